@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""
+Benchmark suite for the hot paths of the rockets client.
+
+The benchmarks follow the `airspeed velocity <https://asv.readthedocs.io>`_ layout and run
+entirely offline: no Rockets server or network connection is needed. Results are stored as JSON
+in ``.asv/results`` which allows comparing revisions with ``asv compare``.
+"""
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Overhead of the client-side admission control of requests that are admitted right away."""
+import asyncio
+
+from rockets import AdmissionControl
+
+
+class AdmissionSuite:
+    """Admit and release 1000 requests under limits they do not reach."""
+
+    params = ["max_pending", "rate", "method_rates"]
+    param_names = ["limit"]
+
+    def setup(self, limit):
+        self.loop = asyncio.new_event_loop()
+        options = {
+            "max_pending": {"max_pending": 10},
+            "rate": {"rate": 1e9, "burst": 1e9},
+            "method_rates": {"method_rates": {"ping": (1e9, 1e9)}},
+        }
+        self.admission = AdmissionControl(**options[limit])
+
+    def teardown(self, limit):
+        self.loop.close()
+
+    async def _admit(self):
+        for _ in range(1000):
+            await self.admission.acquire("ping")
+            self.admission.release()
+
+    def time_acquire_release(self, limit):
+        self.loop.run_until_complete(self._admit())
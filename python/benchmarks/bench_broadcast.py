@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Fan-out of server broadcasts to many connected clients."""
+import asyncio
+import json
+
+from rockets.server import Server
+
+HANDSHAKE = (
+    b"GET / HTTP/1.1\r\n"
+    b"Host: localhost\r\n"
+    b"Upgrade: websocket\r\n"
+    b"Connection: Upgrade\r\n"
+    b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n"
+    b"Sec-WebSocket-Version: 13\r\n"
+    b"Sec-WebSocket-Protocol: rockets\r\n\r\n"
+)
+
+PARAMS = {"frame": 1, "data": list(range(20))}
+
+
+async def _connect(url, loop):
+    """A client which only counts the received bytes, so the fan-out of the server is measured."""
+    host, port = url.split(":")
+    reader, writer = await asyncio.open_connection(host, int(port), loop=loop)
+    writer.write(HANDSHAKE)
+    await reader.readuntil(b"\r\n\r\n")
+    return reader, writer
+
+
+class BroadcastSuite:
+    """Broadcast 100 notifications and wait until every client received all of them."""
+
+    params = [1, 100, 1000]
+    param_names = ["clients"]
+    timeout = 300
+
+    def setup(self, clients):
+        self.loop = asyncio.new_event_loop()
+        self.server = Server(loop=self.loop)
+        self.loop.run_until_complete(self.server.start())
+        self.clients = self.loop.run_until_complete(
+            asyncio.gather(
+                *[_connect(self.server.url, self.loop) for _ in range(clients)],
+                loop=self.loop,
+            )
+        )
+        message = {"jsonrpc": "2.0", "method": "frame", "params": PARAMS}
+        # unmasked text frames with a 16 bit length
+        self.frame_size = 4 + len(json.dumps(message).encode())
+
+    def teardown(self, clients):
+        for _, writer in self.clients:
+            writer.close()
+        self.loop.run_until_complete(self.server.close())
+        self.loop.close()
+
+    async def _fan_out(self, count):
+        async def _receive(reader):
+            left = count * self.frame_size
+            while left:
+                left -= len(await reader.read(left))
+
+        receivers = asyncio.gather(
+            *[_receive(reader) for reader, _ in self.clients], loop=self.loop
+        )
+        for _ in range(count):
+            await self.server.broadcast("frame", PARAMS)
+        await receivers
+
+    def time_broadcast(self, clients):
+        self.loop.run_until_complete(self._fan_out(100))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Event loop lag while receiving large responses, decoded inline or in a worker pool."""
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+import websockets
+
+from rockets import AsyncClient
+
+MESSAGES = 5
+VALUES = 500000
+
+
+class RecordedSocket:
+    """Returns the given messages like a websocket connection, then closes."""
+
+    def __init__(self, messages, loop):
+        self.messages = list(messages)
+        self.loop = loop
+
+    async def recv(self):
+        """Return the next message after the other tasks had their turn."""
+        await asyncio.sleep(0, loop=self.loop)
+        if not self.messages:
+            raise websockets.ConnectionClosed(1000, "")
+        return self.messages.pop(0)
+
+
+class DecodeOffLoopSuite:
+    """Receive 5 responses of 500000 doubles while a task ticks every millisecond."""
+
+    params = ["inline", "thread", "process"]
+    param_names = ["decoding"]
+    timeout = 120
+
+    def setup(self, decoding):
+        self.loop = asyncio.new_event_loop()
+        self.executor = None
+        if decoding == "thread":
+            self.executor = ThreadPoolExecutor(1)
+        elif decoding == "process":
+            self.executor = ProcessPoolExecutor(1)
+            # start the worker outside of the measurement
+            self.executor.submit(json.loads, "0").result()
+
+        client = AsyncClient(
+            "localhost",
+            loop=self.loop,
+            decode_threshold=None if decoding == "inline" else 1024 * 1024,
+            decode_executor=self.executor,
+        )
+        result = [float(i) for i in range(VALUES)]
+        messages = [
+            json.dumps({"jsonrpc": "2.0", "id": i, "result": result})
+            for i in range(MESSAGES)
+        ]
+        responses = [client._add_pending(i, None) for i in range(MESSAGES)]
+
+        self.lags = []
+        start = self.loop.time()
+        self.loop.run_until_complete(
+            asyncio.gather(
+                client._receive_loop(RecordedSocket(messages, self.loop)),
+                self._tick(responses),
+                loop=self.loop,
+            )
+        )
+        self.duration = self.loop.time() - start
+
+    async def _tick(self, responses, interval=0.001):
+        while not all(response.done() for response in responses):
+            start = self.loop.time()
+            await asyncio.sleep(interval, loop=self.loop)
+            self.lags.append(self.loop.time() - start - interval)
+
+    def teardown(self, decoding):
+        if self.executor:
+            self.executor.shutdown()
+        self.loop.close()
+
+    def track_max_loop_lag(self, decoding):
+        return max(self.lags) * 1000
+
+    track_max_loop_lag.unit = "ms"
+
+    def track_duration(self, decoding):
+        return self.duration * 1000
+
+    track_duration.unit = "ms"
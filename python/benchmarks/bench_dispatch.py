@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Benchmarks for dispatching received messages to pending requests and subscribers."""
+import array
+import asyncio
+import json
+
+from rx.subjects import Subject
+
+from rockets import AsyncClient
+from rockets.binary import to_array
+from rockets.utils import is_json_rpc_notification
+from rockets.utils import is_json_rpc_response
+from rockets.utils import is_progress_notification
+
+
+class OfflineClient(AsyncClient):
+    """An AsyncClient that is fed by the benchmark instead of a websocket connection."""
+
+    def __init__(self):
+        super().__init__("localhost", loop=asyncio.new_event_loop())
+
+    async def connect(self):
+        """Never connect, not even when iterating or subscribing the streams."""
+
+    def feed(self, frames):
+        """Dispatch the given frames as if they were received from the websocket."""
+        for frame in frames:
+            self._dispatch(frame)
+
+    def close(self):
+        """Close the event loop of this client."""
+        self.loop.close()
+
+
+class RxPipeline:
+    """
+    The receive pipeline of rockets <= 1.0.2 as a baseline: one rx operator chain per pending
+    request and per notification subscriber on top of a subject fed with every frame.
+    """
+
+    def __init__(self):
+        self.subject = Subject()
+        self.json_stream = self.subject.map(json.loads)
+
+    def add_pending(self, request_id):
+        """Subscribe a filter chain for the response of one request."""
+        self.json_stream.filter(
+            lambda value: is_json_rpc_response(value) and value["id"] == request_id
+        ).take(1).subscribe(lambda value: None)
+
+    def add_subscriber(self):
+        """Subscribe a filter chain for notifications."""
+        self.json_stream.filter(
+            lambda value: is_json_rpc_notification(value)
+            and not is_progress_notification(value)
+        ).subscribe(lambda value: None)
+
+    def feed(self, frames):
+        """Push the given frames into the pipeline."""
+        for frame in frames:
+            self.subject.on_next(frame)
+
+
+def _response(request_id):
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "result": "OK"})
+
+
+def _notification(index):
+    return json.dumps({"jsonrpc": "2.0", "method": "set-camera", "params": [index]})
+
+
+def _progress(request_id, amount):
+    return json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "method": "progress",
+            "params": {"id": request_id, "amount": amount, "operation": "working"},
+        }
+    )
+
+
+class PendingRequestsSuite:
+    """Dispatch one response to each of N pending requests."""
+
+    params = ([1, 100, 1000], ["native", "rx"])
+    param_names = ["pending", "pipeline"]
+    number = 1
+    repeat = 10
+    warmup_time = 0
+    # the rx baseline scans every pending request for each frame
+    timeout = 300
+
+    def setup(self, pending, pipeline):
+        request_ids = ["{:08d}".format(i) for i in range(pending)]
+        if pipeline == "native":
+            self.client = OfflineClient()
+            for request_id in request_ids:
+                self.client._add_pending(request_id, None)
+        else:
+            self.client = RxPipeline()
+            for request_id in request_ids:
+                self.client.add_pending(request_id)
+        self.frames = [_response(request_id) for request_id in request_ids]
+
+    def teardown(self, pending, pipeline):
+        if pipeline == "native":
+            self.client.close()
+
+    def time_dispatch_responses(self, pending, pipeline):
+        self.client.feed(self.frames)
+
+
+class NotificationFanOutSuite:
+    """Deliver 100 notifications to N subscribers."""
+
+    params = ([1, 10, 100], ["native", "rx-compat", "rx"])
+    param_names = ["subscribers", "pipeline"]
+
+    def setup(self, subscribers, pipeline):
+        if pipeline == "native":
+            self.client = OfflineClient()
+            for _ in range(subscribers):
+                self.client.notifications.add_listener(lambda value: None)
+        elif pipeline == "rx-compat":
+            self.client = OfflineClient()
+            for _ in range(subscribers):
+                self.client.notifications.subscribe(lambda value: None)
+        else:
+            self.client = RxPipeline()
+            for _ in range(subscribers):
+                self.client.add_subscriber()
+        self.frames = [_notification(i) for i in range(100)]
+
+    def teardown(self, subscribers, pipeline):
+        if pipeline != "rx":
+            self.client.close()
+
+    def time_fan_out(self, subscribers, pipeline):
+        self.client.feed(self.frames)
+
+
+class NotificationIteratorSuite:
+    """Deliver 100 notifications to N async iterators and consume them."""
+
+    params = [1, 10, 100]
+    param_names = ["iterators"]
+
+    def setup(self, iterators):
+        self.client = OfflineClient()
+        self.iterators = [self.client.notifications() for _ in range(iterators)]
+        self.frames = [_notification(i) for i in range(100)]
+
+    def teardown(self, iterators):
+        self.client.close()
+
+    def time_fan_out(self, iterators):
+        self.client.feed(self.frames)
+
+        async def _consume():
+            for iterator in self.iterators:
+                for _ in self.frames:
+                    await iterator.__anext__()
+
+        self.client.loop.run_until_complete(_consume())
+
+
+class BatchProgressSuite:
+    """Aggregate progress notifications of a batch request with N requests."""
+
+    params = [10, 100]
+    param_names = ["requests"]
+
+    def setup(self, requests):
+        self.client = OfflineClient()
+        request_ids = ["{:08d}".format(i) for i in range(requests)]
+        self.client._add_pending_batch(request_ids, lambda progress: None)
+        self.frames = [
+            _progress(request_id, amount / 10)
+            for amount in range(10)
+            for request_id in request_ids
+        ]
+
+    def teardown(self, requests):
+        self.client.close()
+
+    def time_batch_progress(self, requests):
+        self.client.feed(self.frames)
+
+
+class LargeArraySuite:
+    """Receive a result of one million doubles as JSON list or as binary frame."""
+
+    params = ["json", "binary"]
+    param_names = ["encoding"]
+    number = 1
+    repeat = 10
+    warmup_time = 0
+
+    def setup(self, encoding):
+        values = array.array("d", range(1000000))
+        self.client = OfflineClient()
+        self.client._add_pending("0", None)
+        if encoding == "json":
+            self.frames = [
+                json.dumps({"jsonrpc": "2.0", "id": "0", "result": values.tolist()})
+            ]
+        else:
+            # keep the one-time import of NumPy out of the measurement
+            to_array(b"", "u1")
+            result = {"$binary": 0, "dtype": "<f8"}
+            self.frames = [
+                json.dumps(
+                    {"jsonrpc": "2.0", "id": "0", "binary": 1, "result": result}
+                ),
+                values.tobytes(),
+            ]
+
+    def teardown(self, encoding):
+        self.client.close()
+
+    def time_receive(self, encoding):
+        self.client.feed(self.frames)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Encoding and decoding a response with a numeric result as JSON and as MessagePack."""
+import json
+import random
+
+from rockets.encoding import pack
+from rockets.encoding import unpack
+
+
+class EncodingSuite:
+    """A response with 10000 points of three floats and an int each, e.g. a sampled simulation."""
+
+    params = ["json", "msgpack"]
+    param_names = ["encoding"]
+
+    def setup(self, encoding):
+        rng = random.Random(42)
+        points = [
+            [rng.random(), rng.random(), rng.random(), rng.randint(0, 1 << 20)]
+            for _ in range(10000)
+        ]
+        self.response = {"jsonrpc": "2.0", "id": 1, "result": {"points": points}}
+        if encoding == "msgpack":
+            self.encode, self.decode = pack, unpack
+        else:
+            self.encode, self.decode = json.dumps, json.loads
+        self.message = self.encode(self.response)
+
+    def time_encode(self, encoding):
+        self.encode(self.response)
+
+    def time_decode(self, encoding):
+        self.decode(self.message)
+
+    def track_size(self, encoding):
+        return len(self.message)
+
+    track_size.unit = "bytes"
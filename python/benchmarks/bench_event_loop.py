@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""End-to-end throughput and latency against a local echo server, on asyncio and uvloop."""
+from rockets import new_event_loop
+from rockets.bench import run_load
+from rockets.bench import serve
+
+
+class EventLoopSuite:
+    """Request, batch and notify workloads over 4 connections with 8 operations in flight each."""
+
+    params = (["asyncio", "uvloop"], ["request", "batch", "notify"])
+    param_names = ["loop", "workload"]
+    timeout = 120
+
+    def setup(self, loop_type, workload):
+        try:
+            self.loop = new_event_loop(loop_type)
+        except ImportError:
+            raise NotImplementedError("uvloop is not installed")
+        self.server, url = self.loop.run_until_complete(serve(loop=self.loop))
+        self.stats = self.loop.run_until_complete(
+            run_load(
+                url,
+                workload=workload,
+                method="echo",
+                params=[1.0, 2.0, 3.0],
+                clients=4,
+                concurrency=8,
+                duration=2.0,
+                warmup=0.5,
+                loop=self.loop,
+            )
+        )
+
+    def teardown(self, loop_type, workload):
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    def track_throughput(self, loop_type, workload):
+        return self.stats.throughput
+
+    track_throughput.unit = "operations/s"
+
+    def track_latency_p50(self, loop_type, workload):
+        return self.stats.percentile(50) * 1000
+
+    track_latency_p50.unit = "ms"
+
+    def track_latency_p99(self, loop_type, workload):
+        return self.stats.percentile(99) * 1000
+
+    track_latency_p99.unit = "ms"
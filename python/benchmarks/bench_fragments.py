@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Peak memory of sending large params at once against sending them as fragments."""
+import asyncio
+import json
+import subprocess
+import sys
+import tracemalloc
+
+import rockets
+
+
+def _rows(params):
+    """The JSON text of the params, one row after the other."""
+    yield "["
+    for index, row in enumerate(params):
+        yield json.dumps(row) if index == 0 else "," + json.dumps(row)
+    yield "]"
+
+
+class FragmentedSendSuite:
+    """Send 1000 rows of 2500 floats, about 50 MB of JSON, to a server in another process."""
+
+    params = ["message", "fragments"]
+    param_names = ["send"]
+    timeout = 300
+
+    def setup(self, send):
+        # the echo server answers the unknown method with a small error
+        self.server = subprocess.Popen(
+            [sys.executable, "-m", "rockets.bench", "--serve"],
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        url = self.server.stderr.readline().split()[-1]
+        self.loop = asyncio.new_event_loop()
+        self.client = rockets.AsyncClient(url, loop=self.loop)
+        self.loop.run_until_complete(self.client.connect())
+        self.params = [[float(i) / 3 for i in range(2500)] for _ in range(1000)]
+
+    def teardown(self, send):
+        self.loop.run_until_complete(self.client.disconnect())
+        self.loop.close()
+        self.server.terminate()
+        self.server.wait()
+
+    async def _send(self, send):
+        try:
+            if send == "message":
+                await self.client.request("upload", self.params)
+            else:
+                await self.client.request_fragmented("upload", _rows(self.params))
+        except rockets.RequestError:
+            pass
+
+    def track_peak_memory(self, send):
+        tracemalloc.start()
+        try:
+            self.loop.run_until_complete(self._send(send))
+            return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+
+    track_peak_memory.unit = "MB"
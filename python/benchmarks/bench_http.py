@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Short sessions over HTTP with keep-alive against WebSocket, e.g. of short-lived workers."""
+import asyncio
+
+import rockets
+from rockets.server import Server
+
+
+class ShortSessionSuite:
+    """Sessions which connect, send a few requests concurrently and disconnect."""
+
+    params = (["websocket", "http"], [1, 10])
+    param_names = ["transport", "requests"]
+    timeout = 120
+
+    def setup(self, transport, requests):
+        self.loop = asyncio.new_event_loop()
+        self.server = Server(loop=self.loop)
+        self.server.bind("echo", lambda params: params)
+        self.loop.run_until_complete(self.server.start())
+        self.loop.run_until_complete(self.server.start_http())
+        self.url = self.server.http_url if transport == "http" else self.server.url
+        # warm up the server
+        self.loop.run_until_complete(self._session(transport, requests))
+
+    def teardown(self, transport, requests):
+        self.loop.run_until_complete(self.server.close())
+        self.loop.close()
+
+    async def _session(self, transport, requests):
+        client = rockets.AsyncClient(self.url, loop=self.loop, transport=transport)
+        await asyncio.gather(
+            *[client.request("echo", [1.0, 2.0, 3.0]) for _ in range(requests)],
+            loop=self.loop,
+        )
+        await client.disconnect()
+
+    def time_sessions(self, transport, requests):
+        for _ in range(50):
+            self.loop.run_until_complete(self._session(transport, requests))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Benchmarks for JSON-RPC message construction, serialization and classification."""
+import json
+
+from rockets import Notification
+from rockets import MethodEnvelope
+from rockets import Request
+from rockets import Response
+from rockets.utils import is_json_rpc_notification
+from rockets.utils import is_json_rpc_response
+from rockets.utils import is_progress_notification
+from rockets.utils import random_string
+
+
+PARAMS = {"position": [1.0, 2.0, 3.0], "orientation": [0.0, 0.0, 0.0, 1.0], "fovy": 45}
+
+
+class RequestSuite:
+    """Construction and serialization of requests and notifications."""
+
+    def time_request(self):
+        Request("set-camera", PARAMS)
+
+    def time_request_json(self):
+        return Request("set-camera", PARAMS).json
+
+    def time_notification(self):
+        Notification("set-camera", PARAMS)
+
+    def time_notification_json(self):
+        return Notification("set-camera", PARAMS).json
+
+    def time_request_id(self):
+        next(Request._id_generator)
+
+
+class MethodEnvelopeSuite:
+    """Encoding of requests with the precomputed envelope of generated stubs."""
+
+    def setup(self):
+        self.envelope = MethodEnvelope("set-camera")
+
+    def time_encode(self):
+        self.envelope.encode(PARAMS)
+
+    def time_encode_without_params(self):
+        self.envelope.encode()
+
+
+class IdGenerationSuite:
+    """Generation of random request IDs."""
+
+    params = [8, 16]
+    param_names = ["length"]
+
+    def setup(self, length):
+        self.generator = random_string(length)
+
+    def time_random_string(self, length):
+        next(self.generator)
+
+
+class ResponseSuite:
+    """Decoding of responses with results of different sizes."""
+
+    params = [1, 100, 10000]
+    param_names = ["items"]
+
+    def setup(self, items):
+        result = [PARAMS] * items
+        self.message = json.dumps({"jsonrpc": "2.0", "id": "abcdefgh", "result": result})
+
+    def time_response_from_json(self, items):
+        Response.from_json(self.message)
+
+
+class ClassifierSuite:
+    """The message classifiers used for every received message."""
+
+    def setup(self):
+        self.response = {"jsonrpc": "2.0", "id": "abcdefgh", "result": PARAMS}
+        self.notification = {"jsonrpc": "2.0", "method": "set-camera", "params": PARAMS}
+        self.progress = {
+            "jsonrpc": "2.0",
+            "method": "progress",
+            "params": {"id": "abcdefgh", "amount": 0.5, "operation": "loading"},
+        }
+
+    def time_is_json_rpc_response(self):
+        is_json_rpc_response(self.response)
+        is_json_rpc_response(self.notification)
+
+    def time_is_json_rpc_notification(self):
+        is_json_rpc_notification(self.response)
+        is_json_rpc_notification(self.notification)
+
+    def time_is_progress_notification(self):
+        is_progress_notification(self.progress)
+        is_progress_notification(self.notification)
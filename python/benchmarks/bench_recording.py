@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Cost of recording the frames of a session."""
+import json
+import os
+import tempfile
+
+from rockets.bench import Recorder
+
+
+class RecorderSuite:
+    """Record 10000 frames of a typical request size."""
+
+    params = [64, 4096]
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "session.rec")
+        self.message = json.dumps(
+            {"jsonrpc": "2.0", "id": 1, "method": "echo", "params": "x" * size}
+        )
+
+    def teardown(self, size):
+        self.directory.cleanup()
+
+    def time_record(self, size):
+        recorder = Recorder(self.path)
+        for _ in range(10000):
+            recorder.sent(self.message)
+        recorder.close()
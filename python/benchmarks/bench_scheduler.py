@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Latency of a light client while a heavy client floods a server with a large batch."""
+import asyncio
+import subprocess
+import sys
+import time
+
+import rockets
+
+# the server runs in its own process, like a real service, so only its scheduling is measured
+SERVER = """
+import asyncio
+import sys
+
+from rockets.server import Scheduler
+from rockets.server import Server
+
+
+def _work(params):
+    return sum(range(params[0]))
+
+
+loop = asyncio.get_event_loop()
+scheduler = Scheduler(max_concurrency=int(sys.argv[1])) if sys.argv[1] != "0" else None
+server = Server(scheduler=scheduler)
+server.bind("ping", lambda params: "pong")
+server.bind("work", _work)
+loop.run_until_complete(server.start())
+print(server.url, flush=True)
+loop.run_forever()
+"""
+
+
+class FairnessSuite:
+    """
+    Pings of a light client during a batch of 2000 CPU-bound requests of a heavy client, without a
+    scheduler (0) and with schedulers of different concurrency.
+    """
+
+    params = [0, 16, 4]
+    param_names = ["max_concurrency"]
+    timeout = 120
+
+    def setup(self, max_concurrency):
+        self.server = subprocess.Popen(
+            [sys.executable, "-c", SERVER, str(max_concurrency)],
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        url = self.server.stdout.readline().strip()
+        self.loop = asyncio.new_event_loop()
+        self.latencies = self.loop.run_until_complete(self._flood(url))
+
+    def teardown(self, max_concurrency):
+        self.server.kill()
+        self.server.wait()
+        self.server.stdout.close()
+        self.loop.close()
+
+    async def _flood(self, url):
+        heavy = rockets.AsyncClient(url, loop=self.loop)
+        light = rockets.AsyncClient(url, loop=self.loop)
+        await heavy.connect()
+        await light.connect()
+        batch = asyncio.ensure_future(
+            heavy.batch([rockets.Request("work", [5000]) for _ in range(2000)]),
+            loop=self.loop,
+        )
+        latencies = []
+        while not batch.done():
+            started = time.perf_counter()
+            await light.request("ping")
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.001, loop=self.loop)
+        await heavy.disconnect()
+        await light.disconnect()
+        return sorted(latencies)
+
+    def track_light_latency_p50(self, max_concurrency):
+        return self.latencies[len(self.latencies) // 2] * 1000
+
+    track_light_latency_p50.unit = "ms"
+
+    def track_light_latency_max(self, max_concurrency):
+        return self.latencies[-1] * 1000
+
+    track_light_latency_max.unit = "ms"
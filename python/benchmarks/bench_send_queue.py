@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Latency of small requests while large messages are sent on the same connection."""
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import rockets
+from rockets.bench import LatencyStats
+
+# the echo server, but without a queue of received messages, so messages wait in the client
+_SERVER = """
+import asyncio
+import websockets
+from rockets.bench.server import process_message
+
+async def handle(websocket, path):
+    async for message in websocket:
+        response = process_message(message)
+        if response:
+            await websocket.send(response)
+
+server = asyncio.get_event_loop().run_until_complete(
+    websockets.serve(handle, "localhost", 0, max_size=None, max_queue=1)
+)
+print("localhost:{}".format(server.sockets[0].getsockname()[1]), flush=True)
+asyncio.get_event_loop().run_forever()
+"""
+
+
+class MixedLoadSuite:
+    """Ping every 10 ms while 16 senders upload 1 MB notifications to a server process."""
+
+    params = ["bulk", "interactive"]
+    param_names = ["upload_priority"]
+    timeout = 120
+
+    def setup(self, upload_priority):
+        self.server = subprocess.Popen(
+            [sys.executable, "-c", _SERVER],
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        url = self.server.stdout.readline().strip()
+        self.loop = asyncio.new_event_loop()
+        self.client = rockets.AsyncClient(url, loop=self.loop)
+        self.upload = json.dumps(
+            {"jsonrpc": "2.0", "method": "upload", "params": ["x" * 1024 * 1024]}
+        )
+        self.stats = self.loop.run_until_complete(self._measure(upload_priority, 2.0))
+
+    def teardown(self, upload_priority):
+        self.loop.run_until_complete(self.client.disconnect())
+        self.loop.close()
+        self.server.terminate()
+        self.server.wait()
+
+    async def _measure(self, upload_priority, duration):
+        await self.client.connect()
+        deadline = time.perf_counter() + duration
+        stats = LatencyStats()
+
+        async def _upload():
+            while time.perf_counter() < deadline:
+                await self.client.send(self.upload, upload_priority)
+
+        async def _ping():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await self.client.request("ping")
+                stats.add(time.perf_counter() - started)
+                await asyncio.sleep(0.01, loop=self.loop)
+
+        await asyncio.gather(_ping(), *[_upload() for _ in range(16)], loop=self.loop)
+        return stats
+
+    def track_ping_latency_p50(self, upload_priority):
+        return self.stats.percentile(50) * 1000
+
+    track_ping_latency_p50.unit = "ms"
+
+    def track_ping_latency_p99(self, upload_priority):
+        return self.stats.percentile(99) * 1000
+
+    track_ping_latency_p99.unit = "ms"
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Throughput and latency of rockets.server against the minimal echo server of rockets.bench."""
+import asyncio
+
+from rockets.bench import run_load
+from rockets.bench import serve
+from rockets.server import Server
+
+
+async def _serve_rockets(loop):
+    server = Server(loop=loop)
+    server.bind("ping", lambda params: "pong")
+    server.bind("echo", lambda params: params)
+    await server.start()
+    return server, server.url
+
+
+class ServerSuite:
+    """Request, batch and notify workloads over 4 connections with 8 operations in flight each."""
+
+    params = (["echo", "rockets"], ["request", "batch", "notify"])
+    param_names = ["server", "workload"]
+    timeout = 120
+
+    def setup(self, server, workload):
+        self.loop = asyncio.new_event_loop()
+        if server == "echo":
+            self.server, url = self.loop.run_until_complete(serve(loop=self.loop))
+        else:
+            self.server, url = self.loop.run_until_complete(_serve_rockets(self.loop))
+        self.stats = self.loop.run_until_complete(
+            run_load(
+                url,
+                workload=workload,
+                method="echo",
+                params=[1.0, 2.0, 3.0],
+                clients=4,
+                concurrency=8,
+                duration=2.0,
+                warmup=0.5,
+                loop=self.loop,
+            )
+        )
+
+    def teardown(self, server, workload):
+        if server == "echo":
+            self.server.close()
+            self.loop.run_until_complete(self.server.wait_closed())
+        else:
+            self.loop.run_until_complete(self.server.close())
+        self.loop.close()
+
+    def track_throughput(self, server, workload):
+        return self.stats.throughput
+
+    track_throughput.unit = "operations/s"
+
+    def track_latency_p99(self, server, workload):
+        return self.stats.percentile(99) * 1000
+
+    track_latency_p99.unit = "ms"
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Appending notification frames to a spool and reading them back."""
+import os
+import tempfile
+
+from rockets import NotificationSpool
+from rockets import SpoolReader
+
+FRAME = (
+    '{"jsonrpc": "2.0", "method": "progress", "params": {"step": 12345, "data": "%s"}}'
+)
+
+
+class SpoolSuite:
+    """Append and read 10000 frames in a ring buffer which holds about a third of them."""
+
+    params = [64, 1024]
+    param_names = ["frame_size"]
+
+    def setup(self, frame_size):
+        frame = FRAME % ("x" * (frame_size - len(FRAME) + 2))
+        self.frames = [frame] * 10000
+        self.path = os.path.join(tempfile.mkdtemp(), "bench.spool")
+        self.spool = NotificationSpool(self.path, capacity=frame_size * 3300)
+        for frame in self.frames:
+            self.spool.append(frame)
+        self.reader = SpoolReader(self.path)
+
+    def teardown(self, frame_size):
+        self.reader.close()
+        self.spool.close()
+        os.unlink(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+    def time_append(self, frame_size):
+        append = self.spool.append
+        for frame in self.frames:
+            append(frame)
+
+    def time_read(self, frame_size):
+        self.reader.seek()
+        for _ in self.reader:
+            pass
+
+    def time_read_decoded(self, frame_size):
+        self.reader.seek()
+        for _ in self.reader.records(decode=True):
+            pass
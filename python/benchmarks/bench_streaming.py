@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Peak memory and time of receiving a large result as a whole and streamed."""
+import asyncio
+import json
+
+import websockets
+
+from rockets import AsyncClient
+
+ITEM = json.dumps({"position": [1.0, 2.0, 3.0], "radius": 0.5, "name": "segment"})
+
+
+def _fragments(request_id, count, per_fragment=1000):
+    """Generate the response lazily, so the server does not dominate the peak memory."""
+    yield '{"id": ' + json.dumps(request_id) + ', "jsonrpc": "2.0", "result": ['
+    for start in range(0, count, per_fragment):
+        items = ",".join([ITEM] * min(per_fragment, count - start))
+        yield items if not start else "," + items
+    yield "]}"
+
+
+async def _handle(websocket, path):  # pylint: disable=W0613
+    while True:
+        request = json.loads(await websocket.recv())
+        await websocket.send(_fragments(request["id"], request["params"][0]))
+
+
+def _ignore(item):  # pylint: disable=W0613
+    pass
+
+
+class LargeResultSuite:
+    """A result of 200k items, about 15 MB of JSON, sent in fragments of 1000 items."""
+
+    timeout = 120
+
+    def setup(self):
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(
+            websockets.serve(_handle, "localhost", 0, loop=self.loop, max_size=None)
+        )
+        url = "localhost:{}".format(self.server.sockets[0].getsockname()[1])
+        self.client = AsyncClient(url, loop=self.loop)
+        self.loop.run_until_complete(self.client.connect())
+
+    def teardown(self):
+        self.loop.run_until_complete(self.client.disconnect())
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    def _request(self):
+        return self.loop.run_until_complete(self.client.request("get-items", [200000]))
+
+    def _stream_request(self):
+        return self.loop.run_until_complete(
+            self.client.stream_request("get-items", [200000], sink=_ignore)
+        )
+
+    def peakmem_request(self):
+        self._request()
+
+    def peakmem_stream_request(self):
+        self._stream_request()
+
+    def time_request(self):
+        self._request()
+
+    def time_stream_request(self):
+        self._stream_request()
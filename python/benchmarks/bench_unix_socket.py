@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Latency and throughput over a Unix domain socket against loopback TCP on the same host."""
+import asyncio
+import os
+import tempfile
+
+import rockets
+from rockets.server import Server
+
+PARAMS = {"position": [1.0, 2.0, 3.0], "orientation": [0.0, 0.0, 0.0, 1.0], "fovy": 45}
+
+
+class _LocalServer:
+    """A local Rockets server on TCP or on a Unix domain socket with a connected client."""
+
+    params = ["tcp", "unix"]
+    param_names = ["socket"]
+    timeout = 120
+
+    def setup(self, kind, *args):
+        self.loop = asyncio.new_event_loop()
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = Server(loop=self.loop)
+        self.server.bind("echo", lambda params: params)
+        if kind == "unix":
+            path = os.path.join(self.directory.name, "rockets.sock")
+            self.loop.run_until_complete(self.server.start_unix(path))
+        else:
+            self.loop.run_until_complete(self.server.start())
+        self.client = rockets.AsyncClient(self.server.url, loop=self.loop)
+        self.loop.run_until_complete(self.client.connect())
+
+    def teardown(self, kind, *args):
+        self.loop.run_until_complete(self.client.disconnect())
+        self.loop.run_until_complete(self.server.close())
+        self.loop.close()
+        self.directory.cleanup()
+
+
+class LatencySuite(_LocalServer):
+    """Round trips of one request after the other."""
+
+    def time_round_trips(self, kind):
+        async def _round_trips():
+            for _ in range(500):
+                await self.client.request("echo", PARAMS)
+
+        self.loop.run_until_complete(_round_trips())
+
+
+class ThroughputSuite(_LocalServer):
+    """Concurrent requests with large and small params."""
+
+    params = (["tcp", "unix"], [100, 100000])
+    param_names = ["socket", "size"]
+
+    def time_concurrent_requests(self, kind, size):
+        params = ["x" * size]
+        self.loop.run_until_complete(
+            asyncio.gather(
+                *[self.client.request("echo", params) for _ in range(200)],
+                loop=self.loop,
+            )
+        )
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Cost of compiling method schemas and of validating params on the client."""
+import json
+
+from rockets import ParamsValidator
+from rockets import Request
+
+CAMERA = {
+    "name": "camera",
+    "type": "object",
+    "properties": {
+        "position": {
+            "type": "array",
+            "items": {"type": "number"},
+            "minItems": 3,
+            "maxItems": 3,
+        },
+        "orientation": {
+            "type": "array",
+            "items": {"type": "number"},
+            "minItems": 4,
+            "maxItems": 4,
+        },
+        "fovy": {"type": "number", "exclusiveMinimum": 0, "maximum": 180},
+        "type": {"enum": ["perspective", "orthographic"]},
+    },
+    "required": ["position", "orientation"],
+    "additionalProperties": False,
+}
+
+SCHEMAS = {"set-camera": {"type": "method", "params": [CAMERA]}}
+
+PARAMS = {
+    "position": [1.0, 2.0, 3.0],
+    "orientation": [0.0, 0.0, 0.0, 1.0],
+    "fovy": 45,
+    "type": "perspective",
+}
+
+
+class CompileSuite:
+    """Compilation of the schema of a method, once per schema."""
+
+    def time_compile(self):
+        ParamsValidator(SCHEMAS)
+
+
+class ValidateSuite:
+    """Validation of params compared to encoding the request they are validated for."""
+
+    def setup(self):
+        self.validator = ParamsValidator(SCHEMAS)
+
+    def time_validate(self):
+        self.validator.validate("set-camera", PARAMS)
+
+    def time_validate_unknown_method(self):
+        self.validator.validate("get-camera", PARAMS)
+
+    def time_request_json(self):
+        return Request("set-camera", PARAMS).json
+
+    def time_json_dumps(self):
+        json.dumps(PARAMS)
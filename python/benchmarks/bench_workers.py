@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Throughput of a CPU-heavy method on the event loop, on thread and on process pools."""
+import asyncio
+import time
+
+from rockets import AsyncClient
+from rockets.server import Server
+from rockets.server import WorkerPool
+
+REQUESTS = 32
+
+
+def _burn(params, worker=None):
+    """A CPU-heavy handler which holds the GIL."""
+    return sum(i * i for i in range(params[0]))
+
+
+class WorkerPoolSuite:
+    """32 concurrent requests of a method which computes for about 10 ms."""
+
+    params = (["loop", "thread", "process"], [1, 2, 4])
+    param_names = ["pool", "size"]
+    timeout = 120
+
+    def setup(self, pool, size):
+        if pool == "loop" and size > 1:
+            raise NotImplementedError("the event loop has no size")
+
+        self.loop = asyncio.new_event_loop()
+        self.server = Server(loop=self.loop)
+        self.pool = None
+        if pool == "loop":
+            self.server.bind("burn", _burn)
+        else:
+            self.pool = WorkerPool(pool, size=size, loop=self.loop)
+            self.server.bind_worker("burn", _burn, self.pool)
+        self.loop.run_until_complete(self.server.start())
+
+        client = AsyncClient(self.server.url, loop=self.loop)
+        self.loop.run_until_complete(client.request("burn", [1000]))
+        start = time.perf_counter()
+        self.loop.run_until_complete(
+            asyncio.gather(
+                *[client.request("burn", [200000]) for _ in range(REQUESTS)],
+                loop=self.loop,
+            )
+        )
+        self.elapsed = time.perf_counter() - start
+        self.loop.run_until_complete(client.disconnect())
+
+    def teardown(self, pool, size):
+        self.loop.run_until_complete(self.server.close())
+        if self.pool:
+            self.pool.shutdown()
+        self.loop.close()
+
+    def track_throughput(self, pool, size):
+        return REQUESTS / self.elapsed
+
+    track_throughput.unit = "requests/s"
@@ -19,23 +19,82 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 # All rights reserved. Do not distribute without further notice.
 """A small client for Rockets using JSON-RPC as communication contract over a WebSocket."""
-from .async_client import AsyncClient
-from .client import Client
-from .notification import Notification
-from .request import Request
-from .request_error import RequestError
-from .request_progress import RequestProgress
-from .request_task import RequestTask
-from .response import Response
-from .version import VERSION as __version__
+import sys
+from importlib import import_module
 
+# public name -> (submodule, attribute); loaded on first access to keep 'import rockets' cheap
+_EXPORTS = {
+    "AdmissionControl": ("admission_control", "AdmissionControl"),
+    "AsyncClient": ("async_client", "AsyncClient"),
+    "Client": ("client", "Client"),
+    "MethodEnvelope": ("request", "MethodEnvelope"),
+    "MultiClient": ("multi_client", "MultiClient"),
+    "Notification": ("notification", "Notification"),
+    "NotificationSpool": ("spool", "NotificationSpool"),
+    "ParamsValidator": ("params_validator", "ParamsValidator"),
+    "Request": ("request", "Request"),
+    "RequestError": ("request_error", "RequestError"),
+    "RequestProgress": ("request_progress", "RequestProgress"),
+    "RequestTask": ("request_task", "RequestTask"),
+    "Response": ("response", "Response"),
+    "ResponseCache": ("response_cache", "ResponseCache"),
+    "ResultStream": ("result_stream", "ResultStream"),
+    "SendQueue": ("send_queue", "SendQueue"),
+    "SpoolReader": ("spool", "SpoolReader"),
+    "new_event_loop": ("event_loop", "new_event_loop"),
+    "__version__": ("version", "VERSION"),
+}
+
+# the names are resolved by the module __getattr__, which pylint does not see
+# pylint: disable=undefined-all-variable
 __all__ = [
+    "AdmissionControl",
     "AsyncClient",
     "Client",
+    "MethodEnvelope",
+    "MultiClient",
     "Notification",
+    "NotificationSpool",
+    "ParamsValidator",
     "Request",
     "RequestError",
     "RequestProgress",
     "RequestTask",
     "Response",
+    "ResponseCache",
+    "ResultStream",
+    "SendQueue",
+    "SpoolReader",
+    "new_event_loop",
 ]
+# pylint: enable=undefined-all-variable
+
+
+def _load(name):
+    """Import the submodule of an exported name and cache the attribute."""
+    module, attribute = _EXPORTS[name]
+    value = getattr(import_module("." + module, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # no module __getattr__ (PEP 562), import everything eagerly
+    for _name in _EXPORTS:
+        _load(_name)
+else:
+
+    def __getattr__(name):
+        """Import exported names and submodules on first access."""
+        if name in _EXPORTS:
+            return _load(name)
+        try:
+            return import_module("." + name, __name__)
+        except ImportError as error:
+            if error.name != __name__ + "." + name:
+                raise
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    def __dir__():
+        """List the exported names, including those which are not loaded yet."""
+        return sorted(set(globals()) | set(_EXPORTS))
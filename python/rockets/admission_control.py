@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Client-side admission control of requests: a cap on pending requests and rate limits."""
+import asyncio
+import time
+from collections import deque
+
+from .request_error import REQUEST_THROTTLED
+from .request_error import RequestError
+
+
+class _TokenBucket:
+    """A token bucket which refills at a rate up to its burst size."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        """Add the tokens since the last refill, return the available tokens."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+    def reserve(self):
+        """Take a token, return the seconds until it would have been available."""
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class AdmissionControl:
+    """
+    Client-side admission control of requests, to protect a shared server from runaway clients.
+
+    Limits the number of requests which wait for their response at once and the rate of requests
+    with token buckets, for all methods and for single methods. Requests over a limit either wait
+    in order until they are admitted or fail fast with a :class:`RequestError`. The metrics tell
+    whether requests are slow because the client throttles them or because the server is slow.
+    """
+
+    def __init__(
+        self, max_pending=None, rate=None, burst=None, method_rates=None, wait=True
+    ):
+        """
+        Configure the limits.
+
+        :param int max_pending: maximum number of requests which wait for their response at once,
+                                None for no limit
+        :param float rate: maximum requests and notifications per second of all methods, None
+                           for no limit
+        :param float burst: the number of requests which may be sent at once after a pause, the
+                            rate but at least 1 if None
+        :param dict method_rates: maximum requests per second of single methods, by their name;
+                                  each value is the rate or a tuple of the rate and the burst
+        :param bool wait: whether requests over a limit wait until they are admitted; they fail
+                          with the error -31004 right away otherwise
+        :raises ValueError: if a limit, rate or burst is not positive
+        """
+        method_rates = {
+            method: (
+                method_rate
+                if isinstance(method_rate, (tuple, list))
+                else (method_rate, None)
+            )
+            for method, method_rate in (method_rates or {}).items()
+        }
+        limits = [max_pending, rate, burst]
+        limits += [value for pair in method_rates.values() for value in pair]
+        if any(limit is not None and limit <= 0 for limit in limits):
+            raise ValueError("Limits, rates and bursts must be positive")
+
+        self.max_pending = max_pending
+        """The maximum number of requests which wait for their response at once."""
+
+        self.wait = wait
+        """Whether requests over a limit wait until they are admitted."""
+
+        self._bucket = _TokenBucket(rate, burst) if rate is not None else None
+        self._method_buckets = {
+            method: _TokenBucket(*method_rate)
+            for method, method_rate in method_rates.items()
+        }
+
+        self._pending = 0
+        # futures of the requests which wait for a pending request to finish
+        self._waiters = deque()
+        self._waiting = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._throttled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def metrics(self):
+        """
+        Return the number of pending, waiting, admitted and rejected requests and their waiting.
+
+        :return: pending, waiting, admitted, rejected, throttled (the number of admitted requests
+                 which had to wait), mean_wait_ms and max_wait_ms (over the throttled requests)
+        :rtype: dict
+        """
+        return {
+            "pending": self._pending,
+            "waiting": self._waiting,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "throttled": self._throttled,
+            "mean_wait_ms": (
+                self._wait_total / self._throttled * 1000 if self._throttled else 0.0
+            ),
+            "max_wait_ms": self._wait_max * 1000,
+        }
+
+    async def acquire(self, *methods, pending=True):
+        """
+        Wait until requests of the methods may be sent.
+
+        Call :meth:`release` once the response arrived if they are pending.
+
+        :param str methods: the method of each request, e.g. all methods of a batch
+        :param bool pending: whether the requests wait for a response, i.e. count as one pending
+                             request, or are notifications
+        :raises RequestError: if the requests are over a limit and do not wait
+        """
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            waited = await self._acquire_pending() if pending else False
+            admitted = False
+            try:
+                waited = await self._take_tokens(methods) or waited
+                admitted = True
+            finally:
+                if pending and not admitted:
+                    self.release()
+        finally:
+            self._waiting -= 1
+
+        self._admitted += 1
+        if waited:
+            wait = time.monotonic() - started
+            self._throttled += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+    def release(self):
+        """Let the next waiting request be sent once a pending request got its response."""
+        while self._waiters:
+            turn = self._waiters.popleft()
+            if not turn.done():
+                # the pending request is handed over
+                turn.set_result(None)
+                return
+        self._pending -= 1
+
+    async def _acquire_pending(self):
+        """Wait until the request may be pending, return whether it had to wait."""
+        if self.max_pending is None or self._pending < self.max_pending:
+            self._pending += 1
+            return False
+        if not self.wait:
+            raise self._reject("too many pending requests")
+
+        turn = asyncio.get_event_loop().create_future()
+        self._waiters.append(turn)
+        try:
+            await turn
+        except asyncio.CancelledError:
+            if not turn.cancelled():
+                # cancelled after its turn came, pass it on
+                self.release()
+            raise
+        return True
+
+    async def _take_tokens(self, methods):
+        """Take a token of each bucket for each method, return whether it had to wait."""
+        buckets = [self._bucket] * len(methods) if self._bucket is not None else []
+        buckets += [
+            self._method_buckets[method]
+            for method in methods
+            if method in self._method_buckets
+        ]
+        if not buckets:
+            return False
+
+        now = time.monotonic()
+        for bucket in buckets:
+            bucket.refill(now)
+        if not self.wait:
+            # a batch needs all of its tokens at once
+            needed = dict()
+            for bucket in buckets:
+                needed[bucket] = needed.get(bucket, 0) + 1
+            if any(bucket.tokens < count for bucket, count in needed.items()):
+                raise self._reject("rate limit exceeded")
+
+        delay = max([bucket.reserve() for bucket in buckets])
+        if delay <= 0:
+            return False
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # the reserved tokens were not used
+            for bucket in buckets:
+                bucket.tokens += 1
+            raise
+        return True
+
+    def _reject(self, reason):
+        """The error of a rejected request."""
+        self._rejected += 1
+        return RequestError(REQUEST_THROTTLED.code, REQUEST_THROTTLED.message, reason)
@@ -21,83 +21,219 @@
 """Asynchronous client implementation for asyncio event loop processing of JSON-RPC messages."""
 import asyncio
 import json
-import sys
-from functools import reduce
+import socket
+from functools import partial
 
 import websockets
+from jsonrpc.exceptions import JSONRPCInvalidRequestException
 from jsonrpc.jsonrpc2 import JSONRPC20Request
-from rx import Observable
 
+from .binary import attach
+from .binary import expected_frames
+from .encoding import check_encoding
+from .encoding import decode_msgpack_message
+from .encoding import is_msgpack_subprotocol
+from .encoding import msgpack_subprotocols
+from .encoding import pack
+from .fragments import DEFAULT_FRAGMENT_SIZE
+from .fragments import join_chunks
+from .fragments import send_fragments
+from .http_transport import HttpTransport
+from .http_transport import set_http_protocol
+from .message_stream import MessageStream
 from .notification import Notification
+from .request import MethodEnvelope
 from .request import Request
+from .request_error import INVALID_JSON_RESPONSE
 from .request_error import INVALID_REQUEST
 from .request_error import RequestError
 from .request_error import SOCKET_CLOSED_ERROR
 from .request_progress import RequestProgress
 from .request_task import RequestTask
 from .response import Response
+from .send_queue import SendQueue
+from .result_stream import items_at
+from .result_stream import ResultStream
+from .single_flight import SingleFlight
+from .streaming import StreamingClientProtocol
+from .utils import decode_message
 from .utils import is_json_rpc_notification
 from .utils import is_json_rpc_response
 from .utils import is_progress_notification
+from .utils import request_key
 from .utils import set_ws_protocol
+from .utils import split_unix_url
+from .utils import WS_UNIX
+
+TRANSPORTS = ("websocket", "http")
+
+# the message of _dispatch has not been decoded off the event loop
+_UNDECODED = object()
 
 
 class AsyncClient:
     """Asynchronous client implementation for asyncio event loop processing of JSON-RPC messages."""
 
-    def __init__(self, url, subprotocols=None, loop=None):
+    def __init__(
+        self,
+        url,
+        subprotocols=None,
+        loop=None,
+        cache=None,
+        single_flight=None,
+        decode_threshold=None,
+        decode_executor=None,
+        transport="websocket",
+        http_connections=4,
+        recorder=None,
+        fragment_size=DEFAULT_FRAGMENT_SIZE,
+        validator=None,
+        admission=None,
+        spool=None,
+        encoding="json",
+    ):  # pylint: disable=R0913,R0914,R0915
         """
         Initialize the state of the client.
 
         Convert the URL to a proper format. Does not establish the websocket connection yet. This
         will be postponed to the first notify or request.
 
-        :param str url: The address of the Rockets server.
+        :param str url: The address of the Rockets server; ws+unix:///path/to/socket connects to a
+                        server on a Unix domain socket, see :func:`rockets.utils.split_unix_url`
         :param list subprotocols: The websocket protocols to use
         :param asyncio.AbstractEventLoop loop: Event loop where this client should run in
+        :param ResponseCache cache: Cache for the results of idempotent methods
+        :param list single_flight: names of idempotent methods whose concurrent requests with
+                                   equal params share one request to the server
+        :param int decode_threshold: size of messages in characters, or bytes for MessagePack,
+                                     above which they are decoded in the decode_executor instead
+                                     of on the event loop; all messages are decoded on the event
+                                     loop if None
+        :param concurrent.futures.Executor decode_executor: executor for decoding large messages,
+                                                            the default executor of the event
+                                                            loop if None
+        :param str transport: 'websocket', or 'http' to send the requests as HTTP POST requests;
+                              the server cannot send notifications or progress over HTTP then
+        :param int http_connections: the number of keep-alive connections of the HTTP transport
+        :param rockets.bench.Recorder recorder: records the frames sent and received by this
+                                                client, e.g. to replay them for load tests
+        :param int fragment_size: the size in characters or bytes up to which the chunks of
+                                  fragmented messages are joined, see :meth:`send_fragments`;
+                                  longer messages are sent as 'bulk', in fragments of this size
+        :param ParamsValidator validator: validates the params of requests and notifications
+                                          before they are sent
+        :param AdmissionControl admission: limits the pending requests and the rate of requests
+                                           and notifications of this client
+        :param NotificationSpool spool: receives the raw frames of the notifications from the
+                                        server, e.g. to analyse them later
+        :param str encoding: 'json', or 'msgpack' to offer the ``<subprotocol>+msgpack`` websocket
+                             protocols first and exchange binary frames of MessagePack if the
+                             server accepts one; the http transport always uses JSON
+        :raises ValueError: if the transport or the encoding is unknown, or http for a Unix
+                            domain socket
+        :raises ImportError: if the encoding is 'msgpack' and msgpack is not installed
         """
-        self.url = set_ws_protocol(url)
+        if transport not in TRANSPORTS:
+            raise ValueError(
+                "Unknown transport '{}', expected one of {}".format(
+                    transport, TRANSPORTS
+                )
+            )
+        if transport == "http" and url.startswith(WS_UNIX):
+            raise ValueError(
+                "The http transport cannot connect to a Unix domain socket"
+            )
+        check_encoding(encoding)
+
+        self.url = (
+            set_http_protocol(url) if transport == "http" else set_ws_protocol(url)
+        )
         """The address of the connected Rockets server."""
 
         if not subprotocols:
             subprotocols = ["rockets"]
+        if encoding == "msgpack" and transport == "websocket":
+            subprotocols = msgpack_subprotocols(subprotocols)
         self._subprotocols = subprotocols
 
+        self.encoding = "json"
+        """The encoding negotiated with the server, 'json' or 'msgpack' once connected."""
+
         self._ws = None
+        self._receive_task = None
+        # the server closed the connection, only an explicit connect() reconnects
+        self._connection_lost = False
+        self._disconnecting = False
 
         self.loop = loop
         """The event loop where this client is running in."""
         if not self.loop:
             self.loop = asyncio.get_event_loop()
 
-        def _ws_loop(observer):
-            """Internal: synchronous wrapper for async _ws_loop"""
-            asyncio.ensure_future(self._ws_loop(observer), loop=self.loop)
+        self._connect_lock = asyncio.Lock(loop=self.loop)
+
+        # request id -> future of the response
+        self._pending = dict()
+        # request id -> (future of the responses, all request ids of the batch)
+        self._pending_batches = dict()
+        # request id -> callback for the params of progress notifications
+        self._progress_handlers = dict()
+        # request id -> ResultStream of a streamed request, shared with the protocol
+        self._streams = dict()
+        # message which waits for its binary frames, see rockets.binary
+        self._binary_message = None
+        self._binary_frames = None
+
+        def _on_subscribe():
+            """Internal: connect like the rx observables did on their first subscription."""
+            if self._connection_lost:
+                return
+            self.loop.call_soon_threadsafe(
+                lambda: asyncio.ensure_future(self.connect(), loop=self.loop)
+            )
 
-        # pylint: disable=E1101
-        self.ws_observable = Observable.create(_ws_loop).publish().auto_connect()
-        """The websocket stream as an rx observable to subscribe to it."""
-        # pylint: enable=E1101
+        self.ws_observable = MessageStream(self.loop, on_subscribe=_on_subscribe)
+        """
+        The stream of all websocket messages; iterate over it with ``async for message in
+        client.ws_observable()`` or subscribe to it like an rx observable.
+        """
 
-        def _json_filter(value):
-            try:
-                json.loads(value)
-                return True
-            except ValueError:  # pragma: no cover
-                return False
+        self.notifications = MessageStream(self.loop, on_subscribe=_on_subscribe)
+        """
+        The stream of :class:`Notification` from the server; iterate over it with ``async for
+        notification in client.notifications()`` or subscribe to it like an rx observable.
+        """
 
-        # filter everything that is not JSON
-        self._json_stream = self.ws_observable.filter(_json_filter).map(json.loads)
+        self.cache = cache
+        """The :class:`ResponseCache` for the results of idempotent methods, if any."""
+        if self.cache is not None:
+            self.notifications.add_listener(self.cache.on_notification)
 
-        def _notifications_filter(value):
-            return is_json_rpc_notification(value) and not is_progress_notification(
-                value
-            )
+        self.validator = validator
+        """The :class:`ParamsValidator` of the params of the methods, if any."""
 
-        self.notifications = self._json_stream.filter(_notifications_filter).map(
-            lambda x: Notification.from_json(json.dumps(x))
-        )
-        """The rx observable to subscribe to notifications from the server."""
+        self.admission = admission
+        """The :class:`AdmissionControl` of the requests, if any."""
+
+        self.spool = spool
+        """The :class:`NotificationSpool` of the notifications from the server, if any."""
+
+        self._single_flight_methods = set(single_flight or ())
+        self._single_flight = SingleFlight(self.loop)
+
+        self._decode_threshold = decode_threshold
+        self._decode_executor = decode_executor
+
+        self._recorder = recorder
+
+        self._fragment_size = fragment_size
+
+        self.send_queue = SendQueue(self.loop)
+        """The :class:`SendQueue` which orders the outgoing messages, e.g. for its metrics."""
+
+        self._http = None
+        if transport == "http":
+            self._http = HttpTransport(self.url, self.loop, http_connections)
 
     def connected(self):
         """
@@ -106,36 +242,134 @@ class AsyncClient:
         :return: true if the websocket is connected to the Rockets server.
         :rtype: bool
         """
+        if self._http:
+            return self._http.connected()
         return bool(self._ws and self._ws.open)
 
     async def connect(self):
-        """Connect this client to the Rockets server"""
+        """
+        Connect this client to the Rockets server.
+
+        Requests connect implicitly, unless the server closed the previous connection; then
+        they fail until the client is connected again explicitly.
+        """
         if self.connected():
             return
+        if self._http:
+            await self._http.connect()
+            return
 
-        self._ws = await websockets.connect(
-            self.url,
-            subprotocols=self._subprotocols,
-            max_size=None,
-            ping_timeout=None,
-            loop=self.loop,
-        )
+        # concurrent requests must not open one connection each
+        async with self._connect_lock:
+            if self.connected():
+                return
+
+            reconnect = self._ws is not None
+            # let the previous connection fail its pending requests first
+            if self._receive_task:
+                await self._receive_task
+
+            url = self.url
+            options = dict()
+            if url.startswith(WS_UNIX):
+                socket_path, url = split_unix_url(url)
+                options["sock"] = await self._connect_unix(socket_path)
+            self._ws = await websockets.connect(
+                url,
+                create_protocol=partial(StreamingClientProtocol, streams=self._streams),
+                subprotocols=self._subprotocols,
+                max_size=None,
+                ping_timeout=None,
+                loop=self.loop,
+                **options,
+            )
+            self.encoding = (
+                "msgpack" if is_msgpack_subprotocol(self._ws.subprotocol) else "json"
+            )
+            self._receive_task = asyncio.ensure_future(
+                self._receive_loop(self._ws), loop=self.loop
+            )
+            self._connection_lost = False
+
+            if self.cache is not None and reconnect:
+                # notifications might have been missed while not connected
+                self.cache.invalidate()
 
     async def disconnect(self):
         """Disconnect this client from the Rockets server."""
+        if self._http:
+            await self._http.close()
+            return
         if not self.connected():
             return
 
-        await self._ws.close()
+        self._disconnecting = True
+        try:
+            await self._ws.close()
+            await self._receive_task
+        finally:
+            self._disconnecting = False
 
-    async def send(self, message):
+    async def send(self, message, priority=None):
         """
         Send any message to the connected Rockets server.
 
-        :param str message: The message to send
+        Messages are sent one after the other, 'control' messages first, then 'interactive' and
+        then 'bulk' ones, see :class:`SendQueue`. The cancel notifications of this client are
+        'control' messages.
+
+        :param message: The message to send; str as text frame, bytes as binary frame, e.g. of
+                        MessagePack once that is negotiated
+        :type message: str or bytes
+        :param str priority: 'control', 'interactive' or 'bulk'; if None, messages longer than
+                             the fragment size are 'bulk', the others 'interactive'
+        :raises ValueError: if the priority is unknown
         """
-        await self.connect()
-        await self._ws.send(message)
+        await self._send(message, priority)
+
+    async def _send(self, message, priority=None, keys=()):
+        """Internal: send a message, over HTTP on the connection of the requests of its keys."""
+        await self._ensure_connected()
+        if not isinstance(message, (str, bytes)):
+            # the data of a request, notification or batch, encoded once that is negotiated
+            message = (
+                pack(message) if self.encoding == "msgpack" else json.dumps(message)
+            )
+        if self._recorder:
+            self._recorder.sent(message)
+        if self._http:
+            # the response, if any, is the body of the HTTP response
+            response = await self._http.post(message, keys)
+            if response:
+                if self._recorder:
+                    self._recorder.received(response)
+                self._dispatch(response)
+            return
+
+        large = len(message) > self._fragment_size
+        if priority is None:
+            priority = "bulk" if large else "interactive"
+        if large:
+            # let the event loop run between the fragments of a large message
+            size = self._fragment_size
+            fragments = (message[i:i + size] for i in range(0, len(message), size))
+            write = partial(send_fragments, self._ws, [fragments], size)
+        else:
+            write = partial(self._ws.send, message)
+        await self.send_queue.send(write, priority)
+
+    async def send_fragments(self, chunks):
+        """
+        Send one message as websocket fragments while its chunks are produced.
+
+        Large messages, e.g. of large params, are never held in memory as a whole this way: the
+        chunks are read only as fast as the socket takes them. Other messages are sent after the
+        fragmented message. Over HTTP, the chunks are joined into one message.
+
+        :param chunks: iterable or async iterable of str, or of bytes, which make up the message
+        :raises TypeError: if the chunks are neither str nor bytes, or of both types
+        """
+        await self._send_fragments([chunks])
 
     async def notify(self, method, params):
         """
@@ -143,37 +377,56 @@ class AsyncClient:
 
         :param str method: name of the method to invoke
         :param str params: params for the method
+        :raises RequestError: if the validator rejects the params
+        :raises RequestError: if the admission control rejects the notification
         """
-        notification = Notification(method, params)
-        await self.send(notification.json)
+        if self.validator is not None:
+            self.validator.validate(method, params)
+        if self.admission is not None:
+            await self.admission.acquire(method, pending=False)
+        await self._send(Notification(method, params).data)
 
     async def request(self, method, params=None):
         """
         Invoke an RPC on the Rockets server and returns its response.
 
-        :param str method: name of the method to invoke
+        :param method: name of the method to invoke, or its :class:`MethodEnvelope`
         :param dict params: params for the method
         :return: future object
         :rtype: :class:`asyncio.Future`
+        :raises RequestError: if the validator rejects the params
+        :raises RequestError: if the admission control rejects the request
         """
         if params and not isinstance(params, (list, tuple, dict)):
             params = [params]
-        request = Request(method, params)
-        try:
-            response_future = self.loop.create_future()
+        name = method.method if isinstance(method, MethodEnvelope) else method
+        if self.validator is not None:
+            self.validator.validate(name, params)
 
-            request_id = request.request_id()
-            await self.connect()
-            self._setup_response_filter(response_future, request_id)
-            self._setup_progress_filter(response_future, request_id)
+        cached = self.cache is not None and self.cache.cacheable(name)
+        if cached:
+            found, result = self.cache.get(name, params)
+            if found:
+                return result
+            generation = self.cache.generation
 
-            await self.send(request.json)
-            await response_future
-            return response_future.result()
+        try:
+            if name in self._single_flight_methods:
+                result = await self._single_flight.call(
+                    request_key(name, params),
+                    lambda on_progress: self._request(method, params, on_progress),
+                    self._progress_callback(),
+                )
+            else:
+                result = await self._request(method, params)
         except asyncio.CancelledError:
-            await self.notify("cancel", {"id": request_id})
+            return None
+
+        if cached:
+            self.cache.put(name, params, result, generation)
+        return result
 
-    async def batch(self, requests):
+    async def batch(self, requests):  # pylint: disable=R0912
         """
         Invoke a batch RPC on the Rockets server and return its response(s).
 
@@ -182,6 +435,8 @@ class AsyncClient:
         :rtype: :class:`asyncio.Future`
         :raises RequestError: if methods and/or params are not a list
         :raises RequestError: if methods are empty
+        :raises RequestError: if the validator rejects the params of a request
+        :raises RequestError: if the admission control rejects the batch
         """
         if not requests:
             raise INVALID_REQUEST
@@ -190,31 +445,112 @@ class AsyncClient:
         for request in requests:
             if not isinstance(request, JSONRPC20Request):
                 raise INVALID_REQUEST
+            if self.validator is not None:
+                self.validator.validate(request.method, request.params)
 
         request_ids = list()
         for request in requests:
             if isinstance(request, Request):
                 request_ids.append(request.request_id())
 
+        batch = [entry.data for entry in requests]
+        if self.admission is not None:
+            try:
+                await self.admission.acquire(
+                    *[entry.method for entry in requests], pending=bool(request_ids)
+                )
+            except asyncio.CancelledError:
+                return None
+        if not request_ids:
+            # only notifications, the server does not respond
+            await self._send(batch)
+            return []
+
         try:
+            await self._ensure_connected()
+            response_future = self._add_pending_batch(
+                request_ids, self._progress_callback()
+            )
 
-            def _data(x):
-                return x.data
+            sent = False
+            try:
+                await self._send(batch, keys=tuple(request_ids))
+                sent = True
+            finally:
+                if not sent:
+                    response_future.cancel()
+            return await response_future
+        except asyncio.CancelledError:
+            if self.connected():
+                for request_id in request_ids:
+                    await self._cancel(request_id)
+        finally:
+            if self.admission is not None:
+                self.admission.release()
+
+    async def request_fragmented(self, method, params_chunks):
+        """
+        Invoke an RPC on the Rockets server with params which are sent while they are encoded.
 
-            request = Request.from_data(list(map(_data, requests)))
+        :param str method: name of the method to invoke
+        :param params_chunks: iterable or async iterable of str which make up the JSON text of the
+                              params, e.g. ``json.JSONEncoder().iterencode(params)``
+        :return: the result of the request
+        :rtype: object
+        """
+        try:
+            return await self._request(method, None, params_chunks=params_chunks)
+        except asyncio.CancelledError:
+            return None
 
-            response_future = self.loop.create_future()
+    def stream_request(
+        self, method, params=None, prefix="item", sink=None, maxsize=100
+    ):
+        """
+        Invoke an RPC on the Rockets server and decode its result while it is received.
 
-            await self.connect()
-            self._setup_batch_response_filter(response_future, request_ids)
-            self._setup_batch_progress_filter(response_future, request_ids)
+        Only one item of the result has to be held in memory instead of the whole response, given
+        that the server sends the response fragmented and with the id first, like Rockets servers
+        do, and ijson is installed. Otherwise the result is decoded as a whole and split into its
+        items afterwards.
 
-            await self.send(request.json)
-            await response_future
-            return response_future.result()
-        except asyncio.CancelledError:
-            for request_id in request_ids:
-                await self.notify("cancel", {"id": request_id})
+        :param str method: name of the method to invoke
+        :param dict params: params for the method
+        :param str prefix: dot-separated path of the items in the result, where 'item' stands for
+                           the elements of an array, e.g. 'vertices.item'
+        :param callable sink: called with each item instead of queueing it for iteration
+        :param int maxsize: the number of items to buffer for iteration
+        :return: the items of the result; iterate over it with ``async for item in stream``,
+                 await it for the number of items or close it to cancel the request
+        :rtype: :class:`ResultStream`
+        """
+        if params and not isinstance(params, (list, tuple, dict)):
+            params = [params]
+
+        request = Request(method, params)
+        request_id = request.request_id()
+
+        def _on_close():
+            if self.connected():
+                asyncio.ensure_future(self._cancel(request_id), loop=self.loop)
+
+        stream = ResultStream(
+            self.loop, prefix=prefix, sink=sink, maxsize=maxsize, on_close=_on_close
+        )
+        self._streams[request_id] = stream
+        stream.done.add_done_callback(lambda _: self._streams.pop(request_id, None))
+
+        async def _send():
+            try:
+                if self.admission is not None:
+                    await self.admission.acquire(method)
+                    stream.done.add_done_callback(lambda _: self.admission.release())
+                await self._send(request.data, keys=(request_id,))
+            except (RequestError, OSError, websockets.ConnectionClosed) as error:
+                stream.finish(error)
+
+        asyncio.ensure_future(_send(), loop=self.loop)
+        return stream
 
     def async_request(self, method, params=None):
         """
@@ -243,124 +579,311 @@ class AsyncClient:
         task = self.batch(requests)
         return asyncio.ensure_future(task, loop=self.loop)
 
-    async def _ws_loop(self, observer):
-        """Internal: The loop for feeding an rxpy observer."""
+    async def _request(self, method, params, on_progress=None, params_chunks=None):
+        """Send a request once it is admitted and wait for its response."""
+        if not on_progress:
+            on_progress = self._progress_callback()
+
+        if self.admission is None:
+            return await self._send_request(method, params, on_progress, params_chunks)
+        await self.admission.acquire(
+            method.method if isinstance(method, MethodEnvelope) else method
+        )
+        try:
+            return await self._send_request(method, params, on_progress, params_chunks)
+        finally:
+            self.admission.release()
+
+    async def _send_request(self, method, params, on_progress, params_chunks):
+        """Send a request and wait for its response, cancel it on the server if needed."""
+        request_id = None
         try:
-            await self.connect()
-            if sys.version_info < (3, 6):
-                while True:  # pragma: no cover
-                    message = await self._ws.recv()
-                    observer.on_next(message)
-            else:  # pragma: no cover
-                async for message in self._ws:
-                    observer.on_next(message)
-                observer.on_completed()
-        except websockets.ConnectionClosed:  # pragma: no cover
-            observer.on_completed()
-
-    def _setup_response_filter(self, response_future, request_id):
-        def _response_filter(value):
-            return is_json_rpc_response(value) and value["id"] == request_id
-
-        def _to_response(value):
-            response = Response.from_json(json.dumps(value))
-            if response.result:
-                return response.result
-            return response.error
-
-        def _on_next(value):
-            if not response_future.done():
-                if isinstance(value, dict) and "code" in value:
-                    response_future.set_exception(RequestError(**value))
+            await self._ensure_connected()
+            # the params of fragmented requests are JSON text
+            encoding = self.encoding if params_chunks is None else "json"
+            if isinstance(method, MethodEnvelope):
+                request_id, message = method.encode(params, encoding)
+            else:
+                request = Request(method, params)
+                request_id = request.request_id()
+                message = pack(request.data) if encoding == "msgpack" else request.json
+            response_future = self._add_pending(request_id, on_progress)
+
+            sent = False
+            try:
+                if params_chunks is None:
+                    await self._send(message, keys=(request_id,))
                 else:
-                    response_future.set_result(value)
-
-        def _on_completed():
+                    # the request without its closing brace, then the params and the brace
+                    head = message[:-1] + ', "params": '
+                    await self._send_fragments(
+                        [[head], params_chunks, ["}"]], keys=(request_id,)
+                    )
+                sent = True
+            finally:
+                if not sent:
+                    response_future.cancel()
+            return await response_future
+        except asyncio.CancelledError:
+            if request_id is not None and self.connected():
+                await self._cancel(request_id)
+            raise
+
+    async def _cancel(self, request_id):
+        """Internal: cancel a request on the server, ahead of the other messages."""
+        await self._send(
+            Notification("cancel", {"id": request_id}).data, "control", (request_id,)
+        )
 
-            if not response_future.done():
-                response_future.set_exception(SOCKET_CLOSED_ERROR)
+    async def _send_fragments(self, sources, keys=()):
+        """Internal: send the chunks of the sources one after the other as one message."""
+        if self._http:
+            # the body of an HTTP request is sent as a whole
+            message = ""
+            for source in sources:
+                message += await join_chunks(source)
+            await self._send(message, keys=keys)
+            return
 
-        self._json_stream.filter(_response_filter).take(1).map(_to_response).subscribe(
-            on_next=_on_next, on_completed=_on_completed
+        await self._ensure_connected()
+        sent = [] if self._recorder else None
+        await self.send_queue.send(
+            partial(send_fragments, self._ws, sources, self._fragment_size, sent),
+            "bulk",
         )
+        if sent:
+            self._recorder.sent(sent[0][:0].join(sent))
+
+    async def _connect_unix(self, path):
+        """A socket connected to a Unix domain socket for the websocket handshake."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        connected = False
+        try:
+            await self.loop.sock_connect(sock, path)
+            connected = True
+        finally:
+            if not connected:
+                sock.close()
+        return sock
+
+    async def _ensure_connected(self):
+        """Connect implicitly, unless the server closed the connection."""
+        if self.connected() or self._http:
+            return
+        if self._connection_lost:
+            raise SOCKET_CLOSED_ERROR
+        await self.connect()
 
-    def _setup_batch_response_filter(self, response_future, request_ids):
-        def _response_filter(value):
-            if not isinstance(value, list):
-                return False
-            for response in value:
-                if (
-                    not is_json_rpc_response(response)
-                    or response["id"] not in request_ids
-                ):
-                    return False  # pragma: no cover
-            return True
-
-        def _to_response(value):
-            responses = [Response.from_json(json.dumps(i)) for i in value]
-            return responses
+    @staticmethod
+    def _progress_callback():
+        """The progress callback of the current task if it is a RequestTask."""
+        task = asyncio.Task.current_task()
+        if task and isinstance(task, RequestTask):
+            return task._call_progress_callbacks  # pylint: disable=W0212
+        return None
 
-        def _on_next(value):
-            if not response_future.done():
-                response_future.set_result(value)
+    def _add_pending(self, request_id, on_progress):
+        """The future for the response of a request, resolved by _dispatch."""
+        response_future = self.loop.create_future()
+        self._pending[request_id] = response_future
 
-        def _on_completed():
-            if not response_future.done():
-                response_future.set_exception(SOCKET_CLOSED_ERROR)
+        if on_progress:
 
-        self._json_stream.filter(_response_filter).take(1).map(_to_response).subscribe(
-            on_next=_on_next, on_completed=_on_completed
-        )
+            def _on_progress(params):
+                on_progress(RequestProgress(params["operation"], params["amount"]))
 
-    def _setup_progress_filter(self, response_future, request_id):
-        task = asyncio.Task.current_task()
-        if task and isinstance(task, RequestTask):
+            self._progress_handlers[request_id] = _on_progress
 
-            def _progress_filter(value):
-                return (
-                    is_progress_notification(value)
-                    and value["params"]["id"] == request_id
-                )
+        def _done_callback(future):  # pylint: disable=W0613
+            self._pending.pop(request_id, None)
+            self._progress_handlers.pop(request_id, None)
 
-            def _to_progress(value):
-                progress = Request.from_data(value).params
-                return RequestProgress(progress["operation"], progress["amount"])
+        response_future.add_done_callback(_done_callback)
+        return response_future
 
-            progress_observable = (
-                self._json_stream.filter(_progress_filter)
-                .map(_to_progress)
-                .subscribe(task._call_progress_callbacks)  # pylint: disable=W0212
-            )
+    def _add_pending_batch(self, request_ids, on_progress):
+        """The future for the responses of a batch, resolved by _dispatch."""
+        response_future = self.loop.create_future()
+        for request_id in request_ids:
+            self._pending_batches[request_id] = (response_future, request_ids)
 
-            def _done_callback(future):  # pylint: disable=W0613
-                progress_observable.dispose()
+        if on_progress:
+            amounts = dict()
+            total = 0.0
 
-            response_future.add_done_callback(_done_callback)
+            def _on_progress(params):
+                nonlocal total
+                total += params["amount"] - amounts.get(params["id"], 0.0)
+                amounts[params["id"]] = params["amount"]
+                on_progress(RequestProgress("Batch request", total / len(request_ids)))
 
-    def _setup_batch_progress_filter(self, response_future, request_ids):
-        task = asyncio.Task.current_task()
-        items = dict()
-        if task and isinstance(task, RequestTask):
+            for request_id in request_ids:
+                self._progress_handlers[request_id] = _on_progress
 
-            def _progress_filter(value):
-                return (
-                    is_progress_notification(value)
-                    and value["params"]["id"] in request_ids
-                )
+        def _done_callback(future):  # pylint: disable=W0613
+            for request_id in request_ids:
+                self._pending_batches.pop(request_id, None)
+                self._progress_handlers.pop(request_id, None)
 
-            def _to_progress(value):
-                progress = Request.from_data(value).params
-                items[progress["id"]] = progress["amount"]
-                total = reduce((lambda x, value: x + value), items.values())
-                return RequestProgress("Batch request", total / len(request_ids))
+        response_future.add_done_callback(_done_callback)
+        return response_future
 
-            progress_observable = (
-                self._json_stream.filter(_progress_filter)
-                .map(_to_progress)
-                .subscribe(task._call_progress_callbacks)  # pylint: disable=W0212
-            )
+    async def _receive_loop(self, ws):
+        """Internal: dispatch all messages of a connection until it is closed."""
+        try:
+            while True:
+                message = await ws.recv()
+                if self._recorder:
+                    self._recorder.received(message)
+                if self._decode_off_loop(message):
+                    # the next messages wait for it to keep their order
+                    decode = (
+                        decode_msgpack_message
+                        if isinstance(message, bytes)
+                        else decode_message
+                    )
+                    value = await self.loop.run_in_executor(
+                        self._decode_executor, decode, message
+                    )
+                    self._dispatch(message, value)
+                else:
+                    self._dispatch(message)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._on_closed()
+
+    def _decode_off_loop(self, message):
+        """Whether the message is too large to be decoded on the event loop."""
+        if self._decode_threshold is None or len(message) <= self._decode_threshold:
+            return False
+        if isinstance(message, str):
+            return True
+        # binary frames are MessagePack messages unless they belong to the previous message
+        return self.encoding == "msgpack" and self._binary_message is None
+
+    def _dispatch(self, message, value=_UNDECODED):
+        """Internal: deliver a received message to its request, handler or stream."""
+        self.ws_observable.publish(message)
+
+        if self._binary_message is not None:
+            if isinstance(message, bytes):
+                self._add_binary_frame(message)
+                return
+            self._drop_binary_message()
+
+        if value is _UNDECODED:
+            if self.encoding == "msgpack" and isinstance(message, bytes):
+                value = decode_msgpack_message(message)
+            else:
+                value = decode_message(message)
+        if value is None:
+            return  # neither JSON nor MessagePack
+
+        if expected_frames(value) > 0:
+            # not spooled, a spool record holds one frame
+            self._binary_message = value
+            self._binary_frames = []
+            return
+        if (
+            self.spool is not None
+            and is_json_rpc_notification(value)
+            and not is_progress_notification(value)
+        ):
+            # the frame as received, without encoding the notification again
+            self.spool.append(message)
+        self._dispatch_value(value)
+
+    def _dispatch_value(self, value):
+        """Internal: deliver a decoded message to its request, handler or stream."""
+        if isinstance(value, list):
+            self._dispatch_batch(value)
+        elif is_progress_notification(value):
+            handler = self._progress_handlers.get(value["params"]["id"])
+            if handler:
+                handler(value["params"])
+        elif is_json_rpc_response(value):
+            self._dispatch_response(value)
+        elif is_json_rpc_notification(value):
+            try:
+                notification = Notification.from_data(value)
+            except JSONRPCInvalidRequestException:  # pragma: no cover
+                return
+            self.notifications.publish(notification)
+
+    def _add_binary_frame(self, frame):
+        """Internal: collect the binary frames of a message, dispatch it once all arrived."""
+        self._binary_frames.append(frame)
+        value = self._binary_message
+        if len(self._binary_frames) < expected_frames(value):
+            return
 
-            def _done_callback(future):  # pylint: disable=W0613
-                progress_observable.dispose()
+        frames = self._binary_frames
+        self._binary_message = self._binary_frames = None
+        try:
+            value = attach(value, frames)
+        except ValueError:
+            self._fail_response(value)
+            return
+        self._dispatch_value(value)
+
+    def _drop_binary_message(self):
+        """Internal: a text message interrupted the binary frames of the previous message."""
+        value = self._binary_message
+        self._binary_message = self._binary_frames = None
+        self._fail_response(value)
+
+    def _fail_response(self, value):
+        """Internal: fail the request of a response which could not be decoded."""
+        if is_json_rpc_response(value):
+            error = {
+                "code": INVALID_JSON_RESPONSE.code,
+                "message": INVALID_JSON_RESPONSE.message,
+            }
+            self._dispatch_response({"id": value["id"], "error": error})
+
+    def _dispatch_response(self, value):
+        """Internal: resolve the future of a request with the response."""
+        stream = self._streams.get(value["id"])
+        if stream:
+            # not decoded incrementally by the protocol
+            if "error" in value:
+                stream.finish(RequestError(**value["error"]))
+                return
+            for item in items_at(value.get("result"), stream.prefix):
+                stream.put_nowait(item)
+            stream.finish()
+            return
 
-            response_future.add_done_callback(_done_callback)
+        response_future = self._pending.get(value["id"])
+        if not response_future or response_future.done():
+            return
+        if "error" in value:
+            response_future.set_exception(RequestError(**value["error"]))
+        else:
+            response_future.set_result(value.get("result"))
+
+    def _dispatch_batch(self, values):
+        """Internal: resolve the future of a batch request with the responses."""
+        for value in values:
+            if is_json_rpc_response(value) and value["id"] in self._pending_batches:
+                response_future = self._pending_batches[value["id"]][0]
+                if not response_future.done():
+                    response_future.set_result([Response.from_data(i) for i in values])
+                return
+
+    def _on_closed(self):
+        """Internal: fail all pending requests and end the streams of a closed connection."""
+        if not self._disconnecting:
+            self._connection_lost = True
+        self._binary_message = self._binary_frames = None
+        futures = list(self._pending.values())
+        futures += [entry[0] for entry in self._pending_batches.values()]
+        for future in futures:
+            if not future.done():
+                future.set_exception(SOCKET_CLOSED_ERROR)
+        for stream in list(self._streams.values()):
+            stream.finish(SOCKET_CLOSED_ERROR)
+        self.ws_observable.complete()
+        self.notifications.complete()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""
+Benchmarking tools for Rockets servers.
+
+A load generator and local echo server to measure their throughput and latency, and recording
+and replay of client sessions to reproduce their load.
+
+Run ``python -m rockets.bench --help`` for the command line usage.
+"""
+from .load import run_load
+from .recording import read_recording
+from .recording import Recorder
+from .recording import replay
+from .recording import ReplayStats
+from .server import serve
+from .stats import LatencyStats
+
+__all__ = [
+    "LatencyStats",
+    "read_recording",
+    "Recorder",
+    "replay",
+    "ReplayStats",
+    "run_load",
+    "serve",
+]
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Command line interface of the Rockets load generator."""
+import argparse
+import asyncio
+import json
+import sys
+
+from ..event_loop import LOOP_TYPES
+from ..event_loop import loop_type_of
+from ..event_loop import new_event_loop
+from .load import run_load
+from .load import WORKLOADS
+from .recording import replay
+from .server import serve
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m rockets.bench",
+        description="Measure throughput and latency of a Rockets server. Without a URL, a "
+        "local echo server is started which supports the methods 'ping' and 'echo'.",
+    )
+    parser.add_argument("url", nargs="?", help="address of the Rockets server")
+    parser.add_argument("--workload", choices=WORKLOADS, default="request")
+    parser.add_argument("--method", default="ping", help="method to invoke")
+    parser.add_argument("--params", type=json.loads, help="params as JSON")
+    parser.add_argument("--clients", type=int, default=1, help="number of connections")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="operations in flight per connection (fixed concurrency mode)",
+    )
+    parser.add_argument(
+        "--rate", type=float, help="operations per second in total (fixed rate mode)"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="seconds to measure"
+    )
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds to warm up")
+    parser.add_argument("--batch-size", type=int, default=10, help="requests per batch")
+    parser.add_argument(
+        "--loop",
+        choices=LOOP_TYPES,
+        help="create an event loop of this type for the clients and the echo server "
+        "instead of using the current one",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        help="replay a session recorded with rockets.bench.Recorder instead of a workload; "
+        "--clients sets the number of virtual clients",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="factor of the recorded pace for --replay, 0 for as fast as possible",
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument(
+        "--serve", action="store_true", help="only run the local echo server"
+    )
+    parser.add_argument("--host", default="localhost", help="host of the echo server")
+    parser.add_argument("--port", type=int, default=0, help="port of the echo server")
+    return parser.parse_args(argv)
+
+
+async def _main(args, loop):
+    server = None
+    url = args.url
+    if args.serve or not url:
+        server, url = await serve(args.host, args.port, loop=loop)
+        print("Echo server listening on {}".format(url), file=sys.stderr)
+    if args.serve:  # pragma: no cover
+        await server.wait_closed()
+        return
+
+    try:
+        if args.replay:
+            stats = await replay(
+                url,
+                args.replay,
+                speed=args.speed or None,
+                clients=args.clients,
+                loop=loop,
+            )
+        else:
+            stats = await run_load(
+                url,
+                workload=args.workload,
+                method=args.method,
+                params=args.params,
+                clients=args.clients,
+                concurrency=args.concurrency,
+                rate=args.rate,
+                duration=args.duration,
+                warmup=args.warmup,
+                batch_size=args.batch_size,
+                loop=loop,
+            )
+    finally:
+        if server:
+            server.close()
+            await server.wait_closed()
+
+    if args.json:
+        result = stats.as_dict()
+        result["loop"] = loop_type_of(loop)
+        print(json.dumps(result, indent=4))
+    else:
+        print("{} ({})".format(stats, loop_type_of(loop)))
+
+
+def main(argv=None):
+    """
+    Run the load generator with the given command line arguments.
+
+    :param list argv: the command line arguments, sys.argv if None
+    """
+    args = _parse_args(argv)
+    loop = new_event_loop(args.loop) if args.loop else asyncio.get_event_loop()
+    try:
+        loop.run_until_complete(_main(args, loop))
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+    finally:
+        if args.loop:
+            loop.close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Drive request, batch and notify workloads at fixed concurrency or fixed rate."""
+import asyncio
+import time
+
+from ..async_client import AsyncClient
+from ..request import Request
+from ..request_error import RequestError
+from .stats import LatencyStats
+
+WORKLOADS = ("request", "batch", "notify")
+
+
+def _make_operation(client, workload, method, params, batch_size):
+    """The coroutine function which executes one operation of the workload."""
+    if workload == "request":
+        return lambda: client.request(method, params)
+    if workload == "batch":
+        return lambda: client.batch(
+            [Request(method, params) for _ in range(batch_size)]
+        )
+    if workload == "notify":
+        return lambda: client.notify(method, params)
+    raise ValueError("Unknown workload '{}'".format(workload))
+
+
+async def _timed(operation, started, stats):
+    """Internal: execute one operation and record its latency relative to started."""
+    try:
+        await operation()
+        stats.add(time.perf_counter() - started)
+    except (RequestError, OSError):
+        stats.add_error()
+
+
+async def _fixed_concurrency(operation, concurrency, deadline, stats, loop):
+    """Internal: keep concurrency operations in flight until the deadline."""
+
+    async def _worker():
+        while time.perf_counter() < deadline:
+            await _timed(operation, time.perf_counter(), stats)
+
+    await asyncio.gather(*[_worker() for _ in range(concurrency)], loop=loop)
+
+
+async def _fixed_rate(operations, rate, deadline, stats, loop):
+    """
+    Internal: start operations at a fixed rate until the deadline.
+
+    Latencies are measured from the scheduled start time, so a server that falls behind does not
+    hide its queueing delay (coordinated omission).
+    """
+    interval = 1.0 / rate
+    scheduled = time.perf_counter()
+    pending = set()
+    index = 0
+    while scheduled < deadline:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay, loop=loop)
+        operation = operations[index % len(operations)]
+        pending.add(
+            asyncio.ensure_future(_timed(operation, scheduled, stats), loop=loop)
+        )
+        pending = {task for task in pending if not task.done()}
+        scheduled += interval
+        index += 1
+    if pending:
+        await asyncio.wait(pending, loop=loop)
+
+
+async def run_load(
+    url,
+    workload="request",
+    method="ping",
+    params=None,
+    clients=1,
+    concurrency=1,
+    rate=None,
+    duration=10.0,
+    warmup=1.0,
+    batch_size=10,
+    loop=None,
+):  # pylint: disable=R0913,R0914
+    """
+    Run a workload against a Rockets server and collect latency statistics.
+
+    Opens ``clients`` connections. With a ``rate``, operations are started at that total rate
+    across all connections, otherwise each connection keeps ``concurrency`` operations in flight.
+
+    :param str url: The address of the Rockets server.
+    :param str workload: one of 'request', 'batch' or 'notify'
+    :param str method: name of the method to invoke
+    :param params: params for the method
+    :param int clients: number of connections to open
+    :param int concurrency: number of operations in flight per connection
+    :param float rate: operations per second across all connections, None for fixed concurrency
+    :param float duration: seconds to measure
+    :param float warmup: seconds to run before measuring
+    :param int batch_size: number of requests per batch for the 'batch' workload
+    :param asyncio.AbstractEventLoop loop: Event loop where the clients should run in
+    :return: the statistics of the measurement
+    :rtype: LatencyStats
+    """
+    if not loop:
+        loop = asyncio.get_event_loop()
+
+    connections = [AsyncClient(url, loop=loop) for _ in range(clients)]
+    await asyncio.gather(*[client.connect() for client in connections], loop=loop)
+
+    operations = [
+        _make_operation(client, workload, method, params, batch_size)
+        for client in connections
+    ]
+
+    async def _measure(seconds, stats):
+        deadline = time.perf_counter() + seconds
+        if rate:
+            await _fixed_rate(operations, rate, deadline, stats, loop)
+        else:
+            await asyncio.gather(
+                *[
+                    _fixed_concurrency(operation, concurrency, deadline, stats, loop)
+                    for operation in operations
+                ],
+                loop=loop,
+            )
+
+    try:
+        if warmup:
+            await _measure(warmup, LatencyStats())
+        stats = LatencyStats()
+        started = time.perf_counter()
+        await _measure(duration, stats)
+        stats.elapsed = time.perf_counter() - started
+        return stats
+    finally:
+        await asyncio.gather(
+            *[client.disconnect() for client in connections], loop=loop
+        )
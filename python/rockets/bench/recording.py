@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Record the frames of a session and replay its outgoing side against a server."""
+import asyncio
+import struct
+import time
+
+import websockets
+
+from ..utils import decode_message
+from ..utils import set_ws_protocol
+from .stats import LatencyStats
+
+MAGIC = b"RKTREC1\n"
+OUTGOING = "out"
+INCOMING = "in"
+
+# flags, wall clock timestamp, length of the payload
+_RECORD = struct.Struct("<BdI")
+_OUTGOING_FLAG = 1
+_BINARY_FLAG = 2
+
+
+class Frame:
+    """A recorded websocket frame."""
+
+    def __init__(self, direction, timestamp, data):
+        self.direction = direction
+        """:data:`OUTGOING` for frames sent by the client, :data:`INCOMING` otherwise."""
+
+        self.timestamp = timestamp
+        """The wall clock time when the frame was sent or received, in seconds."""
+
+        self.data = data
+        """The str of a text frame or the bytes of a binary frame."""
+
+
+class Recorder:
+    """
+    Appends the frames sent and received by a client to a file.
+
+    Writes are buffered and not flushed per frame, so recording is cheap enough for live sessions.
+    A recording which was interrupted ends with its last complete frame.
+    """
+
+    def __init__(self, path, buffer_size=1024 * 1024):
+        """
+        Open the file, append to it if it exists already.
+
+        :param str path: the file to record to
+        :param int buffer_size: the number of bytes to buffer before writing to the file
+        """
+        self.path = path
+        """The file to record to."""
+
+        self._file = open(path, "ab", buffering=buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def sent(self, data):
+        """
+        Record a frame sent by the client.
+
+        :param data: the frame
+        :type data: str or bytes
+        """
+        self._write(_OUTGOING_FLAG, data)
+
+    def received(self, data):
+        """
+        Record a frame received by the client.
+
+        :param data: the frame
+        :type data: str or bytes
+        """
+        self._write(0, data)
+
+    def flush(self):
+        """Write the buffered frames to the file."""
+        self._file.flush()
+
+    def close(self):
+        """Write the buffered frames and close the file."""
+        self._file.close()
+
+    def _write(self, flags, data):
+        """Internal: append one frame."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        else:
+            flags |= _BINARY_FLAG
+        self._file.write(_RECORD.pack(flags, time.time(), len(data)))
+        self._file.write(data)
+
+
+def read_recording(path):
+    """
+    Read the frames of a recording.
+
+    :param str path: the file written by a :class:`Recorder`
+    :return: generator of the :class:`Frame` objects in the order they were recorded
+    :rtype: generator
+    :raises ValueError: if the file is not a recording
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("'{}' is not a Rockets recording".format(path))
+        while True:
+            record = file.read(_RECORD.size)
+            if len(record) < _RECORD.size:
+                return
+            flags, timestamp, length = _RECORD.unpack(record)
+            data = file.read(length)
+            if len(data) < length:
+                return
+            if not flags & _BINARY_FLAG:
+                data = data.decode("utf-8")
+            direction = OUTGOING if flags & _OUTGOING_FLAG else INCOMING
+            yield Frame(direction, timestamp, data)
+
+
+def _ids(data, responses):
+    """The ids of the requests, or of the responses, in a frame."""
+    if not isinstance(data, str):
+        return []
+    value = decode_message(data)
+    values = value if isinstance(value, list) else [value]
+    return [
+        value["id"]
+        for value in values
+        if isinstance(value, dict)
+        and isinstance(value.get("id"), (str, int))
+        and ("method" in value) != responses
+    ]
+
+
+def _latencies(frames):
+    """The recorded latency of each request which was answered, by its id."""
+    sent = dict()
+    latencies = dict()
+    for frame in frames:
+        if frame.direction == OUTGOING:
+            for request_id in _ids(frame.data, False):
+                sent[request_id] = frame.timestamp
+        else:
+            for request_id in _ids(frame.data, True):
+                if request_id in sent and request_id not in latencies:
+                    latencies[request_id] = frame.timestamp - sent[request_id]
+    return latencies
+
+
+def _format(stats):
+    """The latency percentiles of statistics in a human readable form."""
+    return "mean {mean_ms:.3f}  p50 {p50_ms:.3f}  p99 {p99_ms:.3f}  max {max_ms:.3f}".format(
+        max_ms=max(stats.samples, default=0.0) * 1000, **stats.as_dict()
+    )
+
+
+class ReplayStats:
+    """The latencies of a replay compared with the recorded ones."""
+
+    def __init__(self):
+        self.recorded = LatencyStats()
+        """The latencies of the answered requests in the recording."""
+
+        self.replayed = LatencyStats()
+        """The latencies of the replayed requests, requests left unanswered count as errors."""
+
+        self.deviation = LatencyStats()
+        """The replayed minus the recorded latency of each request answered in both."""
+
+        self.send_lag = LatencyStats()
+        """How much later than at the recorded pace each frame was sent."""
+
+    def as_dict(self):
+        """
+        Return the statistics as a JSON-serializable dict with latencies in milliseconds.
+
+        :return: the :meth:`LatencyStats.as_dict` of each statistic
+        :rtype: dict
+        """
+        return {
+            "recorded": self.recorded.as_dict(),
+            "replayed": self.replayed.as_dict(),
+            "deviation": self.deviation.as_dict(),
+            "send_lag": self.send_lag.as_dict(),
+        }
+
+    def __str__(self):
+        """
+        Print the statistics in a human readable form.
+
+        :return: the replayed throughput and the latency percentiles
+        :rtype: str
+        """
+        return "{}\nrecorded [ms]: {}\ndeviation [ms]: {}\nsend lag [ms]: {}".format(
+            self.replayed,
+            _format(self.recorded),
+            _format(self.deviation),
+            _format(self.send_lag),
+        )
+
+
+async def _replay_session(url, frames, speed, timeout, subprotocols, loop):
+    """Send the frames on a new connection, return the latencies and the send lags."""
+    websocket = await websockets.connect(
+        url, subprotocols=subprotocols, max_size=None, loop=loop
+    )
+    sent = dict()
+    latencies = dict()
+    answered = asyncio.Event(loop=loop)
+
+    async def _receive():
+        try:
+            while True:
+                data = await websocket.recv()
+                received = time.perf_counter()
+                for request_id in _ids(data, True):
+                    if request_id in sent and request_id not in latencies:
+                        latencies[request_id] = received - sent[request_id]
+                if len(latencies) == len(sent) and sending.done():
+                    answered.set()
+        except websockets.ConnectionClosed:
+            answered.set()
+
+    async def _send():
+        lags = []
+        started = time.perf_counter()
+        for frame in frames:
+            if speed:
+                due = started + (frame.timestamp - frames[0].timestamp) / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay, loop=loop)
+                lags.append(max(time.perf_counter() - due, 0.0))
+            for request_id in _ids(frame.data, False):
+                sent[request_id] = time.perf_counter()
+            await websocket.send(frame.data)
+        return lags
+
+    sending = asyncio.ensure_future(_send(), loop=loop)
+    receiving = asyncio.ensure_future(_receive(), loop=loop)
+    try:
+        lags = await sending
+        if len(latencies) < len(sent):
+            try:
+                await asyncio.wait_for(answered.wait(), timeout, loop=loop)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        receiving.cancel()
+        await websocket.close()
+    return sent, latencies, lags
+
+
+async def replay(
+    url, path, speed=1.0, clients=1, timeout=10.0, subprotocols=("rockets",), loop=None
+):  # pylint: disable=R0914
+    """
+    Replay the outgoing frames of a recording against a server and compare the latencies.
+
+    Each virtual client sends all outgoing frames of the recording on its own connection, at the
+    recorded pace scaled by ``speed``, and then waits for the responses still in flight.
+
+    :param str url: The address of the Rockets server.
+    :param str path: the file written by a :class:`Recorder`
+    :param float speed: factor of the recorded pace, e.g. 2 for twice as fast, None to send the
+                        frames as fast as possible
+    :param int clients: number of virtual clients replaying the recording in parallel
+    :param float timeout: seconds to wait for the responses after the last frame was sent
+    :param list subprotocols: the websocket protocols to request
+    :param asyncio.AbstractEventLoop loop: Event loop where the clients should run in
+    :return: the statistics of the replay
+    :rtype: ReplayStats
+    """
+    if not loop:
+        loop = asyncio.get_event_loop()
+
+    frames = list(read_recording(path))
+    outgoing = [frame for frame in frames if frame.direction == OUTGOING]
+    recorded = _latencies(frames)
+
+    stats = ReplayStats()
+    for latency in recorded.values():
+        stats.recorded.add(latency)
+    if outgoing:
+        stats.recorded.elapsed = outgoing[-1].timestamp - outgoing[0].timestamp
+
+    url = set_ws_protocol(url)
+    subprotocols = list(subprotocols) if subprotocols else None
+    started = time.perf_counter()
+    sessions = await asyncio.gather(
+        *[
+            _replay_session(url, outgoing, speed, timeout, subprotocols, loop)
+            for _ in range(clients)
+        ],
+        loop=loop,
+    )
+    stats.replayed.elapsed = time.perf_counter() - started
+
+    for sent, latencies, lags in sessions:
+        for request_id in sent:
+            if request_id not in latencies:
+                stats.replayed.add_error()
+                continue
+            stats.replayed.add(latencies[request_id])
+            if request_id in recorded:
+                stats.deviation.add(latencies[request_id] - recorded[request_id])
+        for lag in lags:
+            stats.send_lag.add(lag)
+    return stats
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""A minimal JSON-RPC echo server over WebSocket to run benchmarks without a Rockets server."""
+import json
+
+import websockets
+
+PARSE_ERROR = {"code": -32700, "message": "Parse error"}
+METHOD_NOT_FOUND = {"code": -32601, "message": "Method not found"}
+
+
+def _process(request):
+    """The response for one request, None for notifications."""
+    method = request.get("method")
+    if method == "ping":
+        response = {"jsonrpc": "2.0", "result": "pong"}
+    elif method == "echo":
+        response = {"jsonrpc": "2.0", "result": request.get("params")}
+    else:
+        response = {"jsonrpc": "2.0", "error": METHOD_NOT_FOUND}
+    if "id" not in request:
+        return None
+    response["id"] = request["id"]
+    return response
+
+
+def process_message(message):
+    """
+    Answer a JSON-RPC message of the echo server.
+
+    Supports the methods ``ping``, which returns ``"pong"``, and ``echo``, which returns its
+    params.
+
+    :param str message: a JSON-RPC request, notification or batch
+    :return: the JSON-RPC response(s), None if no response is due
+    :rtype: str
+    """
+    try:
+        request = json.loads(message)
+    except ValueError:
+        return json.dumps({"jsonrpc": "2.0", "id": None, "error": PARSE_ERROR})
+
+    if isinstance(request, list):
+        responses = [_process(item) for item in request]
+        responses = [response for response in responses if response]
+        return json.dumps(responses) if responses else None
+
+    response = _process(request)
+    return json.dumps(response) if response else None
+
+
+async def _handle(websocket, path):  # pylint: disable=W0613
+    """Internal: answer all messages of one connection."""
+    try:
+        while True:
+            message = await websocket.recv()
+            response = process_message(message)
+            if response:
+                await websocket.send(response)
+    except websockets.ConnectionClosed:
+        pass
+
+
+async def serve(host="localhost", port=0, loop=None):
+    """
+    Start the echo server.
+
+    :param str host: the interface to listen on
+    :param int port: the port to listen on, 0 to pick a free port
+    :param asyncio.AbstractEventLoop loop: Event loop where the server should run in
+    :return: the running server and its URL
+    :rtype: tuple(websockets.server.WebSocketServer, str)
+    """
+    server = await websockets.serve(
+        _handle, host, port, subprotocols=["rockets"], max_size=None, loop=loop
+    )
+    port = server.sockets[0].getsockname()[1]
+    return server, "{}:{}".format(host, port)
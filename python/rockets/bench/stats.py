@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Latency statistics of a benchmark run."""
+import math
+
+PERCENTILES = (50, 95, 99, 99.9)
+
+
+def _nearest_rank(ordered, percent):
+    """The percentile of already sorted samples using the nearest-rank method."""
+    if not ordered:
+        return 0.0
+    rank = max(int(math.ceil(percent / 100.0 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+class LatencyStats:
+    """Collects latency samples and reports throughput and percentiles."""
+
+    def __init__(self):
+        self.samples = []
+        """The recorded latencies in seconds."""
+
+        self.errors = 0
+        """The number of failed operations."""
+
+        self.elapsed = 0.0
+        """The wall clock duration of the measurement in seconds."""
+
+    def add(self, latency):
+        """
+        Record the latency of one successful operation.
+
+        :param float latency: the latency in seconds
+        """
+        self.samples.append(latency)
+
+    def add_error(self):
+        """Record one failed operation."""
+        self.errors += 1
+
+    def merge(self, other):
+        """
+        Add the samples and errors of another :class:`LatencyStats`.
+
+        :param LatencyStats other: the statistics to merge into this one
+        """
+        self.samples.extend(other.samples)
+        self.errors += other.errors
+
+    @property
+    def count(self):
+        """Return the number of successful operations."""
+        return len(self.samples)
+
+    @property
+    def throughput(self):
+        """Return the number of successful operations per second."""
+        if not self.elapsed:
+            return 0.0
+        return self.count / self.elapsed
+
+    def percentile(self, percent):
+        """
+        Return the latency percentile using the nearest-rank method.
+
+        :param float percent: the percentile in the range (0, 100]
+        :return: the latency in seconds, 0 if no samples were recorded
+        :rtype: float
+        """
+        return _nearest_rank(sorted(self.samples), percent)
+
+    def as_dict(self):
+        """
+        Return the statistics as a JSON-serializable dict with latencies in milliseconds.
+
+        :return: count, errors, elapsed, throughput, mean and percentiles
+        :rtype: dict
+        """
+        ordered = sorted(self.samples)
+        result = {
+            "count": self.count,
+            "errors": self.errors,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "mean_ms": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        }
+        for percent in PERCENTILES:
+            key = "p{}_ms".format(str(percent).replace(".", ""))
+            result[key] = _nearest_rank(ordered, percent) * 1000
+        return result
+
+    def __str__(self):
+        """
+        Print the statistics in a human readable form.
+
+        :return: throughput and latency percentiles
+        :rtype: str
+        """
+        values = self.as_dict()
+        return (
+            "{count} ok, {errors} errors in {elapsed:.2f}s: {throughput:.1f} ops/s\n"
+            "latency [ms]: mean {mean_ms:.3f}  p50 {p50_ms:.3f}  p95 {p95_ms:.3f}  "
+            "p99 {p99_ms:.3f}  p999 {p999_ms:.3f}".format(**values)
+        )
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""
+Binary frames which follow a JSON-RPC message, decoded to NumPy arrays.
+
+A response or notification announces the number of binary frames which follow it with the
+top-level member ``"binary"``. Its result or params refer to the frames with placeholders which
+describe their content::
+
+    {"jsonrpc": "2.0", "id": 1, "binary": 1,
+     "result": {"vertices": {"$binary": 0, "dtype": "<f4", "shape": [1000000, 3]}}}
+
+The placeholders are replaced by read-only :class:`numpy.ndarray` views of the received frames, or
+by the frames as :class:`bytes` if NumPy is not installed.
+"""
+BINARY_KEY = "binary"
+PLACEHOLDER_KEY = "$binary"
+
+
+def expected_frames(value):
+    """
+    Return the number of binary frames which follow a decoded message.
+
+    :param object value: the decoded JSON-RPC message
+    :return: the number of binary frames announced by the message
+    :rtype: int
+    """
+    if isinstance(value, dict):
+        count = value.get(BINARY_KEY)
+        if isinstance(count, int):
+            return count
+    return 0
+
+
+def attach(value, frames):
+    """
+    Replace the placeholders in the result or params of a message by the binary frames.
+
+    :param dict value: the decoded JSON-RPC message which announced the frames
+    :param list frames: the received binary frames
+    :return: the message without the announcement, with arrays instead of placeholders
+    :rtype: dict
+    :raises ValueError: if a placeholder does not match the frames
+    """
+    value = dict(value)
+    del value[BINARY_KEY]
+    for key in ("result", "params"):
+        if key in value:
+            value[key] = _replace(value[key], frames)
+    return value
+
+
+def to_array(frame, dtype, shape=None):
+    """
+    Create a view of a binary frame as array without copying it.
+
+    :param bytes frame: the binary frame
+    :param str dtype: the NumPy data type of the elements, e.g. '<f4'
+    :param list shape: the shape of the array, one dimension if None
+    :return: the read-only array, or the frame if NumPy is not installed
+    :rtype: numpy.ndarray
+    :raises ValueError: if the frame does not match the dtype and shape
+    """
+    try:
+        import numpy
+    except ImportError:
+        return frame
+
+    try:
+        array = numpy.frombuffer(frame, dtype=numpy.dtype(dtype))
+        if shape is not None:
+            array = array.reshape(shape)
+    except TypeError as error:
+        raise ValueError(str(error))
+    return array
+
+
+def _replace(value, frames):
+    """Replace the placeholders in a decoded JSON value."""
+    if isinstance(value, dict):
+        if PLACEHOLDER_KEY in value:
+            index = value[PLACEHOLDER_KEY]
+            if not isinstance(index, int) or not 0 <= index < len(frames):
+                raise ValueError("No binary frame {}".format(index))
+            return to_array(frames[index], value.get("dtype", "u1"), value.get("shape"))
+        return {key: _replace(item, frames) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_replace(item, frames) for item in value]
+    return value
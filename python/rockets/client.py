@@ -23,27 +23,83 @@ import asyncio
 from threading import Thread
 
 from .async_client import AsyncClient
+from .event_loop import new_event_loop
+from .fragments import DEFAULT_FRAGMENT_SIZE
 from .utils import copydoc
 
 
 class Client:
     """Client that support synchronous usage of the :class:`AsyncClient`."""
 
-    def __init__(self, url, subprotocols=None, loop=None):
+    def __init__(
+        self,
+        url,
+        subprotocols=None,
+        loop=None,
+        cache=None,
+        single_flight=None,
+        loop_type=None,
+        decode_threshold=None,
+        decode_executor=None,
+        transport="websocket",
+        http_connections=4,
+        recorder=None,
+        fragment_size=DEFAULT_FRAGMENT_SIZE,
+        validator=None,
+        admission=None,
+        spool=None,
+        encoding="json",
+    ):  # pylint: disable=R0913,R0914
         """
         Setup the :class:`AsyncClient` for synchronous usage.
 
         In case the given loop is running, uses a threaded client to achieve synchronous execution.
 
-        :param str url: The address of the Rockets server.
+        :param str url: The address of the Rockets server; ws+unix:///path/to/socket connects to a
+                        server on a Unix domain socket, see :func:`rockets.utils.split_unix_url`
         :param list subprotocols: The websocket protocols to use
         :param asyncio.AbstractEventLoop loop: Event loop where this client should run in
+        :param ResponseCache cache: Cache for the results of idempotent methods
+        :param list single_flight: names of idempotent methods whose concurrent requests with
+                                   equal params share one request to the server
+        :param str loop_type: type of the event loop to create for this client if no loop is
+                              given, see :func:`rockets.new_event_loop`; uses the current event
+                              loop if None
+        :param int decode_threshold: size of messages in characters, or bytes for MessagePack,
+                                     above which they are decoded in the decode_executor instead
+                                     of on the event loop; all messages are decoded on the event
+                                     loop if None
+        :param concurrent.futures.Executor decode_executor: executor for decoding large messages,
+                                                            the default executor of the event
+                                                            loop if None
+        :param str transport: 'websocket', or 'http' to send the requests as HTTP POST requests;
+                              the server cannot send notifications or progress over HTTP then
+        :param int http_connections: the number of keep-alive connections of the HTTP transport
+        :param rockets.bench.Recorder recorder: records the frames sent and received by this
+                                                client, e.g. to replay them for load tests
+        :param int fragment_size: the size in characters or bytes up to which the chunks of
+                                  fragmented messages are joined, see :meth:`send_fragments`
+        :param ParamsValidator validator: validates the params of requests and notifications
+                                          before they are sent
+        :param AdmissionControl admission: limits the pending requests and the rate of requests
+                                           and notifications of this client
+        :param NotificationSpool spool: receives the raw frames of the notifications from the
+                                        server, e.g. to analyse them later
+        :param str encoding: 'json', or 'msgpack' to offer the ``<subprotocol>+msgpack`` websocket
+                             protocols first and exchange binary frames of MessagePack if the
+                             server accepts one; the http transport always uses JSON
+        :raises ValueError: if the transport or the encoding is unknown, or http for a Unix
+                            domain socket
+        :raises ImportError: if the encoding is 'msgpack' and msgpack is not installed
         """
         if not loop:
-            loop = asyncio.get_event_loop()
+            if loop_type and not asyncio.get_event_loop().is_running():
+                loop = new_event_loop(loop_type)
+            else:
+                loop = asyncio.get_event_loop()
 
         if loop.is_running():
-            thread_loop = asyncio.new_event_loop()
+            thread_loop = new_event_loop(loop_type or "asyncio")
 
             def _start_background_loop(loop):
                 asyncio.set_event_loop(loop)
@@ -53,10 +109,27 @@ class Client:
             self._thread.daemon = True
             self._thread.start()
 
-            self._client = AsyncClient(url, subprotocols=subprotocols, loop=thread_loop)
+            loop = thread_loop
         else:
             self._thread = None
-            self._client = AsyncClient(url, subprotocols=subprotocols, loop=loop)
+
+        self._client = AsyncClient(
+            url,
+            subprotocols=subprotocols,
+            loop=loop,
+            cache=cache,
+            single_flight=single_flight,
+            decode_threshold=decode_threshold,
+            decode_executor=decode_executor,
+            transport=transport,
+            http_connections=http_connections,
+            recorder=recorder,
+            fragment_size=fragment_size,
+            validator=validator,
+            admission=admission,
+            spool=spool,
+            encoding=encoding,
+        )
 
         self.url = self._client.url
         """The address of the connected Rockets server."""
@@ -67,6 +140,26 @@ class Client:
         self.notifications = self._client.notifications
         """The rx observable to subscribe to notifications from the server."""
 
+        self.cache = self._client.cache
+        """The :class:`ResponseCache` for the results of idempotent methods, if any."""
+
+        self.validator = self._client.validator
+        """The :class:`ParamsValidator` of the params of the methods, if any."""
+
+        self.admission = self._client.admission
+        """The :class:`AdmissionControl` of the requests, if any."""
+
+        self.spool = self._client.spool
+        """The :class:`NotificationSpool` of the notifications from the server, if any."""
+
+        self.send_queue = self._client.send_queue
+        """The :class:`SendQueue` which orders the outgoing messages, e.g. for its metrics."""
+
+    @property
+    def encoding(self):
+        """The encoding negotiated with the server, 'json' or 'msgpack' once connected."""
+        return self._client.encoding
+
     @copydoc(AsyncClient.connected)
     def connected(self):  # noqa: D102 pylint: disable=missing-docstring
         return self._client.connected()
@@ -80,8 +173,14 @@ class Client:
         self._call_sync(self._client.disconnect())
 
     @copydoc(AsyncClient.send)
-    def send(self, message):  # noqa: D102 pylint: disable=missing-docstring
-        self._call_sync(self._client.send(message))
+    def send(
+        self, message, priority=None
+    ):  # noqa: D102 pylint: disable=missing-docstring
+        self._call_sync(self._client.send(message, priority))
+
+    @copydoc(AsyncClient.send_fragments)
+    def send_fragments(self, chunks):  # noqa: D102 pylint: disable=missing-docstring
+        self._call_sync(self._client.send_fragments(chunks))
 
     @copydoc(AsyncClient.notify)
     def notify(
@@ -109,6 +208,70 @@ class Client:
         """
         return self._call_sync(self._client.batch(requests), response_timeout)
 
+    @copydoc(AsyncClient.request_fragmented)
+    def request_fragmented(
+        self, method, params_chunks, response_timeout=None
+    ):  # noqa: D102,D205 pylint: disable=C0111,W9011,W9012,W9015,W9016
+        """
+        :param int response_timeout: number of seconds to wait for the response
+        :raises TimeoutError: if request was not answered within given response_timeout
+        """
+        return self._call_sync(
+            self._client.request_fragmented(method, params_chunks), response_timeout
+        )
+
+    def stream_request(
+        self,
+        method,
+        params=None,
+        prefix="item",
+        sink=None,
+        maxsize=100,
+        response_timeout=None,
+    ):
+        """
+        Invoke an RPC on the Rockets server and decode its result while it is received.
+
+        See :meth:`AsyncClient.stream_request` for when the result is decoded incrementally.
+
+        :param str method: name of the method to invoke
+        :param dict params: params for the method
+        :param str prefix: dot-separated path of the items in the result, where 'item' stands for
+                           the elements of an array, e.g. 'vertices.item'
+        :param callable sink: called with each item, from the thread of the event loop
+        :param int maxsize: the number of items to buffer for iteration
+        :param int response_timeout: number of seconds to wait for the response if a sink is given
+        :return: the number of items if a sink is given, an iterator over the items otherwise
+        :rtype: int or generator
+        :raises TimeoutError: if request was not answered within given response_timeout
+        """
+
+        async def _start():
+            return self._client.stream_request(method, params, prefix, sink, maxsize)
+
+        stream = self._call_sync(_start())
+        if sink:
+
+            async def _wait():
+                return await stream
+
+            return self._call_sync(_wait(), response_timeout)
+        return self._iterate(stream)
+
+    def _iterate(self, stream):
+        """Iterate synchronously over a ResultStream, cancel it when abandoned."""
+        try:
+            while True:
+                try:
+                    yield self._call_sync(stream.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if self._thread:
+                self._client.loop.call_soon_threadsafe(stream.close)
+            else:
+                stream.close()
+
     def _call_sync(self, original_function, response_timeout=None):
         if not self._thread and self._client.loop.is_running():
             raise RuntimeError("Unknown working environment")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""
+Encodings of JSON-RPC messages: JSON in text frames, or MessagePack in binary frames.
+
+MessagePack is negotiated with the websocket subprotocol, e.g. ``rockets+msgpack``, which both
+sides only offer if the optional msgpack package is installed.
+"""
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+ENCODINGS = ("json", "msgpack")
+
+MSGPACK_SUFFIX = "+msgpack"
+
+
+def check_encoding(encoding):
+    """
+    Check that an encoding is known and can be used.
+
+    :param str encoding: one of :data:`ENCODINGS`
+    :raises ValueError: if the encoding is unknown
+    :raises ImportError: if the encoding is 'msgpack' and msgpack is not installed
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(
+            "Unknown encoding '{}', expected one of {}".format(encoding, ENCODINGS)
+        )
+    if encoding == "msgpack" and msgpack is None:  # pragma: no cover
+        raise ImportError("The msgpack encoding requires the msgpack package")
+
+
+def msgpack_subprotocols(subprotocols):
+    """
+    Return the subprotocols to offer for MessagePack, preferred over their JSON counterparts.
+
+    :param list subprotocols: the websocket protocols of the JSON encoding, e.g. ['rockets']
+    :return: e.g. ['rockets+msgpack', 'rockets']
+    :rtype: list
+    """
+    return [subprotocol + MSGPACK_SUFFIX for subprotocol in subprotocols] + list(
+        subprotocols
+    )
+
+
+def is_msgpack_subprotocol(subprotocol):
+    """
+    Return whether a negotiated websocket protocol uses the MessagePack encoding.
+
+    :param str subprotocol: the negotiated protocol, None if none was negotiated
+    :return: True for e.g. 'rockets+msgpack'
+    :rtype: bool
+    """
+    return bool(subprotocol) and subprotocol.endswith(MSGPACK_SUFFIX)
+
+
+def pack(value):
+    """
+    Encode a JSON-RPC message as MessagePack.
+
+    :param value: the message, e.g. the dict of a request
+    :type value: dict or list
+    :return: the payload of a binary frame
+    :rtype: bytes
+    """
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def unpack(frame):
+    """
+    Decode a MessagePack message.
+
+    :param bytes frame: the payload of a received binary frame
+    :return: the decoded message
+    :rtype: dict or list
+    :raises ValueError: if the frame is not MessagePack
+    """
+    return msgpack.unpackb(frame, raw=False)
+
+
+def decode_msgpack_message(frame):
+    """
+    Decode a MessagePack message; a module-level function to be usable in process pools.
+
+    :param bytes frame: the payload of a received binary frame
+    :return: the decoded message, or None if it is not MessagePack
+    :rtype: dict or list
+    """
+    try:
+        return unpack(frame)
+    except ValueError:
+        return None
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Creation of event loops, optionally backed by uvloop."""
+import asyncio
+
+LOOP_TYPES = ("asyncio", "uvloop", "auto")
+
+
+def new_event_loop(loop_type="asyncio"):
+    """
+    Create a new event loop of the given type.
+
+    :param str loop_type: 'asyncio' for the default event loop of asyncio, 'uvloop' for an event
+                          loop of uvloop or 'auto' for uvloop if it is installed
+    :return: the new event loop
+    :rtype: asyncio.AbstractEventLoop
+    :raises ValueError: if the loop type is unknown
+    :raises ImportError: if the loop type is 'uvloop' and uvloop is not installed
+    """
+    if loop_type not in LOOP_TYPES:
+        raise ValueError("Unknown event loop type '{}'".format(loop_type))
+
+    if loop_type != "asyncio":
+        try:
+            import uvloop
+        except ImportError:
+            if loop_type == "uvloop":
+                raise
+        else:
+            return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+def loop_type_of(loop):
+    """
+    Return the type of the given event loop.
+
+    :param asyncio.AbstractEventLoop loop: the event loop
+    :return: 'uvloop' for an event loop of uvloop, 'asyncio' otherwise
+    :rtype: str
+    """
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
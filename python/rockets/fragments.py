@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Send one websocket message as fragments from an iterable or async iterable of chunks."""
+import asyncio
+
+from websockets.framing import OP_BINARY
+from websockets.framing import OP_CONT
+from websockets.framing import OP_TEXT
+
+# the chunks of an iterable are exhausted
+_END = object()
+
+DEFAULT_FRAGMENT_SIZE = 64 * 1024
+
+
+async def _chunks(sources):
+    """The next chunk of the iterables or async iterables, _END when all are done."""
+    while sources:
+        source = sources[0]
+        try:
+            if hasattr(source, "__anext__"):
+                return await source.__anext__()
+            return next(source)
+        except (StopIteration, StopAsyncIteration):
+            sources.pop(0)
+    return _END
+
+
+def _iterators(iterables):
+    """An iterator or async iterator for each iterable or async iterable."""
+    return [
+        iterable.__aiter__() if hasattr(iterable, "__aiter__") else iter(iterable)
+        for iterable in iterables
+    ]
+
+
+async def join_chunks(chunks):
+    """
+    Join the chunks of an iterable or async iterable into one message.
+
+    :param chunks: iterable or async iterable of str or bytes
+    :return: the message
+    :rtype: str or bytes
+    """
+    sources = _iterators([chunks])
+    parts = []
+    while True:
+        chunk = await _chunks(sources)
+        if chunk is _END:
+            break
+        parts.append(chunk)
+    return b"".join(parts) if parts and isinstance(parts[0], bytes) else "".join(parts)
+
+
+async def send_fragments(
+    websocket, chunks, fragment_size=DEFAULT_FRAGMENT_SIZE, sent=None
+):
+    """
+    Send one message as fragments, reading the chunks only as fast as the socket takes them.
+
+    Chunks are joined up to the fragment size, so small chunks, e.g. of
+    ``json.JSONEncoder().iterencode()``, do not become one frame each; larger chunks are sent as
+    they are. Each fragment waits for the write buffer of the socket to drain, so only about one
+    fragment is held in memory at a time, and other tasks run between the fragments. The message
+    must not be interleaved with other messages; if sending fails halfway, the connection is closed
+    as it cannot continue the message.
+
+    :param websockets.WebSocketCommonProtocol websocket: the open websocket
+    :param list chunks: iterables or async iterables of str, or of bytes, sent one after the other
+    :param int fragment_size: the size in characters or bytes up to which chunks are joined
+    :param list sent: if given, the fragments are appended to it, e.g. to record the message
+    :raises TypeError: if the chunks are neither str nor bytes, or of both types
+    """
+    await websocket.ensure_open()
+    sources = _iterators(chunks)
+    started = False
+
+    async def _write(fragment, fin):
+        nonlocal started
+        if isinstance(fragment, bytes):
+            opcode, data = OP_BINARY, fragment
+        else:
+            opcode, data = OP_TEXT, fragment.encode("utf-8")
+        await websocket.write_frame(fin, OP_CONT if started else opcode, data)
+        started = True
+        if sent is not None:
+            sent.append(fragment)
+        if not fin:
+            # drain() does not yield while the socket keeps up, let other tasks run meanwhile
+            await asyncio.sleep(0)
+
+    chunk_type = None
+    fragment = None  # sent once it is known whether it is the last one
+    parts = []
+    size = 0
+    done = False
+    try:
+        while True:
+            chunk = await _chunks(sources)
+            if chunk is _END:
+                break
+            if chunk_type is None and isinstance(chunk, (str, bytes)):
+                chunk_type = type(chunk)
+            if chunk_type is None or not isinstance(chunk, chunk_type):
+                raise TypeError("chunks must be either str or bytes")
+            parts.append(chunk)
+            size += len(chunk)
+            if size >= fragment_size:
+                if fragment is not None:
+                    await _write(fragment, False)
+                fragment = chunk_type().join(parts)
+                parts = []
+                size = 0
+        if parts:
+            if fragment is not None:
+                await _write(fragment, False)
+            fragment = chunk_type().join(parts)
+        await _write("" if fragment is None else fragment, True)
+        done = True
+    finally:
+        # the server cannot tell a message which was cut off from one which continues
+        if started and not done:
+            websocket.fail_connection(1011)
@@ -0,0 +1,331 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""JSON-RPC over HTTP POST with pooled keep-alive connections and pipelined requests."""
+import asyncio
+from collections import deque
+from functools import partial
+from urllib.parse import urlsplit
+
+from .request_error import RequestError
+
+HTTP_ERROR_CODE = -31003
+
+
+def set_http_protocol(url):
+    """
+    Set the HTTP protocol according to the resource url.
+
+    :param str url: Url to be checked
+    :return: Url prepended with http for ws, https for wss or http if no protocol was found
+    :rtype: str
+    """
+    for prefix, replacement in (
+        ("ws://", "http://"),
+        ("wss://", "https://"),
+        ("http://", "http://"),
+        ("https://", "https://"),
+    ):
+        if url.startswith(prefix):
+            return replacement + url[len(prefix):]
+    return "http://" + url
+
+
+async def http_get(url, loop=None):
+    """
+    Fetch a resource of a server with HTTP GET, e.g. the registry of a Rockets server.
+
+    :param str url: the address of the resource; ws and wss are fetched with http and https
+    :param asyncio.AbstractEventLoop loop: Event loop where the request is sent in
+    :return: the body of the response
+    :rtype: str
+    :raises RequestError: if the server answered with an HTTP error
+    :raises OSError: if the server cannot be connected
+    :raises ConnectionError: if the server closed the connection before it answered
+    """
+    parts = urlsplit(set_http_protocol(url))
+    ssl = parts.scheme == "https"
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, parts.port or (443 if ssl else 80), ssl=ssl or None, loop=loop
+    )
+    try:
+        writer.write(
+            "GET {} HTTP/1.1\r\nHost: {}\r\nConnection: close\r\n\r\n".format(
+                path, parts.netloc
+            ).encode("latin-1")
+        )
+        status, _, body = await _read_response(reader)
+    except (EOFError, asyncio.IncompleteReadError):
+        raise ConnectionError("HTTP connection closed")
+    finally:
+        writer.close()
+    if status != 200:
+        raise RequestError(HTTP_ERROR_CODE, "HTTP error", status)
+    return body.decode("utf-8")
+
+
+class _StaleConnection(ConnectionError):
+    """Internal: a reused connection was closed before it answered, the request can be resent."""
+
+
+async def _read_response(reader):
+    """Read one HTTP response, return its status, headers and body."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise EOFError()
+    try:
+        status = int(status_line.split()[1])
+    except (IndexError, ValueError):
+        raise ConnectionError("Invalid HTTP response {!r}".format(status_line))
+
+    headers = dict()
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        body = b"".join(chunks)
+    else:
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, body
+
+
+class _Connection:
+    """Internal: a keep-alive connection with pipelined requests, answered in order."""
+
+    def __init__(self, reader, writer, loop):
+        self.reader = reader
+        self.writer = writer
+        self.loop = loop
+        self.open = True
+        self.answered = 0
+        self._pending = deque()
+        # only one coroutine may wait for the writer to drain, like websockets' _drain_lock
+        self._drain_lock = asyncio.Lock(loop=loop)
+        self._reader_task = asyncio.ensure_future(self._read_responses(), loop=loop)
+
+    @property
+    def in_flight(self):
+        """The number of requests waiting for their response."""
+        return len(self._pending)
+
+    def post(self, request):
+        """Send a request, return the future of its response."""
+        response = self.loop.create_future()
+        self._pending.append((response, self.answered > 0))
+        self.writer.write(request)
+        return response
+
+    async def drain(self):
+        """Wait until the requests written so far are sent or buffered below the limit."""
+        async with self._drain_lock:
+            await self.writer.drain()
+
+    def close(self):
+        """Close the connection, fail the requests waiting for their response."""
+        if not self.open:
+            return
+        self.open = False
+        self._reader_task.cancel()
+        self.writer.close()
+        self._fail(ConnectionError("HTTP connection closed"))
+
+    async def _read_responses(self):
+        """Internal: resolve the pending requests with the responses in order."""
+        try:
+            while True:
+                status, headers, body = await _read_response(self.reader)
+                response, _ = self._pending.popleft()
+                self.answered += 1
+                response.set_result((status, body))
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (EOFError, asyncio.IncompleteReadError, ConnectionError, IndexError):
+            pass
+        self.open = False
+        self.writer.close()
+        self._fail(None)
+
+    def _fail(self, error):
+        """Internal: fail all requests waiting for their response."""
+        while self._pending:
+            response, reused = self._pending.popleft()
+            if error is None:
+                # the server closed the connection before answering
+                error_type = _StaleConnection if reused else ConnectionError
+                response.set_exception(error_type("HTTP connection closed"))
+            else:
+                response.set_exception(error)
+
+
+class HttpTransport:
+    """
+    Sends JSON-RPC messages as HTTP POST requests over pooled keep-alive connections.
+
+    Concurrent requests are spread over the connections of the pool first, and then pipelined on
+    them, i.e. sent without waiting for the responses of the previous requests.
+    """
+
+    def __init__(self, url, loop, max_connections=4):
+        """
+        Initialize the pool without connections.
+
+        :param str url: the HTTP endpoint of the server, e.g. http://host:8080/jsonrpc
+        :param asyncio.AbstractEventLoop loop: Event loop where the requests are sent in
+        :param int max_connections: the number of keep-alive connections to open at most
+        """
+        self.url = url
+        parts = urlsplit(url)
+        self._ssl = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port or (443 if self._ssl else 80)
+        self._path = parts.path or "/"
+        if parts.query:
+            self._path += "?" + parts.query
+        self._host_header = parts.netloc
+        self._loop = loop
+        self._max_connections = max_connections
+        self._connections = []
+        self._opening = []
+        # key of a message in flight, e.g. a request id -> the connection it was sent on
+        self._keys = dict()
+
+    def connected(self):
+        """
+        Returns whether any connection of the pool is open.
+
+        :return: True if a connection is open
+        :rtype: bool
+        """
+        return any(connection.open for connection in self._connections)
+
+    async def connect(self):
+        """Open a connection unless one is open already."""
+        if not self.connected():
+            await self._open_connection()
+
+    async def close(self):
+        """Close all connections."""
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+
+    async def post(self, message, keys=()):
+        """
+        Send a message and return the body of the response.
+
+        The server tracks the requests per connection, so a message with the key of a message in
+        flight is sent on the same connection, e.g. the cancel notification of a request.
+
+        :param str message: the JSON-RPC message
+        :param tuple keys: the keys of the message, e.g. the ids of its requests
+        :return: the JSON-RPC response, empty if no response is due
+        :rtype: str
+        :raises RequestError: if the server answered with an HTTP error
+        :raises OSError: if the server cannot be connected
+        """
+        body = message.encode("utf-8")
+        request = (
+            "POST {} HTTP/1.1\r\n"
+            "Host: {}\r\n"
+            "Content-Type: application/json\r\n"
+            "Content-Length: {}\r\n"
+            "\r\n".format(self._path, self._host_header, len(body))
+        ).encode("latin-1") + body
+
+        try:
+            status, body = await self._post(request, keys)
+        except _StaleConnection:
+            # the server closed an idle connection, the request has not been processed
+            status, body = await self._post(request, keys)
+
+        if status != 200:
+            raise RequestError(HTTP_ERROR_CODE, "HTTP error", status)
+        return body.decode("utf-8")
+
+    async def _post(self, request, keys):
+        """Send a request on the connection of its keys or the next one, return the response."""
+        connection = next((self._keys[key] for key in keys if key in self._keys), None)
+        if connection is None or not connection.open:
+            connection = await self._connection()
+        owned = [
+            key for key in keys if key not in self._keys or not self._keys[key].open
+        ]
+        for key in owned:
+            self._keys[key] = connection
+        # the keys are kept until the response arrives, even if the caller is cancelled, so the
+        # cancel notification of a request follows it
+        response = connection.post(request)
+        response.add_done_callback(partial(self._release, owned, connection))
+        await connection.drain()
+        return await asyncio.shield(response, loop=self._loop)
+
+    def _release(self, keys, connection, response):
+        """Forget the keys of a message once its response arrived."""
+        for key in keys:
+            if self._keys.get(key) is connection:
+                del self._keys[key]
+        # retrieve the error of a response nobody waits for anymore
+        response.exception()
+
+    async def _connection(self):
+        """The connection for the next request, open a new one if all are busy."""
+        self._connections = [c for c in self._connections if c.open]
+        idle = min(self._connections, key=lambda c: c.in_flight, default=None)
+        if idle is not None and not idle.in_flight:
+            return idle
+        if len(self._connections) + len(self._opening) < self._max_connections:
+            return await self._open_connection()
+        if idle is None:
+            # all connections are still being opened, pipeline on the first one
+            return await asyncio.shield(self._opening[0], loop=self._loop)
+        return idle
+
+    async def _open_connection(self):
+        """Open a connection and add it to the pool."""
+        opening = asyncio.ensure_future(self._connect(), loop=self._loop)
+        self._opening.append(opening)
+        try:
+            return await asyncio.shield(opening, loop=self._loop)
+        finally:
+            self._opening.remove(opening)
+
+    async def _connect(self):
+        """Connect to the server."""
+        reader, writer = await asyncio.open_connection(
+            self._host, self._port, ssl=self._ssl or None, loop=self._loop
+        )
+        connection = _Connection(reader, writer, self._loop)
+        self._connections.append(connection)
+        return connection
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Stream of received messages, consumed with async iterators, callbacks or rx observables."""
+import asyncio
+import threading
+from collections import deque
+
+_END = object()
+
+
+class MessageIterator:
+    """
+    Asynchronous iterator over the messages of a :class:`MessageStream`.
+
+    Messages are buffered in a bounded queue; if the consumer falls behind, the oldest messages
+    are dropped. The iteration ends when the connection is closed. The iterator may be consumed
+    on another event loop than the one the messages are published on, e.g. the loop of the caller
+    of a threaded :class:`Client`.
+    """
+
+    def __init__(self, stream, maxsize, loop):
+        self._stream = stream
+        self._loop = loop
+        self._messages = deque()
+        self._maxsize = maxsize
+        # the future a consumer waits on for the next message, and its event loop
+        self._waiter = None
+        self._waiter_loop = None
+        # the messages are published and consumed on different threads for threaded clients
+        self._lock = threading.Lock()
+
+        self.dropped = 0
+        """The number of messages dropped because the queue was full."""
+
+    def __aiter__(self):
+        """Return this iterator."""
+        return self
+
+    async def __anext__(self):
+        """Return the next message, wait for it on the event loop of the consumer."""
+        while True:
+            with self._lock:
+                if self._messages:
+                    message = self._messages.popleft()
+                    break
+                loop = asyncio.get_event_loop()
+                self._waiter = loop.create_future()
+                self._waiter_loop = loop
+            try:
+                await self._waiter
+            finally:
+                with self._lock:
+                    self._waiter = self._waiter_loop = None
+        if message is _END:
+            raise StopAsyncIteration
+        return message
+
+    def close(self):
+        """Stop receiving messages; the iteration ends after the already queued messages."""
+        if self._stream:
+            self._stream._remove(self)  # pylint: disable=W0212
+            self._stream = None
+            with self._lock:
+                self._messages.append(_END)
+                self._wake()
+
+    def _put(self, message):
+        """Queue a message, drop the oldest one if the queue is full."""
+        with self._lock:
+            if len(self._messages) >= self._maxsize:
+                self._messages.popleft()
+                self.dropped += 1
+            self._messages.append(message)
+            self._wake()
+
+    def _wake(self):
+        """Wake up the consumer waiting for a message, on its own event loop."""
+        waiter, loop = self._waiter, self._waiter_loop
+        if waiter is None:
+            return
+        self._waiter = self._waiter_loop = None
+        if loop is self._loop:
+            _set_result(waiter)
+        else:
+            loop.call_soon_threadsafe(_set_result, waiter)
+
+
+def _set_result(future):
+    """Resolve a future unless it was cancelled meanwhile."""
+    if not future.done():
+        future.set_result(None)
+
+
+class MessageStream:
+    """
+    Stream of received messages.
+
+    Call the stream to get an asynchronous iterator, ``async for message in stream():``. For
+    compatibility, the stream also provides the rx Observable API, e.g. ``stream.subscribe()``,
+    which is backed by an rx Subject that is only created on first use.
+    """
+
+    def __init__(self, loop, on_subscribe=None, maxsize=1000):
+        """
+        Initialize the stream without any consumers.
+
+        :param asyncio.AbstractEventLoop loop: Event loop where the messages are published in
+        :param callable on_subscribe: called whenever an iterator or rx observer subscribes
+        :param int maxsize: default number of messages buffered per iterator
+        """
+        self._loop = loop
+        self._on_subscribe = on_subscribe
+        self._maxsize = maxsize
+        self._iterators = []
+        self._listeners = []
+        self._subject = None
+
+    def __call__(self, maxsize=None):
+        """
+        Return a new asynchronous iterator over the messages of this stream.
+
+        :param int maxsize: number of messages to buffer before the oldest ones are dropped
+        :return: the iterator which receives all messages published from now on
+        :rtype: MessageIterator
+        """
+        iterator = MessageIterator(self, maxsize or self._maxsize, self._loop)
+        self._iterators.append(iterator)
+        if self._on_subscribe:
+            self._on_subscribe()
+        return iterator
+
+    def __getattr__(self, name):
+        """Provide the rx Observable API, e.g. subscribe(), filter() or map()."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._observable(), name)
+
+    def add_listener(self, callback):
+        """
+        Call the given callback synchronously for every published message.
+
+        Unlike iterators and observers, listeners stay registered when the connection closes.
+
+        :param callable callback: called with each message
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """
+        Stop calling the given callback.
+
+        :param callable callback: a callback registered with :meth:`add_listener`
+        """
+        self._listeners.remove(callback)
+
+    def publish(self, message):
+        """
+        Deliver a message to all listeners, iterators and observers.
+
+        :param object message: the message to deliver, e.g. a text or binary frame or a
+                               :class:`Notification`
+        """
+        for listener in self._listeners:
+            listener(message)
+        for iterator in self._iterators:
+            iterator._put(message)  # pylint: disable=W0212
+        if self._subject is not None:
+            self._subject.on_next(message)
+
+    def complete(self):
+        """End all iterators and complete all observers, e.g. when the connection closed."""
+        for iterator in list(self._iterators):
+            iterator.close()
+        if self._subject is not None:
+            subject, self._subject = self._subject, None
+            subject.on_completed()
+
+    def _observable(self):
+        """The rx Subject feeding the observers, created on first use."""
+        if self._subject is None:
+            from rx.subjects import Subject
+
+            self._subject = Subject()
+            if self._on_subscribe:
+                self._on_subscribe()
+        return self._subject
+
+    def _remove(self, iterator):
+        """Internal: stop delivering messages to the given iterator."""
+        self._iterators.remove(iterator)
@@ -0,0 +1,372 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Client for several Rockets servers which serve the same service."""
+import asyncio
+import hashlib
+import json
+from bisect import bisect
+
+import websockets
+from jsonrpc.jsonrpc2 import JSONRPC20Request
+
+from .async_client import AsyncClient
+from .message_stream import MessageStream
+from .request_error import INVALID_REQUEST
+from .request_error import METHOD_NOT_FOUND
+from .request_error import RequestError
+from .request_error import SOCKET_CLOSED_ERROR
+from .request_task import RequestTask
+
+# points per server on the hash ring, to spread the keys evenly
+_RING_POINTS = 100
+
+# a server which fails with these is skipped, the next one is tried
+_CONNECT_ERRORS = (OSError, asyncio.TimeoutError, websockets.InvalidHandshake)
+
+
+def _hash(text):
+    """A hash which is stable across processes, unlike hash() of strings."""
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:16], 16)
+
+
+class Endpoint:
+    """A server of a :class:`MultiClient` and whether requests are routed to it."""
+
+    def __init__(self, client):
+        self.client = client
+        """The :class:`AsyncClient` connected to this server."""
+
+        self.healthy = True
+        """False if the server was unreachable, until it is connected again."""
+
+        self.retry_at = 0.0
+        """The event loop time after which an unhealthy server is tried again."""
+
+    @property
+    def url(self):
+        """The address of the server."""
+        return self.client.url
+
+
+class MultiClient:
+    """
+    Client for several Rockets servers with the API of :class:`AsyncClient`.
+
+    Requests are routed by method to the servers which serve it, and among those by a consistent
+    hash of a param or round-robin. Servers which cannot be connected are skipped until the retry
+    interval has passed, as long as other servers are available.
+    """
+
+    def __init__(
+        self,
+        urls,
+        subprotocols=None,
+        loop=None,
+        routes=None,
+        shard_keys=None,
+        retry_interval=5.0,
+    ):
+        """
+        Initialize one client per server; they connect on the first request.
+
+        :param list urls: The addresses of the Rockets servers.
+        :param list subprotocols: The websocket protocols to use
+        :param asyncio.AbstractEventLoop loop: Event loop where this client should run in
+        :param dict routes: method name -> list of addresses of the servers serving it; all
+                            other methods are served by all servers
+        :param dict shard_keys: method name -> name or index of the param whose value selects
+                                the server by consistent hashing; all other methods, and requests
+                                without that param, are distributed round-robin
+        :param float retry_interval: seconds to skip a server which could not be connected
+        :raises ValueError: if no URLs are given
+        """
+        if not urls:
+            raise ValueError("MultiClient needs at least one URL")
+
+        self.loop = loop
+        """The event loop where this client is running in."""
+        if not self.loop:
+            self.loop = asyncio.get_event_loop()
+
+        self.endpoints = [
+            Endpoint(AsyncClient(url, subprotocols=subprotocols, loop=self.loop))
+            for url in urls
+        ]
+        """The :class:`Endpoint` of each server."""
+
+        by_url = dict()
+        for url, endpoint in zip(urls, self.endpoints):
+            by_url[url] = by_url[endpoint.url] = endpoint
+        self._routes = dict()
+        for method, route_urls in (routes or {}).items():
+            self._routes[method] = [by_url[url] for url in route_urls]
+        self._shard_keys = dict(shard_keys or {})
+        self._retry_interval = retry_interval
+        self._rings = dict()
+        self._next = 0
+
+        def _on_subscribe():
+            """Internal: connect all servers to receive their messages."""
+            asyncio.ensure_future(self._connect_all(), loop=self.loop)
+
+        self.ws_observable = MessageStream(self.loop, on_subscribe=_on_subscribe)
+        """The merged stream of all websocket messages of all servers."""
+
+        self.notifications = MessageStream(self.loop, on_subscribe=_on_subscribe)
+        """The merged stream of :class:`Notification` from all servers."""
+
+        for endpoint in self.endpoints:
+            endpoint.client.ws_observable.add_listener(self.ws_observable.publish)
+            endpoint.client.notifications.add_listener(self.notifications.publish)
+
+    def connected(self):
+        """
+        Returns the connection state of this client.
+
+        :return: true if the websocket of any server is connected.
+        :rtype: bool
+        """
+        return any(endpoint.client.connected() for endpoint in self.endpoints)
+
+    async def connect(self):
+        """
+        Connect to all servers.
+
+        If no server could be connected, the error of the first one is raised, e.g. an OSError or
+        a failed websocket handshake.
+
+        :raises OSError: if no server could be connected
+        """
+        errors = await self._connect_all()
+        if len(errors) == len(self.endpoints):
+            raise errors[0]
+
+    async def disconnect(self):
+        """Disconnect from all servers and end the merged streams."""
+        await asyncio.gather(
+            *[endpoint.client.disconnect() for endpoint in self.endpoints],
+            loop=self.loop,
+        )
+        self.ws_observable.complete()
+        self.notifications.complete()
+
+    async def notify(self, method, params):
+        """
+        Invoke an RPC on the server routed to without expecting a response.
+
+        :param str method: name of the method to invoke
+        :param str params: params for the method
+        :raises RequestError: if the method is routed to no server
+        """
+        await self._on_endpoint(
+            self._preference(method, params),
+            lambda client: client.notify(method, params),
+        )
+
+    async def request(self, method, params=None):
+        """
+        Invoke an RPC on the server routed to and returns its response.
+
+        :param str method: name of the method to invoke
+        :param dict params: params for the method
+        :return: future object
+        :rtype: :class:`asyncio.Future`
+        :raises RequestError: if the method is routed to no server
+        """
+        return await self._on_endpoint(
+            self._preference(method, params),
+            lambda client: client.request(method, params),
+        )
+
+    async def batch(self, requests):
+        """
+        Invoke a batch RPC and return its response(s).
+
+        The requests are routed one by one; requests for different servers are sent as one batch
+        per server and their responses are returned in the order of the requests.
+
+        :param list requests: list of requests and/or notifications to send as batch
+        :return: future object with list of responses
+        :rtype: :class:`asyncio.Future`
+        :raises RequestError: if methods and/or params are not a list
+        :raises RequestError: if methods are empty
+        :raises RequestError: if a method is routed to no server
+        """
+        if not requests:
+            raise INVALID_REQUEST
+        for request in requests:
+            if not isinstance(request, JSONRPC20Request):
+                raise INVALID_REQUEST
+
+        # preferred server -> (preference, requests)
+        groups = dict()
+        for request in requests:
+            preference = self._preference(request.method, request.params)
+            groups.setdefault(id(preference[0]), (preference, []))[1].append(request)
+
+        def _batch(group):
+            return lambda client: client.batch(group)
+
+        results = await asyncio.gather(
+            *[
+                self._on_endpoint(preference, _batch(group))
+                for preference, group in groups.values()
+            ],
+            loop=self.loop,
+        )
+
+        order = {
+            request.data.get("id"): index for index, request in enumerate(requests)
+        }
+        responses = [response for result in results if result for response in result]
+        return sorted(
+            responses, key=lambda response: order.get(response.data.get("id"), -1)
+        )
+
+    def async_request(self, method, params=None):
+        """
+        Invoke an RPC on the server routed to and return the :class:`RequestTask`.
+
+        :param str method: name of the method to invoke
+        :param dict params: params for the method
+        :return: :class:`RequestTask` object
+        :rtype: :class:`RequestTask`
+        """
+        self.loop.set_task_factory(lambda loop, coro: RequestTask(coro=coro, loop=loop))
+
+        task = self.request(method, params)
+        return asyncio.ensure_future(task, loop=self.loop)
+
+    def async_batch(self, requests):
+        """
+        Invoke a batch RPC and return the :class:`RequestTask`.
+
+        :param list requests: list of requests and/or notifications to send as batch
+        :return: :class:`RequestTask` object
+        :rtype: :class:`RequestTask`
+        """
+        self.loop.set_task_factory(lambda loop, coro: RequestTask(coro=coro, loop=loop))
+
+        task = self.batch(requests)
+        return asyncio.ensure_future(task, loop=self.loop)
+
+    def route(self, method, params=None):
+        """
+        Return the server a request would be sent to.
+
+        :param str method: name of the method to invoke
+        :param dict params: params for the method
+        :return: the preferred server, the next one is tried if it cannot be connected
+        :rtype: Endpoint
+        :raises RequestError: if the method is routed to no server
+        """
+        return self._preference(method, params, advance=False)[0]
+
+    def _preference(self, method, params, advance=True):
+        """The servers for a request in order of preference, healthy ones first."""
+        candidates = self._routes.get(method, self.endpoints)
+        if not candidates:
+            raise RequestError(METHOD_NOT_FOUND.code, METHOD_NOT_FOUND.message, method)
+
+        order = None
+        if method in self._shard_keys:
+            try:
+                key = params[self._shard_keys[method]]
+            except (KeyError, IndexError, TypeError):
+                pass
+            else:
+                order = self._ring_order(candidates, json.dumps(key, sort_keys=True))
+        if order is None:
+            start = self._next % len(candidates)
+            if advance:
+                self._next += 1
+            order = candidates[start:] + candidates[:start]
+
+        now = self.loop.time()
+        available = [e for e in order if e.healthy or e.retry_at <= now]
+        return available + [e for e in order if e not in available]
+
+    def _ring_order(self, candidates, key):
+        """The candidates in the order they follow the key on their hash ring."""
+        ring_key = tuple(endpoint.url for endpoint in candidates)
+        ring = self._rings.get(ring_key)
+        if ring is None:
+            ring = sorted(
+                (_hash("{}#{}".format(endpoint.url, point)), index)
+                for index, endpoint in enumerate(candidates)
+                for point in range(_RING_POINTS)
+            )
+            self._rings[ring_key] = ring
+
+        start = bisect(ring, (_hash(key), -1))
+        order = []
+        for offset in range(len(ring)):
+            index = ring[(start + offset) % len(ring)][1]
+            if index not in order:
+                order.append(index)
+                if len(order) == len(candidates):
+                    break
+        return [candidates[index] for index in order]
+
+    async def _on_endpoint(self, preference, call):
+        """Run the call on the first server which can be connected."""
+        error = None
+        for endpoint in preference:
+            if not endpoint.client.connected():
+                try:
+                    await self._connect(endpoint)
+                except _CONNECT_ERRORS as connect_error:
+                    error = connect_error
+                    continue
+            try:
+                return await call(endpoint.client)
+            except websockets.ConnectionClosed:
+                self._mark_unhealthy(endpoint)
+                raise SOCKET_CLOSED_ERROR
+            except RequestError as request_error:
+                if request_error.code == SOCKET_CLOSED_ERROR.code:
+                    # the request might have been executed, so do not send it again
+                    self._mark_unhealthy(endpoint)
+                raise
+        raise error
+
+    async def _connect(self, endpoint):
+        """Connect a server and track whether it is reachable."""
+        try:
+            await endpoint.client.connect()
+        except _CONNECT_ERRORS:
+            self._mark_unhealthy(endpoint)
+            raise
+        endpoint.healthy = True
+
+    async def _connect_all(self):
+        """Connect all servers, return the errors of those which failed."""
+        results = await asyncio.gather(
+            *[self._connect(endpoint) for endpoint in self.endpoints],
+            loop=self.loop,
+            return_exceptions=True,
+        )
+        return [result for result in results if isinstance(result, Exception)]
+
+    def _mark_unhealthy(self, endpoint):
+        """Internal: skip a server until the retry interval has passed."""
+        endpoint.healthy = False
+        endpoint.retry_at = self.loop.time() + self._retry_interval
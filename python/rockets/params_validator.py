@@ -0,0 +1,547 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Client-side validation of params against the JSON schemas of methods."""
+import hashlib
+import json
+import operator
+import re
+
+from .request_error import INVALID_PARAMS
+from .request_error import RequestError
+
+
+class SchemaError(ValueError):
+    """A value does not match a JSON schema."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+
+        self.reason = reason
+        """Why the value does not match."""
+
+        self.path = []
+        """The keys and indices from the validated value to the invalid one."""
+
+    def __str__(self):
+        """The reason, prefixed with the location of the invalid value, e.g. '[1]["x"]: ...'."""
+        if not self.path:
+            return self.reason
+        location = "".join(
+            (
+                "[{}]".format(json.dumps(key))
+                if isinstance(key, str)
+                else "[{}]".format(key)
+            )
+            for key in reversed(self.path)
+        )
+        return "{}: {}".format(location, self.reason)
+
+
+def _is_integer(value):
+    """Whether a value is a JSON integer, which includes e.g. 1.0."""
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+
+def _is_number(value):
+    """Whether a value is a JSON number."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+_TYPES = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, (list, tuple)),
+    "string": lambda value: isinstance(value, str),
+    "number": _is_number,
+    "integer": _is_integer,
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+
+# keywords which do not constrain the values
+_ANNOTATIONS = {"name", "title", "description", "default", "examples", "$comment"}
+
+
+# the exact Python classes of each JSON type, which are checked without calls of _TYPES
+_CLASSES = {
+    "object": frozenset([dict]),
+    "array": frozenset([list, tuple]),
+    "string": frozenset([str]),
+    "number": frozenset([int, float]),
+    "integer": frozenset([int]),
+    "boolean": frozenset([bool]),
+    "null": frozenset([type(None)]),
+}
+
+
+def _valid(value):  # pylint: disable=unused-argument
+    """The validator of the empty schema, which every value matches."""
+
+
+def _type(kinds):
+    """The validator of the 'type' keyword."""
+    if isinstance(kinds, str):
+        kinds = [kinds]
+    checks = tuple(_TYPES[kind] for kind in kinds if kind in _TYPES)
+    if len(checks) < len(kinds):
+        return _valid
+    reason = "expected " + " or ".join(kinds)
+
+    if len(checks) == 1:
+        check = checks[0]
+
+        def validate_one(value):
+            if not check(value):
+                raise SchemaError(reason)
+
+        return validate_one
+
+    def validate(value):
+        for check in checks:
+            if check(value):
+                return
+        raise SchemaError(reason)
+
+    return validate
+
+
+def _enum(values):
+    """The validator of the 'enum' keyword."""
+    reason = "expected one of " + json.dumps(values)
+
+    def validate(value):
+        for option in values:
+            if value == option and isinstance(value, bool) == isinstance(option, bool):
+                return
+        raise SchemaError(reason)
+
+    return validate
+
+
+def _bound(limit, exclusive, minimum):
+    """The validator of a bound of numbers."""
+    if minimum:
+        symbol, invalid = (">", operator.le) if exclusive else (">=", operator.lt)
+    else:
+        symbol, invalid = ("<", operator.ge) if exclusive else ("<=", operator.gt)
+    reason = "expected {} {}".format(symbol, limit)
+
+    def validate(value):
+        if _is_number(value) and invalid(value, limit):
+            raise SchemaError(reason)
+
+    return validate
+
+
+# the Python types of the JSON values with a length
+_SIZED = {
+    "string": (str, "characters"),
+    "array": ((list, tuple), "items"),
+    "object": (dict, "properties"),
+}
+
+
+def _length(kind, minimum, maximum):
+    """The validator of the minimum and maximum length of strings, arrays or objects."""
+    types, unit = _SIZED[kind]
+    minimum = 0 if minimum is None else minimum
+    maximum = float("inf") if maximum is None else maximum
+    too_short = "expected at least {} {}".format(minimum, unit)
+    too_long = "expected at most {} {}".format(maximum, unit)
+
+    def validate(value):
+        if isinstance(value, types) and not minimum <= len(value) <= maximum:
+            raise SchemaError(too_short if len(value) < minimum else too_long)
+
+    return validate
+
+
+def _pattern(pattern):
+    """The validator of the 'pattern' keyword."""
+    search = re.compile(pattern).search
+    reason = "expected a match of " + json.dumps(pattern)
+
+    def validate(value):
+        if isinstance(value, str) and not search(value):
+            raise SchemaError(reason)
+
+    return validate
+
+
+def _at(key, validate, value):
+    """Validate a value in a container, prefix the errors with its key."""
+    try:
+        validate(value)
+    except SchemaError as error:
+        error.path.append(key)
+        raise
+
+
+def _type_check(schema):
+    """The type check of a schema which only constrains the type, None otherwise."""
+    if set(schema) - _ANNOTATIONS == {"type"} and isinstance(schema["type"], str):
+        return _TYPES.get(schema["type"])
+    return None
+
+
+def _items(schema):
+    """The validator of the 'items' keyword."""
+    if isinstance(schema, list):
+        validators = [compile_schema(item) for item in schema]
+
+        def validate_tuple(value):
+            if not isinstance(value, (list, tuple)):
+                return
+            index = 0
+            try:
+                for index, (validate, item) in enumerate(zip(validators, value)):
+                    validate(item)
+            except SchemaError as error:
+                error.path.append(index)
+                raise
+
+        return validate_tuple
+
+    check = _type_check(schema) if isinstance(schema, dict) else None
+    if check is not None:
+        # arrays of numbers are common and checked without a validator call for each item
+        reason = "expected " + schema["type"]
+        classes = _CLASSES[schema["type"]]
+
+        def validate_typed(value):
+            if not isinstance(value, (list, tuple)) or classes.issuperset(
+                map(type, value)
+            ):
+                return
+            # e.g. subclasses of the exact classes
+            if not all(map(check, value)):
+                error = SchemaError(reason)
+                error.path.append(
+                    next(i for i, item in enumerate(value) if not check(item))
+                )
+                raise error
+
+        return validate_typed
+
+    validate_item = compile_schema(schema)
+    if validate_item is _valid:
+        return _valid
+
+    def validate(value):
+        if not isinstance(value, (list, tuple)):
+            return
+        index = 0
+        try:
+            for index, item in enumerate(value):
+                validate_item(item)
+        except SchemaError as error:
+            error.path.append(index)
+            raise
+
+    return validate
+
+
+def _object(schema):
+    """The validator of the 'properties', 'required' and 'additionalProperties'."""
+    properties = {
+        name: compile_schema(property_schema)
+        for name, property_schema in schema.get("properties", {}).items()
+    }
+    required = frozenset(schema.get("required", ()))
+    additional = schema.get("additionalProperties", True)
+    validate_additional = None
+    if isinstance(additional, dict):
+        validate_additional = compile_schema(additional)
+    # properties which are not validated need no lookup
+    properties = {
+        name: validate
+        for name, validate in properties.items()
+        if validate is not _valid
+    }
+    names = set(schema.get("properties", {})) if additional is False else None
+
+    def validate(value):
+        if not isinstance(value, dict):
+            return
+        if not value.keys() >= required:
+            missing = min(required - value.keys())
+            raise SchemaError("missing property " + json.dumps(missing))
+        if names is not None and not names >= value.keys():
+            unexpected = next(name for name in value if name not in names)
+            raise SchemaError("unexpected property " + json.dumps(unexpected))
+        name = None
+        try:
+            if validate_additional is None:
+                for name in properties.keys() & value.keys():
+                    properties[name](value[name])
+            else:
+                for name, item in value.items():
+                    properties.get(name, validate_additional)(item)
+        except SchemaError as error:
+            error.path.append(name)
+            raise
+
+    return validate
+
+
+def _all_of(schemas):
+    """The validator of the 'allOf' keyword."""
+    return _sequence([compile_schema(schema) for schema in schemas])
+
+
+def _any_of(schemas, exactly_one):
+    """The validator of the 'anyOf' and the 'oneOf' keywords."""
+    validators = [compile_schema(schema) for schema in schemas]
+    if exactly_one:
+        reason = "expected a match of exactly one schema of oneOf"
+    else:
+        reason = "expected a match of any schema of anyOf"
+
+    def validate(value):
+        matches = 0
+        for option in validators:
+            try:
+                option(value)
+            except SchemaError:
+                continue
+            matches += 1
+            if not exactly_one:
+                return
+        if matches != 1:
+            raise SchemaError(reason)
+
+    return validate
+
+
+def _not(schema):
+    """The validator of the 'not' keyword."""
+    validate_schema = compile_schema(schema)
+
+    def validate(value):
+        try:
+            validate_schema(value)
+        except SchemaError:
+            return
+        raise SchemaError("expected no match of the schema of not")
+
+    return validate
+
+
+def _sequence(validators):
+    """A validator which runs all validators."""
+    validators = tuple(validator for validator in validators if validator is not _valid)
+    if not validators:
+        return _valid
+    if len(validators) == 1:
+        return validators[0]
+
+    def validate(value):
+        for validator in validators:
+            validator(value)
+
+    return validate
+
+
+def compile_schema(schema):
+    """
+    Compile a JSON schema into a function which validates values.
+
+    Supports the keywords for types, enums, bounds, lengths, patterns, items, properties and
+    combinations of schemas; other keywords, e.g. '$ref' or 'format', are not checked.
+
+    :param dict schema: the JSON schema
+    :return: a function which raises a :class:`SchemaError` for values which do not match
+    :rtype: callable
+    """
+    # pylint: disable=too-many-branches
+    if not isinstance(schema, dict):
+        return _valid
+
+    validators = []
+    if "type" in schema:
+        validators.append(_type(schema["type"]))
+    if "enum" in schema:
+        validators.append(_enum(schema["enum"]))
+    if "const" in schema:
+        validators.append(_enum([schema["const"]]))
+
+    # the boolean exclusiveMinimum and exclusiveMaximum of draft 4 modify the bounds
+    for key, exclusive_key, minimum in (
+        ("minimum", "exclusiveMinimum", True),
+        ("maximum", "exclusiveMaximum", False),
+    ):
+        exclusive = schema.get(exclusive_key)
+        if key in schema:
+            validators.append(_bound(schema[key], exclusive is True, minimum))
+        if _is_number(exclusive):
+            validators.append(_bound(exclusive, True, minimum))
+
+    for kind, minimum, maximum in (
+        ("string", "minLength", "maxLength"),
+        ("array", "minItems", "maxItems"),
+        ("object", "minProperties", "maxProperties"),
+    ):
+        if minimum in schema or maximum in schema:
+            validators.append(_length(kind, schema.get(minimum), schema.get(maximum)))
+    if "pattern" in schema:
+        validators.append(_pattern(schema["pattern"]))
+
+    if "items" in schema:
+        validators.append(_items(schema["items"]))
+    if any(key in schema for key in ("properties", "required", "additionalProperties")):
+        validators.append(_object(schema))
+
+    if "allOf" in schema:
+        validators.append(_all_of(schema["allOf"]))
+    if "anyOf" in schema:
+        validators.append(_any_of(schema["anyOf"], False))
+    if "oneOf" in schema:
+        validators.append(_any_of(schema["oneOf"], True))
+    if "not" in schema:
+        validators.append(_not(schema["not"]))
+    return _sequence(validators)
+
+
+def _accepts_array(schema):
+    """Whether a param may be an array, i.e. a list of params is not its positions."""
+    if not isinstance(schema, dict):
+        return True
+    kinds = schema.get("type", "array")
+    return "array" in (kinds if isinstance(kinds, list) else [kinds])
+
+
+def _compile_method(schema, compile_param):
+    """Compile the params of a method schema into a function which validates params."""
+    if "params" not in schema:
+        return _valid
+    params = (
+        schema["params"] if isinstance(schema["params"], list) else [schema["params"]]
+    )
+    validators = [compile_param(param) for param in params]
+    names = [param.get("name") if isinstance(param, dict) else None for param in params]
+    optional = [isinstance(param, dict) and "default" in param for param in params]
+    required = optional.count(False)
+    single = validators[0] if len(validators) == 1 else None
+    # a single param which is not an array was wrapped in a list by AsyncClient.request()
+    unwrap = single is not None and not _accepts_array(params[0])
+
+    def validate(params):  # pylint: disable=too-many-branches
+        if params is None:
+            if required:
+                raise SchemaError("expected {} params".format(required))
+        elif single is not None:
+            if unwrap and isinstance(params, (list, tuple)) and len(params) == 1:
+                single(params[0])
+            else:
+                single(params)
+        elif isinstance(params, dict):
+            for name, validator, is_optional in zip(names, validators, optional):
+                if name is None:
+                    continue
+                if name in params:
+                    _at(name, validator, params[name])
+                elif not is_optional:
+                    raise SchemaError("missing param " + json.dumps(name))
+        elif not isinstance(params, (list, tuple)):
+            raise SchemaError("expected a list of params")
+        elif not required <= len(params) <= len(validators):
+            raise SchemaError(
+                "expected {} to {} params, got {}".format(
+                    required, len(validators), len(params)
+                )
+            )
+        else:
+            for index, (validator, param) in enumerate(zip(validators, params)):
+                _at(index, validator, param)
+
+    return validate
+
+
+class ParamsValidator:
+    """
+    Client-side validation of params against the JSON schemas of methods.
+
+    Each schema is compiled once into a validator function; methods with equal schemas share it.
+    Invalid params raise the same error as the server would answer with, without sending the
+    request. Methods without a schema are not validated.
+    """
+
+    def __init__(self, schemas=None):
+        """
+        Compile the schemas of methods.
+
+        :param dict schemas: the schema of each method by its name, e.g. of
+                             :func:`rockets.stubs.fetch_schemas`, with the schemas of its params
+                             in 'params'
+        """
+        self._validators = dict()
+        # hash of a schema -> its compiled validator
+        self._compiled = dict()
+        for method, schema in (schemas or {}).items():
+            self.add(method, schema)
+
+    def __contains__(self, method):
+        """Whether the params of a method are validated."""
+        return method in self._validators
+
+    def add(self, method, schema):
+        """
+        Compile the schema of a method, replaces its previous schema.
+
+        :param str method: name of the method
+        :param dict schema: the schema of the method with the schemas of its params in 'params'
+        """
+        self._validators[method] = _compile_method(schema, self._compile)
+
+    def remove(self, method):
+        """
+        Stop validating the params of a method.
+
+        :param str method: name of the method
+        """
+        self._validators.pop(method, None)
+
+    def validate(self, method, params):
+        """
+        Validate the params of a method.
+
+        :param str method: name of the method
+        :param params: params for the method
+        :type params: list or dict
+        :raises RequestError: if the params do not match the schema of the method
+        """
+        validator = self._validators.get(method)
+        if validator is None:
+            return
+        try:
+            validator(params)
+        except SchemaError as error:
+            raise RequestError(INVALID_PARAMS.code, INVALID_PARAMS.message, str(error))
+
+    def _compile(self, schema):
+        """Compile a schema or reuse the validator of an equal schema."""
+        key = hashlib.sha1(json.dumps(schema, sort_keys=True).encode("utf-8")).digest()
+        validator = self._compiled.get(key)
+        if validator is None:
+            validator = self._compiled[key] = compile_schema(schema)
+        return validator
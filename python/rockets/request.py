@@ -19,8 +19,11 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 # All rights reserved. Do not distribute without further notice.
 """A JSON-RPC 2.0 request"""
+import json
+
 from jsonrpc.jsonrpc2 import JSONRPC20Request
 
+from .encoding import pack
 from .utils import random_string
 
 
@@ -40,3 +43,48 @@ class Request(JSONRPC20Request):
     def request_id(self):
         """Return the request ID"""
         return super()._id
+
+
+class MethodEnvelope:
+    """
+    The JSON-RPC 2.0 envelope of the requests of one method, encoded once.
+
+    Pass it to :meth:`AsyncClient.request` in place of the method name to encode requests without
+    constructing a :class:`Request`, e.g. in generated stubs.
+    """
+
+    def __init__(self, method):
+        """
+        Encode the envelope of a method.
+
+        :param str method: name of the method
+        """
+        self.method = method
+        """The name of the method."""
+
+        # the generated ids are alphanumeric and need no escaping
+        self._head = '{"jsonrpc": "2.0", "method": ' + json.dumps(method) + ', "id": "'
+
+    def encode(self, params=None, encoding="json"):
+        """
+        Encode a new request of the method.
+
+        :param params: params for the method
+        :type params: list or dict
+        :param str encoding: 'json' for the JSON text of the request, or 'msgpack' for the
+                             payload of a binary frame
+        :return: the id and the JSON text or the MessagePack of the request
+        :rtype: tuple(str, str) or tuple(str, bytes)
+        """
+        request_id = next(Request._id_generator)  # pylint: disable=W0212
+        if encoding == "msgpack":
+            data = {"jsonrpc": "2.0", "method": self.method, "id": request_id}
+            if params is not None:
+                data["params"] = params
+            return request_id, pack(data)
+        if params is None:
+            return request_id, self._head + request_id + '"}'
+        return (
+            request_id,
+            self._head + request_id + '", "params": ' + json.dumps(params) + "}",
+        )
@@ -31,6 +31,17 @@ class RequestError(Exception):
         self.message = message
         self.data = data
 
+    def __reduce__(self):
+        """Pickle with all arguments, e.g. to raise it from a process of a pool."""
+        return self.__class__, (self.code, self.message, self.data)
+
 
 SOCKET_CLOSED_ERROR = RequestError(-30100, "Socket connection closed")
 INVALID_REQUEST = RequestError(-32600, "Invalid Request")
+INVALID_JSON_RESPONSE = RequestError(-31001, "Response JSON conversion failed")
+REQUEST_ABORTED = RequestError(-31002, "Request aborted")
+REQUEST_THROTTLED = RequestError(-31004, "Request throttled")
+PARSE_ERROR = RequestError(-32700, "Parse error")
+METHOD_NOT_FOUND = RequestError(-32601, "Method not found")
+INVALID_PARAMS = RequestError(-32602, "Invalid params")
+INTERNAL_ERROR = RequestError(-32603, "Internal error")
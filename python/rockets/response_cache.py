@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Client-side cache for the results of idempotent methods."""
+import json
+import time
+from collections import OrderedDict
+
+from .utils import request_key
+
+
+class ResponseCache:
+    """
+    Client-side cache for the results of idempotent methods.
+
+    Results are keyed by method and params and evicted in least-recently-used order once
+    ``max_entries`` or ``max_bytes`` is exceeded, or once they are older than ``ttl``. Entries are
+    invalidated when one of the configured notifications arrives from the server.
+    """
+
+    def __init__(
+        self, methods, invalidated_by=None, ttl=None, max_entries=1024, max_bytes=None
+    ):
+        """
+        Configure the cache.
+
+        :param list methods: names of the idempotent methods whose results are cached
+        :param dict invalidated_by: notification method names mapped to the list of cached
+                                    methods they invalidate, None to invalidate all methods
+        :param float ttl: seconds after which an entry expires, None to never expire
+        :param int max_entries: maximum number of cached results
+        :param int max_bytes: maximum size of all cached results in their JSON encoding, None for
+                              no limit
+        """
+        self.methods = set(methods)
+        """The names of the methods whose results are cached."""
+
+        self._invalidated_by = dict(invalidated_by or {})
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+
+        self.hits = 0
+        """The number of requests answered from the cache."""
+
+        self.misses = 0
+        """The number of requests of cached methods that were sent to the server."""
+
+        self.evictions = 0
+        """The number of entries removed because of their age or the size limits."""
+
+        self.invalidations = 0
+        """The number of entries removed because of a notification or reconnect."""
+
+    def __len__(self):
+        """Return the number of cached results."""
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        """Return the size of all cached results in their JSON encoding."""
+        return self._bytes
+
+    @property
+    def generation(self):
+        """Return a token that changes whenever entries are invalidated."""
+        return self._generation
+
+    def cacheable(self, method):
+        """
+        Check if the results of the given method are cached.
+
+        :param str method: name of the method
+        :return: True if the results of the method are cached
+        :rtype: bool
+        """
+        return method in self.methods
+
+    def get(self, method, params=None):
+        """
+        Look up the cached result of a method.
+
+        :param str method: name of the method
+        :param params: params of the method
+        :type params: list or dict
+        :return: whether the result was found and the result itself
+        :rtype: tuple(bool, object)
+        """
+        key = request_key(method, params)
+        entry = self._entries.get(key)
+        if entry is not None and self._ttl is not None and entry[1] < time.monotonic():
+            self._remove(key)
+            self.evictions += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, json.loads(entry[0])
+
+    def put(self, method, params, result, generation=None):
+        """
+        Cache the result of a method.
+
+        :param str method: name of the method
+        :param params: params of the method
+        :type params: list or dict
+        :param object result: the result to cache, stored as JSON so callers cannot modify it;
+                              results which have no JSON encoding, e.g. arrays or bytes, are not
+                              cached
+        :param int generation: the :attr:`generation` from before the request was sent; the result
+                               is dropped if entries were invalidated in the meantime
+        """
+        if generation is not None and generation != self._generation:
+            return
+        key = request_key(method, params)
+        if key in self._entries:
+            self._remove(key)
+        try:
+            encoded = json.dumps(result)
+        except TypeError:
+            return
+        expires = time.monotonic() + self._ttl if self._ttl is not None else None
+        self._entries[key] = (encoded, expires, method)
+        self._bytes += len(encoded)
+        while self._entries and (
+            len(self._entries) > self._max_entries
+            or (self._max_bytes is not None and self._bytes > self._max_bytes)
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, methods=None):
+        """
+        Remove cached results.
+
+        :param list methods: names of the methods to remove the results of, None for all
+        """
+        self._generation += 1
+        if methods is None:
+            keys = list(self._entries)
+        else:
+            keys = [key for key, entry in self._entries.items() if entry[2] in methods]
+        for key in keys:
+            self._remove(key)
+        self.invalidations += len(keys)
+
+    def on_notification(self, notification):
+        """
+        Invalidate the entries affected by a notification from the server.
+
+        :param Notification notification: the received notification
+        """
+        if notification.method in self._invalidated_by:
+            self.invalidate(self._invalidated_by[notification.method])
+
+    def _remove(self, key):
+        """Internal: remove one entry and update the size."""
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry[0])
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Items of a result which are decoded while the response is still being received."""
+from collections import deque
+
+
+def items_at(result, prefix):
+    """
+    Select the items of a decoded result like :class:`ResultStream` does for streamed ones.
+
+    :param object result: the decoded result
+    :param str prefix: dot-separated path of the items in the result, where 'item' stands for the
+                       elements of an array; the empty prefix selects the result itself
+    :return: the selected items
+    :rtype: list
+    """
+    values = [result]
+    for key in prefix.split(".") if prefix else ():
+        selected = []
+        for value in values:
+            if key == "item" and isinstance(value, list):
+                selected.extend(value)
+            elif isinstance(value, dict) and key in value:
+                selected.append(value[key])
+        values = selected
+    return values
+
+
+class ResultStream:
+    """
+    The items of a result which is decoded while it is received.
+
+    Returned by :meth:`AsyncClient.stream_request`. Iterate over it with
+    ``async for item in stream`` or await it for the number of items. The items are buffered in a
+    bounded queue; while it is full, the decoding of the response pauses.
+    """
+
+    def __init__(self, loop, prefix="item", sink=None, maxsize=100, on_close=None):
+        """
+        Initialize an empty stream.
+
+        :param asyncio.AbstractEventLoop loop: Event loop where the stream is consumed in
+        :param str prefix: dot-separated path of the items in the result, where 'item' stands for
+                           the elements of an array
+        :param callable sink: called with each item instead of queueing it for iteration
+        :param int maxsize: the number of items to buffer for iteration
+        :param callable on_close: called when the stream is closed before it is finished
+        """
+        self.prefix = prefix
+        """The dot-separated path of the items in the result."""
+
+        self.count = 0
+        """The number of items decoded so far."""
+
+        self.done = loop.create_future()
+        """Future with the number of items, or the error of the request."""
+
+        self._loop = loop
+        self._sink = sink
+        self._maxsize = maxsize
+        self._on_close = on_close
+        self._items = deque()
+        self._readable = None
+        self._writable = None
+        self._closed = False
+
+    @property
+    def closed(self):
+        """Whether the consumer stopped iterating over the items."""
+        return self._closed
+
+    def __await__(self):
+        """Wait for the number of items, or the error of the request."""
+        return self.done.__await__()
+
+    def __aiter__(self):
+        """Return the stream itself, it is its own iterator."""
+        return self
+
+    async def __anext__(self):
+        """Return the next item, wait until it is decoded."""
+        while not self._items:
+            if self._closed:
+                raise StopAsyncIteration
+            if self.done.done():
+                self.done.result()  # raises the error of the request, if any
+                raise StopAsyncIteration
+            self._readable = self._loop.create_future()
+            await self._readable
+
+        item = self._items.popleft()
+        self._wakeup_writer()
+        return item
+
+    def close(self):
+        """Stop iterating; drops the buffered items and cancels the request if not finished."""
+        if self._closed:
+            return
+        self._closed = True
+        self._items.clear()
+        self._wakeup_writer()
+        self._wakeup_reader()
+        if not self.done.done():
+            # nobody is left to retrieve the error of the request
+            self.done.add_done_callback(lambda future: future.exception())
+            if self._on_close:
+                self._on_close()
+
+    async def put(self, item):
+        """
+        Add a decoded item, wait while the buffer is full.
+
+        :param object item: the decoded item
+        """
+        while len(self._items) >= self._maxsize and not self._closed:
+            self._writable = self._loop.create_future()
+            await self._writable
+        self.put_nowait(item)
+
+    def put_nowait(self, item):
+        """
+        Add a decoded item, regardless of the size of the buffer.
+
+        :param object item: the decoded item
+        """
+        self.count += 1
+        if self._closed:
+            return
+        if self._sink:
+            try:
+                self._sink(item)
+            except Exception as error:  # pylint: disable=W0703
+                # stop decoding and report the error of the sink instead
+                self._closed = True
+                if self._on_close:
+                    self._on_close()
+                self.finish(error)
+            return
+        self._items.append(item)
+        self._wakeup_reader()
+
+    def finish(self, error=None):
+        """
+        Finish the stream after the last item.
+
+        :param Exception error: the error of the request, if it failed
+        """
+        if self.done.done():
+            return
+        if error:
+            self.done.set_exception(error)
+        else:
+            self.done.set_result(self.count)
+        self._wakeup_reader()
+
+    def _wakeup_reader(self):
+        """Internal: resume the consumer waiting for items."""
+        if self._readable and not self._readable.done():
+            self._readable.set_result(None)
+
+    def _wakeup_writer(self):
+        """Internal: resume the decoder waiting for space in the buffer."""
+        if self._writable and not self._writable.done():
+            self._writable.set_result(None)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Schedules the outgoing messages of a connection by priority."""
+import asyncio
+from collections import deque
+
+PRIORITIES = ("control", "interactive", "bulk")
+
+
+class _Metrics:
+    """Internal: the counters of one priority."""
+
+    def __init__(self):
+        self.sent = 0
+        self.queued = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class SendQueue:
+    """
+    Orders the outgoing messages of a connection by priority.
+
+    Messages are written one at a time, as the fragments of websocket messages must not be
+    interleaved. While a message is written, the next messages wait in one queue per priority;
+    once it is written, the oldest message of the highest priority is written next. A message
+    which does not need to wait is written right away.
+    """
+
+    def __init__(self, loop):
+        """
+        Initialize an empty queue.
+
+        :param asyncio.AbstractEventLoop loop: Event loop where the messages are sent in
+        """
+        self.loop = loop
+        """The event loop where the messages are sent in."""
+
+        self._queues = [deque() for _ in PRIORITIES]
+        self._metrics = [_Metrics() for _ in PRIORITIES]
+        self._writing = False
+
+    def depth(self, priority=None):
+        """
+        Return the number of messages waiting to be written.
+
+        :param str priority: one of :data:`PRIORITIES`, all messages if None
+        :return: the number of messages waiting to be written
+        :rtype: int
+        """
+        if priority is None:
+            return sum(len(queue) for queue in self._queues)
+        return len(self._queues[_index(priority)])
+
+    def metrics(self):
+        """
+        Return the queue depth and the number and waiting times of the sent messages.
+
+        :return: for each priority: depth, sent, queued (the number of sent messages which had to
+                 wait), mean_wait_ms and max_wait_ms (over the messages which had to wait)
+        :rtype: dict
+        """
+        result = dict()
+        for priority, queue, metrics in zip(PRIORITIES, self._queues, self._metrics):
+            result[priority] = {
+                "depth": len(queue),
+                "sent": metrics.sent,
+                "queued": metrics.queued,
+                "mean_wait_ms": (
+                    metrics.wait_total / metrics.queued * 1000
+                    if metrics.queued
+                    else 0.0
+                ),
+                "max_wait_ms": metrics.wait_max * 1000,
+            }
+        return result
+
+    async def send(self, write, priority="interactive"):
+        """
+        Write a message once it is its turn.
+
+        Its turn comes once all messages of higher priority and the older ones of the same
+        priority are written.
+
+        :param callable write: coroutine function which writes the message
+        :param str priority: one of :data:`PRIORITIES`
+        :raises ValueError: if the priority is unknown
+        """
+        index = _index(priority)
+        if self._writing:
+            await self._wait(index)
+        else:
+            self._writing = True
+        try:
+            await write()
+        finally:
+            self._metrics[index].sent += 1
+            self._write_next()
+
+    async def _wait(self, index):
+        """Internal: wait until the message is next to be written."""
+        turn = self.loop.create_future()
+        entry = (turn, self.loop.time())
+        self._queues[index].append(entry)
+        try:
+            await turn
+        except asyncio.CancelledError:
+            if turn.cancelled():
+                self._queues[index].remove(entry)
+            else:
+                # cancelled after its turn came, pass it on
+                self._write_next()
+            raise
+
+        metrics = self._metrics[index]
+        wait = self.loop.time() - entry[1]
+        metrics.queued += 1
+        metrics.wait_total += wait
+        metrics.wait_max = max(metrics.wait_max, wait)
+
+    def _write_next(self):
+        """Internal: let the next message be written, if any."""
+        for queue in self._queues:
+            if queue:
+                turn, _ = queue.popleft()
+                turn.set_result(None)
+                return
+        self._writing = False
+
+
+def _index(priority):
+    """The index of a priority."""
+    try:
+        return PRIORITIES.index(priority)
+    except ValueError:
+        raise ValueError(
+            "Unknown priority '{}', expected one of {}".format(priority, PRIORITIES)
+        )
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""
+JSON-RPC server over WebSocket with the Rockets extensions, cancel and progress.
+
+Serves the same protocol as the C++ ``rockets::jsonrpc::CancellableReceiver``, e.g. as a
+lightweight service or as a stand-in for benchmarks and tests.
+"""
+from .cancellation import CancellationToken
+from .connection import Progress
+from .scheduler import Scheduler
+from .server import Server
+from .workers import Worker
+from .workers import WorkerPool
+
+__all__ = [
+    "CancellationToken",
+    "Progress",
+    "Scheduler",
+    "Server",
+    "Worker",
+    "WorkerPool",
+]
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Signals the handler of a request that the client has cancelled it."""
+import asyncio
+
+
+class CancellationToken:
+    """
+    Signals the handler of a request that the client has cancelled it.
+
+    The task of the handler is cancelled as well; the token is for work which is not interrupted
+    by that, e.g. loops in an executor which check :attr:`cancelled` regularly.
+    """
+
+    def __init__(self, loop):
+        """
+        Initialize a token which is not cancelled yet.
+
+        :param asyncio.AbstractEventLoop loop: Event loop where the request is processed in
+        """
+        self._future = loop.create_future()
+
+    @property
+    def cancelled(self):
+        """True once the request has been cancelled."""
+        return self._future.done()
+
+    def cancel(self):
+        """Mark the request as cancelled."""
+        if not self._future.done():
+            self._future.set_result(None)
+
+    async def wait(self):
+        """Wait until the request is cancelled."""
+        await asyncio.shield(self._future)
+
+    def add_callback(self, callback):
+        """
+        Call the callback without arguments once the request is cancelled.
+
+        :param callable callback: called in the event loop when the request is cancelled
+        """
+        self._future.add_done_callback(lambda future: callback())
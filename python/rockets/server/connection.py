@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""A client connection of a server and the requests in flight on it."""
+import asyncio
+import json
+from collections import deque
+
+import websockets
+from websockets.framing import OP_BINARY
+from websockets.framing import OP_TEXT
+from websockets.framing import Frame
+
+from ..encoding import pack
+from ..encoding import unpack
+
+DEFAULT_BROADCAST_QUEUE_SIZE = 256
+
+SLOW_CLIENT_POLICIES = ("drop", "disconnect")
+
+# close code of clients disconnected for not keeping up with the broadcasts, policy violation
+SLOW_CLIENT_CLOSE_CODE = 1008
+
+
+class Progress:
+    """Reports the progress of a request to the client as Rockets progress notification."""
+
+    def __init__(self, connection, request_id):
+        self._connection = connection
+        self._request_id = request_id
+
+    async def __call__(self, operation, amount):
+        """
+        Send a progress notification for the request, unless it is a notification itself.
+
+        :param str operation: description of the current operation
+        :param float amount: progress of the request between 0 and 1
+        """
+        if self._request_id is None:
+            return
+        params = {"id": self._request_id, "amount": amount, "operation": operation}
+        await self._connection.send(
+            self._connection.encode(
+                {"jsonrpc": "2.0", "method": "progress", "params": params}
+            )
+        )
+
+
+class Broadcast:
+    """A notification encoded once for all clients of an encoding, as payload and as frame."""
+
+    def __init__(self, value):
+        """
+        Initialize a notification, which is encoded on first use.
+
+        :param dict value: the notification
+        """
+        self.value = value
+        """The notification."""
+
+        # encoding -> opcode, payload and unmasked frame
+        self._encoded = dict()
+
+    def encoded(self, encoding):
+        """
+        Return the notification in an encoding, encoded only for the first client.
+
+        :param str encoding: 'json' or 'msgpack'
+        :return: the opcode and payload of the frame, for clients with websocket extensions, and
+                 the unmasked frame, written as it is to the clients without extensions
+        :rtype: tuple(int, bytes, bytes)
+        """
+        try:
+            return self._encoded[encoding]
+        except KeyError:
+            pass
+        if encoding == "msgpack":
+            opcode, data = OP_BINARY, pack(self.value)
+        else:
+            opcode, data = OP_TEXT, json.dumps(self.value).encode("utf-8")
+        chunks = []
+        Frame(True, opcode, data).write(chunks.append, mask=False)
+        encoded = self._encoded[encoding] = (opcode, data, b"".join(chunks))
+        return encoded
+
+
+class Connection:
+    """A client connection of a server and the requests in flight on it."""
+
+    def __init__(
+        self,
+        websocket,
+        broadcast_queue_size=DEFAULT_BROADCAST_QUEUE_SIZE,
+        slow_client="drop",
+        encoding="json",
+        loop=None,
+    ):
+        """
+        Initialize the connection of a client.
+
+        :param websockets.WebSocketServerProtocol websocket: the websocket of the client
+        :param int broadcast_queue_size: the number of broadcasts which wait for a slow client
+        :param str slow_client: one of :data:`SLOW_CLIENT_POLICIES`, whether a client with a full
+                                broadcast queue loses its oldest broadcast or is disconnected
+        :param str encoding: 'json' for text frames, 'msgpack' for binary frames of MessagePack as
+                             negotiated with the subprotocol
+        :param asyncio.AbstractEventLoop loop: Event loop where the broadcasts are written in
+        """
+        self.websocket = websocket
+        """The websocket of the client."""
+
+        self.encoding = encoding
+        """The encoding of the messages to the client, 'json' or 'msgpack'."""
+
+        self.broadcast_queue_size = broadcast_queue_size
+        """The number of broadcasts which wait for a slow client."""
+
+        self.slow_client = slow_client
+        """Whether a client with a full broadcast queue loses its oldest broadcast or is closed."""
+
+        self.loop = loop
+        """The event loop where the broadcasts are written in."""
+
+        self.dropped = 0
+        """The number of broadcasts which the client did not receive as it did not keep up."""
+
+        # request id -> (task of the handler, CancellationToken)
+        self.requests = dict()
+
+        # broadcasts which wait until the write buffer of the socket drained
+        self._broadcasts = deque()
+        self._writer = None
+        self._closing = False
+
+    def encode(self, value):
+        """
+        Encode a message in the encoding of the client.
+
+        :param value: the message, e.g. the dict of a response
+        :type value: dict or list
+        :return: the JSON text or the MessagePack bytes of the message
+        :rtype: str or bytes
+        """
+        if self.encoding == "msgpack":
+            return pack(value)
+        return json.dumps(value)
+
+    def decode(self, message):
+        """
+        Decode a message from the client; text frames are JSON also for MessagePack clients.
+
+        :param message: the text or binary frame
+        :type message: str or bytes
+        :return: the decoded message
+        :rtype: object
+        :raises ValueError: if the message cannot be decoded
+        """
+        if self.encoding == "msgpack" and isinstance(message, bytes):
+            return unpack(message)
+        return json.loads(message)
+
+    async def send(self, message):
+        """
+        Send a message to the client; messages to closed connections are dropped.
+
+        :param message: the str of a text message or the bytes of a binary message to send
+        """
+        try:
+            await self.websocket.send(message)
+        except websockets.ConnectionClosed:
+            pass
+
+    def broadcast(self, broadcast):
+        """
+        Write a broadcast to the client without waiting for it, or queue it if it is slow.
+
+        The frame is written right away while the write buffer of the socket is below its high
+        water mark. Otherwise it waits in the broadcast queue, and once the queue is full, the
+        oldest broadcast is dropped or the client is disconnected.
+
+        :param Broadcast broadcast: the encoded notification
+        """
+        websocket = self.websocket
+        if self._closing or not websocket.open:
+            return
+        if self._writer is None:
+            transport = websocket.writer.transport
+            if (
+                transport.get_write_buffer_size()
+                < transport.get_write_buffer_limits()[1]
+            ):
+                opcode, data, frame = broadcast.encoded(self.encoding)
+                if websocket.extensions:
+                    Frame(True, opcode, data).write(
+                        transport.write, mask=False, extensions=websocket.extensions
+                    )
+                else:
+                    transport.write(frame)
+                return
+            self._writer = asyncio.ensure_future(
+                self._write_broadcasts(), loop=self.loop
+            )
+
+        if len(self._broadcasts) >= self.broadcast_queue_size:
+            self.dropped += 1
+            if self.slow_client == "disconnect":
+                self._closing = True
+                self.discard_broadcasts()
+                asyncio.ensure_future(
+                    websocket.close(
+                        SLOW_CLIENT_CLOSE_CODE, "Client too slow for the broadcasts"
+                    ),
+                    loop=self.loop,
+                )
+                return
+            self._broadcasts.popleft()
+        self._broadcasts.append(broadcast)
+
+    def discard_broadcasts(self):
+        """Stop writing the queued broadcasts, e.g. when the connection closed."""
+        self._broadcasts.clear()
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+
+    async def _write_broadcasts(self):
+        """Internal: write the queued broadcasts as fast as the socket takes them."""
+        websocket = self.websocket
+        try:
+            while self._broadcasts and websocket.open:
+                opcode, data, _ = self._broadcasts.popleft().encoded(self.encoding)
+                # writes the frame, then waits until the write buffer drained
+                await websocket.write_frame(True, opcode, data)
+        except websockets.ConnectionClosed:
+            self._broadcasts.clear()
+        finally:
+            self._writer = None
+
+    def cancel(self, request_id):
+        """
+        Cancel a request in flight; its handler answers that the request was aborted.
+
+        :param request_id: the id of the request to cancel
+        :type request_id: str or int
+        :return: whether the request was in flight
+        :rtype: bool
+        """
+        try:
+            task, token = self.requests.pop(request_id)
+        except (KeyError, TypeError):
+            return False
+        token.cancel()
+        task.cancel()
+        return True
+
+    def cancel_all(self):
+        """Cancel all requests in flight, e.g. when the connection closed."""
+        for request_id in list(self.requests):
+            self.cancel(request_id)
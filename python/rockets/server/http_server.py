@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""JSON-RPC over HTTP POST for the server, with keep-alive and pipelined requests."""
+import asyncio
+from http import HTTPStatus
+
+from .connection import Connection
+
+
+class _HttpConnection(Connection):
+    """Internal: the requests in flight on an HTTP connection, which has no notifications."""
+
+    def __init__(self):
+        super().__init__(None)
+
+    async def send(self, message):
+        """Drop the message, e.g. progress; HTTP clients only receive responses."""
+
+
+async def _read_request(reader):
+    """Read one HTTP request, return its method, path, headers and body; None at EOF."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, path, version = request_line.decode("latin-1").split()
+
+    headers = dict()
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    headers.setdefault("connection", "keep-alive" if version == "HTTP/1.1" else "close")
+
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return method, path, headers, body
+
+
+def _response(status, body=b"", close=False):
+    """The bytes of an HTTP response."""
+    head = "HTTP/1.1 {} {}\r\nContent-Length: {}\r\n".format(
+        status.value, status.phrase, len(body)
+    )
+    if body:
+        head += "Content-Type: application/json\r\n"
+    if close:
+        head += "Connection: close\r\n"
+    return (head + "\r\n").encode("latin-1") + body
+
+
+class HttpEndpoint:
+    """
+    Answers JSON-RPC messages sent as HTTP POST requests to one path of the server.
+
+    Each request body is a JSON-RPC message, answered with the response in the body, or an empty
+    body if no response is due. Pipelined requests of a connection are processed concurrently and
+    answered in order. The requests in flight are tracked per connection, so a ``cancel``
+    notification cancels a request sent before it on the same connection.
+    """
+
+    def __init__(self, server, path="/"):
+        """
+        Initialize the endpoint of a server.
+
+        :param Server server: the server processing the messages
+        :param str path: the path to accept requests on
+        """
+        self.server = server
+        """The server processing the messages."""
+
+        self.path = path
+        """The path to accept requests on."""
+
+        self.connections = set()
+        """The :class:`Connection` of each HTTP connection, for its requests in flight."""
+
+    async def handle(self, reader, writer):
+        """
+        Answer all requests of one HTTP connection.
+
+        The requests of each HTTP connection are tracked separately, like those of a websocket:
+        their ids only need to be unique per connection, and a cancel notification only cancels
+        a request sent on the same connection.
+
+        :param asyncio.StreamReader reader: the incoming stream of the connection
+        :param asyncio.StreamWriter writer: the outgoing stream of the connection
+        """
+        connection = _HttpConnection()
+        self.connections.add(connection)
+        responses = asyncio.Queue(loop=self.server.loop)
+        writing = asyncio.ensure_future(
+            self._write_responses(responses, writer), loop=self.server.loop
+        )
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    await responses.put(_response(HTTPStatus.BAD_REQUEST, close=True))
+                    break
+                if request is None:
+                    break
+                close = request[2]["connection"].lower() == "close"
+                await responses.put(self._answer(connection, request, close))
+                if close:
+                    break
+        except ConnectionError:
+            pass
+        await responses.put(None)
+        try:
+            await writing
+        finally:
+            self.connections.discard(connection)
+            connection.cancel_all()
+            if self.server.scheduler is not None:
+                self.server.scheduler.remove(connection)
+
+    def _answer(self, connection, request, close):
+        """The HTTP response to a request, or a future of it."""
+        method, path, _, body = request
+        if path != self.path:
+            return _response(HTTPStatus.NOT_FOUND, close=close)
+        if method != "POST":
+            return _response(HTTPStatus.METHOD_NOT_ALLOWED, close=close)
+        try:
+            message = body.decode("utf-8")
+        except UnicodeDecodeError:
+            return _response(HTTPStatus.BAD_REQUEST, close=close)
+
+        response = self.server._respond(connection, message)  # pylint: disable=W0212
+        if isinstance(response, str):
+            return _response(HTTPStatus.OK, response.encode("utf-8"), close)
+        if response is None:
+            return _response(HTTPStatus.OK, close=close)
+        return asyncio.ensure_future(
+            self._answer_later(response, close), loop=self.server.loop
+        )
+
+    async def _answer_later(self, response, close):
+        """The HTTP response to a request once all of its JSON-RPC requests are done."""
+        response = await response
+        body = response.encode("utf-8") if response else b""
+        return _response(HTTPStatus.OK, body, close)
+
+    async def _write_responses(self, responses, writer):
+        """Internal: write the responses in the order of their requests, then close."""
+        try:
+            while True:
+                response = await responses.get()
+                if response is None:
+                    break
+                if not isinstance(response, bytes):
+                    response = await response
+                writer.write(response)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
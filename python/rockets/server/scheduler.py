@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Fair scheduling of the requests of the clients of a server."""
+import asyncio
+from collections import deque
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class _Client:
+    """The waiting requests and the counters of one connection."""
+
+    def __init__(self, weight):
+        self.weight = weight
+        # (turn, method, time when it was queued) of the waiting requests in order of arrival
+        self.queue = deque()
+        self.deficit = 0.0
+        self.running = 0
+        self.started = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class Scheduler:
+    """
+    Runs the requests of the clients of a server in a fair order with limited concurrency.
+
+    Each connection has its own queue of requests, and the queues take turns in deficit
+    round-robin order, so a client which sends a large batch does not delay the requests of other
+    clients by more than a few requests. A client with a larger weight gets more turns. At most
+    ``max_concurrency`` requests run at the same time, and at most the concurrency of their method
+    for methods with a limit. The requests of one client run in the order of their arrival.
+    """
+
+    def __init__(
+        self,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        method_concurrency=None,
+        weight=None,
+        loop=None,
+    ):
+        """
+        Configure the limits and the weights of the clients.
+
+        :param int max_concurrency: the number of requests which run at the same time
+        :param dict method_concurrency: the number of requests of single methods which run at the
+                                        same time, by their name
+        :param callable weight: called with the :class:`Connection` of a new client to return its
+                                positive weight, e.g. from the path or the headers of its
+                                websocket; 1 for all clients if None
+        :param asyncio.AbstractEventLoop loop: Event loop of the server using this scheduler
+        """
+        self.max_concurrency = max_concurrency
+        """The number of requests which run at the same time."""
+
+        self.method_concurrency = dict(method_concurrency or {})
+        """The number of requests of single methods which run at the same time, by their name."""
+
+        self.weight = weight
+        """Returns the weight of the :class:`Connection` of a new client."""
+
+        self.loop = loop
+        """The event loop of the server using this scheduler."""
+        if not self.loop:
+            self.loop = asyncio.get_event_loop()
+
+        # Connection -> _Client
+        self._clients = dict()
+        # the clients with waiting requests, in round-robin order
+        self._active = deque()
+        self._running = 0
+        self._method_running = dict()
+        self._dispatch_scheduled = False
+
+    def metrics(self):
+        """
+        Return the number of waiting and running requests of each client and their waiting time.
+
+        :return: for each :class:`Connection`: waiting, running, started, mean_wait_ms and
+                 max_wait_ms (over the started requests)
+        :rtype: dict
+        """
+        return {
+            connection: {
+                "waiting": len(client.queue),
+                "running": client.running,
+                "started": client.started,
+                "mean_wait_ms": (
+                    client.wait_total / client.started * 1000 if client.started else 0.0
+                ),
+                "max_wait_ms": client.wait_max * 1000,
+            }
+            for connection, client in self._clients.items()
+        }
+
+    async def acquire(self, connection, method):
+        """
+        Wait until a request of a client may run.
+
+        Call :meth:`release` once it is done.
+
+        :param Connection connection: the connection of the client
+        :param str method: the method of the request
+        :raises ValueError: if the weight of a new client is not positive
+        """
+        client = self._clients.get(connection)
+        if client is None:
+            weight = self.weight(connection) if self.weight else 1.0
+            if weight <= 0:
+                # the client would never get a turn
+                raise ValueError(
+                    "The weight of a client must be positive, got {}".format(weight)
+                )
+            client = self._clients[connection] = _Client(weight)
+
+        turn = self.loop.create_future()
+        entry = (turn, method, self.loop.time())
+        if not client.queue:
+            self._active.append(client)
+        client.queue.append(entry)
+        # not right away: a batch of handlers which do not await anything would all run in this
+        # iteration of the event loop, before the messages of other clients are read
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            self.loop.call_soon(self._dispatch_arrivals)
+        try:
+            await turn
+        except asyncio.CancelledError:
+            if turn.cancelled():
+                self._discard(client, entry)
+            else:
+                # cancelled after its turn came, pass it on
+                self.release(connection, method)
+            raise
+
+    def release(self, connection, method):
+        """
+        Let the next requests run once a request is done.
+
+        :param Connection connection: the connection of the client of the request
+        :param str method: the method of the request
+        """
+        self._running -= 1
+        if method in self.method_concurrency:
+            self._method_running[method] -= 1
+        client = self._clients.get(connection)
+        if client is not None:
+            client.running -= 1
+        self._dispatch()
+
+    def remove(self, connection):
+        """
+        Forget a client and cancel its waiting requests, e.g. when its connection closed.
+
+        :param Connection connection: the connection of the client
+        """
+        client = self._clients.pop(connection, None)
+        if client is None:
+            return
+        for turn, _, _ in client.queue:
+            turn.cancel()
+        if client.queue:
+            client.queue.clear()
+            self._active.remove(client)
+
+    def _can_run(self, method):
+        """Whether the concurrency limit of the method lets a request of it run now."""
+        limit = self.method_concurrency.get(method)
+        return limit is None or self._method_running.get(method, 0) < limit
+
+    def _start(self, client, method, queued):
+        """Count a request as running which waited since a time."""
+        self._running += 1
+        if method in self.method_concurrency:
+            self._method_running[method] = self._method_running.get(method, 0) + 1
+        client.running += 1
+        client.started += 1
+        wait = self.loop.time() - queued
+        client.wait_total += wait
+        client.wait_max = max(client.wait_max, wait)
+
+    def _discard(self, client, entry):
+        """Remove a cancelled request from the queue of its client."""
+        try:
+            client.queue.remove(entry)
+        except ValueError:
+            # already taken from the queue, e.g. as the client was removed
+            return
+        if not client.queue:
+            client.deficit = 0.0
+            self._active.remove(client)
+
+    def _dispatch_arrivals(self):
+        """Start the requests which arrived in the last iteration of the event loop."""
+        self._dispatch_scheduled = False
+        self._dispatch()
+
+    def _dispatch(self):
+        """Start the waiting requests in deficit round-robin order while they may run."""
+        active = self._active
+        # the clients in a row whose next request waits for a method limit
+        blocked = 0
+        while active and self._running < self.max_concurrency and blocked < len(active):
+            client = active[0]
+            turn, method, queued = client.queue[0]
+            if turn.cancelled():
+                self._discard(client, client.queue[0])
+                continue
+            if not self._can_run(method):
+                blocked += 1
+                active.rotate(-1)
+                continue
+            blocked = 0
+            if client.deficit < 1.0:
+                # a new round of the client
+                client.deficit += client.weight
+                if client.deficit < 1.0:
+                    active.rotate(-1)
+                    continue
+
+            client.deficit -= 1.0
+            client.queue.popleft()
+            self._start(client, method, queued)
+            turn.set_result(None)
+            if not client.queue:
+                client.deficit = 0.0
+                active.popleft()
+            elif client.deficit < 1.0:
+                active.rotate(-1)
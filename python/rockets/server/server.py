@@ -0,0 +1,497 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""JSON-RPC server over WebSocket with the Rockets extensions, cancel and progress."""
+import asyncio
+import os
+from functools import partial
+from http import HTTPStatus
+from inspect import isawaitable
+
+import websockets
+
+from ..encoding import check_encoding
+from ..encoding import is_msgpack_subprotocol
+from ..encoding import msgpack_subprotocols
+from ..request_error import INTERNAL_ERROR
+from ..request_error import INVALID_REQUEST
+from ..request_error import METHOD_NOT_FOUND
+from ..request_error import PARSE_ERROR
+from ..request_error import REQUEST_ABORTED
+from ..request_error import RequestError
+from ..utils import WS_UNIX
+from .cancellation import CancellationToken
+from .connection import DEFAULT_BROADCAST_QUEUE_SIZE
+from .connection import SLOW_CLIENT_POLICIES
+from .connection import Broadcast
+from .connection import Connection
+from .connection import Progress
+from .http_server import HttpEndpoint
+
+RESERVED_PREFIXES = ("rpc.",)
+RESERVED_METHODS = ("cancel", "progress")
+
+
+def _error(error, request_id=None):
+    """The error response for a RequestError."""
+    data = {"code": error.code, "message": error.message}
+    if error.data is not None:
+        data["data"] = error.data
+    return {"jsonrpc": "2.0", "id": request_id, "error": data}
+
+
+def _dump_batch(connection, responses):
+    """The responses of a batch, None if none are due, e.g. for a batch of notifications."""
+    responses = [response for response in responses if response]
+    return connection.encode(responses) if responses else None
+
+
+def _internal_error(error, request_id):
+    """The error response for an unexpected exception of a handler."""
+    error = RequestError(INTERNAL_ERROR.code, INTERNAL_ERROR.message, str(error))
+    return _error(error, request_id)
+
+
+def _is_valid_request(request):
+    """Whether the object is a valid JSON-RPC 2.0 request or notification."""
+    return (
+        request.get("jsonrpc") == "2.0"
+        and isinstance(request.get("method"), str)
+        and isinstance(request.get("params", []), (list, dict))
+        and (
+            request.get("id") is None
+            or isinstance(request["id"], (str, int, float))
+            and not isinstance(request["id"], bool)
+        )
+    )
+
+
+def _protocols(request_headers):
+    """The subprotocols requested by a client."""
+    protocols = []
+    for header in request_headers.get_all("Sec-WebSocket-Protocol"):
+        protocols += [protocol.strip() for protocol in header.split(",")]
+    return [protocol for protocol in protocols if protocol]
+
+
+class Server:
+    """
+    JSON-RPC server over WebSocket with the Rockets extensions, cancel and progress.
+
+    Requests are processed concurrently, also within a batch. The client cancels a request with
+    a ``cancel`` notification, which cancels the task of its handler and answers the request with
+    the error -31002. Handlers bound with :meth:`bind_async` can report their progress, which is
+    sent as ``progress`` notification with the id of the request.
+
+    Broadcasts are encoded once and written to all clients without waiting for any of them; a
+    client which does not keep up gets a bounded queue of broadcasts, so it does not stall the
+    others.
+
+    With ``msgpack=True``, clients may negotiate binary frames of MessagePack with the
+    ``<subprotocol>+msgpack`` websocket protocol; text frames are still JSON.
+    """
+
+    def __init__(
+        self,
+        subprotocol="rockets",
+        broadcast_queue_size=DEFAULT_BROADCAST_QUEUE_SIZE,
+        slow_clients="drop",
+        scheduler=None,
+        msgpack=False,
+        loop=None,
+    ):
+        """
+        Initialize a server without any methods.
+
+        :param str subprotocol: the websocket protocol to serve; clients which request only other
+                                protocols are rejected
+        :param int broadcast_queue_size: the number of broadcasts which wait for a client once the
+                                         write buffer of its socket is full
+        :param str slow_clients: one of :data:`SLOW_CLIENT_POLICIES`; 'drop' drops the oldest
+                                 broadcast of a client with a full queue, 'disconnect' closes
+                                 its connection
+        :param Scheduler scheduler: runs the requests of the clients in a fair order with limited
+                                    concurrency; they run as they arrive if None
+        :param bool msgpack: whether to also serve the MessagePack encoding
+        :param asyncio.AbstractEventLoop loop: Event loop where this server should run in
+        :raises ValueError: if the policy for slow clients is unknown
+        :raises ImportError: if msgpack is requested but not installed
+        """
+        if slow_clients not in SLOW_CLIENT_POLICIES:
+            raise ValueError(
+                "Unknown policy for slow clients '{}', expected one of {}".format(
+                    slow_clients, SLOW_CLIENT_POLICIES
+                )
+            )
+        if msgpack:
+            check_encoding("msgpack")
+
+        self.subprotocol = subprotocol
+        """The websocket protocol served to the clients."""
+
+        self.subprotocols = (
+            msgpack_subprotocols([subprotocol]) if msgpack else [subprotocol]
+        )
+        """The websocket protocols served to the clients, in the order of preference."""
+
+        self.broadcast_queue_size = broadcast_queue_size
+        """The number of broadcasts which wait for a slow client."""
+
+        self.slow_clients = slow_clients
+        """Whether slow clients with a full broadcast queue lose broadcasts or are disconnected."""
+
+        self.scheduler = scheduler
+        """Runs the requests of the clients in a fair order, None to run them as they arrive."""
+
+        self.loop = loop
+        """The event loop where this server is running in."""
+        if not self.loop:
+            self.loop = asyncio.get_event_loop()
+
+        self.url = None
+        """The address of the server once it is started."""
+
+        self.http_url = None
+        """The address of the HTTP endpoint once it is started with :meth:`start_http`."""
+
+        self.connections = set()
+        """The :class:`Connection` of each connected client."""
+
+        # method name -> (handler, whether it receives progress and cancellation token)
+        self._methods = dict()
+        self._server = None
+        self._unix_path = None
+        self._http_server = None
+        self._http_endpoint = None
+
+    def bind(self, method, handler):
+        """
+        Register the handler of a method.
+
+        :param str method: name of the method
+        :param callable handler: called with the params of the request, which are None if the
+                                 request has none; returns the result or an awaitable of it, or
+                                 raises a :class:`RequestError` to answer with that error
+        :raises ValueError: if the method name is reserved
+        """
+        self._bind(method, handler, False)
+
+    def bind_async(self, method, handler):
+        """
+        Register the coroutine function handling a cancellable method with progress.
+
+        :param str method: name of the method
+        :param callable handler: coroutine function called with the params of the request, a
+                                 :class:`Progress` to await with the operation and amount, and a
+                                 :class:`CancellationToken`
+        :raises ValueError: if the method name is reserved
+        """
+        self._bind(method, handler, True)
+
+    def bind_worker(self, method, handler, pool):
+        """
+        Register the handler of a cancellable method with progress which runs on a worker pool.
+
+        :param str method: name of the method
+        :param callable handler: called in the pool with the params of the request and a
+                                 :class:`Worker` to report progress and check for cancellation;
+                                 a module-level function for process pools
+        :param WorkerPool pool: the pool to run the handler on
+        :raises ValueError: if the method name is reserved
+        """
+        self._bind(method, partial(pool.run, handler), True)
+
+    def unbind(self, method):
+        """
+        Remove the handler of a method.
+
+        :param str method: name of the method
+        """
+        self._methods.pop(method, None)
+
+    async def start(self, host="localhost", port=0):
+        """
+        Start listening for clients.
+
+        :param str host: the interface to listen on
+        :param int port: the port to listen on, 0 to pick a free port
+        """
+        self._server = await websockets.serve(
+            self._handle,
+            host,
+            port,
+            subprotocols=self.subprotocols,
+            process_request=self._check_subprotocol,
+            max_size=None,
+            loop=self.loop,
+        )
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = "{}:{}".format(host, port)
+
+    async def start_unix(self, path):
+        """
+        Start listening for clients on a Unix domain socket instead of TCP.
+
+        Clients on the same host connect to the ws+unix:// :attr:`url` without the TCP stack.
+
+        :param str path: the path of the socket to create
+        """
+        self._server = await websockets.unix_serve(
+            self._handle,
+            path,
+            subprotocols=self.subprotocols,
+            process_request=self._check_subprotocol,
+            max_size=None,
+            loop=self.loop,
+        )
+        self._unix_path = path
+        self.url = WS_UNIX + path
+
+    async def start_http(self, host="localhost", port=0, path="/"):
+        """
+        Start listening for JSON-RPC messages sent as HTTP POST requests.
+
+        HTTP clients cannot receive notifications, like progress and broadcasts.
+
+        :param str host: the interface to listen on
+        :param int port: the port to listen on, 0 to pick a free port
+        :param str path: the path to accept requests on
+        """
+        self._http_endpoint = HttpEndpoint(self, path)
+        self._http_server = await asyncio.start_server(
+            self._http_endpoint.handle, host, port, loop=self.loop
+        )
+        port = self._http_server.sockets[0].getsockname()[1]
+        self.http_url = "http://{}:{}{}".format(host, port, path)
+
+    async def close(self):
+        """Stop listening, close all connections and cancel their requests."""
+        if self._http_server is not None:
+            self._http_server.close()
+            await self._http_server.wait_closed()
+            self._http_server = None
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        if self._unix_path is not None:
+            os.unlink(self._unix_path)
+            self._unix_path = None
+
+    async def broadcast(self, method, params=None):
+        """
+        Send a notification to all connected clients.
+
+        The notification is encoded once and written to the clients without waiting for them;
+        slow clients get it once their broadcast queue is written.
+
+        :param str method: name of the notification
+        :param params: params of the notification
+        """
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        broadcast = Broadcast(message)
+        for connection in self.connections:
+            connection.broadcast(broadcast)
+
+    def _bind(self, method, handler, cancellable):
+        """Register a handler unless the method name is reserved."""
+        if method.startswith(RESERVED_PREFIXES) or method in RESERVED_METHODS:
+            raise ValueError(
+                "The method '{}' is reserved, as are {} and names starting with {}".format(
+                    method,
+                    ", ".join("'{}'".format(name) for name in RESERVED_METHODS),
+                    ", ".join("'{}'".format(prefix) for prefix in RESERVED_PREFIXES),
+                )
+            )
+        self._methods[method] = (handler, cancellable)
+
+    def _check_subprotocol(self, path, request_headers):  # pylint: disable=W0613
+        """Reject clients which request only other websocket protocols."""
+        protocols = _protocols(request_headers)
+        if protocols and not set(protocols).intersection(self.subprotocols):
+            return (
+                HTTPStatus.BAD_REQUEST,
+                [],
+                "Unsupported websocket protocol, expected '{}'\n".format(
+                    self.subprotocol
+                ).encode(),
+            )
+        return None
+
+    async def _handle(self, websocket, path):  # pylint: disable=W0613
+        """Internal: answer all messages of one connection."""
+        connection = Connection(
+            websocket,
+            self.broadcast_queue_size,
+            self.slow_clients,
+            "msgpack" if is_msgpack_subprotocol(websocket.subprotocol) else "json",
+            self.loop,
+        )
+        self.connections.add(connection)
+        try:
+            while True:
+                await self._receive(connection, await websocket.recv())
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.connections.discard(connection)
+            connection.discard_broadcasts()
+            connection.cancel_all()
+            if self.scheduler is not None:
+                self.scheduler.remove(connection)
+
+    async def _receive(self, connection, message):
+        """Internal: process one message, answer it once all of its requests are done."""
+        response = self._respond(connection, message)
+        if isawaitable(response):
+            asyncio.ensure_future(
+                self._send_later(connection, response), loop=self.loop
+            )
+        elif response:
+            await connection.send(response)
+
+    def _respond(self, connection, message):
+        """The response to a message, None if none is due, or an awaitable of it."""
+        try:
+            request = connection.decode(message)
+        except ValueError:
+            return connection.encode(_error(PARSE_ERROR))
+
+        if isinstance(request, dict):
+            response = self._process(connection, request)
+            if isawaitable(response):
+                return self._dump_later(connection, response)
+            return connection.encode(response) if response else None
+        if isinstance(request, list) and request:
+            responses = [self._process(connection, item) for item in request]
+            if any(isawaitable(response) for response in responses):
+                return self._dump_batch_later(connection, responses)
+            return _dump_batch(connection, responses)
+        # neither a request nor a batch, or an empty batch
+        return connection.encode(_error(INVALID_REQUEST))
+
+    def _process(self, connection, request):  # pylint: disable=R0911
+        """The response of a request, None if none is due, or an awaitable of it."""
+        if not isinstance(request, dict):
+            return _error(INVALID_REQUEST)
+
+        request_id = request.get("id")
+        if not _is_valid_request(request):
+            return None if request_id is None else _error(INVALID_REQUEST, request_id)
+
+        method = request["method"]
+        params = request.get("params")
+        if method == "cancel":
+            if request_id is None and isinstance(params, dict):
+                connection.cancel(params.get("id"))
+            return None
+
+        if method not in self._methods:
+            return None if request_id is None else _error(METHOD_NOT_FOUND, request_id)
+
+        handler, cancellable = self._methods[method]
+        token = CancellationToken(self.loop) if cancellable else None
+        try:
+            if self.scheduler is not None:
+                result = self._call_scheduled(
+                    connection, request_id, method, handler, params, token
+                )
+            else:
+                result = self._call(connection, request_id, handler, params, token)
+        except RequestError as error:
+            return None if request_id is None else _error(error, request_id)
+        except Exception as error:  # pylint: disable=W0703
+            return None if request_id is None else _internal_error(error, request_id)
+
+        if not isawaitable(result):
+            if request_id is None:
+                return None
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+        task = asyncio.ensure_future(result, loop=self.loop)
+        if request_id is not None:
+            connection.requests[request_id] = (
+                task,
+                token or CancellationToken(self.loop),
+            )
+        return self._complete(connection, request_id, task)
+
+    @staticmethod
+    def _call(connection, request_id, handler, params, token):
+        """Call the handler of a request."""
+        if token is not None:
+            return handler(params, Progress(connection, request_id), token)
+        return handler(params)
+
+    async def _call_scheduled(
+        self, connection, request_id, method, handler, params, token
+    ):
+        """Call the handler of a request once the scheduler lets it run, await it."""
+        await self.scheduler.acquire(connection, method)
+        try:
+            result = self._call(connection, request_id, handler, params, token)
+            if isawaitable(result):
+                result = await result
+            return result
+        finally:
+            self.scheduler.release(connection, method)
+
+    async def _complete(self, connection, request_id, task):
+        """The response of a request once its handler is done."""
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if not task.cancelled():  # pragma: no cover
+                # this coroutine is cancelled, not the request
+                raise
+            error = _error(REQUEST_ABORTED, request_id)
+            return None if request_id is None else error
+        except RequestError as error:
+            return None if request_id is None else _error(error, request_id)
+        except Exception as error:  # pylint: disable=W0703
+            return None if request_id is None else _internal_error(error, request_id)
+        finally:
+            if request_id is not None:
+                connection.requests.pop(request_id, None)
+
+        if request_id is None:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    async def _send_later(self, connection, response):
+        """Internal: send a response once it is done."""
+        response = await response
+        if response:
+            await connection.send(response)
+
+    async def _dump_later(self, connection, response):
+        """The response of a request once it is done."""
+        response = await response
+        return connection.encode(response) if response else None
+
+    async def _dump_batch_later(self, connection, responses):
+        """The responses of a batch once all of them are done."""
+        done = []
+        for response in responses:
+            done.append((await response) if isawaitable(response) else response)
+        return _dump_batch(connection, done)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Run the handlers of a server on thread or process pools, with progress and cancellation."""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+POOL_KINDS = ("thread", "process")
+
+# the progress queue and cancel flags of the pool, in each of its processes
+_process_queue = None
+_process_flags = None
+
+
+class Worker:
+    """Passed to handlers running on a :class:`WorkerPool` to report progress and check cancel."""
+
+    def __init__(self, progress, cancelled):
+        self._progress = progress
+        self._cancelled = cancelled
+
+    def progress(self, operation, amount):
+        """
+        Report the progress of the request to the client.
+
+        :param str operation: description of the current operation
+        :param float amount: progress of the request between 0 and 1
+        """
+        self._progress(operation, amount)
+
+    @property
+    def cancelled(self):
+        """True once the client cancelled the request; the handler should return early then."""
+        return self._cancelled()
+
+
+def _init_process(queue, flags):  # pragma: no cover
+    """Keep the progress queue and cancel flags of the pool in a new process."""
+    global _process_queue, _process_flags  # pylint: disable=W0603
+    _process_queue = queue
+    _process_flags = flags
+
+
+def _call_in_process(handler, params, call_id, slot):  # pragma: no cover
+    """Call a handler in a process of the pool."""
+    worker = Worker(
+        lambda operation, amount: _process_queue.put((call_id, operation, amount)),
+        lambda: bool(_process_flags[slot]),
+    )
+    try:
+        return handler(params, worker)
+    finally:
+        # all progress of the call is forwarded once this arrives
+        _process_queue.put((call_id, None, None))
+
+
+class _ProcessCall:
+    """A call on a process pool, done once its result and all of its progress arrived."""
+
+    def __init__(self, call_id, slot, progress, future):
+        self.call_id = call_id
+        self.slot = slot
+        self.progress = progress
+        self.future = future
+        self.running = True
+        self.result = None
+        self.has_result = False
+        self.progress_done = False
+
+
+class WorkerPool:
+    """
+    Thread or process pool for the handlers of a :class:`Server`, see :meth:`Server.bind_worker`.
+
+    Threads share the GIL, so only handlers which release it, e.g. in NumPy or I/O, run in
+    parallel on a thread pool; CPU-heavy Python handlers need a process pool. A cancelled request
+    is answered right away, while its handler keeps running until it checks
+    :attr:`Worker.cancelled`.
+    """
+
+    def __init__(self, kind="thread", size=None, loop=None, max_calls=1024):
+        """
+        Start the threads or processes of the pool.
+
+        :param str kind: 'thread' or 'process'
+        :param int size: the number of threads or processes, the number of CPUs if None
+        :param asyncio.AbstractEventLoop loop: Event loop of the server using this pool
+        :param int max_calls: the number of calls a process pool accepts at the same time,
+                              further calls wait
+        :raises ValueError: if the kind is unknown
+        """
+        if kind not in POOL_KINDS:
+            raise ValueError(
+                "Unknown pool kind '{}', expected one of {}".format(kind, POOL_KINDS)
+            )
+
+        self.kind = kind
+        """'thread' or 'process'."""
+
+        self.size = size or os.cpu_count() or 1
+        """The number of threads or processes."""
+
+        self.loop = loop
+        """The event loop of the server using this pool."""
+        if not self.loop:
+            self.loop = asyncio.get_event_loop()
+
+        self._call_ids = count()
+        if kind == "thread":
+            self._executor = ThreadPoolExecutor(self.size)
+            return
+
+        # call id -> _ProcessCall
+        self._calls = dict()
+        self._queue = multiprocessing.Queue()
+        self._flags = multiprocessing.RawArray("b", max_calls)
+        self._free_slots = list(range(max_calls))
+        self._slots = asyncio.Semaphore(max_calls, loop=self.loop)
+        self._pool = multiprocessing.Pool(
+            self.size, _init_process, (self._queue, self._flags)
+        )
+        self._forwarder = threading.Thread(target=self._forward_progress)
+        self._forwarder.daemon = True
+        self._forwarder.start()
+
+    async def run(self, handler, params, progress, token):
+        """
+        Run a handler in the pool.
+
+        :param handler: called with the params and a :class:`Worker`; a module-level function
+                        for process pools
+        :param params: the params of the request
+        :param Progress progress: reports the progress to the client
+        :param CancellationToken token: signals the worker once the request is cancelled
+        :return: the result of the handler
+        :rtype: object
+        """
+        if self.kind == "thread":
+            return await self._run_in_thread(handler, params, progress, token)
+        return await self._run_in_process(handler, params, progress, token)
+
+    def shutdown(self, wait=True):
+        """
+        Stop the threads or processes of the pool.
+
+        :param bool wait: wait for the running handlers, otherwise processes are terminated
+        """
+        if self.kind == "thread":
+            self._executor.shutdown(wait)
+            return
+        if wait:
+            self._pool.close()
+        else:
+            self._pool.terminate()
+        self._pool.join()
+        self._queue.put(None)
+        self._forwarder.join()
+
+    async def _run_in_thread(self, handler, params, progress, token):
+        """Run a handler in a thread of the pool."""
+        cancelled = threading.Event()
+        token.add_callback(cancelled.set)
+
+        def _progress(operation, amount):
+            self.loop.call_soon_threadsafe(
+                self._send_progress, progress, operation, amount
+            )
+
+        worker = Worker(_progress, cancelled.is_set)
+        return await self.loop.run_in_executor(self._executor, handler, params, worker)
+
+    async def _run_in_process(self, handler, params, progress, token):
+        """Run a handler in a process of the pool."""
+        await self._slots.acquire()
+        call = _ProcessCall(
+            next(self._call_ids),
+            self._free_slots.pop(),
+            progress,
+            self.loop.create_future(),
+        )
+        self._flags[call.slot] = 0
+        self._calls[call.call_id] = call
+
+        def _cancel():
+            if call.running:
+                self._flags[call.slot] = 1
+
+        token.add_callback(_cancel)
+        self._pool.apply_async(
+            _call_in_process,
+            (handler, params, call.call_id, call.slot),
+            callback=lambda result: self.loop.call_soon_threadsafe(
+                self._on_result, call, result
+            ),
+            error_callback=lambda error: self.loop.call_soon_threadsafe(
+                self._on_result, call, None, error
+            ),
+        )
+        return await call.future
+
+    def _on_result(self, call, result, error=None):
+        """The process is done with the call, its slot can be reused."""
+        call.running = False
+        self._flags[call.slot] = 0
+        self._free_slots.append(call.slot)
+        self._slots.release()
+        if error is not None:
+            self._complete(call, error=error)
+            return
+        call.result = result
+        call.has_result = True
+        if call.progress_done:
+            self._complete(call)
+
+    def _forward_progress(self):
+        """Forward the progress reported by the processes to the event loop."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self.loop.call_soon_threadsafe(self._on_progress, *item)
+
+    def _on_progress(self, call_id, operation, amount):
+        """Send the progress of a call, complete it after its last progress."""
+        call = self._calls.get(call_id)
+        if call is None:
+            return
+        if operation is None:
+            call.progress_done = True
+            if call.has_result:
+                self._complete(call)
+            return
+        self._send_progress(call.progress, operation, amount)
+
+    def _complete(self, call, error=None):
+        """Answer the request of a call, unless it was cancelled."""
+        self._calls.pop(call.call_id, None)
+        if call.future.done():
+            return
+        if error is None:
+            call.future.set_result(call.result)
+        else:
+            call.future.set_exception(error)
+
+    def _send_progress(self, progress, operation, amount):
+        """Send a progress notification from the event loop."""
+        asyncio.ensure_future(progress(operation, amount), loop=self.loop)
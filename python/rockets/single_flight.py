@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Share one in-flight call between concurrent callers asking for the same thing."""
+import asyncio
+
+
+class _Call:
+    """Internal: a shared call, its number of waiters and their progress callbacks."""
+
+    def __init__(self):
+        self.task = None
+        self.waiters = 0
+        self.progress_callbacks = []
+
+    def on_progress(self, progress):
+        """Forward a progress update to all waiters."""
+        for callback in list(self.progress_callbacks):
+            callback(progress)
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between concurrent callers with the same key.
+
+    The first caller starts the call, later callers with the same key wait for its result. The
+    call is only cancelled once all of its waiters have been cancelled.
+    """
+
+    def __init__(self, loop):
+        """
+        Initialize without any calls in flight.
+
+        :param asyncio.AbstractEventLoop loop: Event loop where the shared calls run in
+        """
+        self._loop = loop
+        self._calls = dict()
+
+        self.shared = 0
+        """The number of callers which joined a call that was already in flight."""
+
+    def __len__(self):
+        """Return the number of calls in flight."""
+        return len(self._calls)
+
+    async def call(self, key, coro_function, on_progress=None):
+        """
+        Wait for the result of the call with the given key, start it if none is in flight.
+
+        :param key: hashable key which identifies the call
+        :param coro_function: called with a progress callback to start the call
+        :param on_progress: called with the progress updates of the call for this caller
+        :return: the result of the call
+        :rtype: object
+        :raises asyncio.CancelledError: if this caller was cancelled
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call()
+            call.task = asyncio.ensure_future(
+                coro_function(call.on_progress), loop=self._loop
+            )
+            call.task.add_done_callback(lambda task: self._forget(key, call))
+            self._calls[key] = call
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        if on_progress:
+            call.progress_callbacks.append(on_progress)
+        try:
+            return await asyncio.shield(call.task, loop=self._loop)
+        finally:
+            call.waiters -= 1
+            if on_progress:
+                call.progress_callbacks.remove(on_progress)
+            if not call.waiters and not call.task.done():
+                # the last caller gave up; new callers must not join the cancelled call
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key, call):
+        """Internal: remove a call that is done or cancelled."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
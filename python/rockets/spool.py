@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""Spool the raw frames of notifications into a memory-mapped ring buffer file."""
+import json
+import mmap
+import os
+import struct
+import time
+
+from .encoding import unpack
+
+MAGIC = b"RKTSPL1\n"
+DEFAULT_CAPACITY = 64 * 1024 * 1024
+
+# magic, capacity of the ring buffer, logical offsets of its head and tail, appended records
+_HEADER = struct.Struct("@8sQQQQ")
+# indices of the header fields which change, which are read and written through a native view
+# as that loads and stores them at once; struct.pack_into clears a field before writing it
+_HEAD = 2
+_TAIL = 3
+_COUNT = 4
+
+# length of the payload, flags, wall clock timestamp
+_RECORD = struct.Struct("<IBd")
+_LENGTH = struct.Struct("<I")
+_BINARY_FLAG = 1
+# marks the unused end of the ring buffer before a record which did not fit there
+_PADDING = 0xFFFFFFFF
+
+
+def _read_header(buffer, path):
+    """The capacity, head, tail and count of a spool, ValueError for other files."""
+    if len(buffer) >= _HEADER.size:
+        magic, capacity, head, tail, count = _HEADER.unpack_from(buffer)
+        if magic == MAGIC and len(buffer) == _HEADER.size + capacity:
+            return capacity, head, tail, count
+    raise ValueError("'{}' is not a Rockets spool".format(path))
+
+
+def _offsets(buffer):
+    """The header of a spool as unsigned 64 bit integers."""
+    return memoryview(buffer)[: _HEADER.size].cast("Q")
+
+
+def _record_at(buffer, capacity, offset):
+    """The offset of the record at a logical offset, after the padding of a wrap."""
+    position = offset % capacity
+    if capacity - position < _RECORD.size:
+        return offset + capacity - position
+    length = _LENGTH.unpack_from(buffer, _HEADER.size + position)[0]
+    if length == _PADDING:
+        return offset + capacity - position
+    return offset
+
+
+class SpoolRecord:
+    """A spooled frame; its payload is only decoded on request."""
+
+    def __init__(self, offset, timestamp, data, binary):
+        self.offset = offset
+        """The logical offset of the record in the spool, to :meth:`SpoolReader.seek` to."""
+
+        self.timestamp = timestamp
+        """The wall clock time when the frame was spooled, in seconds."""
+
+        self.data = data
+        """The raw bytes of the frame."""
+
+        self.binary = binary
+        """Whether the frame was a binary frame rather than text."""
+
+    def text(self):
+        """Return the text of the frame."""
+        return self.data.decode("utf-8")
+
+    def json(self):
+        """Return the decoded JSON of a text frame, or the decoded MessagePack of a binary one."""
+        if self.binary:
+            return unpack(self.data)
+        return json.loads(self.text())
+
+    def notification(self):
+        """Return the :class:`Notification` of the frame."""
+        from .notification import Notification
+
+        return Notification.from_data(self.json())
+
+
+class NotificationSpool:
+    """
+    Appends raw frames to a fixed-size ring buffer in a memory-mapped file.
+
+    Appending copies the frame into the mapping without a system call or a Python object per
+    frame kept alive; the oldest frames are overwritten once the buffer is full. Other processes
+    read the spool with a :class:`SpoolReader` while it is written.
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        """
+        Open the spool, continue it if the file exists already.
+
+        :param str path: the file of the spool
+        :param int capacity: the size of the ring buffer of a new spool in bytes
+        :raises ValueError: if the file exists and is not a spool, or the capacity is negative
+        :raises OSError: if the file cannot be opened or mapped
+        """
+        self.path = path
+        """The file of the spool."""
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "r+b" if exists else "w+b")
+        try:
+            if not exists:
+                self._file.truncate(_HEADER.size + capacity)
+            self._buffer = mmap.mmap(self._file.fileno(), 0)
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+
+        if exists:
+            try:
+                capacity, head, tail, count = _read_header(self._buffer, path)
+            except ValueError:
+                self._buffer.close()
+                self._file.close()
+                raise
+        else:
+            head = tail = count = 0
+            _HEADER.pack_into(self._buffer, 0, MAGIC, capacity, head, tail, count)
+        self._offsets = _offsets(self._buffer)
+
+        self.capacity = capacity
+        """The size of the ring buffer in bytes."""
+
+        self.skipped = 0
+        """The number of frames which were not appended as they are larger than the buffer."""
+
+        self._head = head
+        self._tail = tail
+        self._count = count
+
+    def __enter__(self):
+        """Use the spool as context manager which closes it."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the spool."""
+        self.close()
+
+    def append(self, frame):
+        """
+        Append a frame, overwrite the oldest frames if the buffer is full.
+
+        Frames which are larger than the ring buffer are skipped and counted in :attr:`skipped`,
+        so that a spool never fails the client which feeds it.
+
+        :param frame: the str of a text frame or the bytes of a binary frame
+        :type frame: str or bytes
+        """
+        flags = 0
+        if isinstance(frame, str):
+            frame = frame.encode("utf-8")
+        else:
+            flags = _BINARY_FLAG
+        size = _RECORD.size + len(frame)
+        capacity = self.capacity
+        if size > capacity:
+            self.skipped += 1
+            return
+
+        start = self._head
+        left = capacity - start % capacity
+        if left < size:
+            # the record does not fit before the end of the buffer, it starts at its beginning
+            start += left
+        end = start + size
+
+        # readers must not trust the records which are overwritten
+        tail = self._tail
+        while tail < end - capacity:
+            tail = _record_at(self._buffer, capacity, tail)
+            if tail >= self._head:
+                tail = start
+                break
+            length = _LENGTH.unpack_from(self._buffer, _HEADER.size + tail % capacity)[
+                0
+            ]
+            tail += _RECORD.size + length
+        if tail != self._tail:
+            self._tail = tail
+            self._offsets[_TAIL] = tail
+
+        position = _HEADER.size + start % capacity
+        if start != self._head and left >= _LENGTH.size:
+            _LENGTH.pack_into(
+                self._buffer, _HEADER.size + self._head % capacity, _PADDING
+            )
+        _RECORD.pack_into(self._buffer, position, len(frame), flags, time.time())
+        self._buffer[position + _RECORD.size:position + size] = frame
+
+        # readers see the record once the head is behind it
+        self._head = end
+        self._count += 1
+        self._offsets[_HEAD] = end
+        self._offsets[_COUNT] = self._count
+
+    def on_notification(self, notification):
+        """
+        Append a :class:`Notification`, e.g. as listener of the notifications of a client.
+
+        The raw frames which the client spools itself with its ``spool`` do not need encoding.
+
+        :param Notification notification: the notification to append
+        """
+        self.append(notification.json)
+
+    def count(self):
+        """
+        Return the number of frames appended to the spool since it was created.
+
+        :return: the number of frames, including the overwritten ones
+        :rtype: int
+        """
+        return self._count
+
+    def flush(self):
+        """Write the spool to the disk; the operating system does so on its own otherwise."""
+        self._buffer.flush()
+
+    def close(self):
+        """Unmap and close the file of the spool."""
+        self._offsets.release()
+        self._buffer.close()
+        self._file.close()
+
+
+class SpoolReader:
+    """
+    Reads the frames of a spool, also while a :class:`NotificationSpool` appends to it.
+
+    Iterating yields the records from the current position up to the last appended one and moves
+    the position behind them, so the next iteration continues with the records appended since.
+    A reader which falls behind by more than the capacity continues with the oldest record.
+    """
+
+    def __init__(self, path):
+        """
+        Open a spool for reading, starting at its oldest record.
+
+        :param str path: the file of the spool
+        :raises ValueError: if the file is not a spool
+        :raises OSError: if the file cannot be opened or mapped
+        """
+        self.path = path
+        """The file of the spool."""
+
+        self._file = open(path, "rb")
+        try:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+        try:
+            self.capacity = _read_header(self._buffer, path)[0]
+            """The size of the ring buffer in bytes."""
+        except ValueError:
+            self._buffer.close()
+            self._file.close()
+            raise
+        self._offsets = _offsets(self._buffer)
+
+        self.position = None
+        """The logical offset of the next record to read, None for the oldest record."""
+
+        self.overruns = 0
+        """How often records were overwritten before they were read."""
+
+    def __enter__(self):
+        """Use the spool as context manager which closes it."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the spool."""
+        self.close()
+
+    def __iter__(self):
+        """Iterate over the records up to the last appended one, see :meth:`records`."""
+        return self.records()
+
+    def count(self):
+        """
+        Return the number of frames appended to the spool since it was created.
+
+        :return: the number of frames, including the overwritten ones
+        :rtype: int
+        """
+        return self._offsets[_COUNT]
+
+    def seek(self, offset=None):
+        """
+        Continue reading at a record, e.g. at the :attr:`SpoolRecord.offset` of an earlier one.
+
+        :param int offset: the logical offset of the record, None for the oldest record
+        """
+        self.position = offset
+
+    def seek_time(self, timestamp):
+        """
+        Continue reading at the oldest record which was spooled at or after a time.
+
+        Only the headers of the records are read to find it.
+
+        :param float timestamp: wall clock time in seconds
+        """
+        self.position = None
+        for offset, record_timestamp, _, _ in self._scan(False):
+            if record_timestamp >= timestamp:
+                self.position = offset
+                return
+        self.position = self._offsets[_HEAD]
+
+    def records(self, decode=False):
+        """
+        Read the records up to the last appended one.
+
+        :param bool decode: yield the decoded messages of the frames instead of :class:`SpoolRecord`
+        :return: generator of the records
+        :rtype: generator
+        """
+        for offset, timestamp, flags, data in self._scan(True):
+            self.position = offset + _RECORD.size + len(data)
+            record = SpoolRecord(offset, timestamp, data, bool(flags & _BINARY_FLAG))
+            yield record.json() if decode else record
+
+    def close(self):
+        """Unmap and close the file of the spool."""
+        self._offsets.release()
+        self._buffer.close()
+        self._file.close()
+
+    def _tail(self):
+        """The logical offset of the oldest record."""
+        return self._offsets[_TAIL]
+
+    def _scan(self, copy):
+        """The offset, timestamp, flags and data, if copied, of the next records."""
+        buffer = self._buffer
+        head = self._offsets[_HEAD]
+        offset = self.position
+        while True:
+            tail = self._tail()
+            if offset is None:
+                offset = tail
+            elif offset < tail:
+                self.overruns += 1
+                offset = tail
+            # the padding of a wrap is read before the record, both are checked below
+            checked = offset
+            offset = _record_at(buffer, self.capacity, offset)
+            if offset >= head:
+                return
+
+            position = _HEADER.size + offset % self.capacity
+            length, flags, timestamp = _RECORD.unpack_from(buffer, position)
+            data = None
+            if copy:
+                data = buffer[
+                    position + _RECORD.size:position + _RECORD.size + length
+                ]
+            if self._tail() > checked:
+                # overwritten while it was read, continue with the oldest record
+                offset = checked
+                continue
+            yield offset, timestamp, flags, data
+            offset += _RECORD.size + length
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""WebSocket client protocol which decodes the results of streamed requests incrementally."""
+from websockets.client import WebSocketClientProtocol
+from websockets.exceptions import WebSocketProtocolError
+from websockets.framing import OP_CONT
+from websockets.framing import OP_TEXT
+
+from .request_error import INVALID_JSON_RESPONSE
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+
+class _ResponseDecoder:
+    """Internal: find the stream of a result by the id of the response, then decode its items."""
+
+    def __init__(self, streams):
+        self._streams = streams
+        self._chunks = []
+        self._events = ijson.sendable_list()
+        self._router = ijson.parse_coro(self._events)
+        self._items = ijson.sendable_list()
+        self._parser = None
+
+        self.stream = None
+        """The stream of the request, once the id of the response has been decoded."""
+
+        self.streamed = None
+        """None while undecided, False if the message is not the result of a streamed request."""
+
+    def feed(self, data):
+        """
+        Decode the next fragment of the message.
+
+        :param bytes data: the fragment
+        :return: the items which have been completed by this fragment
+        :rtype: list
+        :raises ijson.JSONError: if the result of a streamed request is not valid JSON
+        """
+        if not data:
+            return []  # would end the input of the parsers
+
+        if self.streamed is None:
+            self._chunks.append(data)
+            self._route()
+            if not self.streamed:
+                return []
+            data = b"".join(self._chunks)
+            self._chunks = None
+
+        self._parser.send(data)
+        items = list(self._items)
+        del self._items[:]
+        return items
+
+    def close(self):
+        """
+        Decode the end of the message.
+
+        :raises ijson.JSONError: if the response is incomplete
+        """
+        self._parser.close()
+
+    def _route(self):
+        """
+        Internal: find the stream by the id, which has to be the first member of the response.
+
+        Error responses are small, they are not streamed but decoded as a whole by the client.
+        """
+        try:
+            self._router.send(self._chunks[-1])
+        except ijson.JSONError:
+            self.streamed = False
+            return
+
+        for prefix, event, value in self._events:
+            if prefix:
+                if prefix == "id" and self.stream is None:
+                    self.stream = self._streams.get(value)
+                    if self.stream is None:
+                        self.streamed = False
+                        break
+            elif event == "map_key" and self.stream is None and value != "id":
+                self.streamed = False
+                break
+            elif event == "map_key" and value in ("result", "error"):
+                self.streamed = value == "result"
+                break
+        del self._events[:]
+
+        if self.streamed:
+            # the items are built by the parser of ijson, much faster than event by event
+            item_prefix = "result"
+            if self.stream.prefix:
+                item_prefix += "." + self.stream.prefix
+            self._parser = ijson.items_coro(self._items, item_prefix, use_float=True)
+
+
+class StreamingClientProtocol(WebSocketClientProtocol):
+    """
+    Client protocol which decodes the results of streamed requests while they are received.
+
+    A response is decoded incrementally if it is a fragmented text message which starts with the
+    id of a streamed request, like the responses of Rockets servers. All other messages are
+    assembled and returned as usual.
+    """
+
+    def __init__(self, *, streams=None, **kwds):
+        """
+        Initialize the protocol.
+
+        :param dict streams: the :class:`ResultStream` of each pending streamed request by id
+        :param kwds: passed on to :class:`WebSocketClientProtocol`
+        """
+        super().__init__(**kwds)
+        self._streams = streams
+
+    async def read_message(self):
+        """Read the next message which is not the response of a streamed request."""
+        if ijson is None:
+            return await super().read_message()
+
+        while True:
+            # decide per message, requests may have been streamed while waiting for it
+            frame = await self.read_data_frame(max_size=self.max_size)
+            if frame is None:
+                return None
+            if frame.opcode == OP_CONT:  # pragma: no cover
+                raise WebSocketProtocolError("Unexpected opcode")
+            text = frame.opcode == OP_TEXT
+            chunks = [frame.data]
+
+            if text and not frame.fin and self._streams:
+                decoder = _ResponseDecoder(self._streams)
+                items = decoder.feed(frame.data)
+                while decoder.streamed is None and not frame.fin:
+                    frame = await self._read_continuation()
+                    chunks.append(frame.data)
+                    items = decoder.feed(frame.data)
+                if decoder.streamed:
+                    await self._stream_result(decoder, frame, items)
+                    continue
+
+            while not frame.fin:
+                frame = await self._read_continuation()
+                chunks.append(frame.data)
+            data = b"".join(chunks)
+            return data.decode("utf-8") if text else data
+
+    async def _read_continuation(self):
+        """Read the next frame of a fragmented message."""
+        frame = await self.read_data_frame(max_size=self.max_size)
+        if frame is None:
+            raise WebSocketProtocolError("Incomplete fragmented message")
+        if frame.opcode != OP_CONT:  # pragma: no cover
+            raise WebSocketProtocolError("Unexpected opcode")
+        return frame
+
+    async def _stream_result(self, decoder, frame, items):
+        """Internal: pass the items to the stream of the request while receiving the response."""
+        stream = decoder.stream
+        error = None
+        while True:
+            for item in items:
+                await stream.put(item)
+            if frame.fin:
+                break
+            frame = await self._read_continuation()
+            items = []
+            if not error and not stream.closed:
+                try:
+                    items = decoder.feed(frame.data)
+                except ijson.JSONError:
+                    error = INVALID_JSON_RESPONSE
+
+        if not error and not stream.closed:
+            try:
+                decoder.close()
+            except ijson.JSONError:
+                error = INVALID_JSON_RESPONSE
+        stream.finish(error)
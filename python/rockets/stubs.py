@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+# All rights reserved. Do not distribute without further notice.
+"""
+Generate typed client stubs from the registry and the method schemas of a Rockets server.
+
+Rockets servers list their HTTP endpoints in their ``registry``, and applications publish the
+JSON schema of each method on a ``<method>/schema`` endpoint. Each method becomes a coroutine of
+the generated ``Stubs`` class, which sends requests with a precomputed :class:`MethodEnvelope`.
+
+Run ``python -m rockets.stubs --help`` for the command line usage.
+"""
+import argparse
+import asyncio
+import hashlib
+import importlib.util
+import json
+import keyword
+import os
+import re
+import sys
+from urllib.parse import urlsplit
+
+from .http_transport import http_get
+from .http_transport import set_http_protocol
+
+SCHEMA_SUFFIX = "/schema"
+
+_TYPES = {
+    "object": "dict",
+    "array": "list",
+    "string": "str",
+    "number": "float",
+    "integer": "int",
+    "boolean": "bool",
+    "null": "None",
+}
+
+# attributes of the generated class which methods must not replace
+_RESERVED = {"_client"}
+
+
+def _root(url):
+    """The HTTP address of the server of a url, without a path."""
+    parts = urlsplit(set_http_protocol(url))
+    return "{}://{}".format(parts.scheme, parts.netloc)
+
+
+def _is_method(schema):
+    """Whether a schema describes a method rather than e.g. an object."""
+    return isinstance(schema, dict) and (
+        schema.get("type") == "method" or "params" in schema or "returns" in schema
+    )
+
+
+async def fetch_schemas(url, loop=None):
+    """
+    Fetch the schemas of the methods of a server.
+
+    Schemas of other endpoints, e.g. of objects, are skipped.
+
+    :param str url: The address of the Rockets server.
+    :param asyncio.AbstractEventLoop loop: Event loop where the requests are sent in
+    :return: the schema of each method by its name
+    :rtype: dict
+    :raises RequestError: if the server answered with an HTTP error
+    :raises OSError: if the server cannot be connected
+    """
+    root = _root(url)
+    registry = json.loads(await http_get(root + "/registry", loop))
+    endpoints = sorted(
+        endpoint
+        for endpoint, methods in registry.items()
+        if endpoint.endswith(SCHEMA_SUFFIX) and "GET" in methods
+    )
+    bodies = await asyncio.gather(
+        *[http_get(root + "/" + endpoint, loop) for endpoint in endpoints], loop=loop
+    )
+
+    schemas = dict()
+    for endpoint, body in zip(endpoints, bodies):
+        schema = json.loads(body)
+        if _is_method(schema):
+            schemas[endpoint[: -len(SCHEMA_SUFFIX)]] = schema
+    return schemas
+
+
+def _identifier(name, taken):
+    """A Python identifier for a name which is not taken yet."""
+    identifier = re.sub(r"\W", "_", name)
+    if not identifier or identifier[0].isdigit():
+        identifier = "_" + identifier
+    if keyword.iskeyword(identifier):
+        identifier += "_"
+    unique = identifier
+    index = 1
+    while unique in taken:
+        index += 1
+        unique = "{}_{}".format(identifier, index)
+    taken.add(unique)
+    return unique
+
+
+def _union(annotations):
+    """The annotation of any of the annotations."""
+    unique = []
+    for annotation in annotations:
+        if annotation not in unique:
+            unique.append(annotation)
+    if "typing.Any" in unique or not unique:
+        return "typing.Any"
+    if len(unique) == 1:
+        return unique[0]
+    return "typing.Union[{}]".format(", ".join(unique))
+
+
+def _annotation(schema):
+    """The Python type annotation of a JSON schema."""
+    if not isinstance(schema, dict):
+        return "typing.Any"
+    for key in ("oneOf", "anyOf"):
+        if isinstance(schema.get(key), list):
+            return _union([_annotation(option) for option in schema[key]])
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        return _union([_annotation(dict(schema, type=option)) for option in kind])
+    if kind == "array" and isinstance(schema.get("items"), dict):
+        return "typing.List[{}]".format(_annotation(schema["items"]))
+    return _TYPES.get(kind, "typing.Any")
+
+
+def _text(value):
+    """Text for a docstring, which cannot end it."""
+    return str(value).replace("\\", "\\\\").replace('"""', '\\"\\"\\"').strip()
+
+
+def _method(name, envelope, schema):
+    """The source lines of the coroutine of a method."""
+    params = schema.get("params") or []
+    if not isinstance(params, list):
+        params = [params]
+    taken = {"self"}
+    names = [
+        _identifier(
+            param.get("name", "param") if isinstance(param, dict) else "param", taken
+        )
+        for param in params
+    ]
+    annotations = [_annotation(param) for param in params]
+    returns = _annotation(schema.get("returns"))
+
+    arguments = ", ".join(
+        "{}: {}".format(param, annotation)
+        for param, annotation in zip(names, annotations)
+    )
+    lines = [
+        "    async def {}(self{}) -> {}:".format(
+            name, ", " + arguments if arguments else "", returns
+        ),
+        '        """',
+    ]
+    description = _text(
+        schema.get("description") or schema.get("title") or envelope.method
+    )
+    lines += ["        " + line if line else "" for line in description.splitlines()]
+    lines.append("")
+    for param, annotation, param_schema in zip(names, annotations, params):
+        description = (
+            param_schema.get("description", "")
+            if isinstance(param_schema, dict)
+            else ""
+        )
+        lines.append(
+            "        :param {} {}: {}".format(
+                annotation.replace("typing.", ""), param, _text(description)
+            ).rstrip()
+        )
+    lines.append("        :rtype: {}".format(returns.replace("typing.", "")))
+    lines.append('        """')
+
+    if not names:
+        call = "_{}".format(envelope.identifier)
+    elif len(names) == 1:
+        call = "_{}, {}".format(envelope.identifier, names[0])
+    else:
+        call = "_{}, [{}]".format(envelope.identifier, ", ".join(names))
+    lines.append("        return await self._client.request({})".format(call))
+    return lines
+
+
+class _Envelope:
+    """Internal: the method name and the identifier of its envelope in a generated module."""
+
+    def __init__(self, method, identifier):
+        self.method = method
+        self.identifier = identifier
+
+
+def generate_stubs(schemas, url=""):
+    """
+    Generate the source of a module with the typed stubs of methods.
+
+    A method with one param sends it as the params of the request, several params are sent as a
+    list. The generated ``Stubs`` class takes an :class:`AsyncClient` and has a coroutine for each
+    method.
+
+    :param dict schemas: the schema of each method by its name, see :func:`fetch_schemas`
+    :param str url: the address of the server, for the documentation of the module
+    :return: the source of the module
+    :rtype: str
+    """
+    encoded = json.dumps(schemas, sort_keys=True).encode("utf-8")
+    lines = [
+        "# Generated by rockets.stubs; do not edit.",
+        '"""Typed stubs of the methods of {}."""'.format(
+            _text(url or "a Rockets server")
+        ),
+        "import typing  # noqa: F401 pylint: disable=unused-import",
+        "",
+        "from rockets.request import MethodEnvelope",
+        "",
+        'SCHEMAS_HASH = "{}"'.format(hashlib.sha1(encoded).hexdigest()),
+        "",
+    ]
+
+    method_names = set(_RESERVED)
+    envelope_names = set()
+    methods = []
+    for method in sorted(schemas):
+        envelope = _Envelope(method, _identifier(method.upper(), envelope_names))
+        lines.append(
+            "_{} = MethodEnvelope({})".format(envelope.identifier, json.dumps(method))
+        )
+        methods.append((_identifier(method, method_names), envelope, schemas[method]))
+
+    lines += [
+        "",
+        "",
+        "class Stubs:",
+        '    """The methods of the server."""',
+        "",
+        "    def __init__(self, client):",
+        '        """',
+        "        Call the methods with a client.",
+        "",
+        "        :param AsyncClient client: the client connected to the server",
+        '        """',
+        "        self._client = client",
+    ]
+    for name, envelope, schema in methods:
+        lines.append("")
+        lines += _method(name, envelope, schema)
+    return "\n".join(lines) + "\n"
+
+
+def _cache_dir():
+    """The default directory of the cached stubs."""
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache, "rockets", "stubs")
+
+
+def _import(name, path):
+    """Import a module from a file."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def load_stubs(url, cache_dir=None, refresh=False, loop=None):
+    """
+    Import the stubs of a server, generate them first unless they are cached on disk.
+
+    :param str url: The address of the Rockets server.
+    :param str cache_dir: the directory of the cached stubs, ~/.cache/rockets/stubs if None
+    :param bool refresh: fetch the schemas and generate the stubs even if they are cached
+    :param asyncio.AbstractEventLoop loop: Event loop where the requests are sent in
+    :return: the generated module; ``module.Stubs(client)`` calls the methods with a client
+    :rtype: module
+    :raises RequestError: if the server answered with an HTTP error
+    :raises OSError: if the server cannot be connected
+    """
+    root = _root(url)
+    name = "rockets_stubs_" + hashlib.sha1(root.encode("utf-8")).hexdigest()[:16]
+    cache_dir = cache_dir or _cache_dir()
+    path = os.path.join(cache_dir, name + ".py")
+
+    if refresh or not os.path.exists(path):
+        source = generate_stubs(await fetch_schemas(root, loop), root)
+        os.makedirs(cache_dir, exist_ok=True)
+        # never leave a partially written module behind for other processes
+        temporary = "{}.{}.tmp".format(path, os.getpid())
+        with open(temporary, "w") as file:
+            file.write(source)
+        os.replace(temporary, path)
+    return _import(name, path)
+
+
+def main(argv=None):
+    """
+    Generate the stubs of a server with the given command line arguments.
+
+    :param list argv: the command line arguments, sys.argv if None
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m rockets.stubs",
+        description="Generate typed Python stubs from the registry and method schemas of a "
+        "Rockets server.",
+    )
+    parser.add_argument("url", help="address of the Rockets server")
+    parser.add_argument(
+        "-o", "--output", help="file to write the module to, stdout if not given"
+    )
+    args = parser.parse_args(argv)
+
+    schemas = asyncio.get_event_loop().run_until_complete(fetch_schemas(args.url))
+    source = generate_stubs(schemas, _root(args.url))
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(source)
+    else:
+        sys.stdout.write(source)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
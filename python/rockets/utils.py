@@ -19,6 +19,7 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 # All rights reserved. Do not distribute without further notice.
 """Utils for the client"""
+import json
 from random import choice
 from string import ascii_lowercase
 from string import digits
@@ -27,6 +28,7 @@ HTTP = "http://"
 HTTPS = "https://"
 WS = "ws://"
 WSS = "wss://"
+WS_UNIX = "ws+unix://"
 
 
 def set_ws_protocol(url):
@@ -37,7 +39,7 @@ def set_ws_protocol(url):
     :return: Url preprend with ws for http, wss for https for ws if no protocol was found
     :rtype: str
     """
-    if url.startswith(WS) or url.startswith(WSS):
+    if url.startswith(WS) or url.startswith(WSS) or url.startswith(WS_UNIX):
         return url
     if url.startswith(HTTP):
         return url.replace(HTTP, WS, 1)
@@ -46,6 +48,24 @@ def set_ws_protocol(url):
     return WS + url
 
 
+def split_unix_url(url):
+    """
+    Split a url of a server on a Unix domain socket into the socket path and the resource url.
+
+    The resource follows the socket path after a colon, e.g. ``ws+unix:///tmp/rockets.sock:/ws``,
+    and is ``/`` if omitted.
+
+    :param str url: Url starting with ws+unix://
+    :return: the path of the socket and the ws url of the resource on the server
+    :rtype: tuple(str, str)
+    """
+    path = url[len(WS_UNIX):]
+    socket_path, colon, resource = path.rpartition(":")
+    if not colon or not resource.startswith("/"):
+        socket_path, resource = path, "/"
+    return socket_path, WS + "localhost" + resource
+
+
 def copydoc(fromfunc, sep="\n"):
     """
     Copy the docstring of `fromfunc`
@@ -81,6 +101,20 @@ def random_string(length=8, chars=digits + ascii_lowercase):
         yield "".join([choice(chars) for _ in range(length)])
 
 
+def decode_message(message):
+    """
+    Decode a JSON message; a module-level function to be usable in process pools.
+
+    :param str message: the received message
+    :return: the decoded message, or None if it is not JSON
+    :rtype: dict or list
+    """
+    try:
+        return json.loads(message)
+    except (TypeError, ValueError):
+        return None
+
+
 def is_json_rpc_response(value):
     """Check if the given value is valid JSON-RPC response."""
     return isinstance(value, dict) and "id" in value
@@ -100,3 +134,16 @@ def is_progress_notification(value):
         and "params" in value
         and "id" in value["params"]
     )
+
+
+def request_key(method, params=None):
+    """
+    A key that identifies a method invocation by its method name and params.
+
+    :param str method: name of the method
+    :param params: params of the method
+    :type params: list or dict
+    :return: the method name and the canonical JSON encoding of the params
+    :rtype: tuple(str, str)
+    """
+    return method, json.dumps(params, sort_keys=True, separators=(",", ":"))
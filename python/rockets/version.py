@@ -19,10 +19,20 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 # All rights reserved. Do not distribute without further notice.
 """The version of the rockets package"""
-from pkg_resources import DistributionNotFound
-from pkg_resources import get_distribution
+try:
+    from importlib.metadata import PackageNotFoundError
+    from importlib.metadata import version
+except ImportError:  # pragma: no cover
+    # Python < 3.8
+    from pkg_resources import DistributionNotFound as PackageNotFoundError
+    from pkg_resources import get_distribution
+
+    def version(distribution_name):
+        """Return the version string of the given distribution."""
+        return get_distribution(distribution_name).version
+
 
 try:
-    VERSION = get_distribution("rockets").version
-except DistributionNotFound:  # pragma: no cover
+    VERSION = version("rockets")
+except PackageNotFoundError:  # pragma: no cover
     VERSION = "rockets-local"
@@ -52,8 +52,14 @@ with open(os.path.join(this_directory, 'README.md')) as f:
     long_description = f.read()
 
 setup(
-    packages=['rockets'],
+    packages=['rockets', 'rockets.bench', 'rockets.server'],
     install_requires=REQS,
+    extras_require={
+        'uvloop': ['uvloop>=0.12'],
+        'streaming': ['ijson>=3.1'],
+        'msgpack': ['msgpack>=1.0'],
+        'numpy': ['numpy>=1.13'],
+    },
     long_description=long_description,
     long_description_content_type='text/markdown'
 )
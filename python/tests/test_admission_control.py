@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import time
+
+from nose.tools import assert_equal
+from nose.tools import assert_greater
+from nose.tools import assert_greater_equal
+from nose.tools import assert_is
+from nose.tools import assert_true
+
+import rockets
+from rockets.server import Server
+
+server = None
+running = {"now": 0, "max": 0}
+
+
+async def _sleep(params):
+    running["now"] += 1
+    running["max"] = max(running["max"], running["now"])
+    try:
+        await asyncio.sleep(params[0])
+    finally:
+        running["now"] -= 1
+    return params[0]
+
+
+def setup():
+    global server
+    server = Server()
+    server.bind("ping", lambda params: "pong")
+    server.bind("sleep", _sleep)
+    server.bind("items", lambda params: [1, 2, 3])
+    _run(server.start())
+
+
+def teardown():
+    _run(server.close())
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _throttled(coro):
+    try:
+        _run(coro)
+    except rockets.RequestError as error:
+        assert_equal(error.code, -31004)
+        assert_equal(error.message, "Request throttled")
+        return error.data
+    assert False, "not throttled"
+
+
+def test_limits_must_be_positive():
+    for limits in (
+        {"max_pending": 0},
+        {"rate": 0},
+        {"rate": 1, "burst": -1},
+        {"method_rates": {"ping": 0}},
+        {"method_rates": {"ping": (1, 0)}},
+    ):
+        try:
+            rockets.AdmissionControl(**limits)
+            assert False, limits
+        except ValueError:
+            pass
+
+
+def test_max_pending_waits():
+    admission = rockets.AdmissionControl(max_pending=2)
+    client = rockets.AsyncClient(server.url, admission=admission)
+    running["max"] = 0
+    results = _run(asyncio.gather(*[client.request("sleep", [0.02]) for _ in range(6)]))
+    assert_equal(results, [0.02] * 6)
+    assert_equal(running["max"], 2)
+    metrics = admission.metrics()
+    assert_equal(metrics["admitted"], 6)
+    assert_equal(metrics["throttled"], 4)
+    assert_equal(metrics["pending"], 0)
+    assert_equal(metrics["waiting"], 0)
+    assert_greater(metrics["mean_wait_ms"], 10)
+    assert_greater_equal(metrics["max_wait_ms"], metrics["mean_wait_ms"])
+    _run(client.disconnect())
+
+
+def test_max_pending_fails_fast():
+    admission = rockets.AdmissionControl(max_pending=1, wait=False)
+    client = rockets.AsyncClient(server.url, admission=admission)
+    first = asyncio.ensure_future(client.request("sleep", [0.05]))
+    _run(asyncio.sleep(0))
+    assert_equal(_throttled(client.request("ping")), "too many pending requests")
+    assert_equal(_run(first), 0.05)
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_equal(admission.metrics()["rejected"], 1)
+    assert_equal(admission.metrics()["throttled"], 0)
+    _run(client.disconnect())
+
+
+def test_rate():
+    client = rockets.AsyncClient(
+        server.url, admission=rockets.AdmissionControl(rate=20, burst=1)
+    )
+    _run(client.connect())
+    started = time.monotonic()
+    _run(asyncio.gather(*[client.request("ping") for _ in range(5)]))
+    assert_greater_equal(time.monotonic() - started, 0.18)
+    assert_equal(client.admission.metrics()["throttled"], 4)
+    _run(client.disconnect())
+
+
+def test_method_rates():
+    admission = rockets.AdmissionControl(method_rates={"sleep": (10, 1), "items": 100})
+    client = rockets.AsyncClient(server.url, admission=admission)
+    _run(client.connect())
+    started = time.monotonic()
+    _run(asyncio.gather(*[client.request("sleep", [0]) for _ in range(3)]))
+    assert_greater_equal(time.monotonic() - started, 0.18)
+    started = time.monotonic()
+    _run(asyncio.gather(*[client.request("ping") for _ in range(10)]))
+    _run(asyncio.gather(*[client.request("items") for _ in range(10)]))
+    assert_true(time.monotonic() - started < 0.1)
+    _run(client.disconnect())
+
+
+def test_rate_fails_fast():
+    admission = rockets.AdmissionControl(max_pending=2, rate=1, burst=1, wait=False)
+    client = rockets.AsyncClient(server.url, admission=admission)
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_equal(_throttled(client.request("ping")), "rate limit exceeded")
+    assert_equal(_throttled(client.notify("ping", None)), "rate limit exceeded")
+    assert_equal(admission.metrics()["pending"], 0)
+    _run(client.disconnect())
+
+
+def test_batch():
+    admission = rockets.AdmissionControl(max_pending=1, rate=2, burst=2, wait=False)
+    client = rockets.AsyncClient(server.url, admission=admission)
+    responses = _run(client.batch([rockets.Request("ping"), rockets.Request("ping")]))
+    assert_equal([response.result for response in responses], ["pong", "pong"])
+    assert_equal(admission.metrics()["pending"], 0)
+    assert_equal(
+        _throttled(
+            client.batch([rockets.Notification("ping"), rockets.Notification("ping")])
+        ),
+        "rate limit exceeded",
+    )
+    admission.wait = True
+    assert_equal(_run(client.batch([rockets.Notification("ping")])), [])
+    assert_equal(admission.metrics()["pending"], 0)
+    _run(client.disconnect())
+
+
+def test_cancel_while_waiting():
+    admission = rockets.AdmissionControl(max_pending=1, rate=1, burst=1)
+    client = rockets.AsyncClient(server.url, admission=admission)
+    _run(client.connect())
+    first = asyncio.ensure_future(client.request("sleep", [0.05]))
+    waiting = [
+        asyncio.ensure_future(client.request("ping")),
+        asyncio.ensure_future(client.batch([rockets.Request("ping")])),
+    ]
+    _run(asyncio.sleep(0.01))
+    assert_equal(admission.metrics()["waiting"], 2)
+    for task in waiting:
+        task.cancel()
+    assert_equal(_run(asyncio.gather(*waiting)), [None, None])
+    assert_equal(_run(first), 0.05)
+    assert_equal(admission.metrics()["pending"], 0)
+
+    # the token of the request which was cancelled while it waited for it is given back
+    sleeping = asyncio.ensure_future(client.request("ping"))
+    _run(asyncio.sleep(0.01))
+    sleeping.cancel()
+    assert_is(_run(sleeping), None)
+    assert_true(admission._bucket.tokens > -1)
+    assert_equal(admission.metrics()["pending"], 0)
+    _run(client.disconnect())
+
+
+def test_cancel_after_turn():
+    admission = rockets.AdmissionControl(max_pending=1)
+
+    async def _test():
+        await admission.acquire("ping")
+        waiting = asyncio.ensure_future(admission.acquire("ping"))
+        await asyncio.sleep(0)
+        # the turn is handed over, but the task is cancelled before it runs
+        admission.release()
+        waiting.cancel()
+        try:
+            await waiting
+            assert False
+        except asyncio.CancelledError:
+            pass
+
+    _run(_test())
+    assert_equal(admission.metrics()["pending"], 0)
+
+
+def test_stream_request():
+    admission = rockets.AdmissionControl(max_pending=1, wait=False)
+    client = rockets.AsyncClient(server.url, admission=admission)
+    first = client.stream_request("items")
+    second = client.stream_request("items")
+    try:
+        _run(second)
+        assert False
+    except rockets.RequestError as error:
+        assert_equal(error.code, -31004)
+    assert_equal(_run(first), 3)
+    assert_equal(admission.metrics()["pending"], 0)
+    _run(client.disconnect())
+
+
+def test_sync_client():
+    admission = rockets.AdmissionControl(max_pending=4)
+    client = rockets.Client(server.url, admission=admission)
+    assert_is(client.admission, admission)
+    assert_equal(client.request("ping"), "pong")
+    client.disconnect()
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
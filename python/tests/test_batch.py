@@ -103,6 +103,12 @@ def test_batch():
     assert_equal(results, [4, 8])
 
 
+def test_only_notifications():
+    client = rockets.Client(server_url)
+    notification = rockets.Notification("foobar")
+    assert_equal(client.batch([notification]), [])
+
+
 @raises(rockets.RequestError)
 def test_invalid_args():
     client = rockets.Client(server_url)
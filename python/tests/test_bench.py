@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import json
+
+from nose.tools import assert_equal
+from nose.tools import assert_greater
+from nose.tools import assert_in
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets.bench import LatencyStats
+from rockets.bench import run_load
+from rockets.bench import serve
+from rockets.bench.__main__ import main
+from rockets.bench.server import process_message
+
+server_url = None
+
+
+def setup():
+    global server_url
+    _, server_url = asyncio.get_event_loop().run_until_complete(serve())
+
+
+def _run(**kwargs):
+    return asyncio.get_event_loop().run_until_complete(
+        run_load(server_url, duration=0.2, warmup=0.05, **kwargs)
+    )
+
+
+def test_request_fixed_concurrency():
+    stats = _run(workload="request", clients=2, concurrency=4)
+    assert_greater(stats.count, 0)
+    assert_equal(stats.errors, 0)
+    assert_greater(stats.throughput, 0)
+
+
+def test_request_fixed_rate():
+    stats = _run(workload="request", rate=200)
+    assert_greater(stats.count, 10)
+    assert_true(stats.percentile(50) <= stats.percentile(99.9))
+
+
+def test_batch():
+    stats = _run(workload="batch", method="echo", params=[1], batch_size=5)
+    assert_greater(stats.count, 0)
+
+
+def test_notify():
+    stats = _run(workload="notify", method="echo")
+    assert_greater(stats.count, 0)
+
+
+def test_errors_are_counted():
+    stats = _run(workload="request", method="unknown")
+    assert_equal(stats.count, 0)
+    assert_greater(stats.errors, 0)
+
+
+@raises(ValueError)
+def test_unknown_workload():
+    _run(workload="foo")
+
+
+def test_echo_server_messages():
+    assert_equal(
+        json.loads(process_message(rockets.Request("echo", [1]).json))["result"], [1]
+    )
+    assert_equal(process_message(rockets.Notification("ping").json), None)
+    assert_equal(process_message(json.dumps([rockets.Notification("ping").data])), None)
+    assert_equal(json.loads(process_message("foo"))["error"]["code"], -32700)
+
+
+def test_stats():
+    stats = LatencyStats()
+    assert_equal(stats.percentile(50), 0)
+    assert_equal(stats.throughput, 0)
+    for latency in range(1, 101):
+        stats.add(latency / 1000)
+    stats.add_error()
+    stats.elapsed = 2.0
+    other = LatencyStats()
+    other.add(0.5)
+    stats.merge(other)
+    assert_equal(stats.count, 101)
+    assert_equal(stats.errors, 1)
+    assert_equal(stats.percentile(50), 0.051)
+    assert_equal(stats.as_dict()["p999_ms"], 500)
+    assert_in("ops/s", str(stats))
+    assert_equal(LatencyStats().as_dict()["mean_ms"], 0)
+
+
+def test_cli():
+    main(["--duration", "0.1", "--warmup", "0", "--json"])
+    main([server_url, "--duration", "0.1", "--warmup", "0", "--rate", "100"])
+    main(["--duration", "0.1", "--warmup", "0", "--loop", "auto"])
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
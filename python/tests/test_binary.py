@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy
+import websockets
+from nose.tools import assert_equal
+from nose.tools import assert_false
+from nose.tools import assert_true
+
+import rockets
+from rockets import binary
+
+VERTICES = numpy.arange(12, dtype="<f4").reshape(4, 3)
+INDICES = numpy.arange(6, dtype="<u2")
+
+
+def _response(request_id, result, frames):
+    return json.dumps(
+        {"id": request_id, "jsonrpc": "2.0", "binary": frames, "result": result}
+    )
+
+
+async def server_handle(websocket, path):
+    while True:
+        request = json.loads(await websocket.recv())
+        method = request["method"]
+        request_id = request["id"]
+        if method == "get-mesh":
+            result = {
+                "name": "mesh",
+                "vertices": {"$binary": 0, "dtype": "<f4", "shape": [4, 3]},
+                "indices": [{"$binary": 1, "dtype": "<u2"}],
+            }
+            await websocket.send(_response(request_id, result, 2))
+            await websocket.send(VERTICES.tobytes())
+            await websocket.send(INDICES.tobytes())
+        elif method == "get-bytes":
+            await websocket.send(_response(request_id, {"$binary": 0}, 1))
+            await websocket.send(b"\x01\x02")
+        elif method == "notify-mesh":
+            params = {"vertices": {"$binary": 0, "dtype": "<f4", "shape": [4, 3]}}
+            notification = {
+                "jsonrpc": "2.0",
+                "method": "mesh",
+                "binary": 1,
+                "params": params,
+            }
+            await websocket.send(json.dumps(notification))
+            await websocket.send(VERTICES.tobytes())
+            await websocket.send(_response(request_id, "done", 0))
+        elif method == "get-size-mismatch":
+            result = {"$binary": 0, "dtype": "<f4", "shape": [4, 3]}
+            await websocket.send(_response(request_id, result, 1))
+            await websocket.send(b"\x00" * 5)
+        elif method == "get-bad-dtype":
+            await websocket.send(_response(request_id, {"$binary": 0, "dtype": "x"}, 1))
+            await websocket.send(b"\x00")
+        elif method == "get-bad-index":
+            await websocket.send(_response(request_id, {"$binary": 3}, 1))
+            await websocket.send(b"\x00")
+        elif method == "get-interrupted":
+            await websocket.send(_response(request_id, {"$binary": 1}, 2))
+            await websocket.send(b"\x00")
+            await websocket.send("not JSON")
+        elif method == "ping":
+            await websocket.send(_response(request_id, "pong", 0))
+
+
+server_url = None
+
+
+def setup():
+    start_server = websockets.serve(server_handle, "localhost")
+    server = asyncio.get_event_loop().run_until_complete(start_server)
+    global server_url
+    server_url = "localhost:" + str(server.sockets[0].getsockname()[1])
+
+
+def _request(client, method):
+    return asyncio.get_event_loop().run_until_complete(client.request(method))
+
+
+def test_arrays():
+    client = rockets.AsyncClient(server_url)
+    result = _request(client, "get-mesh")
+    assert_equal(result["name"], "mesh")
+    vertices = result["vertices"]
+    assert_true(isinstance(vertices, numpy.ndarray))
+    assert_equal(vertices.shape, (4, 3))
+    assert_true(numpy.array_equal(vertices, VERTICES))
+    assert_true(numpy.array_equal(result["indices"][0], INDICES))
+
+    # a view of the received frame, not a copy
+    assert_false(vertices.flags.writeable)
+    assert_false(vertices.flags.owndata)
+
+
+def test_default_dtype():
+    client = rockets.AsyncClient(server_url)
+    assert_equal(list(_request(client, "get-bytes")), [1, 2])
+
+
+def test_notification():
+    client = rockets.AsyncClient(server_url)
+    received = []
+    client.notifications.subscribe(received.append)
+    assert_equal(_request(client, "notify-mesh"), "done")
+    assert_equal(len(received), 1)
+    assert_equal(received[0].method, "mesh")
+    assert_true(numpy.array_equal(received[0].params["vertices"], VERTICES))
+
+
+def test_notification_is_not_spooled():
+    directory = tempfile.mkdtemp()
+    spool = rockets.NotificationSpool(os.path.join(directory, "spool"), capacity=1024)
+    client = rockets.AsyncClient(server_url, spool=spool)
+    received = []
+    client.notifications.subscribe(received.append)
+    assert_equal(_request(client, "notify-mesh"), "done")
+    assert_equal(len(received), 1)
+    # a record holds one frame, not a message with binary frames
+    assert_equal(spool.count(), 0)
+    spool.close()
+    shutil.rmtree(directory)
+
+
+def test_without_numpy():
+    saved = sys.modules.get("numpy")
+    sys.modules["numpy"] = None
+    try:
+        client = rockets.AsyncClient(server_url)
+        result = _request(client, "get-mesh")
+        assert_equal(result["vertices"], VERTICES.tobytes())
+        assert_equal(result["indices"][0], INDICES.tobytes())
+    finally:
+        sys.modules["numpy"] = saved
+
+
+def test_invalid_frames():
+    client = rockets.AsyncClient(server_url)
+    for method in (
+        "get-size-mismatch",
+        "get-bad-dtype",
+        "get-bad-index",
+        "get-interrupted",
+    ):
+        try:
+            _request(client, method)
+            assert False, "request should have failed"
+        except rockets.RequestError as error:
+            assert_equal(error.code, -31001)
+
+    # the connection is still usable
+    assert_equal(_request(client, "ping"), "pong")
+
+
+def test_expected_frames():
+    assert_equal(binary.expected_frames({"binary": 2}), 2)
+    assert_equal(binary.expected_frames({"binary": "2"}), 0)
+    assert_equal(binary.expected_frames([{"binary": 2}]), 0)
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
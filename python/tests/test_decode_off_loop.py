@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+import websockets
+from nose.tools import assert_equal
+
+import rockets
+
+RESULT = list(range(1000))
+
+
+async def server_handle(websocket, path):
+    while True:
+        request = json.loads(await websocket.recv())
+        method = request["method"]
+        response = {"id": request["id"], "jsonrpc": "2.0", "result": RESULT}
+        if method == "get-large":
+            # the small notification must not overtake the large one
+            for index in range(3):
+                await websocket.send(
+                    json.dumps(
+                        {"jsonrpc": "2.0", "method": "large", "params": [index, RESULT]}
+                    )
+                )
+                await websocket.send(
+                    json.dumps({"jsonrpc": "2.0", "method": "small", "params": [index]})
+                )
+            await websocket.send("x" * 10000)
+            await websocket.send(json.dumps(response))
+        elif method == "get-binary":
+            response["binary"] = 1
+            response["result"] = {"values": RESULT, "data": {"$binary": 0}}
+            await websocket.send(json.dumps(response))
+            await websocket.send(b"\x01")
+
+
+server_url = None
+
+
+def setup():
+    start_server = websockets.serve(server_handle, "localhost")
+    server = asyncio.get_event_loop().run_until_complete(start_server)
+    global server_url
+    server_url = "localhost:" + str(server.sockets[0].getsockname()[1])
+
+
+def _check_large(client):
+    received = []
+    client.notifications.subscribe(
+        lambda notification: received.append(
+            (notification.method, notification.params[0])
+        )
+    )
+    result = asyncio.get_event_loop().run_until_complete(client.request("get-large"))
+    assert_equal(result, RESULT)
+    assert_equal(
+        received,
+        [
+            ("large", 0),
+            ("small", 0),
+            ("large", 1),
+            ("small", 1),
+            ("large", 2),
+            ("small", 2),
+        ],
+    )
+
+
+def test_default_executor():
+    _check_large(rockets.AsyncClient(server_url, decode_threshold=100))
+
+
+def test_thread_pool():
+    with ThreadPoolExecutor(1) as executor:
+        client = rockets.AsyncClient(
+            server_url, decode_threshold=100, decode_executor=executor
+        )
+        _check_large(client)
+
+
+def test_process_pool():
+    with ProcessPoolExecutor(1) as executor:
+        client = rockets.AsyncClient(
+            server_url, decode_threshold=100, decode_executor=executor
+        )
+        _check_large(client)
+
+
+def test_binary_frames():
+    client = rockets.AsyncClient(server_url, decode_threshold=100)
+    result = asyncio.get_event_loop().run_until_complete(client.request("get-binary"))
+    assert_equal(result["values"], RESULT)
+    assert_equal(bytes(result["data"]), b"\x01")
+
+
+def test_sync_client():
+    client = rockets.Client(server_url, decode_threshold=100)
+    assert_equal(client.request("get-large"), RESULT)
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import os
+import shutil
+import tempfile
+
+import msgpack
+import websockets
+from nose.tools import assert_equal
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets.encoding import msgpack_subprotocols
+from rockets.encoding import pack
+from rockets.server import Server
+
+server = None
+plain_server = None
+directory = None
+
+
+async def _slow(params, progress, token):
+    await progress("working", 0.5)
+    return "done"
+
+
+def setup():
+    global server, plain_server, directory
+    directory = tempfile.mkdtemp()
+    server = Server(msgpack=True)
+    server.bind("ping", lambda params: "pong")
+    server.bind("echo", lambda params: params)
+    server.bind_async("slow", _slow)
+    plain_server = Server()
+    plain_server.bind("ping", lambda params: "pong")
+    _run(server.start())
+    _run(server.start_http())
+    _run(plain_server.start())
+
+
+def teardown():
+    _run(server.close())
+    _run(plain_server.close())
+    shutil.rmtree(directory)
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _exchange(messages, compression="deflate"):
+    """Send the messages on a new MessagePack connection and return the first response."""
+
+    async def _send():
+        async with websockets.connect(
+            "ws://" + server.url,
+            subprotocols=["rockets+msgpack"],
+            compression=compression,
+        ) as websocket:
+            for message in messages:
+                await websocket.send(message)
+            return await websocket.recv()
+
+    return _run(_send())
+
+
+def test_msgpack_subprotocols():
+    assert_equal(
+        msgpack_subprotocols(["rockets", "other"]),
+        ["rockets+msgpack", "other+msgpack", "rockets", "other"],
+    )
+    assert_equal(server.subprotocols, ["rockets+msgpack", "rockets"])
+
+
+def test_request():
+    client = rockets.AsyncClient(server.url, encoding="msgpack")
+    assert_equal(client.encoding, "json")
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_equal(client.encoding, "msgpack")
+    values = {"values": [0.5, 1, -2, None, True, "é"]}
+    assert_equal(_run(client.request("echo", values)), values)
+    _run(client.disconnect())
+
+
+def test_fallback_to_json():
+    client = rockets.AsyncClient(plain_server.url, encoding="msgpack")
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_equal(client.encoding, "json")
+    _run(client.disconnect())
+
+
+def test_json_client():
+    client = rockets.AsyncClient(server.url)
+    assert_equal(_run(client.request("echo", [1])), [1])
+    assert_equal(client.encoding, "json")
+    _run(client.disconnect())
+
+
+def test_http_transport_uses_json():
+    client = rockets.AsyncClient(server.http_url, transport="http", encoding="msgpack")
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_equal(client.encoding, "json")
+    _run(client.disconnect())
+
+
+def test_sync_client():
+    client = rockets.Client(server.url, encoding="msgpack")
+    assert_equal(client.request("ping"), "pong")
+    assert_equal(client.encoding, "msgpack")
+    client.disconnect()
+
+
+def test_batch_and_notify():
+    client = rockets.AsyncClient(server.url, encoding="msgpack")
+    responses = _run(
+        client.batch([rockets.Request("ping"), rockets.Request("echo", [1])])
+    )
+    assert_equal([response.result for response in responses], ["pong", [1]])
+    _run(client.notify("echo", [2]))
+    assert_equal(_run(client.request("ping")), "pong")
+    _run(client.disconnect())
+
+
+class _Frames:
+    """Records the frames sent by a client."""
+
+    def __init__(self):
+        self.frames = []
+
+    def sent(self, data):
+        self.frames.append(data)
+
+    def received(self, data):
+        pass
+
+
+def test_messages_are_encoded_as_msgpack():
+    frames = _Frames()
+    client = rockets.AsyncClient(server.url, encoding="msgpack", recorder=frames)
+    envelope = rockets.MethodEnvelope("echo")
+    assert_equal(_run(client.request(envelope, [1])), [1])
+    assert_equal(_run(client.request("ping")), "pong")
+    _run(client.batch([rockets.Request("ping"), rockets.Notification("ping")]))
+    _run(client.notify("ping", None))
+    assert_equal(
+        [msgpack.unpackb(frame)["jsonrpc"] for frame in frames.frames[0:2]],
+        ["2.0", "2.0"],
+    )
+    assert_equal(len(msgpack.unpackb(frames.frames[2])), 2)
+    assert_equal(msgpack.unpackb(frames.frames[3])["method"], "ping")
+
+    async def _send_text():
+        messages = client.ws_observable()
+        await client.send(rockets.Request("ping").json)
+        return await messages.__anext__()
+
+    # text stays JSON, the server answers it as negotiated
+    assert_equal(msgpack.unpackb(_run(_send_text()))["result"], "pong")
+    assert_true(isinstance(frames.frames[4], str))
+    _run(client.disconnect())
+
+
+def test_method_envelope():
+    envelope = rockets.MethodEnvelope("echo")
+    request_id, frame = envelope.encode([1], "msgpack")
+    assert_equal(
+        msgpack.unpackb(frame),
+        {"jsonrpc": "2.0", "method": "echo", "id": request_id, "params": [1]},
+    )
+    request_id, frame = envelope.encode(encoding="msgpack")
+    assert_equal(
+        msgpack.unpackb(frame), {"jsonrpc": "2.0", "method": "echo", "id": request_id}
+    )
+
+
+def test_progress():
+    client = rockets.AsyncClient(server.url, encoding="msgpack")
+    progress = []
+
+    async def _request():
+        task = client.async_request("slow")
+        task.add_progress_callback(progress.append)
+        return await task
+
+    assert_equal(_run(_request()), "done")
+    assert_equal([(p.operation, p.amount) for p in progress], [("working", 0.5)])
+    _run(client.disconnect())
+
+
+def test_fragmented_request():
+    client = rockets.AsyncClient(server.url, encoding="msgpack")
+    result = _run(client.request_fragmented("echo", ["[1, ", "2]"]))
+    assert_equal(result, [1, 2])
+    _run(client.disconnect())
+
+
+def test_large_messages_are_fragmented():
+    client = rockets.AsyncClient(server.url, encoding="msgpack", fragment_size=16)
+    values = list(range(100))
+    assert_equal(_run(client.request("echo", values)), values)
+    _run(client.disconnect())
+
+
+def test_decode_off_loop():
+    client = rockets.AsyncClient(server.url, encoding="msgpack", decode_threshold=100)
+    values = list(range(1000))
+    assert_equal(_run(client.request("echo", values)), values)
+    _run(client.disconnect())
+
+
+def test_broadcast():
+    clients = [
+        rockets.AsyncClient(server.url, encoding="msgpack"),
+        rockets.AsyncClient(server.url, encoding="msgpack"),
+        rockets.AsyncClient(server.url),
+    ]
+
+    async def _receive():
+        streams = [client.notifications() for client in clients]
+        for client in clients:
+            await client.connect()
+        await server.broadcast("hello", [1])
+        received = [await stream.__anext__() for stream in streams]
+        for client in clients:
+            await client.disconnect()
+        return received
+
+    for notification in _run(_receive()):
+        assert_equal((notification.method, notification.params), ("hello", [1]))
+
+
+def test_broadcast_without_extensions():
+    async def _receive():
+        async with websockets.connect(
+            "ws://" + server.url, subprotocols=["rockets+msgpack"], compression=None
+        ) as websocket:
+            while not server.connections:
+                await asyncio.sleep(0.01)
+            await server.broadcast("hello", {"name": "é"})
+            return await websocket.recv()
+
+    assert_equal(
+        msgpack.unpackb(_run(_receive())),
+        {"jsonrpc": "2.0", "method": "hello", "params": {"name": "é"}},
+    )
+
+
+def test_spool():
+    path = os.path.join(directory, "spool")
+    with rockets.NotificationSpool(path, capacity=1024) as spool:
+        client = rockets.AsyncClient(server.url, encoding="msgpack", spool=spool)
+
+        async def _receive():
+            notifications = client.notifications()
+            await client.connect()
+            await server.broadcast("hello", [1])
+            await notifications.__anext__()
+            await client.disconnect()
+
+        _run(_receive())
+    with rockets.SpoolReader(path) as reader:
+        (record,) = list(reader.records())
+        assert_true(record.binary)
+        assert_equal(record.notification().params, [1])
+
+
+def test_binary_frames_are_msgpack():
+    response = _exchange([pack(rockets.Request("ping").data)])
+    assert_equal(msgpack.unpackb(response)["result"], "pong")
+
+
+def test_text_frames_are_json():
+    response = _exchange([rockets.Request("ping").json], compression=None)
+    assert_equal(msgpack.unpackb(response)["result"], "pong")
+
+
+def test_invalid_msgpack():
+    response = _exchange([b"\xc1"])
+    assert_equal(msgpack.unpackb(response)["error"]["code"], -32700)
+
+
+def test_invalid_msgpack_response_is_ignored():
+    client = rockets.AsyncClient(server.url, encoding="msgpack")
+
+    async def _receive():
+        messages = client.ws_observable()
+        await client.connect()
+        while len(server.connections) != 1:
+            await asyncio.sleep(0.01)
+        connection = next(iter(server.connections))
+        await connection.send(b"\xc1")
+        await messages.__anext__()
+        result = await client.request("ping")
+        await client.disconnect()
+        return result
+
+    assert_equal(_run(_receive()), "pong")
+
+
+@raises(ValueError)
+def test_unknown_encoding():
+    rockets.AsyncClient(server.url, encoding="cbor")
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
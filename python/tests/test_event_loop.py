@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import sys
+from threading import Thread
+from unittest import SkipTest
+
+from nose.tools import assert_equal
+from nose.tools import raises
+
+import rockets
+from rockets.bench import serve
+from rockets.event_loop import loop_type_of
+
+server_url = None
+
+
+def setup():
+    server_loop = asyncio.new_event_loop()
+    global server_url
+    _, server_url = server_loop.run_until_complete(serve(loop=server_loop))
+    # a thread of its own, so that clients may block the default loop
+    thread = Thread(target=server_loop.run_forever)
+    thread.daemon = True
+    thread.start()
+
+
+def _require_uvloop():
+    try:
+        import uvloop  # noqa: F401 pylint: disable=unused-import
+    except ImportError:
+        raise SkipTest("uvloop is not installed")
+
+
+def test_asyncio():
+    loop = rockets.new_event_loop()
+    assert_equal(loop_type_of(loop), "asyncio")
+    loop.close()
+
+
+def test_uvloop():
+    _require_uvloop()
+    for loop_type in ("uvloop", "auto"):
+        loop = rockets.new_event_loop(loop_type)
+        assert_equal(loop_type_of(loop), "uvloop")
+        loop.close()
+
+
+@raises(ValueError)
+def test_unknown_loop_type():
+    rockets.new_event_loop("foo")
+
+
+def test_missing_uvloop():
+    uvloop = sys.modules.get("uvloop")
+    sys.modules["uvloop"] = None
+    try:
+        assert_equal(loop_type_of(rockets.new_event_loop("auto")), "asyncio")
+        try:
+            rockets.new_event_loop("uvloop")
+            assert False, "uvloop is not installed"
+        except ImportError:
+            pass
+    finally:
+        del sys.modules["uvloop"]
+        if uvloop:
+            sys.modules["uvloop"] = uvloop
+
+
+def test_client_loop_type():
+    _require_uvloop()
+    client = rockets.Client(server_url, loop_type="uvloop")
+    assert_equal(loop_type_of(client._client.loop), "uvloop")
+    assert_equal(client.request("ping"), "pong")
+    client.disconnect()
+
+
+def test_threaded_client_loop_type():
+    _require_uvloop()
+
+    async def _sync_client_in_running_loop():
+        client = rockets.Client(server_url, loop_type="uvloop")
+        assert_equal(loop_type_of(client._client.loop), "uvloop")
+        return client.request("ping")
+
+    result = asyncio.get_event_loop().run_until_complete(_sync_client_in_running_loop())
+    assert_equal(result, "pong")
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
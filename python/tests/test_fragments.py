@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import json
+import os
+import tempfile
+
+import websockets
+from nose.tools import assert_equal
+from nose.tools import assert_false
+from nose.tools import assert_greater
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets.bench import read_recording
+from rockets.bench import Recorder
+from rockets.server import Server
+
+server = None
+echo_server = None
+echo_url = None
+
+
+async def _echo(websocket, path):
+    try:
+        async for message in websocket:
+            await websocket.send(message)
+    except websockets.ConnectionClosed:
+        pass
+
+
+def setup():
+    global server, echo_server, echo_url
+    server = Server()
+    server.bind("sum", lambda params: sum(params))
+    server.bind("ping", lambda params: "pong")
+    _run(server.start())
+    _run(server.start_http())
+    echo_server = _run(
+        websockets.serve(_echo, "localhost", 0, subprotocols=["rockets"], max_size=None)
+    )
+    echo_url = "localhost:{}".format(echo_server.sockets[0].getsockname()[1])
+
+
+def teardown():
+    _run(server.close())
+    echo_server.close()
+    _run(echo_server.wait_closed())
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Chunks:
+    """Async iterator over chunks, which sleeps before each one."""
+
+    def __init__(self, chunks, delay=0):
+        self.chunks = list(chunks)
+        self.delay = delay
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(self.delay)
+        if not self.chunks:
+            raise StopAsyncIteration
+        chunk = self.chunks.pop(0)
+        if isinstance(chunk, Exception):
+            raise chunk
+        return chunk
+
+
+def _count_frames(client):
+    """Count the frames written by the websocket of a connected client."""
+    frames = []
+    write_frame = client._ws.write_frame
+
+    def _write_frame(fin, opcode, data, **kwargs):
+        frames.append((fin, opcode, len(data)))
+        return write_frame(fin, opcode, data, **kwargs)
+
+    client._ws.write_frame = _write_frame
+    return frames
+
+
+def _received(client):
+    """The messages a client receives from the echo server."""
+    messages = []
+    client.ws_observable.add_listener(messages.append)
+    return messages
+
+
+def test_request_fragmented():
+    client = rockets.AsyncClient(server.url, fragment_size=1000)
+    _run(client.connect())
+    frames = _count_frames(client)
+    params = list(range(10000))
+    result = _run(
+        client.request_fragmented("sum", json.JSONEncoder().iterencode(params))
+    )
+    assert_equal(result, sum(params))
+    assert_greater(len(frames), 40)
+    assert_equal([fin for fin, _, _ in frames], [False] * (len(frames) - 1) + [True])
+    # small chunks are joined up to the fragment size
+    assert_true(all(size >= 1000 for _, _, size in frames[:-1]))
+    _run(client.disconnect())
+
+
+def test_request_fragmented_async_chunks():
+    client = rockets.AsyncClient(server.url, fragment_size=2)
+    assert_equal(_run(client.request_fragmented("sum", _Chunks(["[1, ", "2, 3]"]))), 6)
+    _run(client.disconnect())
+
+
+def test_send_fragments():
+    client = rockets.AsyncClient(echo_url, fragment_size=4)
+    messages = _received(client)
+
+    async def _send():
+        await client.send_fragments(["ab", "cd", "ef"])
+        await client.send_fragments(_Chunks([b"\x00\x01", b"\x02\x03\x04"]))
+        await client.send_fragments([])
+        await client.send("last")
+        await asyncio.sleep(0.1)
+
+    _run(_send())
+    assert_equal(messages, ["abcdef", b"\x00\x01\x02\x03\x04", "", "last"])
+    _run(client.disconnect())
+
+
+def test_messages_wait_for_fragmented_message():
+    client = rockets.AsyncClient(echo_url, fragment_size=1)
+    messages = _received(client)
+
+    async def _send():
+        await client.connect()
+        fragments = asyncio.ensure_future(
+            client.send_fragments(_Chunks(["a", "b", "c"], delay=0.02))
+        )
+        await asyncio.sleep(0.01)
+        await asyncio.gather(
+            client.send("single"), client.send_fragments(["d", "e"]), fragments
+        )
+        await asyncio.sleep(0.1)
+
+    _run(_send())
+    assert_equal(messages, ["abc", "single", "de"])
+    _run(client.disconnect())
+
+
+@raises(TypeError)
+def test_invalid_chunk():
+    client = rockets.AsyncClient(echo_url)
+    try:
+        _run(client.send_fragments([1]))
+    finally:
+        # nothing was sent, the connection is still usable
+        assert_true(client.connected())
+        _run(client.disconnect())
+
+
+def test_mixed_chunks_close_the_connection():
+    client = rockets.AsyncClient(echo_url, fragment_size=1)
+    try:
+        _run(client.send_fragments(["a", "b", b"c"]))
+        assert False
+    except TypeError:
+        pass
+    _run(asyncio.sleep(0.1))
+    assert_false(client.connected())
+
+
+def test_failing_chunks_close_the_connection():
+    client = rockets.AsyncClient(echo_url, fragment_size=1)
+    try:
+        _run(client.send_fragments(_Chunks(["a", "b", ValueError("failed")])))
+        assert False
+    except ValueError:
+        pass
+    _run(asyncio.sleep(0.1))
+    assert_false(client.connected())
+
+
+def test_cancel_request_fragmented():
+    client = rockets.AsyncClient(server.url, fragment_size=1)
+
+    async def _cancel():
+        task = asyncio.ensure_future(
+            client.request_fragmented("sum", _Chunks(["[1", ", 2", "]"], delay=0.1))
+        )
+        await asyncio.sleep(0.15)
+        task.cancel()
+        return await task
+
+    assert_equal(_run(_cancel()), None)
+
+
+def test_request_fragmented_http():
+    client = rockets.AsyncClient(server.http_url, transport="http")
+    assert_equal(
+        _run(client.request_fragmented("sum", _Chunks(["[1, ", "2", ", 3]"]))), 6
+    )
+    _run(client.send_fragments(['{"jsonrpc": "2.0", ', '"method": "ping"}']))
+    _run(client.disconnect())
+
+
+def test_recorded_as_one_message():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.rec")
+        recorder = Recorder(path)
+        client = rockets.AsyncClient(echo_url, fragment_size=1, recorder=recorder)
+        _run(client.send_fragments(["a", "b", "c"]))
+        _run(client.disconnect())
+        recorder.close()
+        assert_equal([frame.data for frame in read_recording(path)][:1], ["abc"])
+
+
+def test_sync_client():
+    client = rockets.Client(server.url, fragment_size=4)
+    assert_equal(client.request_fragmented("sum", ["[1, 2", ", 3]"]), 6)
+    client.send_fragments(['{"jsonrpc": "2.0", ', '"method": "ping"}'])
+    client.disconnect()
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
@@ -0,0 +1,462 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import json
+import socket
+import struct
+
+from nose.tools import assert_equal
+from nose.tools import assert_false
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets.http_transport import HTTP_ERROR_CODE
+from rockets.http_transport import HttpTransport
+from rockets.http_transport import set_http_protocol
+from rockets.server import Server
+
+server = None
+
+
+async def _sleep(params):
+    await asyncio.sleep(params[0])
+    return params[0]
+
+
+async def _slow(params, progress, token):
+    await progress("working", 0.5)
+    await asyncio.sleep(params["delay"])
+    return "done"
+
+
+def setup():
+    global server
+    server = Server()
+    server.bind("ping", lambda params: "pong")
+    server.bind("echo", lambda params: params)
+    server.bind("sleep", _sleep)
+    server.bind_async("slow", _slow)
+    asyncio.get_event_loop().run_until_complete(server.start_http(path="/jsonrpc"))
+
+
+def teardown():
+    asyncio.get_event_loop().run_until_complete(server.close())
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _raw_server(handler):
+    """Start a server which answers each connection with the handler, return its url."""
+    raw = _run(asyncio.start_server(handler, "localhost", 0))
+    return raw, "http://localhost:{}/".format(raw.sockets[0].getsockname()[1])
+
+
+async def _read_request(reader):
+    """Read one request of the HTTP transport, return its body."""
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    return await reader.readexactly(length)
+
+
+def _pong(body):
+    """The HTTP response answering the request in the body with 'pong'."""
+    response = json.dumps(
+        {"jsonrpc": "2.0", "id": json.loads(body)["id"], "result": "pong"}
+    )
+    return "HTTP/1.1 200 OK\r\nContent-Length: {}\r\n\r\n{}".format(
+        len(response), response
+    ).encode()
+
+
+async def _exchange(data):
+    """Send raw bytes to the HTTP endpoint, return everything it sent back."""
+    host, port = server.http_url[len("http://"):].split("/")[0].split(":")
+    reader, writer = await asyncio.open_connection(host, int(port))
+    writer.write(data)
+    writer.write_eof()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def _post(body, path="/jsonrpc", method="POST", extra=""):
+    return (
+        "{} {} HTTP/1.1\r\nContent-Length: {}\r\n{}\r\n".format(
+            method, path, len(body), extra
+        ).encode()
+        + body
+    )
+
+
+def test_set_http_protocol():
+    assert_equal(set_http_protocol("ws://host:1"), "http://host:1")
+    assert_equal(set_http_protocol("wss://host:1"), "https://host:1")
+    assert_equal(set_http_protocol("http://host:1"), "http://host:1")
+    assert_equal(set_http_protocol("https://host:1/rpc"), "https://host:1/rpc")
+    assert_equal(set_http_protocol("host:1"), "http://host:1")
+
+
+def test_default_ports():
+    assert_equal(HttpTransport("https://host/rpc?a=1", None)._port, 443)
+    assert_equal(HttpTransport("https://host/rpc?a=1", None)._path, "/rpc?a=1")
+    assert_equal(HttpTransport("http://host", None)._port, 80)
+    assert_equal(HttpTransport("http://host", None)._path, "/")
+
+
+@raises(ValueError)
+def test_unknown_transport():
+    rockets.AsyncClient(server.http_url, transport="carrier-pigeon")
+
+
+def test_request():
+    client = rockets.AsyncClient(server.http_url, transport="http")
+    assert_equal(client.url, server.http_url)
+    assert_false(client.connected())
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_equal(_run(client.request("echo", {"a": [1, 2]})), {"a": [1, 2]})
+    assert_true(client.connected())
+    _run(client.disconnect())
+    assert_false(client.connected())
+
+
+def test_connect():
+    client = rockets.AsyncClient(server.http_url, transport="http")
+    _run(client.connect())
+    assert_true(client.connected())
+    _run(client.connect())
+    assert_equal(len(client._http._connections), 1)
+    _run(client.disconnect())
+
+
+def test_sync_client():
+    client = rockets.Client(server.http_url, transport="http", http_connections=2)
+    assert_equal(client.url, server.http_url)
+    assert_equal(client.request("ping"), "pong")
+    responses = client.batch([rockets.Request("ping"), rockets.Request("echo", [1])])
+    assert_equal([response.result for response in responses], ["pong", [1]])
+    client.disconnect()
+
+
+def test_error():
+    client = rockets.AsyncClient(server.http_url, transport="http")
+    try:
+        _run(client.request("unknown"))
+        assert False
+    except rockets.RequestError as e:
+        assert_equal(e.code, -32601)
+    _run(client.disconnect())
+
+
+def test_batch():
+    client = rockets.AsyncClient(server.http_url, transport="http")
+    responses = _run(
+        client.batch([rockets.Request("sleep", [0.05]), rockets.Request("ping")])
+    )
+    assert_equal([response.result for response in responses], [0.05, "pong"])
+    _run(client.disconnect())
+
+
+def test_notify():
+    client = rockets.AsyncClient(server.http_url, transport="http")
+    _run(client.notify("ping", None))
+    _run(client.notify("unknown", None))
+    assert_equal(_run(client.request("ping")), "pong")
+    _run(client.disconnect())
+
+
+def test_progress_is_not_sent():
+    client = rockets.AsyncClient(server.http_url, transport="http")
+    assert_equal(_run(client.request("slow", {"delay": 0})), "done")
+    _run(client.disconnect())
+
+
+def test_concurrent_requests_share_the_pool():
+    client = rockets.AsyncClient(server.http_url, transport="http", http_connections=2)
+
+    async def _requests():
+        return await asyncio.gather(*[client.request("sleep", [0.1]) for _ in range(6)])
+
+    assert_equal(_run(client.request("ping")), "pong")
+    start = asyncio.get_event_loop().time()
+    assert_equal(_run(_requests()), [0.1] * 6)
+    # pipelined requests are processed concurrently by the server
+    assert_true(asyncio.get_event_loop().time() - start < 0.5)
+    assert_equal(len(client._http._connections), 2)
+    _run(client.disconnect())
+
+
+def test_concurrent_large_requests_on_one_connection():
+    client = rockets.AsyncClient(server.http_url, transport="http", http_connections=1)
+    text = "x" * (8 * 1024 * 1024)
+
+    async def _requests():
+        return await asyncio.gather(*[client.request("echo", [text]) for _ in range(4)])
+
+    # the pipelined requests wait for the same writer to drain
+    assert_equal(_run(_requests()), [[text]] * 4)
+    assert_equal(len(client._http._connections), 1)
+    _run(client.disconnect())
+
+
+def test_cancel():
+    client = rockets.AsyncClient(server.http_url, transport="http")
+
+    async def _cancel():
+        task = client.async_request("sleep", [10])
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.sleep(0.1)
+        return task
+
+    assert_equal(_run(_cancel()).result(), None)
+    # the cancel notification aborted the request on the server
+    assert_equal(sum(len(c.requests) for c in server._http_endpoint.connections), 0)
+    _run(client.disconnect())
+
+
+def test_cancel_pipelined_while_busy():
+    client = rockets.AsyncClient(server.http_url, transport="http", http_connections=2)
+
+    async def _cancel():
+        first = client.async_request("sleep", [0.3])
+        task = client.async_request("sleep", [10])
+        await asyncio.sleep(0.1)
+        # the pool is full, the cancel is sent on the connection of its request
+        task.cancel()
+        await asyncio.sleep(0.1)
+        return await first, task
+
+    result, task = _run(_cancel())
+    assert_equal(result, 0.3)
+    assert_equal(task.result(), None)
+    assert_equal(client._http._keys, dict())
+    assert_equal(sum(len(c.requests) for c in server._http_endpoint.connections), 0)
+    _run(client.disconnect())
+
+
+def test_same_ids_on_other_connections():
+    sleep = json.dumps({"jsonrpc": "2.0", "id": 0, "method": "sleep", "params": [0.2]})
+    cancel = json.dumps({"jsonrpc": "2.0", "method": "cancel", "params": {"id": 0}})
+
+    async def _requests():
+        answer = asyncio.ensure_future(_exchange(_post(sleep.encode())))
+        await asyncio.sleep(0.05)
+        # the request of the same id on another connection is not cancelled
+        await _exchange(_post(cancel.encode()))
+        return await answer
+
+    assert_true(b'"result": 0.2' in _run(_requests()))
+
+
+def test_http_status_error():
+    client = rockets.AsyncClient(
+        server.http_url.replace("/jsonrpc", "/other"), transport="http"
+    )
+    try:
+        _run(client.request("ping"))
+        assert False
+    except rockets.RequestError as e:
+        assert_equal(e.code, HTTP_ERROR_CODE)
+        assert_equal(e.data, 404)
+    _run(client.disconnect())
+
+
+def test_refused_connection():
+    sock = socket.socket()
+    sock.bind(("localhost", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    client = rockets.AsyncClient("http://localhost:{}".format(port), transport="http")
+    for coro in (
+        client.connect(),
+        client.request("ping"),
+        client.batch([rockets.Request("ping")]),
+    ):
+        try:
+            _run(coro)
+            assert False
+        except OSError:
+            pass
+    assert_false(client.connected())
+
+
+def test_stale_keep_alive_connection_is_retried():
+    connections = []
+
+    async def _handle(reader, writer):
+        connections.append(writer)
+        writer.write(_pong(await _read_request(reader)))
+        if len(connections) == 1:
+            # close the idle connection once the next request arrives
+            await _read_request(reader)
+        writer.close()
+
+    raw, url = _raw_server(_handle)
+    client = rockets.AsyncClient(url, transport="http")
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_equal(len(connections), 2)
+    _run(client.disconnect())
+    raw.close()
+
+
+def test_closed_before_first_response():
+    async def _handle(reader, writer):
+        await _read_request(reader)
+        writer.close()
+
+    raw, url = _raw_server(_handle)
+    client = rockets.AsyncClient(url, transport="http")
+    try:
+        _run(client.request("ping"))
+        assert False
+    except ConnectionError:
+        pass
+    raw.close()
+
+
+def test_invalid_response():
+    async def _handle(reader, writer):
+        await _read_request(reader)
+        writer.write(b"garbage\r\n\r\n")
+        await writer.drain()
+
+    raw, url = _raw_server(_handle)
+    client = rockets.AsyncClient(url, transport="http")
+    try:
+        _run(client.request("ping"))
+        assert False
+    except ConnectionError:
+        pass
+    _run(client.disconnect())
+    raw.close()
+
+
+def test_chunked_response_and_connection_close():
+    async def _handle(reader, writer):
+        body = _pong(await _read_request(reader)).split(b"\r\n\r\n")[1]
+        half = len(body) // 2
+        writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n")
+        writer.write(b"Connection: close\r\n\r\n")
+        for chunk in (body[:half], body[half:], b""):
+            writer.write("{:x};ext\r\n".format(len(chunk)).encode() + chunk + b"\r\n")
+        writer.write(b"\r\n")
+        await writer.drain()
+
+    raw, url = _raw_server(_handle)
+    client = rockets.AsyncClient(url, transport="http")
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_false(client.connected())
+    _run(client.disconnect())
+    raw.close()
+
+
+def test_disconnect_fails_requests_in_flight():
+    async def _handle(reader, writer):
+        await _read_request(reader)
+        await asyncio.sleep(10)
+
+    raw, url = _raw_server(_handle)
+    transport = HttpTransport(url, asyncio.get_event_loop(), max_connections=1)
+
+    async def _disconnect():
+        cancelled = asyncio.ensure_future(transport.post("{}"))
+        failed = asyncio.ensure_future(transport.post("{}"))
+        await asyncio.sleep(0.1)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        await transport.close()
+        try:
+            await failed
+            assert False
+        except ConnectionError:
+            pass
+
+    _run(_disconnect())
+    raw.close()
+
+
+def test_server_keep_alive():
+    ping = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "ping"}).encode()
+    notify = json.dumps({"jsonrpc": "2.0", "method": "ping"}).encode()
+    response = _run(
+        _exchange(
+            _post(ping) + _post(notify) + _post(ping, extra="Connection: close\r\n")
+        )
+    )
+    assert_equal(response.count(b"HTTP/1.1 200 OK"), 3)
+    assert_equal(response.count(b'"result": "pong"'), 2)
+    assert_true(
+        response.endswith(
+            b"Connection: close\r\n\r\n"
+            + ping.replace(b'"method": "ping"', b'"result": "pong"')
+        )
+    )
+
+
+def test_server_http_errors():
+    ping = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "ping"}).encode()
+    assert_true(_run(_exchange(_post(ping, path="/"))).startswith(b"HTTP/1.1 404"))
+    assert_true(_run(_exchange(_post(b"", method="GET"))).startswith(b"HTTP/1.1 405"))
+    assert_true(_run(_exchange(_post(b"\xff"))).startswith(b"HTTP/1.1 400"))
+    assert_true(_run(_exchange(b"nonsense\r\n")).startswith(b"HTTP/1.1 400"))
+    # the connection closed before the whole body arrived
+    assert_true(_run(_exchange(_post(b"{}")[:-1])).startswith(b"HTTP/1.1 400"))
+    assert_equal(_run(_exchange(b"\r\n")), b"")
+    # HTTP/1.0 closes the connection after the response
+    response = _run(_exchange(_post(ping).replace(b"HTTP/1.1", b"HTTP/1.0")))
+    assert_true(b"Connection: close" in response)
+
+
+def test_server_connection_reset():
+    sleep = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "sleep", "params": [0.1]})
+
+    async def _reset():
+        host, port = server.http_url[len("http://"):].split("/")[0].split(":")
+        sock = socket.create_connection((host, int(port)))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        sock.sendall(_post(sleep.encode()))
+        await asyncio.sleep(0.05)
+        sock.close()
+        await asyncio.sleep(0.1)
+
+    _run(_reset())
+    # the server still answers other clients
+    response = _run(_exchange(_post(b'{"jsonrpc": "2.0", "method": "ping"}')))
+    assert_true(response.startswith(b"HTTP/1.1 200 OK\r\nContent-Length: 0"))
+
+
+def test_server_invalid_json():
+    response = _run(_exchange(_post(b"[", extra="Connection: close\r\n")))
+    assert_true(b'"code": -32700' in response)
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import json
+import subprocess
+import sys
+from unittest import SkipTest
+
+from nose.tools import assert_equal
+from nose.tools import assert_false
+from nose.tools import assert_less
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+
+# seconds 'import rockets' may take without the interpreter startup; it takes a few milliseconds
+# with the lazy imports, the eager import of the clients takes over 100
+IMPORT_TIME_BUDGET = 0.1
+
+HEAVY_MODULES = ("rx", "websockets")
+if sys.version_info >= (3, 8):
+    # older interpreters have no importlib.metadata to read the version
+    HEAVY_MODULES += ("pkg_resources",)
+
+
+def _run_python(code):
+    if sys.version_info < (3, 7):
+        raise SkipTest("lazy loading requires Python 3.7")
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return json.loads(output.decode())
+
+
+def _loaded_modules(statement):
+    return _run_python(
+        "import json, sys\n"
+        "import rockets\n"
+        "{}\n"
+        "print(json.dumps(sorted(sys.modules)))".format(statement)
+    )
+
+
+def test_import_time_budget():
+    # the fastest of several runs, so that a loaded machine does not fail the test
+    import_time = min(
+        _run_python(
+            "import time\n"
+            "started = time.perf_counter()\n"
+            "import rockets\n"
+            "print(time.perf_counter() - started)"
+        )
+        for _ in range(5)
+    )
+    assert_less(import_time, IMPORT_TIME_BUDGET)
+
+
+def test_import_loads_no_submodules():
+    modules = _loaded_modules("")
+    for module in HEAVY_MODULES + ("jsonrpc",):
+        assert_false(module in modules, module)
+    assert_equal([module for module in modules if module.startswith("rockets.")], [])
+
+
+def test_lightweight_symbols_do_not_load_heavy_modules():
+    modules = _loaded_modules(
+        "rockets.Request('ping').json\n"
+        "rockets.Notification('ping').json\n"
+        "rockets.RequestError, rockets.RequestProgress, rockets.ResponseCache\n"
+        "rockets.__version__"
+    )
+    for module in HEAVY_MODULES:
+        assert_false(module in modules, module)
+
+
+def test_clients_load_on_access():
+    modules = _loaded_modules("rockets.AsyncClient")
+    assert_true("websockets" in modules)
+    # rx is only needed once a stream is subscribed to like an observable
+    assert_false("rx" in modules)
+
+
+def test_submodules_and_dir():
+    assert_true(rockets.request_error.RequestError is rockets.RequestError)
+    assert_true(set(rockets.__all__) <= set(dir(rockets)))
+
+
+@raises(AttributeError)
+def test_unknown_attribute():
+    getattr(rockets, "does_not_exist")
+
+
+@raises(ImportError)
+def test_broken_submodules_are_not_masked():
+    if sys.version_info < (3, 7):
+        raise SkipTest("lazy loading requires Python 3.7")
+    loaded = {
+        name: sys.modules.pop(name)
+        for name in list(sys.modules)
+        if name.startswith("rockets.bench")
+    }
+    bench = rockets.__dict__.pop("bench", None)
+    # a missing dependency of rockets.bench must not look like a missing attribute
+    sys.modules["rockets.bench.stats"] = None
+    try:
+        getattr(rockets, "bench")
+    finally:
+        del sys.modules["rockets.bench.stats"]
+        sys.modules.update(loaded)
+        if bench:
+            rockets.bench = bench
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import json
+from collections import Counter
+
+import websockets
+from nose.tools import assert_equal
+from nose.tools import assert_false
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets import MultiClient
+from rockets.server import Server
+
+
+def _server_handle(name):
+    async def _handle(websocket, path):
+        async for message in websocket:
+            request = json.loads(message)
+            if isinstance(request, list):
+                responses = [
+                    {"id": item["id"], "jsonrpc": "2.0", "result": name}
+                    for item in request
+                    if "id" in item
+                ]
+                if responses:
+                    await websocket.send(json.dumps(responses))
+                continue
+            method = request["method"]
+            if method == "close":
+                await websocket.close()
+                return
+            if method == "emit":
+                await websocket.send(
+                    json.dumps(
+                        {"jsonrpc": "2.0", "method": "emitted", "params": [name]}
+                    )
+                )
+            if method == "hang":
+                await asyncio.sleep(1)
+            if "id" in request:
+                await websocket.send(
+                    json.dumps({"id": request["id"], "jsonrpc": "2.0", "result": name})
+                )
+
+    return _handle
+
+
+servers = []
+server_urls = []
+UNREACHABLE = "localhost:1"
+# rejects the websocket handshake of the clients, which request the 'rockets' protocol
+rejecting_server = Server(subprotocol="other")
+
+
+def setup():
+    for name in ("a", "b", "c"):
+        start_server = websockets.serve(_server_handle(name), "localhost")
+        server = asyncio.get_event_loop().run_until_complete(start_server)
+        servers.append(server)
+        server_urls.append("localhost:" + str(server.sockets[0].getsockname()[1]))
+    _run(rejecting_server.start())
+
+
+def teardown():
+    _run(rejecting_server.close())
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def test_round_robin():
+    client = MultiClient(server_urls)
+    names = [_run(client.request("name")) for _ in range(6)]
+    assert_equal(names, ["a", "b", "c", "a", "b", "c"])
+    assert_true(client.connected())
+
+
+def test_routes():
+    client = MultiClient(server_urls, routes={"render": server_urls[1:]})
+    names = Counter(_run(client.request("render")) for _ in range(6))
+    assert_equal(names, Counter({"b": 3, "c": 3}))
+    assert_equal(client.route("render").url, "ws://" + server_urls[1])
+
+
+def test_shard_keys():
+    client = MultiClient(server_urls, shard_keys={"get-model": "id", "get-item": 0})
+    for model_id in range(20):
+        params = {"id": model_id}
+        name = _run(client.request("get-model", params))
+        assert_equal(_run(client.request("get-model", params)), name)
+        url = server_urls["abc".index(name)]
+        assert_equal(client.route("get-model", params).url, "ws://" + url)
+
+    # all servers get some keys
+    names = {client.route("get-model", {"id": i}).url for i in range(100)}
+    assert_equal(len(names), 3)
+    assert_equal(client.route("get-item", ["x"]), client.route("get-item", ["x"]))
+
+    # without the key the requests are distributed round-robin
+    names = {_run(client.request("get-model", {"other": 1})) for _ in range(3)}
+    assert_equal(names, {"a", "b", "c"})
+
+
+def test_consistent_hash():
+    client = MultiClient(server_urls, shard_keys={"get-model": "id"})
+    smaller = MultiClient(server_urls[:2], shard_keys={"get-model": "id"})
+    for model_id in range(100):
+        url = client.route("get-model", {"id": model_id}).url
+        if url != "ws://" + server_urls[2]:
+            # only the keys of the removed server move
+            assert_equal(smaller.route("get-model", {"id": model_id}).url, url)
+
+
+def test_unreachable_server_is_skipped():
+    client = MultiClient([UNREACHABLE] + server_urls[:1], retry_interval=60)
+    names = [_run(client.request("name")) for _ in range(4)]
+    assert_equal(names, ["a"] * 4)
+    assert_false(client.endpoints[0].healthy)
+    assert_true(client.endpoints[1].healthy)
+    # the unhealthy server is not even tried anymore
+    assert_equal(client.route("name").url, "ws://" + server_urls[0])
+
+
+def test_retry_interval():
+    client = MultiClient([UNREACHABLE] + server_urls[:1], retry_interval=0)
+    assert_equal([_run(client.request("name")) for _ in range(2)], ["a", "a"])
+    assert_false(client.endpoints[0].healthy)
+    # the next request tries the unhealthy server again
+    assert_equal(client.route("name").url, "ws://" + UNREACHABLE)
+
+
+def test_rejected_handshake_is_skipped():
+    client = MultiClient([rejecting_server.url] + server_urls[:1], retry_interval=60)
+    assert_equal([_run(client.request("name")) for _ in range(2)], ["a", "a"])
+    assert_false(client.endpoints[0].healthy)
+
+
+@raises(websockets.InvalidStatusCode)
+def test_all_rejected():
+    _run(MultiClient([rejecting_server.url]).request("name"))
+
+
+def test_method_routed_to_no_server():
+    client = MultiClient(server_urls, routes={"render": []})
+    for call in (client.request("render"), client.notify("render", None)):
+        try:
+            _run(call)
+            assert False, "request should have failed"
+        except rockets.RequestError as error:
+            assert_equal((error.code, error.data), (-32601, "render"))
+
+
+@raises(OSError)
+def test_all_unreachable():
+    client = MultiClient([UNREACHABLE])
+    _run(client.request("name"))
+
+
+@raises(OSError)
+def test_connect_all_unreachable():
+    _run(MultiClient([UNREACHABLE, "localhost:2"]).connect())
+
+
+def test_connect_some_unreachable():
+    client = MultiClient([UNREACHABLE] + server_urls)
+    _run(client.connect())
+    assert_false(client.endpoints[0].healthy)
+    assert_true(all(endpoint.client.connected() for endpoint in client.endpoints[1:]))
+    _run(client.disconnect())
+    assert_false(client.connected())
+
+
+def test_connection_closed_during_request():
+    client = MultiClient(server_urls[:1])
+    try:
+        _run(client.request("close"))
+        assert False, "request should have failed"
+    except rockets.RequestError as error:
+        assert_equal(error.code, -30100)
+    assert_false(client.endpoints[0].healthy)
+    # the server is tried again as there is no other one
+    assert_equal(_run(client.request("name")), "a")
+    assert_true(client.endpoints[0].healthy)
+
+
+def test_connection_closed_while_sending():
+    client = MultiClient(server_urls[:1])
+
+    async def _send(async_client):
+        raise websockets.ConnectionClosed(1006, "")
+
+    try:
+        _run(client._on_endpoint(client.endpoints, _send))
+        assert False, "call should have failed"
+    except rockets.RequestError as error:
+        assert_equal(error.code, -30100)
+    assert_false(client.endpoints[0].healthy)
+
+
+def test_notify():
+    client = MultiClient(server_urls[:1])
+    received = []
+    client.notifications.add_listener(received.append)
+    _run(client.notify("emit", None))
+    _run(client.request("name"))
+    assert_equal([notification.params for notification in received], [["a"]])
+
+
+def test_merged_notifications():
+    client = MultiClient(server_urls)
+
+    async def _receive():
+        iterator = client.notifications()
+        await client.connect()
+        for endpoint in client.endpoints:
+            await endpoint.client.request("emit")
+        names = []
+        for _ in client.endpoints:
+            names.append((await iterator.__anext__()).params[0])
+        messages = client.ws_observable()
+        await client.request("name")
+        await messages.__anext__()
+        return names
+
+    assert_equal(_run(_receive()), ["a", "b", "c"])
+
+
+def test_batch():
+    client = MultiClient(server_urls, routes={"render": server_urls[2:]})
+    requests = [
+        rockets.Request("name"),
+        rockets.Request("render"),
+        rockets.Request("name"),
+        rockets.Notification("name"),
+    ]
+    responses = _run(client.batch(requests))
+    assert_equal(
+        [response.data["id"] for response in responses],
+        [r.request_id() for r in requests[:3]],
+    )
+    assert_equal(responses[1].result, "c")
+
+    assert_equal(_run(client.batch([rockets.Notification("name")])), [])
+
+
+@raises(rockets.RequestError)
+def test_empty_batch():
+    _run(MultiClient(server_urls).batch([]))
+
+
+@raises(rockets.RequestError)
+def test_invalid_batch():
+    _run(MultiClient(server_urls).batch(["name"]))
+
+
+def test_async_request():
+    client = MultiClient(server_urls[:1])
+    assert_equal(_run(client.async_request("name")), "a")
+    responses = _run(client.async_batch([rockets.Request("name")]))
+    assert_equal(responses[0].result, "a")
+
+
+def test_cancel():
+    client = MultiClient(server_urls[:1])
+
+    async def _cancel():
+        task = client.async_request("hang")
+        await asyncio.sleep(0.1)
+        task.cancel()
+        return await task
+
+    assert_equal(_run(_cancel()), None)
+
+
+@raises(ValueError)
+def test_no_urls():
+    MultiClient([])
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
@@ -20,6 +20,7 @@
 # All rights reserved. Do not distribute without further notice.
 import asyncio
 import json
+import threading
 
 import websockets
 from nose.tools import assert_equal
@@ -103,6 +104,101 @@ def test_notifications():
     asyncio.get_event_loop().run_forever()
 
 
+def test_notification_iterator():
+    client = rockets.AsyncClient(server_url)
+
+    async def _do_it():
+        await client.connect()
+        notifications = client.notifications()
+        await client.notify("NotifyMe", None)
+        await client.notify("NotifyMe", None)
+        received = [await notifications.__anext__()]
+        await client.send("Rockets")
+        # the server closes the connection which ends the iteration
+        async for notification in notifications:
+            received.append(notification)
+        return received
+
+    received = asyncio.get_event_loop().run_until_complete(_do_it())
+    assert_equal([notification.method for notification in received], ["Hello"] * 2)
+
+
+def test_iterator_drops_oldest():
+    stream = rockets.message_stream.MessageStream(asyncio.get_event_loop())
+    iterator = stream(maxsize=2)
+    for message in range(3):
+        stream.publish(message)
+    stream.complete()
+
+    async def _consume():
+        messages = []
+        async for message in iterator:
+            messages.append(message)
+        return messages
+
+    assert_equal(asyncio.get_event_loop().run_until_complete(_consume()), [1, 2])
+    assert_equal(iterator.dropped, 1)
+
+
+@raises(AttributeError)
+def test_no_private_observable_attributes():
+    stream = rockets.message_stream.MessageStream(asyncio.get_event_loop())
+    stream._missing
+
+
+def test_listener():
+    stream = rockets.message_stream.MessageStream(asyncio.get_event_loop())
+    received = []
+    stream.add_listener(received.append)
+    stream.publish(1)
+    stream.complete()
+    stream.publish(2)
+    stream.remove_listener(received.append)
+    stream.publish(3)
+    assert_equal(received, [1, 2])
+
+
+def test_iterate_on_another_loop():
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever)
+    thread.start()
+    stream = rockets.message_stream.MessageStream(other_loop)
+    iterator = stream()
+
+    async def _consume():
+        for message in range(3):
+            other_loop.call_soon_threadsafe(stream.publish, message)
+        other_loop.call_soon_threadsafe(stream.complete)
+        messages = []
+        async for message in iterator:
+            messages.append(message)
+        return messages
+
+    try:
+        messages = asyncio.get_event_loop().run_until_complete(_consume())
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join()
+        other_loop.close()
+    assert_equal(messages, [0, 1, 2])
+
+
+def test_iterate_threaded_client():
+    async def _receive():
+        # the loop is running, so the client runs on a loop in a thread of its own
+        client = rockets.Client(server_url)
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, client.connect)
+        notifications = client.notifications()
+        await loop.run_in_executor(None, client.notify, "NotifyMe")
+        notification = await asyncio.wait_for(notifications.__anext__(), 5)
+        await loop.run_in_executor(None, client.disconnect)
+        return notification
+
+    notification = asyncio.get_event_loop().run_until_complete(_receive())
+    assert_equal(notification.method, "Hello")
+
+
 if __name__ == "__main__":
     import nose
 
@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+
+from nose.tools import assert_equal
+from nose.tools import assert_false
+from nose.tools import assert_in
+from nose.tools import assert_is
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets.params_validator import compile_schema
+from rockets.params_validator import SchemaError
+from rockets.server import Server
+
+CAMERA = {
+    "type": "object",
+    "properties": {
+        "position": {
+            "type": "array",
+            "items": {"type": "number"},
+            "minItems": 3,
+            "maxItems": 3,
+        },
+        "fovy": {"type": "number", "exclusiveMinimum": 0, "maximum": 180},
+    },
+    "required": ["position"],
+    "additionalProperties": False,
+}
+
+SCHEMAS = {
+    "set-camera": {"type": "method", "params": [dict(CAMERA, name="camera")]},
+    "set-zoom": {"type": "method", "params": [{"name": "zoom", "type": "number"}]},
+    "add": {
+        "type": "method",
+        "params": [
+            {"name": "a", "type": "integer"},
+            {"name": "b", "type": "integer", "default": 0},
+        ],
+    },
+    "reset": {"type": "method", "params": []},
+    "echo": {
+        "type": "method",
+        "params": {"type": "array", "items": {"type": "string"}},
+    },
+    "anything": {"type": "method"},
+}
+
+server = None
+calls = []
+
+
+def _record(params):
+    calls.append(params)
+    return params
+
+
+def setup():
+    global server
+    server = Server()
+    for method in SCHEMAS:
+        server.bind(method, _record)
+    _run(server.start())
+
+
+def teardown():
+    _run(server.close())
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _reason(schema, value):
+    """The reason why a value does not match a schema, None if it does."""
+    try:
+        compile_schema(schema)(value)
+    except SchemaError as error:
+        return str(error)
+    return None
+
+
+def _invalid(method, params):
+    try:
+        rockets.ParamsValidator(SCHEMAS).validate(method, params)
+    except rockets.RequestError as error:
+        assert_equal(error.code, -32602)
+        assert_equal(error.message, "Invalid params")
+        return error.data
+    assert False, "valid params"
+
+
+def test_types():
+    assert_equal(_reason({"type": "integer"}, 1.0), None)
+    assert_equal(_reason({"type": "integer"}, 1.5), "expected integer")
+    assert_equal(_reason({"type": "integer"}, True), "expected integer")
+    assert_equal(_reason({"type": "number"}, False), "expected number")
+    assert_equal(_reason({"type": ["string", "null"]}, None), None)
+    assert_equal(_reason({"type": ["string", "null"]}, 1), "expected string or null")
+    assert_equal(_reason({"type": "boolean"}, True), None)
+    assert_equal(_reason({"type": "array"}, (1,)), None)
+    assert_equal(_reason({"type": ["string", "custom"]}, 1), None)
+    assert_equal(_reason(True, 1), None)
+
+
+def test_enum_and_const():
+    assert_equal(_reason({"enum": ["a", 1]}, 1), None)
+    assert_equal(_reason({"enum": ["a", 1]}, True), 'expected one of ["a", 1]')
+    assert_equal(_reason({"const": "a"}, "b"), 'expected one of ["a"]')
+
+
+def test_bounds():
+    assert_equal(_reason({"minimum": 1}, 0), "expected >= 1")
+    assert_equal(_reason({"minimum": 1, "exclusiveMinimum": True}, 1), "expected > 1")
+    assert_equal(_reason({"exclusiveMinimum": 1}, 1), "expected > 1")
+    assert_equal(_reason({"maximum": 1}, 2), "expected <= 1")
+    assert_equal(_reason({"maximum": 1, "exclusiveMaximum": True}, 1), "expected < 1")
+    assert_equal(_reason({"exclusiveMaximum": 1}, 1.5), "expected < 1")
+    assert_equal(_reason({"maximum": 1}, "a"), None)
+    # booleans are no numbers in JSON schema
+    assert_equal(_reason({"minimum": 1}, False), None)
+    assert_equal(_reason({"maximum": 0}, True), None)
+
+
+def test_lengths_and_patterns():
+    assert_equal(_reason({"minLength": 2}, "a"), "expected at least 2 characters")
+    assert_equal(_reason({"maxItems": 1}, [1, 2]), "expected at most 1 items")
+    assert_equal(_reason({"minProperties": 1}, {}), "expected at least 1 properties")
+    assert_equal(_reason({"maxProperties": 1}, [1, 2]), None)
+    assert_equal(_reason({"pattern": "^[a-z]+$"}, "ab"), None)
+    assert_equal(
+        _reason({"pattern": "^[a-z]+$"}, "aB"), 'expected a match of "^[a-z]+$"'
+    )
+
+
+def test_items():
+    assert_equal(
+        _reason({"items": {"type": "number"}}, [1, "a"]), "[1]: expected number"
+    )
+    assert_equal(
+        _reason({"items": [{"type": "string"}, {"type": "number"}]}, ["a", "b"]),
+        "[1]: expected number",
+    )
+    assert_equal(_reason({"items": [{"type": "string"}]}, ["a", "b"]), None)
+    assert_equal(_reason({"items": {}}, [1]), None)
+    assert_equal(_reason({"items": {"type": "number"}}, {}), None)
+
+
+def test_items_of_other_schemas():
+    items = {"enum": ["x", "y"]}
+    assert_equal(_reason({"items": items}, ["x", "y"]), None)
+    assert_equal(_reason({"items": items}, ("x", "z")), '[1]: expected one of ["x", "y"]')
+    assert_equal(_reason({"items": items}, "z"), None)
+    assert_equal(
+        _reason({"items": {"items": {"type": "integer"}}}, [[1], [2, 2.5]]),
+        "[1][1]: expected integer",
+    )
+    # the items of a tuple schema only apply to arrays
+    assert_equal(_reason({"items": [{"type": "string"}]}, {"0": 1}), None)
+    assert_equal(_reason({"items": [{"type": "string"}]}, "a"), None)
+
+
+def test_objects():
+    assert_equal(_reason(CAMERA, {"position": [1, 2, 3], "fovy": 45}), None)
+    assert_equal(_reason(CAMERA, {"fovy": 45}), 'missing property "position"')
+    assert_equal(
+        _reason(CAMERA, {"position": [1, 2, "3"]}), '["position"][2]: expected number'
+    )
+    assert_equal(
+        _reason(CAMERA, {"position": [1, 2, 3], "fov": 1}), 'unexpected property "fov"'
+    )
+    assert_equal(_reason(CAMERA, [1]), "expected object")
+    schema = {"properties": {}, "additionalProperties": {"type": "string"}}
+    assert_equal(_reason(schema, {"a": "b"}), None)
+    assert_equal(_reason(schema, {"a": 1}), '["a"]: expected string')
+    assert_equal(_reason({"required": ["a"]}, 1), None)
+
+
+def test_combinations():
+    schema = {"allOf": [{"type": "number"}, {"minimum": 0}]}
+    assert_equal(_reason(schema, -1), "expected >= 0")
+    schema = {"anyOf": [{"type": "string"}, {"type": "number"}]}
+    assert_equal(_reason(schema, 1), None)
+    assert_equal(_reason(schema, None), "expected a match of any schema of anyOf")
+    schema = {"oneOf": [{"type": "number"}, {"type": "integer"}]}
+    assert_equal(_reason(schema, 1.5), None)
+    assert_equal(_reason(schema, 1), "expected a match of exactly one schema of oneOf")
+    assert_equal(_reason({"not": {"type": "string"}}, 1), None)
+    assert_equal(
+        _reason({"not": {"type": "string"}}, "a"),
+        "expected no match of the schema of not",
+    )
+
+
+def test_method_params():
+    validator = rockets.ParamsValidator(SCHEMAS)
+    validator.validate("set-camera", {"position": [1, 2, 3]})
+    validator.validate("set-zoom", [2.0])
+    validator.validate("set-zoom", 2.0)
+    validator.validate("add", [1])
+    validator.validate("add", {"a": 1, "b": 2})
+    validator.validate("reset", None)
+    validator.validate("echo", ["a", "b"])
+    validator.validate("anything", {"a": 1})
+    validator.validate("unknown", 1)
+
+    assert_equal(
+        _invalid("set-camera", {"position": [1, 2]}),
+        '["position"]: expected at least 3 items',
+    )
+    assert_equal(_invalid("set-camera", None), "expected 1 params")
+    assert_equal(_invalid("set-zoom", ["a"]), "expected number")
+    assert_equal(_invalid("set-zoom", [1, 2]), "expected number")
+    assert_equal(_invalid("add", [1, 2, 3]), "expected 1 to 2 params, got 3")
+    assert_equal(_invalid("add", [1.5]), "[0]: expected integer")
+    assert_equal(_invalid("add", {"b": 1}), 'missing param "a"')
+    assert_equal(_invalid("add", {"a": "1"}), '["a"]: expected integer')
+    assert_equal(_invalid("add", 1), "expected a list of params")
+    assert_equal(_invalid("reset", [1]), "expected 0 to 0 params, got 1")
+    assert_equal(_invalid("echo", [1]), "[0]: expected string")
+
+
+def test_unnamed_params():
+    validator = rockets.ParamsValidator(
+        {"a": {"params": [{"type": "number"}, {"type": "string"}]}}
+    )
+    validator.validate("a", {"x": "ignored"})
+    rockets.ParamsValidator({"b": {"params": [True]}}).validate("b", [1, 2])
+
+
+def test_add_and_remove():
+    validator = rockets.ParamsValidator()
+    assert_false("set-zoom" in validator)
+    validator.add("set-zoom", SCHEMAS["set-zoom"])
+    assert_true("set-zoom" in validator)
+    validator.remove("set-zoom")
+    validator.remove("set-zoom")
+    validator.validate("set-zoom", "a")
+
+
+def test_equal_schemas_are_compiled_once():
+    validator = rockets.ParamsValidator(SCHEMAS)
+    validator.add("set-fovy", {"params": [{"name": "zoom", "type": "number"}]})
+    assert_is(
+        validator._compile({"type": "number", "name": "zoom"}),
+        validator._compile(SCHEMAS["set-zoom"]["params"][0]),
+    )
+
+
+def test_client_rejects_before_sending():
+    client = rockets.AsyncClient(server.url, validator=rockets.ParamsValidator(SCHEMAS))
+    del calls[:]
+    assert_equal(_run(client.request("set-zoom", 2)), [2])
+    for call in (
+        client.request("set-zoom", "a"),
+        client.notify("add", ["a"]),
+        client.batch([rockets.Request("add", [1]), rockets.Request("reset", [1])]),
+    ):
+        try:
+            _run(call)
+            assert False
+        except rockets.RequestError as error:
+            assert_equal(error.code, -32602)
+    assert_equal(_run(client.batch([rockets.Request("add", [1])]))[0].result, [1])
+    assert_equal(calls, [[2], [1]])
+    _run(client.disconnect())
+
+
+def test_sync_client():
+    validator = rockets.ParamsValidator(SCHEMAS)
+    client = rockets.Client(server.url, validator=validator)
+    assert_is(client.validator, validator)
+    try:
+        client.request("add", ["a"])
+        assert False
+    except rockets.RequestError as error:
+        assert_in("expected integer", error.data)
+    client.disconnect()
+
+
+@raises(SchemaError)
+def test_schema_error_is_value_error():
+    try:
+        compile_schema({"type": "string"})(1)
+    except ValueError:
+        raise
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
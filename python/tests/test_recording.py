@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import os
+import tempfile
+
+import websockets
+from nose.tools import assert_equal
+from nose.tools import assert_greater
+from nose.tools import assert_in
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets.bench import read_recording
+from rockets.bench import Recorder
+from rockets.bench import replay
+from rockets.bench import ReplayStats
+from rockets.bench.__main__ import main
+from rockets.bench.recording import INCOMING
+from rockets.bench.recording import MAGIC
+from rockets.bench.recording import OUTGOING
+from rockets.server import Server
+
+server = None
+directory = None
+
+
+async def _sleep(params):
+    await asyncio.sleep(params[0])
+    return params[0]
+
+
+def setup():
+    global server, directory
+    directory = tempfile.TemporaryDirectory()
+    server = Server()
+    server.bind("ping", lambda params: "pong")
+    server.bind("sleep", _sleep)
+    _run(server.start())
+    _run(server.start_http())
+
+
+def teardown():
+    _run(server.close())
+    directory.cleanup()
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _path(name):
+    return os.path.join(directory.name, name)
+
+
+def _record(name, **kwargs):
+    """Record a session with requests, a batch and a notification."""
+    recorder = Recorder(_path(name))
+    client = rockets.AsyncClient(
+        kwargs.pop("url", server.url), recorder=recorder, **kwargs
+    )
+
+    async def _session():
+        await client.request("ping")
+        await asyncio.sleep(0.05)
+        await asyncio.gather(client.request("sleep", [0.02]), client.request("ping"))
+        await client.batch([rockets.Request("ping"), rockets.Request("ping")])
+        await client.notify("ping", None)
+        await client.disconnect()
+
+    _run(_session())
+    recorder.close()
+    return _path(name)
+
+
+def test_record():
+    frames = list(read_recording(_record("session.rec")))
+    directions = [frame.direction for frame in frames]
+    assert_equal(directions.count(OUTGOING), 5)
+    assert_equal(directions.count(INCOMING), 4)
+    assert_equal(directions[:2], [OUTGOING, INCOMING])
+    assert_in('"method": "ping"', frames[0].data)
+    assert_in('"result": "pong"', frames[1].data)
+    timestamps = [frame.timestamp for frame in frames]
+    assert_equal(timestamps, sorted(timestamps))
+    assert_greater(timestamps[2] - timestamps[1], 0.04)
+
+
+def test_record_http():
+    path = _record("http.rec", url=server.http_url, transport="http")
+    directions = [frame.direction for frame in read_recording(path)]
+    # the notification has no response
+    assert_equal(directions.count(OUTGOING), 5)
+    assert_equal(directions.count(INCOMING), 4)
+
+
+def test_append_and_binary_frames():
+    path = _path("append.rec")
+    for data in ("text", b"\x00\x01"):
+        recorder = Recorder(path)
+        recorder.received(data)
+        recorder.flush()
+        recorder.close()
+    with open(path, "rb") as file:
+        assert_equal(file.read().count(MAGIC), 1)
+    frames = list(read_recording(path))
+    assert_equal([frame.data for frame in frames], ["text", b"\x00\x01"])
+    assert_equal([frame.direction for frame in frames], [INCOMING, INCOMING])
+
+
+def test_interrupted_recording():
+    path = _path("interrupted.rec")
+    recorder = Recorder(path)
+    recorder.sent("first")
+    recorder.sent("second")
+    recorder.close()
+    size = os.path.getsize(path)
+    for cut in (2, 10):
+        os.truncate(path, size - cut)
+        assert_equal([frame.data for frame in read_recording(path)], ["first"])
+        size -= cut
+
+
+@raises(ValueError)
+def test_not_a_recording():
+    path = _path("other.rec")
+    with open(path, "wb") as file:
+        file.write(b"something else")
+    list(read_recording(path))
+
+
+def test_replay():
+    path = _record("replay.rec")
+    stats = _run(replay(server.url, path, clients=3))
+    assert_equal(stats.recorded.count, 5)
+    assert_equal(stats.replayed.count, 15)
+    assert_equal(stats.replayed.errors, 0)
+    assert_equal(stats.deviation.count, 15)
+    assert_equal(stats.send_lag.count, 15)
+    # the recorded pause is kept at 1x
+    assert_greater(stats.replayed.elapsed, 0.05)
+    assert_true(stats.deviation.percentile(50) < 0.05)
+
+
+def test_replay_speed():
+    path = _record("speed.rec")
+    stats = _run(replay(server.url.split("//")[-1], path, speed=None))
+    assert_equal(stats.replayed.count, 5)
+    assert_equal(stats.send_lag.count, 0)
+    stats = _run(replay(server.url, path, speed=100))
+    assert_equal(stats.replayed.count, 5)
+
+
+def test_replay_unanswered():
+    path = _path("unanswered.rec")
+    recorder = Recorder(path)
+    recorder.sent('{"jsonrpc": "2.0", "id": 1, "method": "sleep", "params": [10]}')
+    recorder.sent('{"jsonrpc": "2.0", "id": 2, "method": "ping"}')
+    recorder.sent(b"\x00")
+    recorder.received('[{"jsonrpc": "2.0", "id": 2, "result": "pong"}]')
+    recorder.close()
+    stats = _run(replay(server.url, path, timeout=0.1))
+    assert_equal(stats.replayed.count, 1)
+    assert_equal(stats.replayed.errors, 1)
+    assert_equal(stats.deviation.count, 1)
+
+
+def test_replay_connection_closed():
+    async def _close(websocket, path):
+        await websocket.recv()
+
+    closing = _run(websockets.serve(_close, "localhost", 0))
+    url = "ws://localhost:{}".format(closing.sockets[0].getsockname()[1])
+    path = _record("closed.rec")
+    stats = _run(replay(url, path, speed=None, subprotocols=None, timeout=5))
+    assert_equal(stats.replayed.errors, 5)
+    closing.close()
+    _run(closing.wait_closed())
+
+
+def test_empty_recording():
+    path = _path("empty.rec")
+    Recorder(path).close()
+    stats = _run(replay(server.url, path))
+    assert_equal(stats.replayed.count, 0)
+    assert_equal(stats.recorded.elapsed, 0.0)
+
+
+def test_replay_stats():
+    stats = ReplayStats()
+    stats.deviation.add(-0.001)
+    stats.deviation.add(0.002)
+    assert_equal(
+        sorted(stats.as_dict()), ["deviation", "recorded", "replayed", "send_lag"]
+    )
+    assert_equal(stats.as_dict()["deviation"]["p50_ms"], -1.0)
+    assert_in("deviation [ms]: mean 0.500  p50 -1.000", str(stats))
+    assert_in("max 2.000", str(stats))
+
+
+def test_cli():
+    path = _record("cli.rec")
+    main(["--replay", path, "--speed", "0", "--clients", "2"])
+    main([server.url, "--replay", path, "--json"])
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
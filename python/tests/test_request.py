@@ -25,6 +25,7 @@ import websockets
 from jsonrpcserver.aio import methods
 from jsonrpcserver.response import RequestResponse
 from nose.tools import assert_equal
+from nose.tools import assert_false
 from nose.tools import assert_true
 from nose.tools import raises
 
@@ -61,6 +62,8 @@ async def server_handle(websocket, path):
     elif method == "test_cancel":
         await websocket.recv()
         response = RequestResponse(json_request["id"], "CANCELLED")
+    elif method == "test_close":
+        return
     else:
         response = await methods.dispatch(request)
     if not response.is_notification:
@@ -114,6 +117,34 @@ def test_error_on_connection_lost():
     client.request("ping")
 
 
+@raises(rockets.request_error.RequestError)
+def test_pending_request_fails_on_connection_lost():
+    client = rockets.Client(server_url)
+    client.request("test_close")
+
+
+def test_reconnect_after_connection_lost():
+    client = rockets.AsyncClient(server_url)
+    loop = asyncio.get_event_loop()
+    try:
+        loop.run_until_complete(client.request("test_close"))
+    except rockets.RequestError:
+        pass
+
+    # neither requests nor subscriptions reconnect implicitly
+    client.notifications.subscribe(lambda notification: None)
+    loop.run_until_complete(asyncio.sleep(0))
+    assert_false(client.connected())
+
+    loop.run_until_complete(client.connect())
+    assert_equal(loop.run_until_complete(client.request("ping")), "pong")
+
+
+def test_response_from_json():
+    response = rockets.Response.from_json('{"jsonrpc": "2.0", "id": 1, "result": 42}')
+    assert_equal(response.result, 42)
+
+
 def test_subsequent_request():
     start_test_server = websockets.serve(server_handle_two_requests, "localhost")
     test_server = asyncio.get_event_loop().run_until_complete(start_test_server)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import json
+import time
+
+import numpy
+import websockets
+from jsonrpcserver.aio import methods
+from nose.tools import assert_equal
+from nose.tools import assert_false
+from nose.tools import assert_true
+
+import rockets
+
+calls = {"get-camera": 0}
+
+
+@methods.add
+async def get_camera(**params):
+    calls["get-camera"] += 1
+    return {"calls": calls["get-camera"], "params": params}
+
+
+async def server_handle(websocket, path):
+    while True:
+        request = json.loads(await websocket.recv())
+        if request["method"] == "get-camera":
+            request["method"] = "get_camera"
+            response = await methods.dispatch(json.dumps(request))
+            await websocket.send(str(response))
+        elif request["method"] == "set-camera":
+            await websocket.send(rockets.Notification("set-camera").json)
+            await websocket.send(
+                json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": True})
+            )
+
+
+server_url = None
+
+
+def setup():
+    start_server = websockets.serve(server_handle, "localhost")
+    server = asyncio.get_event_loop().run_until_complete(start_server)
+    global server_url
+    server_url = "localhost:" + str(server.sockets[0].getsockname()[1])
+
+
+def test_hit_and_miss():
+    cache = rockets.ResponseCache(["get-camera"])
+    client = rockets.Client(server_url, cache=cache)
+    first = client.request("get-camera", {"index": 0})
+    assert_equal(client.request("get-camera", {"index": 0}), first)
+    assert_equal(cache.hits, 1)
+    assert_equal(cache.misses, 1)
+    assert_equal(len(cache), 1)
+
+
+def test_invalidated_on_reconnect():
+    cache = rockets.ResponseCache(["get-camera"])
+    client = rockets.Client(server_url, cache=cache)
+    client.request("get-camera", {"index": 4})
+    client.disconnect()
+    client.connect()
+    client.request("get-camera", {"index": 4})
+    assert_equal(cache.misses, 2)
+    assert_equal(cache.invalidations, 1)
+
+
+def test_invalidated_by_notification():
+    cache = rockets.ResponseCache(
+        ["get-camera"], invalidated_by={"set-camera": ["get-camera"]}
+    )
+    client = rockets.Client(server_url, cache=cache)
+    first = client.request("get-camera")
+    assert_true(client.request("set-camera"))
+    assert_equal(len(cache), 0)
+    assert_equal(cache.invalidations, 1)
+    assert_true(client.request("get-camera")["calls"] > first["calls"])
+
+
+def test_results_are_copies():
+    cache = rockets.ResponseCache(["get-camera"])
+    cache.put("get-camera", None, {"position": [0, 0, 0]})
+    found, result = cache.get("get-camera")
+    assert_true(found)
+    result["position"].append(1)
+    assert_equal(cache.get("get-camera")[1], {"position": [0, 0, 0]})
+
+
+def test_lru_eviction():
+    cache = rockets.ResponseCache(["get"], max_entries=2)
+    cache.put("get", [1], 1)
+    cache.put("get", [2], 2)
+    cache.get("get", [1])
+    cache.put("get", [3], 3)
+    assert_true(cache.get("get", [1])[0])
+    assert_false(cache.get("get", [2])[0])
+    assert_equal(cache.evictions, 1)
+
+
+def test_byte_budget():
+    cache = rockets.ResponseCache(["get"], max_bytes=10)
+    cache.put("get", [1], "12345")
+    cache.put("get", [1], "1234")
+    assert_equal(cache.size_bytes, 6)
+    cache.put("get", [2], "12345")
+    assert_equal(len(cache), 1)
+    assert_equal(cache.size_bytes, 7)
+
+
+def test_binary_results_are_not_cached():
+    cache = rockets.ResponseCache(["get"])
+    cache.put("get", [1], 1)
+    cache.put("get", [1], b"\x00\x01")
+    cache.put("get", [2], numpy.arange(3))
+    assert_equal(len(cache), 0)
+    assert_equal(cache.size_bytes, 0)
+    assert_false(cache.get("get", [1])[0])
+
+
+def test_ttl():
+    cache = rockets.ResponseCache(["get"], ttl=0.01)
+    cache.put("get", None, 1)
+    assert_true(cache.get("get")[0])
+    time.sleep(0.02)
+    assert_false(cache.get("get")[0])
+    assert_equal(cache.evictions, 1)
+
+
+def test_stale_result_is_dropped():
+    cache = rockets.ResponseCache(["get"])
+    generation = cache.generation
+    cache.invalidate()
+    cache.put("get", None, 1, generation)
+    assert_equal(len(cache), 0)
+
+
+def test_invalidate_all():
+    cache = rockets.ResponseCache(["get", "list"], invalidated_by={"reset": None})
+    cache.put("get", None, 1)
+    cache.put("list", None, 2)
+    cache.on_notification(rockets.Notification("other"))
+    assert_equal(len(cache), 2)
+    cache.on_notification(rockets.Notification("reset"))
+    assert_equal(len(cache), 0)
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import time
+
+from nose.tools import assert_equal
+from nose.tools import assert_greater
+from nose.tools import assert_less
+from nose.tools import assert_true
+
+import rockets
+from rockets.server import Scheduler
+from rockets.server import Server
+
+server = None
+scheduler = None
+
+
+def _work(params):
+    # CPU-bound, blocks the event loop like a real handler
+    time.sleep(params[0])
+    return params[0]
+
+
+async def _slow(params, progress, token):
+    await asyncio.sleep(params[0])
+    return params[0]
+
+
+def setup():
+    global server, scheduler
+    scheduler = Scheduler(max_concurrency=2, method_concurrency={"slow": 1})
+    server = Server(scheduler=scheduler)
+    server.bind("ping", lambda params: "pong")
+    server.bind(
+        "started",
+        lambda params: sum(
+            metrics["started"] for metrics in scheduler.metrics().values()
+        ),
+    )
+    server.bind("work", _work)
+    server.bind_async("slow", _slow)
+    _run(server.start())
+    _run(server.start_http())
+
+
+def teardown():
+    _run(server.close())
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _settle():
+    for _ in range(3):
+        _run(asyncio.sleep(0))
+
+
+def _queue(scheduler, order, client, method="ping"):
+    """Wait for the turn of a request and record it."""
+
+    async def _acquire():
+        await scheduler.acquire(client, method)
+        order.append(client)
+
+    return asyncio.ensure_future(_acquire())
+
+
+def _drain(scheduler, order, method="ping"):
+    """Release the requests one at a time until all ran."""
+    released = 0
+    while released < len(order):
+        scheduler.release(order[released], method)
+        released += 1
+        _settle()
+
+
+def test_round_robin():
+    scheduler = Scheduler(max_concurrency=1)
+    order = []
+    for _ in range(5):
+        _queue(scheduler, order, "heavy")
+    _settle()
+    for _ in range(2):
+        _queue(scheduler, order, "light")
+    _settle()
+    assert_equal(order, ["heavy"])
+    _drain(scheduler, order)
+    assert_equal(order, ["heavy", "heavy", "light", "heavy", "light", "heavy", "heavy"])
+    metrics = scheduler.metrics()
+    assert_equal(metrics["heavy"]["started"], 5)
+    assert_equal(metrics["light"]["started"], 2)
+    assert_equal(metrics["light"]["waiting"], 0)
+    assert_equal(metrics["light"]["running"], 0)
+    assert_greater(metrics["light"]["max_wait_ms"], 0)
+    assert_greater(metrics["light"]["mean_wait_ms"], 0)
+
+
+def test_weights():
+    weights = {"heavy": 0.5, "light": 2}
+    scheduler = Scheduler(max_concurrency=1, weight=weights.get)
+    order = []
+    _queue(scheduler, order, "light")
+    _settle()
+    for _ in range(3):
+        _queue(scheduler, order, "heavy")
+    for _ in range(4):
+        _queue(scheduler, order, "light")
+    _settle()
+    _drain(scheduler, order)
+    # heavy needs two rounds for a turn, light gets two turns per round
+    assert_equal(
+        order,
+        ["light", "light", "light", "heavy", "light", "light", "heavy", "heavy"],
+    )
+
+
+def test_weight_must_be_positive():
+    scheduler = Scheduler(weight=lambda connection: 0)
+    try:
+        _run(scheduler.acquire("client", "ping"))
+        assert False
+    except ValueError:
+        pass
+    assert_equal(scheduler.metrics(), {})
+
+
+def test_method_concurrency():
+    scheduler = Scheduler(max_concurrency=4, method_concurrency={"render": 1})
+    order = []
+    _queue(scheduler, order, "a", "render")
+    _queue(scheduler, order, "b", "render")
+    _queue(scheduler, order, "c", "ping")
+    _settle()
+    # the render of b waits, the other methods of the clients do not
+    assert_equal(order, ["a", "c"])
+    assert_equal(scheduler.metrics()["b"]["waiting"], 1)
+    scheduler.release("a", "render")
+    _settle()
+    assert_equal(order, ["a", "c", "b"])
+
+
+def test_cancel_waiting_request():
+    scheduler = Scheduler(max_concurrency=1)
+    order = []
+    _queue(scheduler, order, "a")
+    waiting = _queue(scheduler, order, "b")
+    _queue(scheduler, order, "b")
+    _settle()
+    waiting.cancel()
+    _settle()
+    assert_equal(scheduler.metrics()["b"]["waiting"], 1)
+
+    # cancelled before the scheduler saw it
+    other = _queue(scheduler, order, "c")
+    _settle()
+    other.cancel()
+    _drain(scheduler, order)
+    assert_equal(order, ["a", "b"])
+    assert_equal(scheduler.metrics()["c"]["waiting"], 0)
+
+
+def test_cancel_before_turn():
+    scheduler = Scheduler(max_concurrency=1)
+    order = []
+    _queue(scheduler, order, "a")
+    cancelled = _queue(scheduler, order, "b")
+    _queue(scheduler, order, "c")
+    _settle()
+    cancelled.cancel()
+    scheduler.release("a", "ping")
+    _settle()
+    assert_equal(order, ["a", "c"])
+    assert_equal(scheduler.metrics()["b"]["waiting"], 0)
+
+
+def test_cancel_after_turn():
+    scheduler = Scheduler(max_concurrency=1)
+    order = []
+    _queue(scheduler, order, "a")
+    cancelled = _queue(scheduler, order, "b")
+    _queue(scheduler, order, "c")
+    _settle()
+    scheduler.release("a", "ping")
+    cancelled.cancel()
+    _settle()
+    # the turn of b is passed on to c
+    assert_equal(order, ["a", "c"])
+
+
+def test_remove():
+    scheduler = Scheduler(max_concurrency=1)
+    order = []
+    _queue(scheduler, order, "a")
+    waiting = [_queue(scheduler, order, "b") for _ in range(2)]
+    _settle()
+    scheduler.remove("b")
+    scheduler.remove("b")
+    _settle()
+    assert_true(all(task.cancelled() for task in waiting))
+    scheduler.release("a", "ping")
+    scheduler.remove("a")
+    assert_equal(scheduler.metrics(), {})
+
+
+def test_light_client_not_delayed_by_batch():
+    heavy = rockets.AsyncClient(server.url)
+    light = rockets.AsyncClient(server.url)
+
+    async def _requests():
+        await light.connect()
+        batch = asyncio.ensure_future(
+            heavy.batch([rockets.Request("work", [0.01]) for _ in range(50)])
+        )
+        while not scheduler.metrics():
+            await asyncio.sleep(0.01)
+        started = await light.request("started")
+        await batch
+        return started
+
+    # the request of the light client does not wait for the whole batch
+    assert_less(_run(_requests()), 25)
+    metrics = [
+        scheduler.metrics()[connection] for connection in list(server.connections)
+    ]
+    assert_equal(sorted(metrics["started"] for metrics in metrics), [1, 50])
+    _run(heavy.disconnect())
+    _run(light.disconnect())
+
+
+def test_cancel_scheduled_request():
+    client = rockets.AsyncClient(server.url)
+
+    async def _cancel():
+        first = client.async_request("slow", [0.2])
+        second = client.async_request("slow", [0.2])
+        await asyncio.sleep(0.05)
+        second.cancel()
+        return await first
+
+    assert_equal(_run(_cancel()), 0.2)
+    _run(client.disconnect())
+
+
+def test_disconnect_with_waiting_requests():
+    client = rockets.AsyncClient(server.url)
+
+    async def _disconnect():
+        for _ in range(3):
+            client.async_request("slow", [0.1])
+        await asyncio.sleep(0.05)
+        await client.disconnect()
+        while server.connections:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+
+    _run(_disconnect())
+    assert_equal(scheduler.metrics(), {})
+
+
+def test_http_connections_are_clients():
+    client = rockets.AsyncClient(server.http_url, transport="http")
+
+    async def _requests():
+        results = await asyncio.gather(
+            *[client.request("slow", [0.05]) for _ in range(2)]
+        )
+        assert_equal(len(scheduler.metrics()), 2)
+        await client.disconnect()
+        while server._http_endpoint.connections:
+            await asyncio.sleep(0.01)
+        return results
+
+    assert_equal(_run(_requests()), [0.05, 0.05])
+    assert_equal(scheduler.metrics(), {})
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
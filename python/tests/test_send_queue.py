@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+
+import websockets
+from nose.tools import assert_equal
+from nose.tools import assert_greater
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets import SendQueue
+from rockets.server import Server
+
+server = None
+echo_server = None
+echo_url = None
+
+
+async def _echo(websocket, path):
+    try:
+        async for message in websocket:
+            await websocket.send(message)
+    except websockets.ConnectionClosed:
+        pass
+
+
+async def _sleep(params):
+    await asyncio.sleep(params[0])
+    return params[0]
+
+
+def setup():
+    global server, echo_server, echo_url
+    server = Server()
+    server.bind("sleep", _sleep)
+    _run(server.start())
+    echo_server = _run(
+        websockets.serve(_echo, "localhost", 0, subprotocols=["rockets"], max_size=None)
+    )
+    echo_url = "localhost:{}".format(echo_server.sockets[0].getsockname()[1])
+
+
+def teardown():
+    _run(server.close())
+    echo_server.close()
+    _run(echo_server.wait_closed())
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Writes:
+    """Records the order of the writes; the first write blocks until it is released."""
+
+    def __init__(self):
+        self.order = []
+        self.release = asyncio.Event()
+
+    def write(self, name, block=False):
+        async def _write():
+            if block:
+                await self.release.wait()
+            self.order.append(name)
+
+        return _write
+
+
+def test_priority_order():
+    queue = SendQueue(asyncio.get_event_loop())
+    writes = _Writes()
+
+    async def _send():
+        tasks = [
+            asyncio.ensure_future(queue.send(writes.write("first", block=True), "bulk"))
+        ]
+        await asyncio.sleep(0)
+        for name, priority in (
+            ("bulk", "bulk"),
+            ("interactive-1", "interactive"),
+            ("control", "control"),
+            ("interactive-2", "interactive"),
+        ):
+            tasks.append(
+                asyncio.ensure_future(queue.send(writes.write(name), priority))
+            )
+        await asyncio.sleep(0.01)
+        assert_equal(queue.depth(), 4)
+        assert_equal(queue.depth("interactive"), 2)
+        writes.release.set()
+        await asyncio.gather(*tasks)
+
+    _run(_send())
+    assert_equal(
+        writes.order, ["first", "control", "interactive-1", "interactive-2", "bulk"]
+    )
+    metrics = queue.metrics()
+    assert_equal(queue.depth(), 0)
+    assert_equal(metrics["bulk"]["sent"], 2)
+    assert_equal(metrics["bulk"]["queued"], 1)
+    assert_equal(metrics["interactive"]["sent"], 2)
+    assert_greater(metrics["control"]["max_wait_ms"], 5)
+    assert_true(
+        metrics["interactive"]["mean_wait_ms"] <= metrics["interactive"]["max_wait_ms"]
+    )
+    assert_equal(metrics["control"]["depth"], 0)
+
+
+def test_metrics_without_messages():
+    metrics = SendQueue(asyncio.get_event_loop()).metrics()
+    assert_equal(sorted(metrics), ["bulk", "control", "interactive"])
+    assert_equal(metrics["bulk"]["mean_wait_ms"], 0.0)
+
+
+def test_cancel_queued_message():
+    queue = SendQueue(asyncio.get_event_loop())
+    writes = _Writes()
+
+    async def _send():
+        first = asyncio.ensure_future(queue.send(writes.write("first", block=True)))
+        await asyncio.sleep(0)
+        cancelled = asyncio.ensure_future(queue.send(writes.write("cancelled")))
+        last = asyncio.ensure_future(queue.send(writes.write("last")))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert_equal(queue.depth(), 1)
+        writes.release.set()
+        await asyncio.gather(first, last)
+
+    _run(_send())
+    assert_equal(writes.order, ["first", "last"])
+
+
+def test_cancel_after_turn():
+    cancelled = []
+
+    class _Queue(SendQueue):
+        def _write_next(self):
+            super()._write_next()
+            # cancel the message whose turn has just come, before it can write
+            while cancelled:
+                cancelled.pop().cancel()
+
+    queue = _Queue(asyncio.get_event_loop())
+    writes = _Writes()
+
+    async def _send():
+        first = asyncio.ensure_future(queue.send(writes.write("first", block=True)))
+        await asyncio.sleep(0)
+        cancelled.append(asyncio.ensure_future(queue.send(writes.write("cancelled"))))
+        last = asyncio.ensure_future(queue.send(writes.write("last")))
+        await asyncio.sleep(0)
+        writes.release.set()
+        await asyncio.gather(first, last)
+
+    _run(_send())
+    assert_equal(writes.order, ["first", "last"])
+
+
+def test_failed_write():
+    queue = SendQueue(asyncio.get_event_loop())
+    writes = _Writes()
+
+    async def _fail():
+        raise OSError("failed")
+
+    async def _send():
+        failed = asyncio.ensure_future(queue.send(_fail))
+        last = asyncio.ensure_future(queue.send(writes.write("last")))
+        try:
+            await failed
+            assert False
+        except OSError:
+            pass
+        await last
+
+    _run(_send())
+    assert_equal(writes.order, ["last"])
+
+
+@raises(ValueError)
+def test_unknown_priority():
+    _run(SendQueue(asyncio.get_event_loop()).send(None, "urgent"))
+
+
+@raises(ValueError)
+def test_unknown_priority_depth():
+    SendQueue(asyncio.get_event_loop()).depth("urgent")
+
+
+def test_client_priorities():
+    client = rockets.AsyncClient(echo_url, fragment_size=4)
+    messages = []
+    client.ws_observable.add_listener(messages.append)
+
+    class _Chunks:
+        def __init__(self):
+            self.chunks = ["a" * 4] * 5
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            await asyncio.sleep(0.01)
+            if not self.chunks:
+                raise StopAsyncIteration
+            return self.chunks.pop()
+
+    async def _send():
+        await client.connect()
+        upload = asyncio.ensure_future(client.send_fragments(_Chunks()))
+        await asyncio.sleep(0.005)
+        await asyncio.gather(
+            client.send("large-bulk"),
+            client.send("b", "bulk"),
+            client.send("i"),
+            client.send("c", "control"),
+            upload,
+        )
+        await asyncio.sleep(0.1)
+
+    _run(_send())
+    assert_equal(messages, ["a" * 20, "c", "i", "large-bulk", "b"])
+    metrics = client.send_queue.metrics()
+    assert_equal(metrics["bulk"]["sent"], 3)
+    assert_equal(metrics["control"]["sent"], 1)
+    _run(client.disconnect())
+
+
+def test_cancel_is_control():
+    client = rockets.AsyncClient(server.url)
+
+    async def _cancel():
+        task = client.async_request("sleep", [10])
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0.05)
+
+    _run(_cancel())
+    assert_equal(client.send_queue.metrics()["control"]["sent"], 1)
+    _run(client.disconnect())
+
+
+def test_sync_client():
+    client = rockets.Client(echo_url)
+    client.send('{"jsonrpc": "2.0", "method": "ping"}', "control")
+    assert_equal(client.send_queue.metrics()["control"]["sent"], 1)
+    client.disconnect()
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
@@ -0,0 +1,423 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import json
+
+import websockets
+from nose.tools import assert_equal
+from nose.tools import assert_false
+from nose.tools import assert_in
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets.server import Server
+
+tokens = []
+
+
+async def _slow(params, progress, token):
+    tokens.append(token)
+    await progress("working", 0.5)
+    await asyncio.sleep(params["delay"])
+    return "done"
+
+
+async def _spin(params, progress, token):
+    token.add_callback(lambda: tokens.append(token))
+    await token.wait()
+
+
+async def _sleep(params):
+    await asyncio.sleep(params[0])
+    return params[0]
+
+
+def _fail(params):
+    raise rockets.RequestError(-1, "failed", params)
+
+
+async def _async_fail(params):
+    raise rockets.RequestError(-2, "failed")
+
+
+async def _crash(params):
+    raise RuntimeError("crashed")
+
+
+server = None
+
+
+def setup():
+    global server
+    server = Server()
+    server.bind("ping", lambda params: "pong")
+    server.bind("echo", lambda params: params)
+    server.bind("sleep", _sleep)
+    server.bind("fail", _fail)
+    server.bind("async-fail", _async_fail)
+    server.bind("crash", _crash)
+    server.bind("sync-crash", lambda params: 1 / 0)
+    server.bind_async("slow", _slow)
+    server.bind_async("spin", _spin)
+    asyncio.get_event_loop().run_until_complete(server.start())
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _exchange(messages, subprotocols=("rockets",)):
+    """Send the messages on a new connection and return the first response."""
+
+    async def _send():
+        async with websockets.connect(
+            "ws://" + server.url, subprotocols=list(subprotocols) or None
+        ) as websocket:
+            for message in messages:
+                await websocket.send(message)
+            return json.loads(await websocket.recv())
+
+    return _run(_send())
+
+
+def test_requests():
+    client = rockets.AsyncClient(server.url)
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_equal(_run(client.request("echo", {"a": [1]})), {"a": [1]})
+    assert_equal(_run(client.request("sleep", [0.01])), 0.01)
+
+
+def test_errors():
+    client = rockets.AsyncClient(server.url)
+    for method, code in (
+        ("fail", -1),
+        ("async-fail", -2),
+        ("crash", -32603),
+        ("sync-crash", -32603),
+        ("foo", -32601),
+    ):
+        try:
+            _run(client.request(method, [1]))
+            assert False, "request should have failed"
+        except rockets.RequestError as error:
+            assert_equal(error.code, code)
+    try:
+        _run(client.request("fail", [1]))
+    except rockets.RequestError as error:
+        assert_equal(error.data, [1])
+
+
+def test_protocol_errors():
+    assert_equal(_exchange(["foo"])["error"]["code"], -32700)
+    for message in ("1", '"x"', "null", "[]"):
+        response = _exchange([message])
+        assert_equal((response["id"], response["error"]["code"]), (None, -32600))
+    invalid = {"jsonrpc": "1.0", "id": 1, "method": "ping"}
+    assert_equal(_exchange([json.dumps(invalid)])["error"]["code"], -32600)
+    assert_equal(_exchange([json.dumps([1])])[0]["error"]["code"], -32600)
+
+
+def test_notifications_are_not_answered():
+    batch = [
+        {"jsonrpc": "2.0", "method": method, "params": [0]}
+        for method in (
+            "ping",
+            "sleep",
+            "fail",
+            "async-fail",
+            "crash",
+            "sync-crash",
+            "foo",
+            "cancel",
+        )
+    ]
+    batch.append({"jsonrpc": "1.0", "method": "ping"})
+    batch.append({"jsonrpc": "2.0", "method": "slow", "params": {"delay": 0}})
+    messages = [json.dumps(notification) for notification in batch]
+    messages += [json.dumps(batch), rockets.Request("ping").json]
+    # only the last message is answered
+    assert_equal(_exchange(messages)["result"], "pong")
+
+
+def test_batch():
+    client = rockets.AsyncClient(server.url)
+    requests = [
+        rockets.Request("sleep", [0.02]),
+        rockets.Request("ping"),
+        rockets.Notification("ping"),
+        rockets.Request("fail"),
+    ]
+    responses = _run(client.batch(requests))
+    assert_equal([response.result for response in responses[:2]], [0.02, "pong"])
+    assert_equal(responses[2].error["code"], -1)
+
+    responses = _run(
+        client.batch([rockets.Request("ping"), rockets.Request("echo", [1])])
+    )
+    assert_equal([response.result for response in responses], ["pong", [1]])
+
+
+def test_progress():
+    client = rockets.AsyncClient(server.url)
+    progress = []
+
+    async def _request():
+        task = client.async_request("slow", {"delay": 0.01})
+        task.add_progress_callback(progress.append)
+        return await task
+
+    assert_equal(_run(_request()), "done")
+    assert_equal([(p.operation, p.amount) for p in progress], [("working", 0.5)])
+
+
+def test_cancel():
+    client = rockets.AsyncClient(server.url)
+    del tokens[:]
+
+    async def _cancel():
+        task = client.async_request("slow", {"delay": 10})
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await task
+        # the server answers the cancelled request
+        await asyncio.sleep(0.1)
+
+    _run(_cancel())
+    assert_true(tokens[0].cancelled)
+    assert_true(all(not connection.requests for connection in server.connections))
+
+
+def test_cancel_response():
+    async def _cancel():
+        async with websockets.connect(
+            "ws://" + server.url, subprotocols=["rockets"]
+        ) as websocket:
+            request = {"jsonrpc": "2.0", "id": 7, "method": "spin"}
+            await websocket.send(json.dumps(request))
+            # let the handler start
+            await asyncio.sleep(0.1)
+            await websocket.send(json.dumps({"jsonrpc": "2.0", "method": "cancel"}))
+            await websocket.send(
+                json.dumps({"jsonrpc": "2.0", "method": "cancel", "params": {"id": 8}})
+            )
+            await websocket.send(
+                json.dumps({"jsonrpc": "2.0", "method": "cancel", "params": {"id": 7}})
+            )
+            return json.loads(await websocket.recv())
+
+    del tokens[:]
+    response = _run(_cancel())
+    assert_true(tokens[0].cancelled)
+    assert_equal(response["id"], 7)
+    assert_equal(response["error"], {"code": -31002, "message": "Request aborted"})
+
+
+def test_requests_cancelled_on_close():
+    async def _close():
+        websocket = await websockets.connect(
+            "ws://" + server.url, subprotocols=["rockets"]
+        )
+        request = {"jsonrpc": "2.0", "id": 1, "method": "slow", "params": {"delay": 10}}
+        await websocket.send(json.dumps(request))
+        await websocket.recv()  # progress
+        await websocket.close()
+        await asyncio.sleep(0.1)
+
+    del tokens[:]
+    _run(_close())
+    assert_true(tokens[0].cancelled)
+
+
+def test_broadcast():
+    client = rockets.AsyncClient(server.url)
+
+    async def _receive():
+        notifications = client.notifications()
+        await client.connect()
+        await server.broadcast("hello", [1])
+        await server.broadcast("bye")
+        received = []
+        for _ in range(2):
+            received.append(await notifications.__anext__())
+        return received
+
+    hello, bye = _run(_receive())
+    assert_equal((hello.method, hello.params), ("hello", [1]))
+    assert_equal(bye.method, "bye")
+
+
+def test_broadcast_without_extensions():
+    async def _receive():
+        async with websockets.connect(
+            "ws://" + server.url, subprotocols=["rockets"], compression=None
+        ) as websocket:
+            while not server.connections:
+                await asyncio.sleep(0.01)
+            await server.broadcast("hello", {"name": "\u00e9"})
+            return json.loads(await websocket.recv())
+
+    assert_equal(
+        _run(_receive()),
+        {"jsonrpc": "2.0", "method": "hello", "params": {"name": "\u00e9"}},
+    )
+
+
+async def _connect_raw(url):
+    """A client which reads only when asked to, to fill the write buffer of the server."""
+    host, port = url.split(":")
+    reader, writer = await asyncio.open_connection(host, int(port))
+    writer.write(
+        b"GET / HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+        b"Connection: Upgrade\r\nSec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n"
+        b"Sec-WebSocket-Version: 13\r\n\r\n"
+    )
+    await reader.readuntil(b"\r\n\r\n")
+    return reader, writer
+
+
+def _broadcast_to_slow_client(slow_clients, until):
+    """Broadcast 10 large notifications to a client which does not read, then read them."""
+    other = Server(broadcast_queue_size=2, slow_clients=slow_clients)
+
+    async def _broadcast():
+        await other.start()
+        reader, writer = await _connect_raw(other.url)
+        while not other.connections:
+            await asyncio.sleep(0.01)
+        connection = next(iter(other.connections))
+        for index in range(10):
+            await other.broadcast("frame", [index, "x" * 4 * 1024 * 1024])
+        dropped = connection.dropped
+        received = bytearray()
+        while until not in received[-len(until) - 65536:]:
+            received += await reader.read(65536)
+        writer.close()
+        await other.close()
+        return dropped, received
+
+    return _run(_broadcast())
+
+
+def test_slow_client_drops_oldest_broadcasts():
+    dropped, received = _broadcast_to_slow_client("drop", b"[9, ")
+    # the first one was written right away, the two newest ones waited
+    assert_equal(dropped, 7)
+    assert_in(b"[0, ", received)
+    assert_false(
+        any("[{}, ".format(index).encode() in received for index in range(1, 8))
+    )
+    assert_in(b"[8, ", received)
+
+
+def test_slow_client_disconnected():
+    dropped, received = _broadcast_to_slow_client(
+        "disconnect", b"\x03\xf0Client too slow"
+    )
+    assert_equal(dropped, 1)
+    assert_in(b"[0, ", received)
+    assert_false(b"[1, " in received)
+
+
+def test_slow_client_closed():
+    other = Server()
+
+    async def _broadcast():
+        await other.start()
+        _, writer = await _connect_raw(other.url)
+        while not other.connections:
+            await asyncio.sleep(0.01)
+        connection = next(iter(other.connections))
+        for index in range(4):
+            await other.broadcast("frame", [index, "x" * 4 * 1024 * 1024])
+        writer.transport.abort()
+        while other.connections:
+            await asyncio.sleep(0.01)
+        await other.broadcast("frame", [4])
+        await other.close()
+        return connection
+
+    connection = _run(_broadcast())
+    assert_equal(connection.dropped, 0)
+    assert_equal(len(connection._broadcasts), 0)
+    assert_equal(connection._writer, None)
+
+
+@raises(ValueError)
+def test_unknown_slow_clients_policy():
+    Server(slow_clients="block")
+
+
+def test_subprotocol():
+    ping = rockets.Request("ping").json
+    assert_equal(_exchange([ping], subprotocols=())["result"], "pong")
+    try:
+        _exchange([ping], subprotocols=("other",))
+        assert False, "connection should have been rejected"
+    except websockets.InvalidStatusCode as error:
+        assert_equal(error.status_code, 400)
+
+
+def test_unbind():
+    other = Server()
+    other.bind("ping", lambda params: "pong")
+    other.unbind("ping")
+    other.unbind("ping")
+    assert_equal(other._methods, {})
+
+
+@raises(ValueError)
+def test_reserved_method():
+    Server().bind("cancel", lambda params: None)
+
+
+@raises(ValueError)
+def test_reserved_prefix():
+    Server().bind_async("rpc.discover", lambda params, progress, token: None)
+
+
+def test_methods_which_start_like_reserved_ones():
+    other = Server()
+    other.bind("cancelJob", lambda params: "cancelled")
+    other.bind("progressive_render", lambda params: "rendered")
+    _run(other.start())
+    client = rockets.AsyncClient(other.url)
+    assert_equal(_run(client.request("cancelJob")), "cancelled")
+    assert_equal(_run(client.request("progressive_render")), "rendered")
+    _run(client.disconnect())
+    _run(other.close())
+
+
+def test_start_and_close():
+    other = Server(subprotocol="other")
+    other.bind("ping", lambda params: "pong")
+    _run(other.close())
+    _run(other.start())
+    assert_in("localhost:", other.url)
+    client = rockets.AsyncClient(other.url, subprotocols=["other"])
+    assert_equal(_run(client.request("ping")), "pong")
+    _run(other.close())
+    assert_false(other.connections)
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import json
+
+import websockets
+from nose.tools import assert_equal
+from nose.tools import assert_true
+
+import rockets
+
+requests = []
+cancelled = []
+
+
+async def _answer(websocket, request):
+    requests.append(request)
+    await websocket.send(
+        rockets.Request(
+            "progress", {"amount": 0.5, "operation": "working", "id": request["id"]}
+        ).json
+    )
+    await asyncio.sleep(0.1)
+    if request["id"] not in cancelled:
+        await websocket.send(
+            json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": len(requests)})
+        )
+
+
+async def server_handle(websocket, path):
+    try:
+        while True:
+            request = json.loads(await websocket.recv())
+            if request["method"] == "cancel":
+                cancelled.append(request["params"]["id"])
+            else:
+                asyncio.ensure_future(_answer(websocket, request))
+    except websockets.ConnectionClosed:
+        pass
+
+
+server_url = None
+
+
+def setup():
+    start_server = websockets.serve(server_handle, "localhost")
+    server = asyncio.get_event_loop().run_until_complete(start_server)
+    global server_url
+    server_url = "localhost:" + str(server.sockets[0].getsockname()[1])
+
+
+def test_concurrent_requests_are_shared():
+    client = rockets.AsyncClient(server_url, single_flight=["get"])
+    del requests[:]
+
+    async def _do_it():
+        return await asyncio.gather(
+            client.request("get", [1]),
+            client.request("get", [1]),
+            client.request("get", [2]),
+        )
+
+    results = asyncio.get_event_loop().run_until_complete(_do_it())
+    assert_equal(len(requests), 2)
+    assert_equal(results[0], results[1])
+    assert_equal(client._single_flight.shared, 1)
+    assert_equal(len(client._single_flight), 0)
+
+
+def test_other_methods_are_not_shared():
+    client = rockets.AsyncClient(server_url, single_flight=["get"])
+    del requests[:]
+
+    async def _do_it():
+        return await asyncio.gather(client.request("set"), client.request("set"))
+
+    asyncio.get_event_loop().run_until_complete(_do_it())
+    assert_equal(len(requests), 2)
+
+
+def test_progress_reaches_all_waiters():
+    client = rockets.AsyncClient(server_url, single_flight=["get"])
+    task_a = client.async_request("get")
+    task_b = client.async_request("get")
+    progress = []
+    task_a.add_progress_callback(progress.append)
+    task_b.add_progress_callback(progress.append)
+
+    results = asyncio.get_event_loop().run_until_complete(
+        asyncio.gather(task_a, task_b)
+    )
+    assert_equal(results[0], results[1])
+    assert_equal(len(progress), 2)
+
+
+def test_cancel_only_when_last_waiter_gives_up():
+    client = rockets.AsyncClient(server_url, single_flight=["get"])
+    del cancelled[:]
+
+    async def _do_it():
+        task_a = client.async_request("get", ["cancel"])
+        task_b = client.async_request("get", ["cancel"])
+        await asyncio.sleep(0.02)
+        task_a.cancel()
+        assert_equal(await task_a, None)
+        assert_equal(cancelled, [])
+        assert_true(await task_b)
+
+        task_c = client.async_request("get", ["cancel"])
+        task_d = client.async_request("get", ["cancel"])
+        await asyncio.sleep(0.02)
+        task_c.cancel()
+        task_d.cancel()
+        assert_equal(await task_c, None)
+        assert_equal(await task_d, None)
+        await asyncio.sleep(0.02)
+
+    asyncio.get_event_loop().run_until_complete(_do_it())
+    assert_equal(len(cancelled), 1)
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
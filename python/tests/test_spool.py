@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from nose.tools import assert_equal
+from nose.tools import assert_false
+from nose.tools import assert_greater
+from nose.tools import assert_is
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets.encoding import pack
+from rockets.server import Server
+from rockets.spool import SpoolRecord
+
+server = None
+directory = None
+
+WRITER = """
+import json
+import sys
+from rockets.spool import NotificationSpool
+
+with NotificationSpool(sys.argv[1], capacity=4096) as spool:
+    for index in range(int(sys.argv[2])):
+        params = [index, "x" * (index % 50)]
+        spool.append(json.dumps({"jsonrpc": "2.0", "method": "step", "params": params}))
+"""
+
+
+def setup():
+    global server, directory
+    directory = tempfile.mkdtemp()
+    server = Server()
+    server.bind("ping", lambda params: "pong")
+    _run(server.start())
+
+
+def teardown():
+    _run(server.close())
+    shutil.rmtree(directory)
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _path(name):
+    return os.path.join(directory, name)
+
+
+def _notification(index):
+    return json.dumps({"jsonrpc": "2.0", "method": "step", "params": [index]})
+
+
+def test_append_and_read():
+    with rockets.NotificationSpool(_path("simple"), capacity=1024) as spool:
+        spool.append(_notification(0))
+        spool.append(b"\x00\x01")
+        spool.on_notification(rockets.Notification("done"))
+        assert_equal(spool.count(), 3)
+
+        with rockets.SpoolReader(_path("simple")) as reader:
+            records = list(reader)
+            assert_equal(len(records), 3)
+            assert_equal(
+                records[0].json(), {"jsonrpc": "2.0", "method": "step", "params": [0]}
+            )
+            assert_false(records[0].binary)
+            assert_true(records[1].binary)
+            assert_equal(records[1].data, b"\x00\x01")
+            assert_equal(records[2].notification().method, "done")
+            assert_true(records[0].timestamp <= records[2].timestamp)
+            assert_equal(reader.count(), 3)
+
+            # the next iteration continues with the new records
+            assert_equal(list(reader), [])
+            spool.append(_notification(1))
+            assert_equal(
+                [record["params"] for record in reader.records(decode=True)], [[1]]
+            )
+
+            reader.seek(records[2].offset)
+            assert_equal(len(list(reader)), 2)
+            reader.seek()
+            assert_equal(len(list(reader)), 4)
+            assert_equal(reader.overruns, 0)
+
+
+def test_ring_buffer_overwrites_the_oldest_records():
+    with rockets.NotificationSpool(_path("ring"), capacity=200) as spool:
+        reader = rockets.SpoolReader(_path("ring"))
+        spool.append(_notification(0))
+        assert_equal(len(list(reader)), 1)
+        for index in range(1, 100):
+            spool.append(_notification(index))
+        params = [record["params"][0] for record in reader.records(decode=True)]
+        assert_equal(params, list(range(100 - len(params), 100)))
+        assert_greater(len(params), 1)
+        assert_equal(reader.overruns, 1)
+        reader.close()
+
+
+def test_record_which_overwrites_all_records():
+    with rockets.NotificationSpool(_path("all"), capacity=200) as spool:
+        spool.append(_notification(0))
+        spool.append(_notification(1))
+        spool.append("x" * 180)
+        with rockets.SpoolReader(_path("all")) as reader:
+            assert_equal([record.text() for record in reader], ["x" * 180])
+
+
+def test_records_which_fill_the_end_of_the_buffer():
+    # each record takes 25 bytes, 4 of them fit and leave 0, 4, 12 or 13 bytes at the end
+    for capacity in (100, 104, 112, 113):
+        path = _path("end{}".format(capacity))
+        with rockets.NotificationSpool(path, capacity=capacity) as spool:
+            for index in range(20):
+                spool.append("{:012d}".format(index))
+                with rockets.SpoolReader(path) as reader:
+                    texts = [record.text() for record in reader]
+                assert_equal(texts[-1], "{:012d}".format(index))
+                assert_equal(
+                    texts,
+                    [
+                        "{:012d}".format(i)
+                        for i in range(index + 1 - len(texts), index + 1)
+                    ],
+                )
+
+
+def test_reopen():
+    with rockets.NotificationSpool(_path("reopen"), capacity=1024) as spool:
+        spool.append(_notification(0))
+    with rockets.NotificationSpool(_path("reopen"), capacity=10) as spool:
+        assert_equal(spool.capacity, 1024)
+        spool.append(_notification(1))
+        spool.flush()
+    with rockets.SpoolReader(_path("reopen")) as reader:
+        assert_equal([record["params"] for record in reader.records(True)], [[0], [1]])
+
+
+def test_seek_time():
+    with rockets.NotificationSpool(_path("time"), capacity=1024) as spool:
+        spool.append(_notification(0))
+        time.sleep(0.01)
+        middle = time.time()
+        spool.append(_notification(1))
+        spool.append(_notification(2))
+        with rockets.SpoolReader(_path("time")) as reader:
+            reader.seek_time(middle)
+            assert_equal(
+                [record["params"] for record in reader.records(True)], [[1], [2]]
+            )
+            reader.seek_time(time.time() + 1)
+            assert_equal(list(reader), [])
+            spool.append(_notification(3))
+            assert_equal([record["params"] for record in reader.records(True)], [[3]])
+
+
+def test_frame_larger_than_the_buffer():
+    with rockets.NotificationSpool(_path("small"), capacity=32) as spool:
+        spool.append("x" * 32)
+        assert_equal(spool.skipped, 1)
+        assert_equal(spool.count(), 0)
+        spool.append("x")
+        assert_equal(spool.skipped, 1)
+        assert_equal(spool.count(), 1)
+
+
+@raises(ValueError)
+def test_spool_of_other_file():
+    with open(_path("other"), "wb") as file:
+        file.write(b"not a spool")
+    rockets.NotificationSpool(_path("other"))
+
+
+@raises(ValueError)
+def test_read_other_file():
+    with open(_path("other"), "wb") as file:
+        file.write(b"not a spool at all, but long enough for the header")
+    rockets.SpoolReader(_path("other"))
+
+
+def test_files_which_cannot_be_mapped():
+    try:
+        rockets.NotificationSpool(_path("negative"), capacity=-1000)
+        assert False
+    except (OSError, ValueError):
+        pass
+    open(_path("empty"), "wb").close()
+    try:
+        rockets.SpoolReader(_path("empty"))
+        assert False
+    except ValueError:
+        pass
+
+
+class _RacingReader(rockets.SpoolReader):
+    """Appends records which overwrite the first one while it is read."""
+
+    def __init__(self, path, spool):
+        super().__init__(path)
+        self.spool = spool
+        self.calls = 0
+
+    def _tail(self):
+        self.calls += 1
+        if self.calls == 2:
+            for index in range(10):
+                self.spool.append(_notification(index))
+        return super()._tail()
+
+
+def test_record_overwritten_while_it_is_read():
+    with rockets.NotificationSpool(_path("race"), capacity=200) as spool:
+        spool.append("first")
+        with _RacingReader(_path("race"), spool) as reader:
+            # the iteration ends at the last record appended before it started
+            assert_equal(list(reader), [])
+            assert_equal(reader.overruns, 1)
+            records = list(reader)
+            assert_equal(records[-1].json()["params"], [9])
+            assert_false(any(record.data == b"first" for record in records))
+
+
+def test_read_while_another_process_writes():
+    path = _path("concurrent")
+    rockets.NotificationSpool(path, capacity=4096).close()
+    reader = rockets.SpoolReader(path)
+    writer = subprocess.Popen([sys.executable, "-c", WRITER, path, "20000"])
+    last = -1
+    read = 0
+    while True:
+        done = writer.poll() is not None
+        for record in reader.records(decode=True):
+            index, padding = record["params"]
+            assert_greater(index, last)
+            assert_equal(padding, "x" * (index % 50))
+            last = index
+            read += 1
+        if done:
+            break
+    assert_equal(writer.returncode, 0)
+    assert_equal(last, 19999)
+    assert_equal(reader.count(), 20000)
+    assert_true(read == 20000 or reader.overruns > 0)
+    reader.close()
+
+
+def test_client_spools_notifications():
+    path = _path("client")
+    spool = rockets.NotificationSpool(path, capacity=1024 * 1024)
+    client = rockets.AsyncClient(server.url, spool=spool)
+    assert_is(client.spool, spool)
+    assert_equal(_run(client.request("ping")), "pong")
+    _run(server.broadcast("step", [0]))
+    _run(server.broadcast("step", [1]))
+    _run(client.request("ping"))
+    _run(client.disconnect())
+    spool.close()
+    with rockets.SpoolReader(path) as reader:
+        assert_equal(
+            [record["params"] for record in reader.records(decode=True)], [[0], [1]]
+        )
+
+
+def test_client_skips_notifications_larger_than_the_spool():
+    spool = rockets.NotificationSpool(_path("client_small"), capacity=256)
+    client = rockets.AsyncClient(server.url, spool=spool)
+    assert_equal(_run(client.request("ping")), "pong")
+    _run(server.broadcast("step", ["x" * 1024]))
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_true(client.connected())
+    assert_equal(spool.skipped, 1)
+    assert_equal(spool.count(), 0)
+    _run(client.disconnect())
+    spool.close()
+
+
+def test_sync_client():
+    spool = rockets.NotificationSpool(_path("sync"), capacity=1024)
+    client = rockets.Client(server.url, spool=spool)
+    assert_is(client.spool, spool)
+    client.disconnect()
+    spool.close()
+
+
+def test_record():
+    record = SpoolRecord(0, 1.0, b'{"a": 1}', False)
+    assert_equal(record.json(), {"a": 1})
+    record = SpoolRecord(0, 1.0, pack({"a": 1}), True)
+    assert_equal(record.json(), {"a": 1})
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
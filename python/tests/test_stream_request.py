@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import json
+from threading import Thread
+
+import websockets
+from nose.tools import assert_equal
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets import streaming
+from rockets.result_stream import items_at
+
+ITEMS = [[1, 2], {"a": {"b": [None]}}, "éx", 1.5, None, True, False, 7]
+
+cancelled = []
+
+
+def _fragments(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _truncated(request_id):
+    yield '{"id": ' + json.dumps(request_id) + ', "result": [1, 2'
+    raise ConnectionError("lost")
+
+
+async def server_handle(websocket, path):
+    while True:
+        request = json.loads(await websocket.recv())
+        method = request["method"]
+        if method == "cancel":
+            cancelled.append(request["params"]["id"])
+            continue
+
+        request_id = json.dumps(request["id"])
+        if method == "get-params-after-other":
+            # the response of a request which is not streamed, then the one of the stream
+            other = '{"id": "other", "jsonrpc": "2.0", "result": [0]}'
+            await websocket.send(_fragments(other))
+            params = json.dumps(request["params"])
+            response = (
+                '{"id": ' + request_id + ', "jsonrpc": "2.0", "result": ' + params + "}"
+            )
+            await websocket.send(_fragments(response))
+            continue
+
+        result = json.dumps(request.get("params", {}).get("result", ITEMS))
+        if method == "get-items":
+            response = (
+                '{"id": ' + request_id + ', "jsonrpc": "2.0", "result": ' + result + "}"
+            )
+            await websocket.send(_fragments(response))
+        elif method == "get-items-unfragmented":
+            response = (
+                '{"id": ' + request_id + ', "jsonrpc": "2.0", "result": ' + result + "}"
+            )
+            await websocket.send(response)
+        elif method == "get-items-id-last":
+            response = (
+                '{"jsonrpc": "2.0", "result": ' + result + ', "id": ' + request_id + "}"
+            )
+            await websocket.send(_fragments(response))
+        elif method == "get-error":
+            response = (
+                '{"id": ' + request_id + ', "error": {"code": -1, "message": "no"}}'
+            )
+            await websocket.send(_fragments(response))
+        elif method == "get-error-id-last":
+            response = (
+                '{"error": {"code": -1, "message": "no"}, "id": ' + request_id + "}"
+            )
+            await websocket.send(_fragments(response))
+        elif method == "get-invalid":
+            await websocket.send(['{"id": ' + request_id + ', "result": [1', ", x]}"])
+        elif method == "get-incomplete":
+            await websocket.send(['{"id": ' + request_id + ', "result": [1', ", 2"])
+        elif method == "get-items-after-garbage":
+            await websocket.send(["not", " JSON"])
+            response = (
+                '{"id": ' + request_id + ', "jsonrpc": "2.0", "result": ' + result + "}"
+            )
+            await websocket.send(_fragments(response))
+        elif method == "get-nothing":
+            return
+        elif method == "get-truncated":
+            await websocket.send(_truncated(request["id"]))
+        elif method == "ping":
+            await websocket.send(
+                json.dumps({"id": request["id"], "jsonrpc": "2.0", "result": "pong"})
+            )
+
+
+server_url = None
+
+
+def setup():
+    start_server = websockets.serve(server_handle, "localhost")
+    server = asyncio.get_event_loop().run_until_complete(start_server)
+    global server_url
+    server_url = "localhost:" + str(server.sockets[0].getsockname()[1])
+
+
+def _collect(stream):
+    async def _consume():
+        items = []
+        async for item in stream:
+            items.append(item)
+        return items
+
+    return asyncio.get_event_loop().run_until_complete(_consume())
+
+
+def test_items():
+    client = rockets.AsyncClient(server_url)
+    methods = (
+        "get-items",
+        "get-items-unfragmented",
+        "get-items-id-last",
+        "get-items-after-garbage",
+    )
+    for method in methods:
+        stream = client.stream_request(method)
+        assert_equal(_collect(stream), ITEMS)
+        assert_equal(stream.count, len(ITEMS))
+
+
+def test_prefix():
+    client = rockets.AsyncClient(server_url)
+    result = {"mesh": {"vertices": [[0, 0, 0], [1, 0, 0]]}, "name": "x"}
+    stream = client.stream_request(
+        "get-items", {"result": result}, prefix="mesh.vertices.item"
+    )
+    assert_equal(_collect(stream), [[0, 0, 0], [1, 0, 0]])
+    assert_equal(_collect(client.stream_request("get-items", {"result": 5}, "")), [5])
+
+
+def test_sink():
+    client = rockets.AsyncClient(server_url)
+    items = []
+    stream = client.stream_request("get-items", sink=items.append)
+    count = asyncio.get_event_loop().run_until_complete(stream)
+    assert_equal(count, len(ITEMS))
+    assert_equal(items, ITEMS)
+
+
+def test_other_responses_are_not_streamed():
+    client = rockets.AsyncClient(server_url)
+    # a single param is sent as list
+    stream = client.stream_request("get-params-after-other", 5)
+    assert_equal(_collect(stream), [5])
+
+
+def test_backpressure():
+    client = rockets.AsyncClient(server_url)
+    result = list(range(500))
+    stream = client.stream_request("get-items", {"result": result}, maxsize=2)
+
+    async def _consume_slowly():
+        items = []
+        async for item in stream:
+            items.append(item)
+            await asyncio.sleep(0)
+        return items
+
+    items = asyncio.get_event_loop().run_until_complete(_consume_slowly())
+    assert_equal(items, result)
+
+
+def test_errors():
+    client = rockets.AsyncClient(server_url)
+    for method in ("get-error", "get-error-id-last"):
+        try:
+            _collect(client.stream_request(method))
+            assert False, "request should have failed"
+        except rockets.RequestError as error:
+            assert_equal(error.code, -1)
+
+    for method in ("get-invalid", "get-incomplete"):
+        try:
+            _collect(client.stream_request(method))
+            assert False, "request should have failed"
+        except rockets.RequestError as error:
+            assert_equal(error.code, -31001)
+
+    # the connection is still usable
+    assert_equal(
+        asyncio.get_event_loop().run_until_complete(client.request("ping")), "pong"
+    )
+
+
+def test_close_cancels_request():
+    client = rockets.AsyncClient(server_url)
+    stream = client.stream_request(
+        "get-items", {"result": list(range(1000))}, maxsize=1
+    )
+
+    async def _take_three():
+        items = [await stream.__anext__() for _ in range(3)]
+        stream.close()
+        stream.close()
+        async for item in stream:
+            items.append(item)
+        return items
+
+    loop = asyncio.get_event_loop()
+    assert_equal(loop.run_until_complete(_take_three()), [0, 1, 2])
+    assert_equal(loop.run_until_complete(client.request("ping")), "pong")
+    assert_true(stream.closed)
+    assert_true(cancelled)
+
+
+def test_failing_sink_cancels_request():
+    client = rockets.AsyncClient(server_url)
+
+    def _sink(item):
+        raise ValueError(item)
+
+    stream = client.stream_request("get-items", sink=_sink)
+    try:
+        asyncio.get_event_loop().run_until_complete(stream)
+        assert False, "sink should have failed"
+    except ValueError as error:
+        assert_equal(error.args, (ITEMS[0],))
+    assert_equal(
+        asyncio.get_event_loop().run_until_complete(client.request("ping")), "pong"
+    )
+
+
+@raises(rockets.RequestError)
+def test_connection_lost():
+    client = rockets.AsyncClient(server_url)
+    _collect(client.stream_request("get-truncated"))
+
+
+@raises(rockets.RequestError)
+def test_connection_closed():
+    client = rockets.AsyncClient(server_url)
+    _collect(client.stream_request("get-nothing"))
+
+
+@raises(OSError)
+def test_not_connected():
+    client = rockets.AsyncClient("localhost:1")
+    _collect(client.stream_request("get-items"))
+
+
+def test_without_ijson():
+    ijson = streaming.ijson
+    streaming.ijson = None
+    try:
+        client = rockets.AsyncClient(server_url)
+        assert_equal(_collect(client.stream_request("get-items")), ITEMS)
+    finally:
+        streaming.ijson = ijson
+
+
+def test_sync_client():
+    client = rockets.Client(server_url)
+    assert_equal(list(client.stream_request("get-items")), ITEMS)
+    items = []
+    assert_equal(client.stream_request("get-items", sink=items.append), len(ITEMS))
+    assert_equal(items, ITEMS)
+
+    iterator = client.stream_request("get-items", {"result": list(range(100))})
+    assert_equal(next(iterator), 0)
+    iterator.close()
+    assert_equal(client.request("ping"), "pong")
+
+
+def test_threaded_client():
+    # the default loop is blocked by the synchronous client, so serve from another one
+    server_loop = asyncio.new_event_loop()
+    start_server = websockets.serve(server_handle, "localhost", loop=server_loop)
+    server = server_loop.run_until_complete(start_server)
+    url = "localhost:" + str(server.sockets[0].getsockname()[1])
+    thread = Thread(target=server_loop.run_forever)
+    thread.daemon = True
+    thread.start()
+
+    async def _iterate_in_running_loop():
+        client = rockets.Client(url)
+        return list(client.stream_request("get-items"))
+
+    items = asyncio.get_event_loop().run_until_complete(_iterate_in_running_loop())
+    assert_equal(items, ITEMS)
+
+
+def test_items_at():
+    result = {"a": [{"b": 1}, {"b": 2}, {"c": 3}], "item": 4}
+    assert_equal(items_at(result, "a.item.b"), [1, 2])
+    assert_equal(items_at(result, "item"), [4])
+    assert_equal(items_at(result, ""), [result])
+    assert_equal(items_at([1, 2], "item"), [1, 2])
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
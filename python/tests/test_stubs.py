@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import typing
+
+from nose.tools import assert_equal
+from nose.tools import assert_false
+from nose.tools import assert_in
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets.http_transport import HTTP_ERROR_CODE
+from rockets.http_transport import http_get
+from rockets.server import Server
+from rockets.stubs import fetch_schemas
+from rockets.stubs import generate_stubs
+from rockets.stubs import load_stubs
+from rockets.stubs import main
+
+SCHEMAS = {
+    "get-camera/schema": {
+        "type": "method",
+        "title": "get-camera",
+        "description": "Get the camera",
+        "returns": {"type": "object"},
+    },
+    "set-zoom/schema": {
+        "type": "method",
+        "description": 'Set the zoom """of""" the camera\n\nin percent',
+        "params": [{"name": "zoom", "type": "number", "description": "the zoom"}],
+        "returns": {"type": ["number", "null"]},
+    },
+    "add/schema": {
+        "type": "method",
+        "params": [
+            {"name": "lambda", "type": "integer"},
+            {"name": "lambda", "type": "integer"},
+        ],
+        "returns": {"oneOf": [{"type": "integer"}, {"type": "integer"}]},
+    },
+    "animation/schema": {"type": "object", "properties": {}},
+    "hidden/schema": {"type": "method"},
+}
+
+# endpoints and their methods, as in the registry of a Rockets server
+REGISTRY = {
+    "get-camera/schema": ["GET"],
+    "set-zoom/schema": ["GET"],
+    "add/schema": ["GET"],
+    "animation/schema": ["GET"],
+    "animation": ["GET", "PUT"],
+    "hidden/schema": ["PUT"],
+}
+
+server = None
+registry = None
+registry_url = None
+requests = []
+cache_dir = None
+
+
+async def _serve(reader, writer):
+    """Answer GET requests of the registry and the schemas."""
+    path = (await reader.readline()).split()[1].decode()
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    requests.append(path)
+    path = path.split("?")[0]
+    if path == "/registry":
+        status, body = "200 OK", json.dumps(REGISTRY)
+    elif path[1:] in SCHEMAS:
+        status, body = "200 OK", json.dumps(SCHEMAS[path[1:]])
+    else:
+        status, body = "404 Not Found", "not found"
+    writer.write(
+        "HTTP/1.1 {}\r\nContent-Length: {}\r\n\r\n{}".format(
+            status, len(body), body
+        ).encode()
+    )
+    await writer.drain()
+    writer.close()
+
+
+def setup():
+    global server, registry, registry_url, cache_dir
+    server = Server()
+    server.bind("get-camera", lambda params: {"orientation": [0, 0, 0, 1]})
+    server.bind("set-zoom", lambda params: params[0] * 2)
+    server.bind("add", lambda params: params[0] + params[1])
+    _run(server.start())
+    registry = _run(asyncio.start_server(_serve, "localhost", 0))
+    registry_url = "ws://localhost:{}/ws".format(registry.sockets[0].getsockname()[1])
+    cache_dir = tempfile.mkdtemp()
+
+
+def teardown():
+    _run(server.close())
+    registry.close()
+    _run(registry.wait_closed())
+    shutil.rmtree(cache_dir)
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def test_fetch_schemas():
+    schemas = _run(fetch_schemas(registry_url))
+    assert_equal(sorted(schemas), ["add", "get-camera", "set-zoom"])
+    assert_equal(schemas["get-camera"], SCHEMAS["get-camera/schema"])
+
+
+def test_generate_stubs():
+    source = generate_stubs(_run(fetch_schemas(registry_url)), "http://localhost")
+    assert_in("async def get_camera(self) -> dict:", source)
+    assert_in(
+        "async def set_zoom(self, zoom: float) -> typing.Union[float, None]:", source
+    )
+    assert_in("async def add(self, lambda_: int, lambda__2: int) -> int:", source)
+    assert_in("Get the camera", source)
+    module = {}
+    exec(compile(source, "stubs", "exec"), module)
+    assert_equal(module["_SET_ZOOM"].method, "set-zoom")
+    assert_equal(module["Stubs"].set_zoom.__annotations__["zoom"], float)
+    assert_in('"""of"""', module["Stubs"].set_zoom.__doc__)
+
+
+def test_annotations():
+    schemas = {
+        "1st": {"params": [{"type": "array", "items": {"type": "string"}}, "?"]},
+        "class": {
+            "params": {"anyOf": [{"type": "string"}, {}]},
+            "returns": {"type": "null"},
+        },
+        "_client": {"returns": {"type": "array"}},
+        "nothing": {"params": [{"oneOf": []}]},
+    }
+    source = generate_stubs(schemas)
+    assert_in(
+        "async def _1st(self, param: typing.List[str], param_2: typing.Any) -> typing.Any:",
+        source,
+    )
+    assert_in("async def class_(self, param: typing.Any) -> None:", source)
+    assert_in("async def _client_2(self) -> list:", source)
+    assert_in("async def nothing(self, param: typing.Any) -> typing.Any:", source)
+    exec(compile(source, "stubs", "exec"), {})
+
+
+def test_calls():
+    module = _run(load_stubs(registry_url, cache_dir=cache_dir, refresh=True))
+    client = rockets.AsyncClient(server.url)
+    stubs = module.Stubs(client)
+    assert_equal(_run(stubs.get_camera()), {"orientation": [0, 0, 0, 1]})
+    assert_equal(_run(stubs.set_zoom(1.5)), 3.0)
+    assert_equal(_run(stubs.add(1, 2)), 3)
+    _run(client.disconnect())
+
+
+def test_cache():
+    cache = os.path.join(cache_dir, "cache")
+    first = _run(load_stubs(registry_url, cache_dir=cache))
+    del requests[:]
+    second = _run(load_stubs(registry_url.replace("/ws", ""), cache_dir=cache))
+    assert_equal(requests, [])
+    assert_equal(first.SCHEMAS_HASH, second.SCHEMAS_HASH)
+    assert_equal(len(os.listdir(cache)), 1)
+
+    _run(load_stubs(registry_url, cache_dir=cache, refresh=True))
+    assert_in("/registry", requests)
+    assert_equal(len(os.listdir(cache)), 1)
+
+
+def test_default_cache_dir():
+    environ = dict(os.environ)
+    os.environ["XDG_CACHE_HOME"] = os.path.join(cache_dir, "xdg")
+    try:
+        _run(load_stubs(registry_url))
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+    assert_equal(len(os.listdir(os.path.join(cache_dir, "xdg", "rockets", "stubs"))), 1)
+
+
+def test_main_stdout():
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        main([registry_url])
+        source = sys.stdout.getvalue()
+    finally:
+        sys.stdout = stdout
+    assert_in("class Stubs:", source)
+
+
+def test_main_output():
+    output = os.path.join(cache_dir, "api.py")
+    main([registry_url, "-o", output])
+    with open(output) as file:
+        assert_in("class Stubs:", file.read())
+
+
+def test_http_get_error():
+    try:
+        _run(http_get(registry_url.replace("/ws", "/unknown")))
+        assert False
+    except rockets.RequestError as e:
+        assert_equal(e.code, HTTP_ERROR_CODE)
+        assert_equal(e.data, 404)
+
+
+def test_http_get_query():
+    _run(http_get(registry_url.replace("/ws", "/registry?format=json")))
+    assert_equal(requests[-1], "/registry?format=json")
+
+
+@raises(ConnectionError)
+def test_http_get_closed():
+    async def close(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.close()
+
+    raw = _run(asyncio.start_server(close, "localhost", 0))
+    try:
+        _run(http_get("localhost:{}".format(raw.sockets[0].getsockname()[1])))
+    finally:
+        raw.close()
+
+
+def test_method_envelope():
+    envelope = rockets.MethodEnvelope('say "hi"')
+    request_id, message = envelope.encode()
+    assert_equal(
+        json.loads(message), {"jsonrpc": "2.0", "method": 'say "hi"', "id": request_id}
+    )
+    other_id, message = envelope.encode({"a": 1})
+    assert_true(other_id != request_id)
+    assert_equal(json.loads(message)["params"], {"a": 1})
+
+
+def test_method_envelope_cache_and_single_flight():
+    cache = rockets.ResponseCache(["get-camera"])
+    client = rockets.AsyncClient(server.url, cache=cache, single_flight=["add"])
+    camera = rockets.MethodEnvelope("get-camera")
+    add = rockets.MethodEnvelope("add")
+    assert_equal(_run(client.request(camera)), {"orientation": [0, 0, 0, 1]})
+    found, _ = cache.get("get-camera", None)
+    assert_true(found)
+    results = _run(
+        asyncio.gather(client.request(add, [1, 2]), client.request(add, [1, 2]))
+    )
+    assert_equal(results, [3, 3])
+    assert_false(client._single_flight._calls)
+    _run(client.disconnect())
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import os
+import shutil
+import tempfile
+
+from nose.tools import assert_equal
+from nose.tools import assert_false
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets.server import Server
+from rockets.utils import set_ws_protocol
+from rockets.utils import split_unix_url
+
+server = None
+directory = None
+
+
+def setup():
+    global server, directory
+    directory = tempfile.mkdtemp()
+    server = Server()
+    server.bind("ping", lambda params: "pong")
+    server.bind("echo", lambda params: params)
+    _run(server.start_unix(os.path.join(directory, "rockets.sock")))
+
+
+def teardown():
+    _run(server.close())
+    shutil.rmtree(directory)
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def test_split_unix_url():
+    assert_equal(
+        split_unix_url("ws+unix:///tmp/rockets.sock"),
+        ("/tmp/rockets.sock", "ws://localhost/"),
+    )
+    assert_equal(
+        split_unix_url("ws+unix:///tmp/rockets.sock:/ws"),
+        ("/tmp/rockets.sock", "ws://localhost/ws"),
+    )
+    assert_equal(split_unix_url("ws+unix://a:b.sock"), ("a:b.sock", "ws://localhost/"))
+
+
+def test_set_ws_protocol():
+    assert_equal(
+        set_ws_protocol("ws+unix:///tmp/rockets.sock"), "ws+unix:///tmp/rockets.sock"
+    )
+
+
+def test_server_url():
+    assert_equal(server.url, "ws+unix://" + os.path.join(directory, "rockets.sock"))
+
+
+def test_request():
+    client = rockets.AsyncClient(server.url)
+    assert_equal(_run(client.request("ping")), "pong")
+    assert_true(client.connected())
+    assert_equal(_run(client.request("echo", {"a": "b" * 100000})), {"a": "b" * 100000})
+    _run(client.disconnect())
+    assert_false(client.connected())
+
+
+def test_resource_path():
+    client = rockets.AsyncClient(server.url + ":/ws")
+    assert_equal(_run(client.request("ping")), "pong")
+    _run(client.disconnect())
+
+
+def test_sync_client():
+    client = rockets.Client(server.url)
+    assert_equal(client.request("ping"), "pong")
+    client.disconnect()
+
+
+@raises(FileNotFoundError)
+def test_missing_socket():
+    client = rockets.AsyncClient("ws+unix://" + os.path.join(directory, "missing.sock"))
+    _run(client.connect())
+
+
+@raises(ValueError)
+def test_http_transport():
+    rockets.AsyncClient(server.url, transport="http")
+
+
+def test_close_removes_socket():
+    path = os.path.join(directory, "other.sock")
+    other = Server()
+    _run(other.start_unix(path))
+    assert_true(os.path.exists(path))
+    _run(other.close())
+    assert_false(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)
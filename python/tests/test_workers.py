@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018, Blue Brain Project
+#                     Daniel Nachbaur <daniel.nachbaur@epfl.ch>
+#
+# This file is part of Rockets <https://github.com/BlueBrain/Rockets>
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License version 3.0 as published
+# by the Free Software Foundation.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import asyncio
+import pickle
+import threading
+import time
+
+from nose.tools import assert_equal
+from nose.tools import assert_true
+from nose.tools import raises
+
+import rockets
+from rockets.server import Server
+from rockets.server import WorkerPool
+
+stopped = threading.Event()
+
+
+def _square(params, worker):
+    worker.progress("squaring", 0.5)
+    return params[0] ** 2
+
+
+def _wait_for_cancel(params, worker):
+    deadline = time.time() + 5
+    while not worker.cancelled and time.time() < deadline:
+        time.sleep(0.01)
+    stopped.set()
+    return "stopped"
+
+
+def _fail(params, worker):
+    raise rockets.RequestError(-5, "failed", params)
+
+
+server = None
+pools = dict()
+
+
+def setup():
+    global server
+    server = Server()
+    for kind in ("thread", "process"):
+        pool = WorkerPool(kind, size=2)
+        pools[kind] = pool
+        server.bind_worker(kind + "-square", _square, pool)
+        server.bind_worker(kind + "-wait", _wait_for_cancel, pool)
+        server.bind_worker(kind + "-fail", _fail, pool)
+    asyncio.get_event_loop().run_until_complete(server.start())
+
+
+def teardown():
+    for pool in pools.values():
+        pool.shutdown()
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def test_results_and_progress():
+    client = rockets.AsyncClient(server.url)
+    for kind in pools:
+        progress = []
+
+        async def _request():
+            task = client.async_request(kind + "-square", [3])
+            task.add_progress_callback(progress.append)
+            return await task
+
+        assert_equal(_run(_request()), 9)
+        assert_equal([(p.operation, p.amount) for p in progress], [("squaring", 0.5)])
+
+
+def test_concurrent_requests():
+    client = rockets.AsyncClient(server.url)
+    for kind in pools:
+        requests = [client.request(kind + "-square", [i]) for i in range(20)]
+        results = _run(asyncio.gather(*requests))
+        assert_equal(results, [i**2 for i in range(20)])
+
+
+def test_errors():
+    client = rockets.AsyncClient(server.url)
+    for kind in pools:
+        try:
+            _run(client.request(kind + "-fail", [1]))
+            assert False, "request should have failed"
+        except rockets.RequestError as error:
+            assert_equal((error.code, error.data), (-5, [1]))
+
+
+def test_request_error_is_pickled_with_all_arguments():
+    # the errors of a process pool are pickled to reach the server
+    error = pickle.loads(pickle.dumps(rockets.RequestError(-5, "failed", {"x": 1})))
+    assert_equal((error.code, error.message, error.data), (-5, "failed", {"x": 1}))
+
+
+def test_cancel():
+    client = rockets.AsyncClient(server.url)
+    for kind, pool in pools.items():
+        stopped.clear()
+
+        def _worker_stopped():
+            if kind == "thread":
+                return stopped.is_set()
+            return len(pool._free_slots) == 1024
+
+        async def _cancel():
+            task = client.async_request(kind + "-wait")
+            await asyncio.sleep(0.2)
+            task.cancel()
+            await task
+            deadline = time.time() + 2
+            while not _worker_stopped() and time.time() < deadline:
+                await asyncio.sleep(0.01)
+
+        _run(_cancel())
+        assert_true(_worker_stopped())
+
+
+def test_process_pool_limits_calls():
+    pool = WorkerPool("process", size=1, max_calls=1)
+    other = Server()
+    other.bind_worker("square", _square, pool)
+    _run(other.start())
+    try:
+        client = rockets.AsyncClient(other.url)
+        requests = [client.request("square", [i]) for i in range(3)]
+        assert_equal(_run(asyncio.gather(*requests)), [0, 1, 4])
+    finally:
+        _run(other.close())
+        pool.shutdown(wait=False)
+
+
+def test_late_progress_is_dropped():
+    # e.g. of a call which failed before its last progress arrived
+    pools["process"]._on_progress(-1, "late", 1.0)
+
+
+def test_default_size():
+    pool = WorkerPool()
+    assert_true(pool.size >= 1)
+    pool.shutdown()
+
+
+@raises(ValueError)
+def test_unknown_kind():
+    WorkerPool("fiber")
+
+
+if __name__ == "__main__":
+    import nose
+
+    nose.run(defaultTest=__name__)